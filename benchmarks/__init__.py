@@ -0,0 +1,10 @@
+"""
+Offline benchmarks.
+
+Client, parsing, validation and CLI rendering are measured against
+a local stand-in server serving recorded or generated fixtures.
+Usage:
+    python -m benchmarks run
+    python -m benchmarks history
+    python -m benchmarks record
+"""
@@ -0,0 +1,164 @@
+import sys
+
+import click
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from tests.fixtures import FIXTURES
+from . import suite
+
+GROUPS = ("client", "parsing", "validation", "rendering")
+
+
+@click.group()
+def main():
+    """Habr Career client offline benchmarks."""
+
+
+@main.command("run")
+@click.option("-n", "--iterations", type=int, default=20, show_default=True)
+@click.option("-g", "--group", "groups", type=click.Choice(GROUPS),
+              multiple=True, help="Run only specified groups.")
+@click.option("-k", "--pattern", help="Run only cases matching pattern.")
+@click.option("--latency", type=float, default=0.0, show_default=True,
+              help="Stand-in server response delay in seconds.")
+@click.option("--jitter", type=float, default=0.0, show_default=True)
+@click.option("--failure-rate", type=float, default=0.0, show_default=True,
+              help="Share of requests failed by stand-in server.")
+@click.option("--failure-status", type=int, default=500, show_default=True)
+@click.option("--save/--no-save", default=True, show_default=True,
+              help="Append results to history.")
+@click.option("--threshold", type=float, default=0.1, show_default=True,
+              help="Median slowdown reported as regression, 0.1 is 10%.")
+def run(
+        iterations: int,
+        groups: tuple[str],
+        pattern: str | None,
+        latency: float,
+        jitter: float,
+        failure_rate: float,
+        failure_status: int,
+        save: bool,
+        threshold: float,
+) -> None:
+    """Run benchmarks against local stand-in server."""
+    server_options = {
+        "latency": latency,
+        "jitter": jitter,
+        "failure_rate": failure_rate,
+        "failure_status": failure_status,
+    }
+    params = {"iterations": iterations, **server_options}
+    # Only runs with the same server options are comparable
+    history = [e for e in suite.load_history() if e["params"] == params]
+    results = suite.run(iterations, groups, pattern, **server_options)
+
+    console = Console()
+    console.print(build_results_table(results))
+
+    if not save:
+        return
+    entry = suite.save_results(results, params)
+    if history:
+        report_regressions(console, entry, history[-1], threshold)
+
+
+@main.command("history")
+@click.option("-k", "--pattern", help="Show only cases matching pattern.")
+@click.option("-l", "--limit", type=int, default=10, show_default=True)
+def history(pattern: str | None, limit: int) -> None:
+    """Show median time of cases over saved runs."""
+    entries = suite.load_history()[-limit:]
+    if not entries:
+        click.echo("No saved runs.")
+        return
+
+    table = Table(box=box.HORIZONTALS, pad_edge=False)
+    table.add_column("Case", no_wrap=True)
+    for entry in entries:
+        table.add_column(
+            f"{entry['commit'] or '-'}\n{entry['timestamp'][:10]}",
+            justify="right",
+        )
+    names = dict.fromkeys(
+        name for entry in entries for name in entry["results"])
+    for name in names:
+        if pattern and pattern not in name:
+            continue
+        cells = []
+        for entry in entries:
+            result = entry["results"].get(name)
+            cells.append(fmt(result["median"]) if result else "")
+        table.add_row(name, *cells)
+    Console().print(table)
+
+
+@main.command("compare")
+@click.option("--threshold", type=float, default=0.1, show_default=True)
+def compare(threshold: float) -> None:
+    """Compare last saved run with previous one. Exits with 1 on regression."""
+    entries = suite.load_history()
+    if len(entries) < 2:
+        click.echo("At least two saved runs are required.")
+        return
+    console = Console()
+    if report_regressions(console, entries[-1], entries[-2], threshold):
+        sys.exit(1)
+
+
+@main.command("record")
+@click.option("--token", envvar="HABR_CAREER_TOKEN", required=True,
+              help="Auth token, HABR_CAREER_TOKEN by default.")
+def record(token: str) -> None:
+    """Record fixtures from the live site."""
+    from habr.career.client import HABRCareerClient, TokenAuthenticator
+
+    client = HABRCareerClient(auth=TokenAuthenticator(token=token))
+    recorded = set(suite.record(client))
+    for fixture in FIXTURES:
+        status = "recorded" if fixture.name in recorded else "generated"
+        click.echo(f"{fixture.name}: {status}")
+
+
+def build_results_table(results: list[suite.Result]) -> Table:
+    table = Table(box=box.HORIZONTALS, pad_edge=False)
+    table.add_column("Group", no_wrap=True)
+    table.add_column("Case", no_wrap=True)
+    for header in ("Errors", "Min", "Median", "P95", "Ops/s"):
+        table.add_column(header, justify="right", no_wrap=True)
+    for r in results:
+        table.add_row(
+            r.group,
+            r.name,
+            str(r.errors),
+            fmt(r.min),
+            fmt(r.median),
+            fmt(r.p95),
+            f"{r.ops_per_sec:.1f}",
+        )
+    return table
+
+
+def report_regressions(console, current, baseline, threshold) -> bool:
+    regressions = suite.compare(current, baseline, threshold)
+    if not regressions:
+        console.print(
+            f"No regressions against {baseline['commit'] or 'previous run'}.",
+            style="green",
+        )
+        return False
+    console.print(
+        f"Regressions against {baseline['commit'] or 'previous run'}:",
+        style="red",
+    )
+    for name, before, after, change in regressions:
+        console.print(
+            f"  {name}: {fmt(before)} -> {fmt(after)} (+{change:.0%})",
+            style="red",
+        )
+    return True
+
+
+def fmt(seconds: float) -> str:
+    return f"{seconds * 1000:.2f}ms"
@@ -0,0 +1,607 @@
+"""
+Benchmark cases and runner.
+
+Cases are grouped by what they measure:
+    client     - full client call against the stand-in server
+    parsing    - query encoding, JSON codecs and SSR state extraction
+    validation - pydantic model validation
+    rendering  - CLI command output rendering
+"""
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from click.testing import CliRunner
+from rich.console import Console
+from requests import PreparedRequest
+
+from habr.career.client import HABRCareerClient
+from habr.career.client.companies.models import Ratings
+from habr.career.client.conversations.models import Conversations
+from habr.career.client.experts.models import Experts
+from habr.career.client.friendships.models import Friends
+from habr.career.client.matching import ResumeMatcher, VacancyFeatures
+from habr.career.client.metrics import RequestHook, RequestInfo
+from habr.career.client.pipeline import SSRPipeline
+from habr.career.client.resumes import RESUMES_QUERY
+from habr.career.client.salaries.sweep import (
+    SalarySweeper,
+    SQLiteSweepStore,
+    SweepDimensions,
+)
+from habr.career.client.resumes.analytics import GroupBy, SalaryAnalytics
+from habr.career.client.resumes.columnar import ResumeColumns
+from habr.career.client.resumes.models import Resumes
+from habr.career.client.users.enrichment import ProfileCache, ProfileEnricher
+from habr.career.client.vacancies.dedup import VacancyDeduplicator
+from habr.career.client.validation import materialize, validate
+from habr.career import codec
+from habr.career.cli.utils import build_table, truncate_chars
+from habr.career.cli.utils.chart import SeriesChart
+from habr.career.cli.utils.stream import TableStream
+from habr.career.cli.utils.text import truncate_to_width
+from habr.career.utils import (
+    Convertor,
+    Pagination,
+    ValidationMode,
+    get_ssr_json,
+    get_ssr_json_text,
+    cleanup_tags,
+    cleanup_tags_many,
+    _cleanup_tags,
+    _cleanup_tags_soup,
+)
+from tests.fixtures import FIXTURES, find_fixture, vacancy
+from tests.server import LIVE_URL, StandInClient, StandInServer
+
+RESULTS_DIR = Path(__file__).parent / "results"
+HISTORY_FILE = RESULTS_DIR / "history.jsonl"
+# HTML snippets corpus shared with tests
+HTML_SNIPPETS = (
+    Path(__file__).parent.parent / "tests" / "data" / "html_snippets.json")
+
+
+# Client calls shared by benchmarks and fixtures recording
+CLIENT_CALLS: dict[str, Callable[[HABRCareerClient], Any]] = {
+    "me": lambda c: c.me,
+    "resumes": lambda c: c.get_resumes(),
+    "vacancies": lambda c: c.get_vacancies(),
+    "experts": lambda c: c.get_experts(),
+    "ratings": lambda c: c.get_companies_ratings(),
+    "conversations": lambda c: c.get_conversations(),
+    "conversation": lambda c: c.get_conversation("testuser"),
+    "messages": lambda c: c.get_messages("testuser"),
+    "templates": lambda c: c.get_templates(),
+    "friends": lambda c: c.get_friends(),
+    "friendship_requests": lambda c: c.get_friendship_requests(),
+    "my_salary": lambda c: c.my_salary(),
+    "salary_general_graph": lambda c: c.get_salary_general_graph(),
+    "salary_dynamic_graph": lambda c: c.get_salary_dynamic_graph(),
+    "salary_chart": lambda c: c.get_salary_chart(),
+    "resumes_page": lambda c: c.get_resumes_data(),
+    "vacancy_page": lambda c: c.get_vacancy(1000000000),
+    "conversation_page": lambda c: c.get_conversation_data("testuser"),
+    "profile_page": lambda c: c.get_profile("testuser"),
+}
+
+# CLI commands rendering benchmarks
+CLI_COMMANDS: dict[str, list[str]] = {
+    "resumes list": ["resumes", "list"],
+    "resumes list --json": ["resumes", "list", "--json"],
+    "resumes list --raw": ["resumes", "list", "--raw"],
+    "vacancies list": ["vacancies", "list"],
+    "experts list": ["experts", "list"],
+    "companies ratings": ["companies", "ratings"],
+    "conversations list": ["conversations", "list"],
+    "salaries compare_graph": [
+        "salaries", "compare_graph", "-q", "Junior", "-q", "Senior"],
+}
+
+# Typical resumes crawl query, only page changes between requests
+RESUMES_PARAMS = {
+    "q": "python",
+    "skills[]": [446, 1012, 264],
+    "locations[]": ["c_678", "c_679"],
+    "currency": "RUR",
+    "remote": True,
+    "with_salary": True,
+    "page": 1,
+    "per_page": 100,
+}
+
+# Profiles fetched by pipeline benchmarks
+PIPELINE_PAGES = 10
+
+# Filter combinations of salary sweep benchmark
+SWEEP_COMBINATIONS = 40
+
+# Resumes of salary analytics benchmarks
+ANALYTICS_RESUMES = 100000
+
+# Resumes and vacancies of matching benchmarks
+MATCH_RESUMES = 10000
+MATCH_VACANCIES = 100
+
+# Vacancies of deduplication benchmark, every one is posted 5 times
+DEDUP_VACANCIES = 5000
+
+# Rows of table rendering benchmarks
+TABLE_ROWS = 1000
+
+# Points of every series of chart rendering benchmarks
+CHART_POINTS = 10000
+
+# Fixtures validated by validation benchmarks
+VALIDATED_MODELS = {
+    "resumes": Resumes,
+    "experts": Experts,
+    "ratings": Ratings,
+    "conversations": Conversations,
+    "friends": Friends,
+}
+
+
+class Recorder(RequestHook):
+    """Saves live responses as fixtures."""
+
+    def __init__(self):
+        self.recorded: list[str] = []
+
+    def post_request(self, info: RequestInfo) -> None:
+        if info.response is None or not info.response.ok:
+            return
+        path = info.url.removeprefix(LIVE_URL).split("?")[0]
+        fixture = find_fixture(info.method, path)
+        if fixture is not None:
+            fixture.save(info.response.content)
+            self.recorded.append(fixture.name)
+
+
+@dataclass
+class Case:
+    name: str
+    group: str
+    func: Callable[[], Any]
+
+
+@dataclass
+class Result:
+    name: str
+    group: str
+    iterations: int
+    errors: int
+    total: float
+    min: float
+    median: float
+    p95: float
+    mean: float
+    ops_per_sec: float
+
+    @classmethod
+    def from_timings(
+            cls,
+            case: Case,
+            timings: list[float],
+            errors: int,
+    ) -> "Result":
+        ordered = sorted(timings)
+        total = sum(ordered)
+        return cls(
+            name=case.name,
+            group=case.group,
+            iterations=len(ordered),
+            errors=errors,
+            total=total,
+            min=ordered[0],
+            median=statistics.median(ordered),
+            p95=ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            mean=total / len(ordered),
+            ops_per_sec=len(ordered) / total if total else 0.0,
+        )
+
+
+def build_cases(client: HABRCareerClient) -> list[Case]:
+    cases = [
+        Case(name, "client", lambda call=call: call(client))
+        for name, call in CLIENT_CALLS.items()
+    ]
+
+    usernames = [f"user{i}" for i in range(PIPELINE_PAGES)]
+    for parse_workers in (0, None):
+        pipeline = SSRPipeline(parse_workers=parse_workers)
+        cases.append(Case(
+            f"pipeline profiles"
+            f" {'processes' if pipeline.parse_workers else 'threads'}",
+            "client",
+            lambda p=pipeline: list(p.map(client.get_profile, usernames)),
+        ))
+    cases.append(Case(
+        "enrich profiles", "client",
+        lambda: _enrich(client, usernames),
+    ))
+
+    dimensions = SweepDimensions(
+        specializations=[f"spec{i}" for i in range(SWEEP_COMBINATIONS // 2)],
+        remote=[None, True],
+    )
+    cases.append(Case(
+        f"salary sweep {SWEEP_COMBINATIONS} combinations", "client",
+        lambda: _sweep(client, dimensions),
+    ))
+
+    with HTML_SNIPPETS.open(encoding="utf-8") as f:
+        snippets = json.load(f)
+    cases.append(Case(
+        "cleanup_tags soup", "parsing",
+        lambda: [_cleanup_tags_soup(s) for s in snippets],
+    ))
+    cases.append(Case(
+        "cleanup_tags", "parsing",
+        lambda: _cleanup_tags.cache_clear() or [
+            cleanup_tags(s) for s in snippets],
+    ))
+    cases.append(Case(
+        "cleanup_tags cached", "parsing",
+        lambda: [cleanup_tags(s) for s in snippets],
+    ))
+    cases.append(Case(
+        "cleanup_tags_many", "parsing",
+        lambda: _cleanup_tags.cache_clear() or cleanup_tags_many(
+            snippets * 10, strip=True, separator="\n"),
+    ))
+
+    cases.append(Case("query resumes", "parsing", _encode_query))
+    cases.append(Case("query resumes requests", "parsing",
+                      _encode_query_requests))
+
+    fixtures = {f.name: f for f in FIXTURES}
+    for name in ("resumes", "experts", "vacancies"):
+        content = fixtures[name].load()
+        for json_codec in codec.available_codecs():
+            cases.append(Case(
+                f"json {name} {json_codec.name}", "parsing",
+                lambda content=content, c=json_codec: c.loads(content),
+            ))
+    data = json.loads(fixtures["resumes"].load())
+    for json_codec in codec.available_codecs():
+        cases.append(Case(
+            f"dump resumes {json_codec.name}", "parsing",
+            lambda c=json_codec: c.dumps(data, indent=2),
+        ))
+    for name in ("resumes_page", "profile_page"):
+        html = fixtures[name].load().decode()
+        cases.append(Case(f"ssr {name}", "parsing",
+                          lambda html=html: get_ssr_json(html)))
+        state = get_ssr_json_text(html)
+        for json_codec in codec.available_codecs():
+            cases.append(Case(
+                f"ssr state {name} {json_codec.name}", "parsing",
+                lambda state=state, c=json_codec: c.loads(state),
+            ))
+
+    for name, model in VALIDATED_MODELS.items():
+        data = json.loads(fixtures[name].load())
+        for mode in ValidationMode:
+            cases.append(Case(
+                f"model {model.__name__} {mode}", "validation",
+                lambda model=model, data=data, mode=mode: validate(
+                    model, data, mode),
+            ))
+        # Lazy validation when every item is read anyway
+        cases.append(Case(
+            f"model {model.__name__} lazy all", "validation",
+            lambda model=model, data=data: materialize(validate(
+                model, data, ValidationMode.LAZY)),
+        ))
+
+    data = json.loads(fixtures["resumes"].load())
+    cases.append(Case(
+        "columns Resumes", "validation",
+        lambda: ResumeColumns().append_page(data),
+    ))
+
+    columns = ResumeColumns.from_pages(
+        [data] * (ANALYTICS_RESUMES // len(data["list"])))
+    cases.append(Case(
+        f"salary analytics {ANALYTICS_RESUMES} resumes", "parsing",
+        lambda: _salary_analytics(columns),
+    ))
+
+    matcher = _matcher()
+    vacancies = [
+        VacancyFeatures(
+            id=str(i),
+            skills=[(i * 7 + j * 13) % 500 for j in range(5)],
+            qualification=5,
+            location=678,
+            remote=i % 2 == 0,
+            salary_to=300000,
+            currency="rur",
+        )
+        for i in range(MATCH_VACANCIES)
+    ]
+    cases.append(Case(
+        f"match {MATCH_VACANCIES}x{MATCH_RESUMES}", "parsing",
+        lambda: matcher.match_many(vacancies, k=10),
+    ))
+
+    postings = _postings()
+    cases.append(Case(
+        f"dedup {DEDUP_VACANCIES} vacancies", "parsing",
+        lambda: VacancyDeduplicator().annotate(postings),
+    ))
+
+    cells = [_table_cell(i) for i in range(TABLE_ROWS)]
+    cases.append(Case(
+        f"truncate {TABLE_ROWS} cells", "rendering",
+        lambda: [truncate_chars(c, 40) for c in cells],
+    ))
+    cases.append(Case(
+        f"table {TABLE_ROWS} rows", "rendering",
+        lambda: _render_table(cells),
+    ))
+    cases.append(Case(
+        f"stream {TABLE_ROWS} rows", "rendering",
+        lambda: _stream_table(cells),
+    ))
+    series = {
+        f"series {n}": [
+            200000 + 50000 * math.sin(i / (100 * n)) for i in range(CHART_POINTS)
+        ]
+        for n in range(1, 4)
+    }
+    cases.append(Case(
+        f"chart 3x{CHART_POINTS} points", "rendering",
+        lambda: Console(file=io.StringIO(), width=120).print(
+            SeriesChart(series, width=80)),
+    ))
+
+    from habr.career.cli import main
+    runner = CliRunner()
+    for name, args in CLI_COMMANDS.items():
+        cases.append(Case(
+            f"cli {name}", "rendering",
+            lambda args=args: _invoke(runner, main, args, client),
+        ))
+    return cases
+
+
+def _encode_query() -> None:
+    for page in range(1, 101):
+        RESUMES_QUERY.encode({**RESUMES_PARAMS, "page": page})
+
+
+def _encode_query_requests() -> None:
+    """The way params were encoded before `QueryEncoder`."""
+    for page in range(1, 101):
+        params = Convertor().map(
+            {**RESUMES_PARAMS, "page": page}, bool_as_str=True)
+        PreparedRequest().prepare_url(LIVE_URL, params)
+
+
+def _salary_analytics(columns: ResumeColumns) -> None:
+    analytics = SalaryAnalytics(columns, rates={"usd": 90})
+    mask = analytics.mask(remote_work=False)
+    analytics.summary(mask=mask)
+    analytics.histogram(mask=mask)
+    analytics.group_by(GroupBy.SKILL, mask=mask)
+
+
+def _matcher() -> ResumeMatcher:
+    """Matcher of resumes with 6 of 500 skills each."""
+    columns = ResumeColumns()
+    for i in range(MATCH_RESUMES):
+        columns.append({
+            "id": f"user{i}",
+            "salary": {"value": 100000 + i % 50 * 10000, "currency": "rur"},
+            "qualification": {"title": "", "value": (1, 3, 4, 5, 6)[i % 5]},
+            "location": {"title": "Москва", "value": (678, 679, 1)[i % 3]},
+            "remoteWork": i % 2 == 0,
+            "skills": [
+                {"title": f"Навык {s}", "value": (i * 31 + s * 97) % 500}
+                for s in range(6)
+            ],
+        })
+    return ResumeMatcher(columns)
+
+
+def _postings() -> list[dict[str, Any]]:
+    """Vacancies with 100 words descriptions, reposts differ in a few words."""
+    postings = []
+    for i in range(DEDUP_VACANCIES):
+        original, repost = divmod(i, 5)
+        item = vacancy(i)
+        item["company"] = vacancy(original)["company"]
+        words = [f"слово{(original * 7 + j) % 3000}" for j in range(100)]
+        words[repost * 3:repost * 3 + 2] = ["новое", "слово"]
+        item["description"] = "<p>" + " ".join(words) + "</p>"
+        postings.append(item)
+    return postings
+
+
+def _table_cell(index: int) -> str:
+    return (
+        f"<p>Сообщение {index}: ищем Python разработчика — удаленно,"
+        f" 日本語 OK</p><p>Зарплата от {200000 + index} ₽</p>"
+    )
+
+
+def _render_table(cells: list[str]) -> None:
+    table = build_table(
+        rows=[(f"user{i}", c, str(i)) for i, c in enumerate(cells)],
+        headers=["Username", "Message", "ID"],
+        max_cell_width=40,
+    )
+    Console(file=io.StringIO(), width=120).print(table)
+
+
+def _sweep(client: HABRCareerClient, dimensions: SweepDimensions) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteSweepStore(os.path.join(directory, "sweep.sqlite"))
+        SalarySweeper(client, store, rate=None).run("benchmark", dimensions)
+
+
+def _enrich(client: HABRCareerClient, usernames: list[str]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ProfileCache(os.path.join(directory, "profiles.sqlite"))
+        list(ProfileEnricher(client, cache).enrich(usernames))
+
+
+def _stream_table(cells: list[str]) -> None:
+    """The same table printed page by page as pages arrive."""
+    stream = TableStream(
+        Console(file=io.StringIO(), width=120),
+        widths=[10, 40, 4],
+        headers=["Username", "Message", "ID"],
+    )
+    for start in range(0, len(cells), Pagination.PER_PAGE):
+        stream.write(
+            (f"user{i}", truncate_to_width(c, 40), str(i))
+            for i, c in enumerate(
+                cells[start:start + Pagination.PER_PAGE], start)
+        )
+    stream.close()
+
+
+def _invoke(runner: CliRunner, main, args: list[str], client) -> None:
+    group = main.commands[args[0]]
+    result = runner.invoke(group, args[1:], obj=client, catch_exceptions=False)
+    if result.exit_code:
+        raise RuntimeError(result.output)
+
+
+def run_case(case: Case, iterations: int, warmup: int = 1) -> Result:
+    for _ in range(warmup):
+        try:
+            case.func()
+        except Exception:
+            pass
+
+    timings = []
+    errors = 0
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        try:
+            case.func()
+        except Exception:
+            errors += 1
+        timings.append(time.perf_counter() - started_at)
+    return Result.from_timings(case, timings, errors)
+
+
+def run(
+        iterations: int = 20,
+        groups: Iterable[str] | None = None,
+        pattern: str | None = None,
+        **server_options,
+) -> list[Result]:
+    """
+    Run benchmarks against the stand-in server.
+
+    :param iterations: Iterations per case
+    :param groups: Groups to run, all by default
+    :param pattern: Run only cases which names contain the pattern
+    :param server_options: Stand-in server options, e.g. latency
+    :return:
+    """
+    groups = set(groups or ())
+    with StandInServer(**server_options) as server:
+        client = StandInClient(server.url)
+        results = []
+        for case in build_cases(client):
+            if groups and case.group not in groups:
+                continue
+            if pattern and pattern not in case.name:
+                continue
+            results.append(run_case(case, iterations))
+    return results
+
+
+def record(client: HABRCareerClient) -> list[str]:
+    """
+    Record fixtures from the live site.
+
+    :param client: Authorized client
+    :return: Recorded fixtures names
+    """
+    recorder = Recorder()
+    client.add_hook(recorder)
+    for call in CLIENT_CALLS.values():
+        try:
+            call(client)
+        except Exception:
+            # Responses are saved by hook, models may reject them
+            pass
+    return recorder.recorded
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(
+        results: list[Result],
+        params: dict[str, Any],
+        path: Path = HISTORY_FILE,
+) -> dict[str, Any]:
+    """Append run results to history file."""
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "params": params,
+        "results": {r.name: asdict(r) for r in results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as f:
+        f.write(json.dumps(entry) + "\n")
+    return entry
+
+
+def load_history(path: Path = HISTORY_FILE) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    with path.open() as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(
+        current: dict[str, Any],
+        baseline: dict[str, Any],
+        threshold: float = 0.1,
+) -> list[tuple[str, float, float, float]]:
+    """
+    Find cases which median time increased by more than threshold.
+
+    :param current: History entry
+    :param baseline: History entry to compare with
+    :param threshold: Allowed relative slowdown, 0.1 is 10%
+    :return: List of (case name, baseline median, current median, change)
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or not base["median"]:
+            continue
+        change = result["median"] / base["median"] - 1
+        if change > threshold:
+            regressions.append(
+                (name, base["median"], result["median"], change))
+    return regressions
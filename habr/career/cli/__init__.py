@@ -1,3 +1,8 @@
+import time
+
+# Taken before any heavy import to report import time with --timings
+STARTED_AT = time.perf_counter()
+
 from typing import cast
 
 import click
@@ -15,11 +20,14 @@ from .commands import (
     friendships,
     resumes,
     salaries,
+    skills,
     users,
     vacancies,
+    watch,
 )
 from .config import SPINNER
 from .utils import error, info, process_response_error
+from .utils.profiling import Profiler, Timings
 
 
 @click.group()
@@ -39,16 +47,57 @@ from .utils import error, info, process_response_error
     default=False,
     hidden=True,
 )
+@click.option(
+    "--timings",
+    is_flag=True,
+    default=False,
+    help="Print time spent on imports, client init, "
+         "each HTTP call and rendering.",
+)
+@click.option(
+    "--profile",
+    "profile_path",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Dump cProfile statistics of the command to the file.",
+)
 @click.version_option(__version__, message="Version: %(version)s")
 @click.pass_context
-def main(ctx, token: str, session_id, debug: bool) -> None:
+def main(
+        ctx,
+        token: str,
+        session_id,
+        debug: bool,
+        timings: bool,
+        profile_path: str | None,
+) -> None:
     """Habr Career console application."""
+    if profile_path:
+        profiler = Profiler(profile_path)
+        profiler.start()
+        ctx.call_on_close(profiler.stop)
+
+    timings_hook = None
+    if timings:
+        timings_hook = Timings(STARTED_AT)
+        timings_hook.phases["imports"] = time.perf_counter() - STARTED_AT
+        timings_hook.start("client init")
+
     ctx.obj = HABRCareerClient(
         auth=TokenAuthenticator(token=token),
         session_id=session_id,
         debug=debug,
     )
 
+    if timings_hook is not None:
+        timings_hook.stop()
+        ctx.obj.add_hook(timings_hook)
+        timings_hook.start("command")
+
+        def report():
+            timings_hook.stop()
+            timings_hook.report()
+        ctx.call_on_close(report)
+
 
 @main.command("logout")
 @click.pass_obj
@@ -72,5 +121,7 @@ main.add_command(cast(Command, experts.cli))
 main.add_command(cast(Command, friendships.cli))
 main.add_command(cast(Command, resumes.cli))
 main.add_command(cast(Command, salaries.cli))
+main.add_command(cast(Command, skills.cli))
 main.add_command(cast(Command, users.cli))
 main.add_command(cast(Command, vacancies.cli))
+main.add_command(cast(Command, watch.cli))
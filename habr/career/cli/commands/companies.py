@@ -11,18 +11,60 @@ from habr.career.cli.utils import (
     show_table,
     build_table,
     output_as_json,
+    output_raw,
+    success,
+    error,
 )
 from habr.career.client import HABRCareerClient
 from habr.career.client.companies import CompanySize, CompanyRatingCriteria
+from habr.career.client.companies.ratings import (
+    RatingsCrawler,
+    RatingsStore,
+    rating_years,
+)
 from habr.career.utils import Pagination, cleanup_tags
 
+SIZE_HELP = """\b
+    5: Over 5000
+    4: 1000 - 5000
+    3: 100 - 1000
+    2: 10 - 100
+    
+    Размер компании.
+    """
+
+CRITERIA_HELP = """\b
+    av: Общая оценка
+    s_2: Интересные задачи
+    s_16: Современные технологии
+    s_3: Адекватная зарплата
+    s_4: Социальный пакет
+    s_5: Комфортные условия труда
+    s_6: Профессиональный рост
+    s_7: Карьерный рост
+    s_8: Отношения с коллегами
+    s_9: Признание результатов труда
+    s_10: Грамотность менеджмента
+    s_11: Связь с топ-менеджментом
+    s_12: Компания делает мир лучше
+    
+    Критерии оценки.
+    """
+
+store_option = click.option(
+    "-o", "--output",
+    default="ratings.sqlite",
+    show_default=True,
+    help="SQLite file of ratings history.",
+)
+
 
 @click.group("companies")
 def cli():
     """Companies chapter."""
 
 
-@cli.command("ratings")
+@cli.group("ratings", invoke_without_command=True)
 @click.option(
     "-y", "--year",
     type=int,
@@ -35,37 +77,14 @@ def cli():
     type=click.Choice(CompanySize),
     default=CompanySize.HUGE,
     show_default=True,
-    help="""\b
-    5: Over 5000
-    4: 1000 - 5000
-    3: 100 - 1000
-    2: 10 - 100
-    
-    Размер компании.
-    """,
+    help=SIZE_HELP,
 )
 @click.option(
     "-S", "--sort",
     type=click.Choice(CompanyRatingCriteria),
     default=CompanyRatingCriteria.AV,
     show_default=True,
-    help="""\b
-    av: Общая оценка
-    s_2: Интересные задачи
-    s_16: Современные технологии
-    s_3: Адекватная зарплата
-    s_4: Социальный пакет
-    s_5: Комфортные условия труда
-    s_6: Профессиональный рост
-    s_7: Карьерный рост
-    s_8: Отношения с коллегами
-    s_9: Признание результатов труда
-    s_10: Грамотность менеджмента
-    s_11: Связь с топ-менеджментом
-    s_12: Компания делает мир лучше
-    
-    Критерии оценки.
-    """,
+    help=CRITERIA_HELP,
 )
 @click.option(
     "-q", "--search",
@@ -90,6 +109,13 @@ def cli():
     show_default=True,
     help="Show as JSON.",
 )
+@click.option(
+    "--raw", "as_raw",
+    is_flag=True,
+    default=False,
+    help="Output response JSON as is, without validation. "
+         "Faster than --json, field names are as in API.",
+)
 @click.pass_obj
 @process_response_error
 def get_companies_ratings(
@@ -101,18 +127,29 @@ def get_companies_ratings(
         page: int,
         full_scores: bool,
         as_json: bool,
+        as_raw: bool,
 ) -> None:
     """Get companies ratings."""
+    if click.get_current_context().invoked_subcommand is not None:
+        return
+
     console = Console()
 
+    kwargs = {
+        "year": year,
+        "size": size,
+        "sort": sort,
+        "search": search,
+        "page": page,
+    }
+
+    if as_raw:
+        with client.passthrough(stream=True):
+            output_raw(client.get_companies_ratings(**kwargs))
+        return
+
     with console.status("Loading...", spinner=SPINNER):
-        result = client.get_companies_ratings(
-            year=year,
-            size=size,
-            sort=sort,
-            search=search,
-            page=page,
-        )
+        result = client.get_companies_ratings(**kwargs)
 
     if as_json:
         console.print(output_as_json(ratings=result))
@@ -183,6 +220,244 @@ def get_companies_ratings(
     )
 
 
+@get_companies_ratings.command("crawl")
+@store_option
+@click.option(
+    "-y", "--years",
+    type=int,
+    multiple=True,
+    help="Rating years, last 5 years by default.",
+)
+@click.option(
+    "-s", "--sizes",
+    type=click.Choice(CompanySize),
+    multiple=True,
+    help="Company sizes, all by default.",
+)
+@click.option(
+    "-S", "--criteria",
+    type=click.Choice(CompanyRatingCriteria),
+    multiple=True,
+    help="Criteria, all by default. Every page has scores of all "
+         "criteria, other criteria add positions only.",
+)
+@click.option(
+    "-w", "--workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Concurrent requests.",
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0, min_open=True),
+    default=5,
+    show_default=True,
+    help="Requests per second.",
+)
+@click.option(
+    "--max-age",
+    type=click.FloatRange(min=0),
+    default=24,
+    show_default=True,
+    help="Hours, pages of the latest year are not fetched again for.",
+)
+@click.pass_obj
+@process_response_error
+def crawl_ratings(
+        client: HABRCareerClient,
+        output: str,
+        years: list[int],
+        sizes: list[CompanySize],
+        criteria: list[CompanyRatingCriteria],
+        workers: int,
+        rate: float,
+        max_age: float,
+) -> None:
+    """Crawl ratings of every year, company size and criterion."""
+    console = Console()
+    store = RatingsStore(output)
+    crawler = RatingsCrawler(client, store, workers=workers, rate=rate)
+
+    with console.status("Loading...", spinner=SPINNER) as status:
+        stats = crawler.run(
+            years or rating_years(),
+            sizes=sizes or list(CompanySize),
+            criteria=criteria or list(CompanyRatingCriteria),
+            max_age=max_age * 60 * 60,
+            progress=lambda s: status.update(
+                f"Crawling {s.done}/{s.pages} pages..."),
+        )
+
+    success(
+        f"{stats.fetched} pages fetched, {stats.skipped} already saved, "
+        f"{len(stats.failed)} failed of {stats.queries} ratings, "
+        f"{stats.ratings} ratings saved to {output}"
+    )
+    for key, reason in stats.failed.items():
+        error(f"{key}: {reason}")
+    if stats.failed:
+        error("Run the command again to retry failed pages.", exit_code=1)
+
+
+@get_companies_ratings.command("trend")
+@click.argument("company")
+@store_option
+@click.option(
+    "-S", "--sort",
+    type=click.Choice(CompanyRatingCriteria),
+    default=CompanyRatingCriteria.AV,
+    show_default=True,
+    help=CRITERIA_HELP,
+)
+@click.option(
+    "--json/--no-json", "as_json",
+    default=False,
+    show_default=True,
+    help="Show as JSON.",
+)
+@click.pass_obj
+@process_response_error
+def ratings_trend(
+        client: HABRCareerClient,
+        company: str,
+        output: str,
+        sort: CompanyRatingCriteria,
+        as_json: bool,
+) -> None:
+    """Show crawled scores of the company (alias or title) by year."""
+    console = Console()
+    store = RatingsStore(output)
+    alias = store.find(company)
+    if alias is None:
+        error(f"Company {company!r} is not crawled.", exit_code=1)
+
+    trend = store.trend(alias, sort)
+    if as_json:
+        return console.print(output_as_json(trend=[
+            {"year": s.year, "score": s.score, "position": s.position}
+            for s in trend
+        ]))
+
+    rows = []
+    for i, s in enumerate(trend):
+        change = s.score - trend[i - 1].score if i else None
+        rows.append([
+            str(s.year),
+            f"{s.score:.2f}",
+            "" if change is None else f"{change:+.2f}",
+            "" if s.position is None else f"#{s.position}",
+        ])
+    console.print(build_table(
+        rows=rows,
+        headers=["Year", "Score", "Change", "Position"],
+        title=f"{trend[0].title if trend else alias} ({sort})",
+    ))
+
+
+@get_companies_ratings.command("changes")
+@store_option
+@click.option(
+    "-y", "--year",
+    type=int,
+    help="Year, the latest crawled one by default.",
+)
+@click.option(
+    "-p", "--previous",
+    type=int,
+    help="Year to compare with, the year before by default.",
+)
+@click.option(
+    "-s", "--size",
+    type=click.Choice(CompanySize),
+    default=CompanySize.HUGE,
+    show_default=True,
+    help=SIZE_HELP,
+)
+@click.option(
+    "-S", "--sort",
+    type=click.Choice(CompanyRatingCriteria),
+    default=CompanyRatingCriteria.AV,
+    show_default=True,
+    help=CRITERIA_HELP,
+)
+@click.option(
+    "-k", "--count",
+    type=click.IntRange(min=1),
+    help="Companies with the largest changes only.",
+)
+@click.option(
+    "--json/--no-json", "as_json",
+    default=False,
+    show_default=True,
+    help="Show as JSON.",
+)
+@click.pass_obj
+@process_response_error
+def ratings_changes(
+        client: HABRCareerClient,
+        output: str,
+        year: int | None,
+        previous: int | None,
+        size: CompanySize,
+        sort: CompanyRatingCriteria,
+        count: int | None,
+        as_json: bool,
+) -> None:
+    """Show position changes of crawled ratings between two years."""
+    console = Console()
+    store = RatingsStore(output)
+    if year is None:
+        years = store.years()
+        if not years:
+            error(f"No ratings in {output}, crawl them first.", exit_code=1)
+        year = years[-1]
+    previous = previous or year - 1
+
+    changes = store.rank_changes(
+        year, previous, size=size, criterion=sort, k=count)
+    if as_json:
+        return console.print(output_as_json(changes=[
+            {
+                "company": c.alias,
+                "title": c.title,
+                "position": c.position,
+                "previous": c.previous,
+                "change": c.change,
+                "score": c.score,
+                "previous_score": c.previous_score,
+            }
+            for c in changes
+        ]))
+
+    if not changes:
+        console.print("[blue]No ratings[/blue]")
+        return
+
+    def position(value: int | None) -> str:
+        return "—" if value is None else f"#{value}"
+
+    console.print(build_table(
+        rows=[
+            [
+                c.title,
+                position(c.position),
+                position(c.previous),
+                "" if c.change is None else (
+                    f"[green]▲{c.change}[/green]" if c.change > 0
+                    else f"[red]▼{-c.change}[/red]" if c.change < 0
+                    else "="
+                ),
+                "" if c.score is None else f"{c.score:.2f}",
+            ]
+            for c in changes
+        ],
+        headers=["Company", str(year), str(previous), "Change", "Score"],
+        title=f"Ratings changes ({sort}, size {size})",
+        max_cell_width=40,
+    ))
+
+
 @cli.command("subscribe")
 @click.option(
     "-i", "--company-id",
@@ -9,11 +9,14 @@ from habr.career.cli.utils import (
     show_table,
     truncate_chars,
     output_as_json,
+    output_raw,
 )
+from habr.career.cli.utils.stream import iter_pages, page_prompt, stream_table
 from habr.career.client import HABRCareerClient
+from habr.career.client.conversations.models import Conversations
 from habr.career.utils import (
     ComplainReason,
-    cleanup_tags,
+    cleanup_tags_many,
     ConcurrentJobs,
     Pagination,
 )
@@ -21,6 +24,9 @@ from habr.career.utils import (
 from rich.console import Console
 from rich.text import Text
 
+# Name, username, date and last message columns
+CONVERSATIONS_TABLE_WIDTHS = [24, 16, 11, 44]
+
 
 @click.group("conversations")
 def cli() -> None:
@@ -44,23 +50,52 @@ def templates() -> None:
     show_default=True,
     help="Page number.",
 )
+@click.option(
+    "-n", "--pages",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Pages to show starting from --page, 0 for all pages. "
+         "Rows are printed as soon as a page is loaded.",
+)
+@click.option(
+    "--pager",
+    is_flag=True,
+    default=False,
+    help="Load the next page on key press only.",
+)
 @click.option(
     "--json/--no-json", "as_json",
     default=False,
     show_default=True,
     help="Show as JSON.",
 )
+@click.option(
+    "--raw", "as_raw",
+    is_flag=True,
+    default=False,
+    help="Output response JSON as is, without validation. "
+         "Faster than --json, field names are as in API.",
+)
 @click.pass_obj
 @process_response_error
 def get_conversations(
         client: HABRCareerClient,
         search: str,
         page: int,
+        pages: int,
+        pager: bool,
         as_json: bool,
+        as_raw: bool,
 ) -> None:
     """Get conversations list."""
     console = Console()
 
+    if as_raw:
+        with client.passthrough(stream=True):
+            output_raw(client.get_conversations(search, page))
+        return
+
     with console.status("Loading...", spinner=SPINNER):
         conversations = client.get_conversations(search, page)
 
@@ -75,6 +110,43 @@ def get_conversations(
         console.print("[blue]No conversations.[/blue]")
         return
 
+    title = "Conversations"
+    if total_count:
+        title = f"{title} ({total_count})"
+
+    if pages == 1 and not pager:
+        show_table(
+            console=console,
+            title=title,
+            rows=build_conversation_rows(conversations),
+            caption=conversations_caption(conversations),
+            max_cell_width=max(CONVERSATIONS_TABLE_WIDTHS),
+        )
+        return
+
+    def fetch(p: int) -> Conversations:
+        with console.status("Loading...", spinner=SPINNER):
+            return client.get_conversations(search, p)
+
+    stream_table(
+        console=console,
+        results=iter_pages(
+            fetch,
+            conversations,
+            page=page,
+            total_pages=lambda x: x.meta.total,
+            pages=pages,
+            pager=page_prompt if pager else None,
+        ),
+        rows=build_conversation_rows,
+        widths=CONVERSATIONS_TABLE_WIDTHS,
+        max_cell_width=max(CONVERSATIONS_TABLE_WIDTHS),
+        title=title,
+        caption=conversations_caption,
+    )
+
+
+def build_conversation_rows(conversations: Conversations) -> list:
     rows = []
     for username, con in conversations.objects.items():
         last_message = con.conversation.last_message
@@ -119,21 +191,15 @@ def get_conversations(
         body = f"{style}{body}"
 
         rows.append([full_name, username, created_at, body])
+    return rows
 
-    title = "Conversations"
-    if total_count:
-        title = f"{title} ({total_count})"
 
-    show_table(
-        console=console,
-        title=title,
-        rows=rows,
-        caption=", ".join([
-            f"{k.title().replace("_", " ")}: {v}"
-            for k, v in conversations.meta.model_dump(
-                exclude={"total_count"}, exclude_unset=True).items()
-        ]),
-    )
+def conversations_caption(conversations: Conversations) -> str:
+    return ", ".join([
+        f"{k.title().replace("_", " ")}: {v}"
+        for k, v in conversations.meta.model_dump(
+            exclude={"total_count"}, exclude_unset=True).items()
+    ])
 
 
 @cli.command("connect")
@@ -216,13 +282,19 @@ def connect(
         for k, v in meta.model_dump().items()
     ]))
 
+    bodies = dict(zip(
+        (m.id for m in messages),
+        cleanup_tags_many(
+            (m.body for m in messages), strip=True, separator="\n"),
+    ))
+
     for date, messages_ in itertools.groupby(
             messages, key=lambda m: m.created_at.date()):
         date = date.strftime("%d %B %Y")
         rows.append(
             [Text(date, justify="center", style="blue", end="\n\n")])
         for message in messages_:
-            body = cleanup_tags(message.body, strip=True, separator="\n")
+            body = bodies[message.id]
             if message.is_mine:
                 author = me.user.full_name
                 # author = "Me"
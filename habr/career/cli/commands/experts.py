@@ -7,11 +7,14 @@ from habr.career.cli.config import SPINNER
 from habr.career.cli.utils import (
     process_response_error,
     output_as_json,
+    output_raw,
     show_table,
     build_table,
 )
+from habr.career.cli.utils.stream import iter_pages, page_prompt, stream_table
 from habr.career.client import HABRCareerClient
 from habr.career.client.experts import RequestID, ExpertsOrder
+from habr.career.client.experts.models import Experts
 from habr.career.utils import (
     Pagination,
     Currency,
@@ -19,6 +22,9 @@ from habr.career.utils import (
     CurrencySymbol,
 )
 
+# Name and summary columns, 100 cells wide table
+EXPERTS_TABLE_WIDTHS = [25, 70]
+
 
 @click.group("experts")
 def cli():
@@ -127,12 +133,33 @@ def cli():
     show_default=True,
     help="Items per page.",
 )
+@click.option(
+    "-n", "--pages",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Pages to show starting from --page, 0 for all pages. "
+         "Rows are printed as soon as a page is loaded.",
+)
+@click.option(
+    "--pager",
+    is_flag=True,
+    default=False,
+    help="Load the next page on key press only.",
+)
 @click.option(
     "--json/--no-json", "as_json",
     default=False,
     show_default=True,
     help="Show as JSON.",
 )
+@click.option(
+    "--raw", "as_raw",
+    is_flag=True,
+    default=False,
+    help="Output response JSON as is, without validation. "
+         "Faster than --json, field names are as in API.",
+)
 @click.pass_obj
 @process_response_error
 def get_experts(
@@ -150,7 +177,10 @@ def get_experts(
     search: str | None,
     page: int,
     per_page: int,
+    pages: int,
+    pager: bool,
     as_json: bool,
+    as_raw: bool,
 ):
     """Get experts list."""
     console = Console()
@@ -171,6 +201,11 @@ def get_experts(
         "per_page": per_page,
     }
 
+    if as_raw:
+        with client.passthrough(stream=True):
+            output_raw(client.get_experts(**kwargs))
+        return
+
     with console.status("Loading...", spinner=SPINNER):
         result = client.get_experts(**kwargs)
 
@@ -185,10 +220,42 @@ def get_experts(
         console.print(Text("No experts", style="blue"))
         return
 
-    experts = result.objects
-
     table_width = 100
 
+    if pages == 1 and not pager:
+        show_table(
+            console=console,
+            title=f"Эксперты ({total_count})",
+            rows=build_expert_rows(result.objects),
+            caption=experts_caption(result),
+            width=table_width,
+            max_cell_width=max(EXPERTS_TABLE_WIDTHS),
+        )
+        return
+
+    def fetch(p: int) -> Experts:
+        with console.status("Loading...", spinner=SPINNER):
+            return client.get_experts(**{**kwargs, "page": p})
+
+    stream_table(
+        console=console,
+        results=iter_pages(
+            fetch,
+            result,
+            page=page,
+            total_pages=lambda x: x.meta.total_pages,
+            pages=pages,
+            pager=page_prompt if pager else None,
+        ),
+        rows=lambda x: build_expert_rows(x.objects),
+        widths=EXPERTS_TABLE_WIDTHS,
+        max_cell_width=max(EXPERTS_TABLE_WIDTHS),
+        title=f"Эксперты ({total_count})",
+        caption=experts_caption,
+    )
+
+
+def build_expert_rows(experts: list) -> list:
     rows = []
     for expert in experts:
         full_name = expert.title
@@ -327,14 +394,11 @@ def get_experts(
             ]),
             summary_table,
         ])
+    return rows
 
-    show_table(
-        console=console,
-        title=f"Эксперты ({total_count})",
-        rows=rows,
-        caption=", ".join([
-            f"{k.title().replace("_", " ")}: {v}"
-            for k, v in meta.model_dump(exclude={"total"}).items()
-        ]),
-        width=table_width,
-    )
+
+def experts_caption(result: Experts) -> str:
+    return ", ".join([
+        f"{k.title().replace("_", " ")}: {v}"
+        for k, v in result.meta.model_dump(exclude={"total"}).items()
+    ])
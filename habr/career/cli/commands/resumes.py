@@ -7,9 +7,11 @@ from habr.career.cli.config import SPINNER, EXPERT_MARK
 from habr.career.cli.utils import (
     process_response_error,
     output_as_json,
+    output_raw,
     show_table,
     build_table,
 )
+from habr.career.cli.utils.stream import iter_pages, page_prompt, stream_table
 from habr.career.client import HABRCareerClient
 from habr.career.client.resumes import (
     CareerSearchField,
@@ -17,12 +19,16 @@ from habr.career.client.resumes import (
     CareerSortingCriteria,
     CareerWorkState,
 )
+from habr.career.client.resumes.models import Resumes
 from habr.career.utils import (
     Pagination,
     Currency,
     QualificationID,
 )
 
+# Name and summary columns, 100 cells wide table
+RESUMES_TABLE_WIDTHS = [25, 70]
+
 
 @click.group("resumes")
 def cli():
@@ -235,12 +241,33 @@ def filters():
     show_default=True,
     help="Items per page.",
 )
+@click.option(
+    "-n", "--pages",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Pages to show starting from --page, 0 for all pages. "
+         "Rows are printed as soon as a page is loaded.",
+)
+@click.option(
+    "--pager",
+    is_flag=True,
+    default=False,
+    help="Load the next page on key press only.",
+)
 @click.option(
     "--json/--no-json", "as_json",
     default=False,
     show_default=True,
     help="Show as JSON.",
 )
+@click.option(
+    "--raw", "as_raw",
+    is_flag=True,
+    default=False,
+    help="Output response JSON as is, without validation. "
+         "Faster than --json, field names are as in API.",
+)
 @click.pass_obj
 @process_response_error
 def get_resumes(
@@ -277,7 +304,10 @@ def get_resumes(
 
     page: int,
     per_page: int,
+    pages: int,
+    pager: bool,
     as_json: bool,
+    as_raw: bool,
 ) -> None:
     """Get resumes list."""
     console = Console()
@@ -317,6 +347,11 @@ def get_resumes(
             "per_page": per_page,
         }
 
+    if as_raw:
+        with client.passthrough(stream=True):
+            output_raw(client.get_resumes(**kwargs))
+        return
+
     with console.status("Loading...", spinner=SPINNER):
         result = client.get_resumes(**kwargs)
 
@@ -328,17 +363,35 @@ def get_resumes(
         console.print(Text("No resumes", style="blue"))
         return
 
-    show_resumes_table(console, result)
+    if pages == 1 and not pager:
+        show_resumes_table(console, result)
+        return
 
+    def fetch(p: int) -> Resumes:
+        with console.status("Loading...", spinner=SPINNER):
+            return client.get_resumes(**{**kwargs, "page": p})
 
-def show_resumes_table(console, result):
-    meta = result.meta
-    total_count = meta.total_results
+    stream_table(
+        console=console,
+        results=iter_pages(
+            fetch,
+            result,
+            page=page,
+            total_pages=lambda x: x.meta.total_pages,
+            pages=pages,
+            pager=page_prompt if pager else None,
+        ),
+        rows=lambda x: build_resume_rows(x.objects),
+        widths=RESUMES_TABLE_WIDTHS,
+        max_cell_width=max(RESUMES_TABLE_WIDTHS),
+        title=f"Специалисты ({result.meta.total_results})",
+        caption=resumes_caption,
+    )
 
-    table_width = 100
 
+def build_resume_rows(resumes: list) -> list:
     rows = []
-    for resume in result.objects:
+    for resume in resumes:
         full_name = resume.title
         username = resume.id
         last_visited = resume.last_visited.title
@@ -451,25 +504,37 @@ def show_resumes_table(console, result):
             ]),
             summary_table,
         ])
+    return rows
+
 
+def resumes_caption(result: Resumes) -> str:
     limited_access = result.limited_access and "Поиск ограничен"
     # TODO:
     #  type = noCompany
     #  type = guest
 
+    return "\n".join(x for x in [
+        ", ".join([
+            f"{k.title().replace("_", " ")}: {v}"
+            for k, v in result.meta.model_dump(
+                exclude={"total_results"}).items()
+        ]),
+        limited_access and f"[red]{limited_access}[/red]",
+    ] if x)
+
+
+def show_resumes_table(console, result):
+    total_count = result.meta.total_results
+
+    table_width = 100
+
     show_table(
         console=console,
         title=f"Специалисты ({total_count})",
-        rows=rows,
-        caption="\n".join(x for x in [
-            ", ".join([
-                f"{k.title().replace("_", " ")}: {v}"
-                for k, v in meta.model_dump(
-                    exclude={"total_results"}).items()
-            ]),
-            limited_access and f"[red]{limited_access}[/red]",
-        ] if x),
+        rows=build_resume_rows(result.objects),
+        caption=resumes_caption(result),
         width=table_width,
+        max_cell_width=max(RESUMES_TABLE_WIDTHS),
     )
 
 
@@ -1,3 +1,6 @@
+import math
+from datetime import date
+
 import click
 from rich.console import Console
 
@@ -5,11 +8,84 @@ from habr.career.cli.config import SPINNER, DEFAULT_COLOR
 from habr.career.cli.utils import (
     process_response_error,
     output_as_json,
+    build_table,
+    success,
+    error,
+    info,
 )
-from habr.career.cli.utils.chart import Chart
+from habr.career.cli.utils.chart import Chart, SeriesChart, to_readable
 from habr.career.client import HABRCareerClient
+from habr.career.client.crawl import SQLiteWorkQueue, UnitKind
+from habr.career.client.resumes.analytics import (
+    PERCENTILES,
+    GroupBy,
+    SalaryAnalytics,
+)
+from habr.career.client.resumes.columnar import ResumeColumns
 from habr.career.client.salaries import EmploymentType
-from habr.career.utils import ConcurrentJobs, Qualification, CurrencySymbol
+from habr.career.client.salaries.history import (
+    MY_SALARY,
+    SalaryHistory,
+    percent_change,
+    series_key,
+)
+from habr.career.client.salaries.sweep import (
+    SalarySweeper,
+    SQLiteSweepStore,
+    SweepDimensions,
+)
+from habr.career.utils import (
+    ConcurrentJobs,
+    Currency,
+    CurrencySymbol,
+    Qualification,
+    QualificationID,
+)
+
+# Styles of compared series
+SERIES_STYLES = (DEFAULT_COLOR, "cyan", "green", "magenta", "red", "blue")
+
+# Remote work filter values of sweep
+REMOTE_MODES = {"any": None, "yes": True, "no": False}
+
+
+def series_pairs(
+        qualifications: list[Qualification],
+        specializations: list[str],
+) -> list[tuple[Qualification, str | None]]:
+    """Every qualification and specialization pair is a series."""
+    return [
+        (qualification, specialization)
+        for qualification in qualifications or [Qualification.ALL]
+        for specialization in specializations or [None]
+    ]
+
+
+def series_name(
+        qualification: Qualification,
+        specialization: str | None,
+) -> str:
+    return " • ".join(x for x in [
+        specialization,
+        qualification if qualification != Qualification.ALL else None,
+    ] if x)
+
+
+def parse_rates(
+        ctx: click.Context,
+        param: click.Parameter,
+        value: tuple[str, ...],
+) -> dict[str, float]:
+    """Parse `currency=rate` pairs."""
+    rates = {}
+    for item in value:
+        currency, _, rate = item.partition("=")
+        try:
+            rates[Currency(currency.strip().lower())] = float(rate)
+        except ValueError:
+            raise click.BadParameter(
+                f"{item!r} is not a currency=rate pair, e.g. usd=92.5")
+    return rates
 
 
 @click.group("salaries")
@@ -282,3 +358,643 @@ def dynamic_graph(
         title="Зарплаты в динамике",
     )
     console.print(chart)
+
+
+@cli.command("compare_graph")
+@click.option(
+    "-q", "--qualifications",
+    type=click.Choice(Qualification),
+    multiple=True,
+    help="Qualification to compare, every one is a separate series.",
+)
+@click.option(
+    "-s", "--specializations",
+    multiple=True,
+    help="Specialization alias to compare, every one is a separate series.",
+)
+@click.option(
+    "-r", "--remote",
+    is_flag=True,
+    default=None,
+    help="",
+)
+@click.option(
+    "-e", "--employment_type",
+    type=click.Choice(EmploymentType),
+    help="""\b
+    0: Full time
+    1: Part time
+    """,
+)
+@click.option(
+    "-c", "--company",
+    help="",
+)
+@click.option(
+    "-S", "--skills",
+    multiple=True,
+    help="",
+)
+@click.option(
+    "-l", "--locations",
+    multiple=True,
+    help="",
+)
+@click.option(
+    "-E", "--exclude_locations",
+    is_flag=True,
+    default=None,
+    help="",
+)
+@click.option(
+    "-m", "--my/--no-my", "with_my_salary",
+    default=True,
+    show_default=True,
+    help="Show my salary series.",
+)
+@click.option(
+    "-W", "--width",
+    type=click.IntRange(min=10),
+    default=60,
+    show_default=True,
+    help="Chart width, longer series are averaged to fit it.",
+)
+@click.option(
+    "-H", "--height",
+    type=click.IntRange(min=3),
+    default=12,
+    show_default=True,
+    help="Chart height.",
+)
+@click.option(
+    "--json/--no-json", "as_json",
+    default=False,
+    show_default=True,
+    help="",
+)
+@click.pass_obj
+@process_response_error
+def compare_graph(
+        client: HABRCareerClient,
+        qualifications: list[Qualification],
+        specializations: list[str],
+        remote: bool | None,
+        employment_type: EmploymentType | None,
+        company: str | None,
+        skills: list[str] | None,
+        locations: list[str] | None,
+        exclude_locations: bool | None,
+        with_my_salary: bool,
+        width: int,
+        height: int,
+        as_json: bool,
+) -> None:
+    """Compare salary dynamics of qualifications and specializations."""
+    console = Console()
+    jobs = ConcurrentJobs()
+
+    filter_ = {
+        "remote": remote,
+        "employment_type": employment_type,
+        "company": company,
+        "skills": skills,
+        "locations": locations,
+        "exclude_locations": exclude_locations,
+    }
+
+    pairs = series_pairs(qualifications, specializations)
+    for qualification, specialization in pairs:
+        jobs.register(
+            client.get_salary_dynamic_graph,
+            qualification=qualification,
+            specializations=specialization and [specialization],
+            **filter_,
+        )
+    if with_my_salary:
+        jobs.register(client.my_salary)
+
+    with console.status("Loading...", spinner=SPINNER):
+        results = list(jobs.run())
+
+    my_salary_ = results.pop() if with_my_salary else None
+    series = {}
+    periods = {}
+    for (qualification, specialization), result in zip(pairs, results):
+        name = (series_name(qualification, specialization)
+                or result.graphs_data.title)
+        series[name] = {p.key: p.value for p in result.graphs_data.periods}
+        periods.update(
+            (p.key, p.title) for p in result.graphs_data.periods)
+    if my_salary_ is not None:
+        series["Моя зарплата"] = {
+            p.key: p.value for p in my_salary_.periods
+            if p.value is not None
+        }
+
+    # Periods of series may differ, they are aligned by period key
+    keys = sorted(periods)
+
+    if as_json:
+        console.print(
+            output_as_json(
+                periods=[{"key": k, "title": periods[k]} for k in keys],
+                series={
+                    name: [values.get(k) for k in keys]
+                    for name, values in series.items()
+                },
+            )
+        )
+        return
+
+    styles = [
+        SERIES_STYLES[i % len(SERIES_STYLES)] for i in range(len(series))]
+    if my_salary_ is not None:
+        styles[-1] = "yellow"
+
+    chart = SeriesChart(
+        series={
+            name: [values.get(k) for k in keys]
+            for name, values in series.items()
+        },
+        labels=[periods[k] for k in keys],
+        styles=styles,
+        width=width,
+        height=height,
+        title="Зарплаты в динамике",
+    )
+    console.print(chart)
+
+
+@cli.command("sweep")
+@click.option(
+    "-q", "--qualifications",
+    type=click.Choice(Qualification),
+    multiple=True,
+    help="Qualification groups to save, all by default.",
+)
+@click.option(
+    "-s", "--specializations",
+    multiple=True,
+    help="Specialization alias.",
+)
+@click.option(
+    "-l", "--locations",
+    multiple=True,
+    help="Location alias.",
+)
+@click.option(
+    "-S", "--skills",
+    multiple=True,
+    help="Skill alias.",
+)
+@click.option(
+    "-r", "--remote",
+    type=click.Choice(REMOTE_MODES),
+    multiple=True,
+    help="Remote work filter: any (not filtered), yes or no.",
+)
+@click.option(
+    "-e", "--employment_types",
+    type=click.Choice(EmploymentType),
+    multiple=True,
+    help="""\b
+    0: Full time
+    1: Part time
+    """,
+)
+@click.option(
+    "-o", "--output",
+    default="salaries.sqlite",
+    show_default=True,
+    help="SQLite file with results.",
+)
+@click.option(
+    "-i", "--sweep-id",
+    help="Sweep identifier, current ISO week by default. "
+         "Run with the same identifier to resume the sweep.",
+)
+@click.option(
+    "-w", "--workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Concurrent requests.",
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0, min_open=True),
+    default=5,
+    show_default=True,
+    help="Requests per second.",
+)
+@click.option(
+    "--csv", "csv_path",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Export sweep rows to CSV file.",
+)
+@click.pass_obj
+@process_response_error
+def sweep(
+        client: HABRCareerClient,
+        qualifications: list[Qualification],
+        specializations: list[str],
+        locations: list[str],
+        skills: list[str],
+        remote: list[str],
+        employment_types: list[EmploymentType],
+        output: str,
+        sweep_id: str | None,
+        workers: int,
+        rate: float,
+        csv_path: str | None,
+) -> None:
+    """Sweep general salary graph over every filter combination."""
+    console = Console()
+
+    sweep_id = sweep_id or date.today().strftime("%G-W%V")
+    dimensions = SweepDimensions(
+        qualifications=list(qualifications or Qualification),
+        specializations=list(specializations),
+        locations=list(locations),
+        skills=list(skills),
+        remote=[REMOTE_MODES[x] for x in remote],
+        employment_types=list(employment_types),
+    )
+    store = SQLiteSweepStore(output)
+    sweeper = SalarySweeper(client, store, workers=workers, rate=rate)
+
+    with console.status("Loading...", spinner=SPINNER) as status:
+        stats = sweeper.run(
+            sweep_id,
+            dimensions,
+            progress=lambda s: status.update(
+                f"Sweeping {s.done}/{s.total}..."),
+        )
+
+    success(
+        f"Sweep {sweep_id}: {stats.fetched} fetched, "
+        f"{stats.skipped} already saved, {len(stats.failed)} failed "
+        f"of {stats.total} combinations, {stats.rows} rows saved "
+        f"to {output}"
+    )
+    for key, reason in stats.failed.items():
+        error(f"{key}: {reason}")
+
+    if csv_path:
+        with open(csv_path, "w", newline="") as f:
+            count = store.export_csv(sweep_id, f)
+        info(f"{count} rows exported to {csv_path}")
+
+    if stats.failed:
+        error("Run the command again to retry failed combinations.",
+              exit_code=1)
+
+
+@cli.command("history")
+@click.option(
+    "-q", "--qualifications",
+    type=click.Choice(Qualification),
+    multiple=True,
+    help="Qualification, every one is a separate series.",
+)
+@click.option(
+    "-s", "--specializations",
+    multiple=True,
+    help="Specialization alias, every one is a separate series.",
+)
+@click.option(
+    "-m", "--my/--no-my", "with_my_salary",
+    default=True,
+    show_default=True,
+    help="Show my salary series.",
+)
+@click.option(
+    "-o", "--output",
+    default="salary_history.sqlite",
+    show_default=True,
+    help="SQLite file with salary history.",
+)
+@click.option(
+    "--refresh/--no-refresh",
+    default=True,
+    show_default=True,
+    help="Fetch series whose latest period is stale.",
+)
+@click.option(
+    "--start",
+    type=int,
+    help="First period key, e.g. 221 for the first half of 2022.",
+)
+@click.option(
+    "--end",
+    type=int,
+    help="Last period key.",
+)
+@click.option(
+    "-W", "--width",
+    type=click.IntRange(min=10),
+    default=60,
+    show_default=True,
+    help="Chart width.",
+)
+@click.option(
+    "-H", "--height",
+    type=click.IntRange(min=3),
+    default=12,
+    show_default=True,
+    help="Chart height.",
+)
+@click.option(
+    "--json/--no-json", "as_json",
+    default=False,
+    show_default=True,
+    help="",
+)
+@click.pass_obj
+@process_response_error
+def history(
+        client: HABRCareerClient,
+        qualifications: list[Qualification],
+        specializations: list[str],
+        with_my_salary: bool,
+        output: str,
+        refresh: bool,
+        start: int | None,
+        end: int | None,
+        width: int,
+        height: int,
+        as_json: bool,
+) -> None:
+    """Show salary history kept locally, fetching stale series only."""
+    console = Console()
+    store = SalaryHistory(output)
+
+    names = {}
+    filters = []
+    for qualification, specialization in series_pairs(
+            qualifications, specializations):
+        filter_ = {
+            "qualification": qualification,
+            "specializations": specialization and [specialization],
+        }
+        filters.append(filter_)
+        names[series_key(filter_)] = series_name(
+            qualification, specialization)
+    if with_my_salary:
+        names[MY_SALARY] = "Моя зарплата"
+
+    if refresh:
+        with console.status("Loading...", spinner=SPINNER):
+            store.refresh(client, filters, my_salary=with_my_salary)
+
+    periods, series = store.aligned(names, start, end)
+    titles = store.period_titles(periods)
+    names = {
+        key: name or store.title(key) or key for key, name in names.items()}
+
+    if as_json:
+        console.print(
+            output_as_json(
+                periods=[
+                    {"key": k, "title": t} for k, t in zip(periods, titles)],
+                series={
+                    names[key]: [None if v != v else v for v in values]
+                    for key, values in series.items()
+                },
+            )
+        )
+        return
+
+    if not periods:
+        console.print("[blue]No salary history[/blue]")
+        return
+
+    styles = [
+        SERIES_STYLES[i % len(SERIES_STYLES)] for i in range(len(series))]
+    if with_my_salary:
+        styles[-1] = "yellow"
+
+    console.print(SeriesChart(
+        series={names[key]: values for key, values in series.items()},
+        labels=titles,
+        styles=styles,
+        width=width,
+        height=height,
+        title="Зарплаты в динамике",
+    ))
+
+    rows = []
+    for key in series:
+        _, values = store.series(key, start, end)
+        changes = percent_change(values)
+        change = store.change(key, start, end)
+        rows.append([
+            names[key],
+            to_readable(values[-1], 1) if values else "",
+            f"{changes[-1]:+.1f}%" if changes and changes[-1] == changes[-1]
+            else "",
+            f"{change:+.1f}%" if change is not None else "",
+        ])
+    console.print(build_table(
+        rows=rows,
+        headers=["Series", "Last", "Last change", "Total change"],
+    ))
+
+
+@cli.command("local_stats")
+@click.option(
+    "-d", "--database",
+    type=click.Path(exists=True, dir_okay=False),
+    default="crawl.sqlite",
+    show_default=True,
+    help="SQLite file of the crawl queue.",
+)
+@click.option(
+    "-c", "--crawl-id",
+    required=True,
+    help="Crawl identifier of resumes pages.",
+)
+@click.option(
+    "-g", "--group-by",
+    type=click.Choice(GroupBy),
+    help="Column to group resumes by.",
+)
+@click.option(
+    "-p", "--percentiles", "qs",
+    type=click.FloatRange(min=0, max=100),
+    multiple=True,
+    help=f"Percentile, {', '.join(map(str, PERCENTILES))} by default.",
+)
+@click.option(
+    "--currency",
+    type=click.Choice(Currency),
+    default=Currency.RUR,
+    show_default=True,
+    help="Currency of salaries.",
+)
+@click.option(
+    "-r", "--rate", "rates",
+    multiple=True,
+    callback=parse_rates,
+    help="Value of other currency unit, e.g. usd=92.5. "
+         "Salaries in currencies without rate are skipped.",
+)
+@click.option(
+    "-Q", "--qualifications",
+    type=click.Choice(QualificationID),
+    multiple=True,
+    help="""\b
+    1: Intern
+    3: Junior
+    4: Middle
+    5: Senior
+    6: Lead
+    """,
+)
+@click.option(
+    "-K", "--skills",
+    type=int,
+    multiple=True,
+    help="Skill ID, resumes with any of skills match.",
+)
+@click.option(
+    "-L", "--locations",
+    type=int,
+    multiple=True,
+    help="Location ID.",
+)
+@click.option(
+    "--remote/--no-remote",
+    default=None,
+    help="Remote work.",
+)
+@click.option(
+    "--min-count",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Skip groups with fewer resumes.",
+)
+@click.option(
+    "-b", "--bins",
+    type=click.IntRange(min=0),
+    default=10,
+    show_default=True,
+    help="Histogram bins, 0 to skip histogram.",
+)
+@click.option(
+    "--json/--no-json", "as_json",
+    default=False,
+    show_default=True,
+    help="",
+)
+@click.pass_obj
+@process_response_error
+def local_stats(
+        client: HABRCareerClient,
+        database: str,
+        crawl_id: str,
+        group_by: GroupBy | None,
+        qs: list[float],
+        currency: Currency,
+        rates: dict[str, float],
+        qualifications: list[QualificationID],
+        skills: list[int],
+        locations: list[int],
+        remote: bool | None,
+        min_count: int,
+        bins: int,
+        as_json: bool,
+) -> None:
+    """Show salary distribution of crawled resumes."""
+    console = Console()
+    qs = tuple(qs or PERCENTILES)
+
+    with console.status("Loading...", spinner=SPINNER):
+        columns = ResumeColumns.from_pages(
+            result
+            for unit, result in SQLiteWorkQueue(database).results(crawl_id)
+            if unit.kind == UnitKind.RESUMES
+        )
+        analytics = SalaryAnalytics(columns, rates, currency)
+        mask = analytics.mask(
+            qualifications=[int(q) for q in qualifications] or None,
+            locations=locations or None,
+            skills=skills or None,
+            remote_work=remote,
+        )
+        if group_by is None:
+            groups = [analytics.summary(qs, mask)]
+        else:
+            groups = analytics.group_by(group_by, qs, mask, min_count)
+        edges, counts = analytics.histogram(bins, mask) if bins else ([], [])
+
+    count = mask.count(1)
+    if as_json:
+        def number(value: float) -> float | None:
+            # Statistics of empty groups are NaN, not valid JSON
+            return None if math.isnan(value) else value
+
+        return console.print(
+            output_as_json(
+                currency=currency,
+                count=count,
+                unconverted=analytics.unconverted,
+                groups=[
+                    {
+                        "key": group.key,
+                        "title": group.title,
+                        "count": group.count,
+                        "mean": number(group.mean),
+                        "percentiles": {
+                            str(q): number(v)
+                            for q, v in group.percentiles.items()
+                        },
+                    }
+                    for group in groups
+                ],
+                histogram=[
+                    {"from": low, "to": high, "count": n}
+                    for low, high, n in zip(edges, edges[1:], counts)
+                ],
+            )
+        )
+
+    if not count:
+        console.print("[blue]No resumes with salary[/blue]")
+        return
+
+    symbol = CurrencySymbol.by_name(currency)
+    console.print(build_table(
+        rows=[
+            [
+                group.title,
+                str(group.count),
+                f"{to_readable(group.mean, 1)} {symbol}",
+                *[f"{to_readable(v, 1)} {symbol}"
+                  for v in group.percentiles.values()],
+            ]
+            for group in groups
+        ],
+        headers=[
+            str(group_by or "").capitalize() or "Resumes",
+            "Count",
+            "Mean",
+            *[f"P{q:g}" for q in qs],
+        ],
+    ))
+
+    if bins:
+        console.print(Chart(
+            data=[(n,) for n in counts],
+            labels=[
+                f"{to_readable(low, 1)}–{to_readable(high, 1)} {symbol}"
+                for low, high in zip(edges, edges[1:])
+            ],
+            categories=["Резюме"],
+            title="Распределение зарплат",
+        ))
+
+    if analytics.unconverted:
+        info(f"{analytics.unconverted} resumes with salary in currencies "
+             f"without rate are skipped, see --rate.")
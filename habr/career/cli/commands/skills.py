@@ -0,0 +1,273 @@
+import click
+from rich.console import Console
+
+from habr.career.cli.config import SPINNER
+from habr.career.cli.utils import (
+    process_response_error,
+    output_as_json,
+    build_table,
+    success,
+    error,
+)
+from habr.career.client import HABRCareerClient
+from habr.career.client.crawl import SQLiteWorkQueue
+from habr.career.client.skills import (
+    SkillIndex,
+    SkillRank,
+    SkillScore,
+    SkillSource,
+)
+from habr.career.utils import Pagination, QualificationID
+
+QUALIFICATION_HELP = """\b
+    1: Intern
+    3: Junior
+    4: Middle
+    5: Senior
+    6: Lead
+    """
+
+index_option = click.option(
+    "-o", "--output",
+    default="skills.sqlite",
+    show_default=True,
+    help="SQLite file of the skill index.",
+)
+qualification_option = click.option(
+    "-Q", "--qualification",
+    type=click.Choice(QualificationID),
+    help=QUALIFICATION_HELP,
+)
+location_option = click.option(
+    "-L", "--location",
+    type=int,
+    help="Location ID, e.g. 678 for Moscow.",
+)
+count_option = click.option(
+    "-k", "--count",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Number of skills.",
+)
+min_count_option = click.option(
+    "--min-count",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Skip skills met fewer times.",
+)
+json_option = click.option(
+    "--json/--no-json", "as_json",
+    default=False,
+    show_default=True,
+    help="",
+)
+
+
+def show_scores(
+        console: Console,
+        scores: list[SkillScore],
+        headers: list[str],
+        as_json: bool,
+) -> None:
+    if as_json:
+        return console.print(output_as_json(skills=[
+            {
+                "skill": s.skill,
+                "title": s.title,
+                "count": s.count,
+                "score": s.score,
+            }
+            for s in scores
+        ]))
+
+    if not scores:
+        console.print("[blue]No skills[/blue]")
+        return
+
+    console.print(build_table(
+        rows=[
+            [s.title, str(s.skill), str(s.count), f"{s.score:.2f}"]
+            for s in scores
+        ],
+        headers=headers,
+    ))
+
+
+@click.group("skills")
+def cli():
+    """Skills chapter."""
+
+
+@cli.command("index")
+@index_option
+@click.option(
+    "-d", "--database",
+    type=click.Path(exists=True, dir_okay=False),
+    help="SQLite file of the crawl queue.",
+)
+@click.option(
+    "-c", "--crawl-id",
+    help="Crawl identifier of resumes and vacancies pages.",
+)
+@click.option(
+    "-n", "--pages",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Number of resumes and vacancies pages to fetch.",
+)
+@click.option(
+    "-s", "--sources",
+    type=click.Choice(SkillSource),
+    multiple=True,
+    help="Fetched pages, resumes and vacancies by default.",
+)
+@qualification_option
+@click.option(
+    "-K", "--skills",
+    type=int,
+    multiple=True,
+    help="Fetch pages filtered by skills.",
+)
+@click.pass_obj
+@process_response_error
+def index(
+        client: HABRCareerClient,
+        output: str,
+        database: str | None,
+        crawl_id: str | None,
+        pages: int,
+        sources: list[SkillSource],
+        qualification: QualificationID | None,
+        skills: list[int],
+) -> None:
+    """Count skills of crawled or fetched resumes and vacancies."""
+    console = Console()
+    if crawl_id is None and not pages:
+        error("Pass --crawl-id to index a crawl or --pages to fetch pages.",
+              exit_code=1)
+
+    skill_index = SkillIndex(output)
+    before = sum(skill_index.documents(source) for source in SkillSource)
+    with console.status("Indexing...", spinner=SPINNER) as status:
+        if crawl_id is not None:
+            queue = SQLiteWorkQueue(database or "crawl.sqlite")
+            skill_index.add_crawl(queue, crawl_id)
+
+        filters = {
+            "qualification": qualification,
+            "skills": list(skills) or None,
+        }
+        for page in range(Pagination.INIT_PAGE, pages + 1):
+            status.update(f"Indexing page {page}/{pages}...")
+            if SkillSource.RESUMES in (sources or SkillSource):
+                client.record_resume_skills(skill_index, page=page, **filters)
+            if SkillSource.VACANCIES in (sources or SkillSource):
+                client.record_vacancy_skills(
+                    skill_index, page=page, **filters)
+
+    resumes = skill_index.documents(SkillSource.RESUMES)
+    vacancies = skill_index.documents(SkillSource.VACANCIES)
+    success(
+        f"{resumes + vacancies - before} documents indexed, "
+        f"{resumes} resumes and {vacancies} vacancies in {output}"
+    )
+
+
+@cli.command("related")
+@click.argument("skill")
+@index_option
+@click.option(
+    "-s", "--source",
+    type=click.Choice(SkillSource),
+    default=SkillSource.RESUMES,
+    show_default=True,
+    help="Co-occurrence in resumes or vacancies.",
+)
+@qualification_option
+@location_option
+@click.option(
+    "-r", "--rank",
+    type=click.Choice(SkillRank),
+    default=SkillRank.LIFT,
+    show_default=True,
+    help="""\b
+    count: documents with both skills
+    lift: how much more often skills meet than by chance
+    """,
+)
+@count_option
+@min_count_option
+@json_option
+@click.pass_obj
+@process_response_error
+def related(
+        client: HABRCareerClient,
+        skill: str,
+        output: str,
+        source: SkillSource,
+        qualification: QualificationID | None,
+        location: int | None,
+        rank: SkillRank,
+        count: int,
+        min_count: int,
+        as_json: bool,
+) -> None:
+    """Show skills most associated with the skill (title or ID)."""
+    console = Console()
+    skill_index = SkillIndex(output)
+    skill_id = skill_index.find(skill)
+    if skill_id is None:
+        error(f"Skill {skill!r} is not indexed.", exit_code=1)
+
+    scores = skill_index.related(
+        skill_id,
+        k=count,
+        source=source,
+        qualification=qualification and int(qualification),
+        location=location,
+        rank=rank,
+        min_count=min_count,
+    )
+    show_scores(
+        console,
+        scores,
+        ["Skill", "ID", "Together", rank.capitalize()],
+        as_json,
+    )
+
+
+@cli.command("demand")
+@index_option
+@qualification_option
+@location_option
+@count_option
+@min_count_option
+@json_option
+@click.pass_obj
+@process_response_error
+def demand(
+        client: HABRCareerClient,
+        output: str,
+        qualification: QualificationID | None,
+        location: int | None,
+        count: int,
+        min_count: int,
+        as_json: bool,
+) -> None:
+    """Show skills in short supply: wanted by vacancies, rare in resumes."""
+    console = Console()
+    scores = SkillIndex(output).demand(
+        k=count,
+        qualification=qualification and int(qualification),
+        location=location,
+        min_count=min_count,
+    )
+    show_scores(
+        console,
+        scores,
+        ["Skill", "ID", "Vacancies", "Demand/supply"],
+        as_json,
+    )
@@ -8,14 +8,23 @@ from habr.career.cli.utils import (
     show_table,
     build_table,
     info,
+    error,
+    success,
     output_as_json,
 )
 from habr.career.client import HABRCareerClient
 from habr.career.client.users import CVFormat
+from habr.career.client.users.enrichment import (
+    EnrichmentStats,
+    ProfileCache,
+    ProfileEnricher,
+    resume_usernames,
+)
 from habr.career.utils import (
     ComplainReason,
     cleanup_tags,
     CurrencySymbol,
+    QualificationID,
 )
 
 
@@ -324,6 +333,155 @@ def get_profile(
     #  recommendation_letters = resume["recommendationLetters"]
 
 
+@cli.command("enrich")
+@click.argument("usernames", nargs=-1)
+@click.option(
+    "-q", "--search",
+    help="Enrich users of the resume search query.",
+)
+@click.option(
+    "-Z", "--specializations",
+    multiple=True,
+    type=int,
+    help="Специализация.",
+)
+@click.option(
+    "-Q", "--qualification",
+    type=click.Choice(QualificationID),
+    help="Квалификация.",
+)
+@click.option(
+    "-K", "--skills",
+    multiple=True,
+    type=int,
+    help="Профессиональные навыки.",
+)
+@click.option(
+    "-n", "--pages",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Resume search pages, 0 for all pages.",
+)
+@click.option(
+    "-o", "--output",
+    default="profiles.sqlite",
+    show_default=True,
+    help="SQLite file of cached profiles.",
+)
+@click.option(
+    "-a", "--max-age",
+    type=click.FloatRange(min=0),
+    default=7 * 24,
+    show_default=True,
+    help="Hours cached profiles are fresh for.",
+)
+@click.option(
+    "-w", "--workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Concurrent requests.",
+)
+@click.option(
+    "-r", "--rate",
+    type=click.FloatRange(min=0),
+    default=0,
+    show_default=True,
+    help="Requests per second limit, 0 for no limit.",
+)
+@click.option(
+    "--json/--no-json", "as_json",
+    default=False,
+    show_default=True,
+    help="Show as JSON.",
+)
+@click.pass_obj
+@process_response_error
+def enrich_profiles(
+        client: HABRCareerClient,
+        usernames: tuple[str, ...],
+        search: str | None,
+        specializations: tuple[int, ...],
+        qualification: QualificationID | None,
+        skills: tuple[int, ...],
+        pages: int,
+        output: str,
+        max_age: float,
+        workers: int,
+        rate: float,
+        as_json: bool,
+) -> None:
+    """
+    Fetch full profiles of users or of resume search results.
+    Profiles are cached, fresh ones are not fetched again.
+    """
+    console = Console()
+    enricher = ProfileEnricher(
+        client,
+        ProfileCache(output),
+        max_age=max_age * 60 * 60,
+        fetch_workers=workers,
+        rate=rate or None,
+    )
+    stats = EnrichmentStats()
+
+    with console.status("Loading...", spinner=SPINNER) as status:
+        usernames = list(usernames)
+        if search or specializations or qualification or skills:
+            usernames += resume_usernames(
+                client,
+                {
+                    "search": search,
+                    "specializations": list(specializations) or None,
+                    "qualification": qualification,
+                    "skills": list(skills) or None,
+                },
+                pages=pages or None,
+                workers=workers,
+            )
+        if not usernames:
+            error("Pass usernames or resume search options.", exit_code=1)
+
+        profiles = list(enricher.enrich(
+            usernames,
+            stats=stats,
+            progress=lambda s: status.update(
+                f"Enriching {s.done}/{s.users} profiles..."),
+        ))
+
+    if as_json:
+        console.print(output_as_json(profiles=[
+            p.model_dump(mode="json") for p in profiles
+        ]))
+    else:
+        console.print(build_table(
+            rows=[
+                (
+                    p.username,
+                    p.full_name or "",
+                    " • ".join(x for x in [
+                        p.specialization, p.qualification] if x),
+                    p.experience or "",
+                    " • ".join(c.title for c in p.companies[:2]),
+                    " • ".join(p.skills[:5]),
+                ) for p in profiles
+            ],
+            headers=["Username", "Name", "Specialization", "Experience",
+                     "Companies", "Skills"],
+            max_cell_width=40,
+        ))
+        success(
+            f"{stats.fetched} profiles fetched, {stats.cached} cached, "
+            f"{len(stats.failed)} failed, saved to {output}"
+        )
+
+    for username, reason in stats.failed.items():
+        error(f"{username}: {reason}")
+    if stats.failed:
+        error("Run the command again to retry failed profiles.", exit_code=1)
+
+
 @cli.command("cv")
 @click.option(
     "-u", "--username",
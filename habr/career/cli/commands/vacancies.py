@@ -6,14 +6,22 @@ from habr.career.cli.config import SPINNER
 from habr.career.cli.utils import (
     process_response_error,
     output_as_json,
+    output_raw,
     show_table,
+    build_table,
 )
+from habr.career.cli.utils.stream import iter_pages, page_prompt, stream_table
 from habr.career.client import HABRCareerClient
+from habr.career.client.crawl import SQLiteWorkQueue, UnitKind
+from habr.career.client.matching import ResumeMatcher
+from habr.career.client.resumes.columnar import ResumeColumns
 from habr.career.client.vacancies import (
     EmploymentType,
     VacancyType,
     VacanciesSort,
 )
+from habr.career.client.vacancies.changes import ChangeStore, VacancyFeed
+from habr.career.client.vacancies.dedup import VacancyDeduplicator
 from habr.career.utils import (
     Pagination,
     QualificationID,
@@ -21,6 +29,9 @@ from habr.career.utils import (
     cleanup_tags,
 )
 
+# Company and vacancy columns, 100 cells wide table
+VACANCIES_TABLE_WIDTHS = [25, 70]
+
 
 @click.group("vacancies")
 def cli():
@@ -168,12 +179,40 @@ def reactions_():
     show_default=True,
     help="Items per page.",
 )
+@click.option(
+    "-n", "--pages",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Pages to show starting from --page, 0 for all pages. "
+         "Rows are printed as soon as a page is loaded.",
+)
+@click.option(
+    "--pager",
+    is_flag=True,
+    default=False,
+    help="Load the next page on key press only.",
+)
+@click.option(
+    "--dedup", "deduplicate",
+    is_flag=True,
+    default=False,
+    help="Hide near-duplicate vacancies, "
+         "with --json add cluster ID to every vacancy.",
+)
 @click.option(
     "--json/--no-json", "as_json",
     default=False,
     show_default=True,
     help="Show as JSON.",
 )
+@click.option(
+    "--raw", "as_raw",
+    is_flag=True,
+    default=False,
+    help="Output response JSON as is, without validation. "
+         "Faster than --json, field names are as in API.",
+)
 @click.pass_obj
 @process_response_error
 def get_vacancies(
@@ -195,7 +234,11 @@ def get_vacancies(
     search: str | None,
     page: int,
     per_page: int,
+    pages: int,
+    pager: bool,
+    deduplicate: bool,
     as_json: bool,
+    as_raw: bool,
 ) -> None:
     """Get vacancies."""
     console = Console()
@@ -220,10 +263,19 @@ def get_vacancies(
         "per_page": per_page,
     }
 
+    if as_raw:
+        with client.passthrough(stream=True):
+            output_raw(client.get_vacancies(**kwargs))
+        return
+
     with console.status("Loading...", spinner=SPINNER):
         result = client.get_vacancies(**kwargs)
 
+    dedup = VacancyDeduplicator() if deduplicate else None
+
     if as_json:
+        if dedup is not None:
+            dedup.annotate(result["list"])
         console.print(output_as_json(vacancies=result))
         return
 
@@ -234,18 +286,54 @@ def get_vacancies(
         console.print("[blue]No vacancies[/blue]")
         return
 
-    del meta["totalResults"]
+    table_width = 100
 
-    vacancies = result["list"]
+    def vacancy_rows(x: dict) -> list:
+        vacancies = x["list"]
+        if dedup is not None:
+            vacancies = [v for v in vacancies if not dedup.add(v).duplicate]
+        return build_vacancy_rows(vacancies)
 
+    if pages == 1 and not pager:
+        show_table(
+            console=console,
+            title=f"Работа и вакансии ({total_count})",
+            rows=vacancy_rows(result),
+            caption=vacancies_caption(result),
+            width=table_width,
+            max_cell_width=max(VACANCIES_TABLE_WIDTHS),
+        )
+        return
+
+    def fetch(p: int) -> dict:
+        with console.status("Loading...", spinner=SPINNER):
+            return client.get_vacancies(**{**kwargs, "page": p})
+
+    stream_table(
+        console=console,
+        results=iter_pages(
+            fetch,
+            result,
+            page=page,
+            total_pages=lambda x: x["meta"]["totalPages"],
+            pages=pages,
+            pager=page_prompt if pager else None,
+        ),
+        rows=vacancy_rows,
+        widths=VACANCIES_TABLE_WIDTHS,
+        max_cell_width=max(VACANCIES_TABLE_WIDTHS),
+        title=f"Работа и вакансии ({total_count})",
+        caption=vacancies_caption,
+    )
+
+
+def build_vacancy_rows(vacancies: list) -> list:
     employment_descriptions = {
         "full_time": "Полный рабочий день",
         "part_time": "Неполный рабочий день",
         None: "",
     }
 
-    table_width = 100
-
     rows = []
     for vacancy in vacancies:
         employment = employment_descriptions[vacancy["employment"]]
@@ -296,14 +384,14 @@ def get_vacancies(
                 Text(),
             ]),
         ])
+    return rows
 
-    show_table(
-        console=console,
-        title=f"Работа и вакансии ({total_count})",
-        rows=rows,
-        caption=", ".join([f"{k}: {v}" for k, v in meta.items()]),
-        width=table_width,
-    )
+
+def vacancies_caption(result: dict) -> str:
+    return ", ".join([
+        f"{k}: {v}" for k, v in result["meta"].items()
+        if k != "totalResults"
+    ])
 
 
 @cli.command("get")
@@ -423,6 +511,315 @@ def get_vacancy(
     show_about_vacancy_table()
 
 
+@cli.command("match")
+@click.option(
+    "-i", "--ids",
+    type=int,
+    multiple=True,
+    help="Vacancy ID.",
+)
+@click.option(
+    "-q", "--search",
+    help="Match vacancies of the search query.",
+)
+@click.option(
+    "-d", "--database",
+    type=click.Path(exists=True, dir_okay=False),
+    default="crawl.sqlite",
+    show_default=True,
+    help="SQLite file of the crawl queue.",
+)
+@click.option(
+    "-c", "--crawl-id",
+    required=True,
+    help="Crawl identifier of resumes pages.",
+)
+@click.option(
+    "-k", "--count",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Resumes per vacancy.",
+)
+@click.option(
+    "--min-skills",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Skip resumes sharing fewer skills with vacancy.",
+)
+@click.option(
+    "--json/--no-json", "as_json",
+    default=False,
+    show_default=True,
+    help="Show as JSON.",
+)
+@click.pass_obj
+@process_response_error
+def match_vacancies(
+        client: HABRCareerClient,
+        ids: list[int],
+        search: str | None,
+        database: str,
+        crawl_id: str,
+        count: int,
+        min_skills: int,
+        as_json: bool,
+) -> None:
+    """Find best fitting crawled resumes for vacancies."""
+    console = Console()
+
+    with console.status("Loading...", spinner=SPINNER):
+        columns = ResumeColumns.from_pages(
+            result
+            for unit, result in SQLiteWorkQueue(database).results(crawl_id)
+            if unit.kind == UnitKind.RESUMES
+        )
+        matcher = ResumeMatcher(columns)
+        vacancies = [client.get_vacancy(id_=id_)["vacancy"] for id_ in ids]
+        if search is not None or not ids:
+            vacancies += client.get_vacancies(search=search)["list"]
+        matches = matcher.match_many(vacancies, k=count, min_skills=min_skills)
+
+    if as_json:
+        return console.print(output_as_json(matches={
+            vacancy_id: [
+                {
+                    "resume": m.resume,
+                    "score": m.score,
+                    "skills": m.skills,
+                }
+                for m in vacancy_matches
+            ]
+            for vacancy_id, vacancy_matches in matches.items()
+        }))
+
+    titles = {str(v["id"]): v["title"] for v in vacancies}
+    for vacancy_id, vacancy_matches in matches.items():
+        console.print(build_table(
+            rows=[
+                [
+                    m.resume,
+                    f"{m.score:.2f}",
+                    str(m.skills),
+                    " • ".join(
+                        columns.skill_titles.get(s, str(s))
+                        for s in columns.resume_skills(m.index)
+                    ),
+                ]
+                for m in vacancy_matches
+            ],
+            headers=["Resume", "Score", "Shared", "Skills"],
+            title=f"{titles[vacancy_id]} ({vacancy_id})",
+            max_cell_width=60,
+        ))
+
+
+@cli.command("dedup")
+@click.option(
+    "-d", "--database",
+    type=click.Path(exists=True, dir_okay=False),
+    default="crawl.sqlite",
+    show_default=True,
+    help="SQLite file of the crawl queue.",
+)
+@click.option(
+    "-c", "--crawl-id",
+    required=True,
+    help="Crawl identifier of vacancies pages.",
+)
+@click.option(
+    "-t", "--threshold",
+    type=click.FloatRange(min=0, max=1),
+    default=0.7,
+    show_default=True,
+    help="Minimal text similarity of duplicates.",
+)
+@click.option(
+    "--any-company",
+    is_flag=True,
+    default=False,
+    help="Vacancies of different companies can be duplicates.",
+)
+@click.option(
+    "--json/--no-json", "as_json",
+    default=False,
+    show_default=True,
+    help="Output every vacancy with its cluster ID.",
+)
+@click.pass_obj
+@process_response_error
+def dedup_vacancies(
+        client: HABRCareerClient,
+        database: str,
+        crawl_id: str,
+        threshold: float,
+        any_company: bool,
+        as_json: bool,
+) -> None:
+    """Find near-duplicate crawled vacancies."""
+    console = Console()
+    dedup = VacancyDeduplicator(
+        threshold=threshold, same_company=not any_company)
+    vacancies = {}
+
+    with console.status("Loading...", spinner=SPINNER):
+        for unit, result in SQLiteWorkQueue(database).results(crawl_id):
+            if unit.kind == UnitKind.VACANCIES:
+                for item in result["list"]:
+                    dedup.add(item)
+                    vacancies.setdefault(str(item["id"]), item)
+
+    if as_json:
+        return console.print(output_as_json(vacancies=[
+            {
+                "id": entry.id,
+                "cluster": entry.cluster,
+                "similarity": entry.similarity,
+                "title": vacancies[entry.id]["title"],
+                "company": (vacancies[entry.id]["company"] or {}).get("title"),
+            }
+            for entry in map(dedup.entries.get, dedup.ids)
+        ]))
+
+    clusters = dedup.clusters()
+    if not clusters:
+        console.print(
+            f"[blue]No duplicates among {len(dedup)} vacancies[/blue]")
+        return
+
+    duplicates = sum(len(ids) - 1 for ids in clusters.values())
+    console.print(build_table(
+        rows=[
+            [
+                cluster,
+                str(len(ids)),
+                (vacancies[cluster]["company"] or {}).get("title") or "",
+                Text("\n").join(
+                    Text(f"{id_} {vacancies[id_]['title']}") for id_ in ids),
+            ]
+            for cluster, ids in clusters.items()
+        ],
+        headers=["Cluster", "Size", "Company", "Vacancies"],
+        title=f"Дубликаты вакансий ({duplicates} of {len(dedup)})",
+        max_cell_width=60,
+    ))
+
+
+@cli.command("changes")
+@click.option(
+    "-Z", "--specializations",
+    multiple=True,
+    type=int,
+    help="Специализация.",
+)
+@click.option(
+    "-L", "--locations",
+    multiple=True,
+    help="Местоположение.",
+)
+@click.option(
+    "-Q", "--qualification",
+    type=click.Choice(QualificationID),
+    help="""\b
+    1: Intern
+    3: Junior
+    4: Middle
+    5: Senior
+    6: Lead
+    
+    Квалификация.
+    """,
+)
+@click.option(
+    "-S", "--skills",
+    multiple=True,
+    type=int,
+    help="Профессиональные навыки.",
+)
+@click.option(
+    "-c", "--company",
+    type=int,
+    help="Компания.",
+)
+@click.option(
+    "-r", "--remote",
+    is_flag=True,
+    default=None,
+    help="Можно удалённо.",
+)
+@click.option(
+    "-q", "--search",
+    help="Search query.",
+)
+@click.option(
+    "-o", "--output",
+    default="changes.sqlite",
+    show_default=True,
+    help="SQLite file of vacancy fingerprints.",
+)
+@click.option(
+    "-n", "--pages",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Polled pages, 0 for all pages. "
+         "Deletes are reported only when all pages are polled.",
+)
+@click.option(
+    "-i", "--interval",
+    type=click.FloatRange(min=0),
+    default=0,
+    show_default=True,
+    help="Seconds between polls, 0 to poll once.",
+)
+@click.option(
+    "-w", "--workers",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Concurrent requests.",
+)
+@click.pass_obj
+@process_response_error
+def vacancy_changes(
+        client: HABRCareerClient,
+        specializations: list[int],
+        locations: list[str],
+        qualification: QualificationID | None,
+        skills: list[int],
+        company: int | None,
+        remote: bool | None,
+        search: str | None,
+        output: str,
+        pages: int,
+        interval: float,
+        workers: int,
+) -> None:
+    """
+    Output inserted, updated and deleted vacancies since the previous
+    poll of the same filters as NDJSON. The first poll reports every
+    vacancy as inserted.
+    """
+    feed = VacancyFeed(
+        client,
+        ChangeStore(output),
+        {
+            "specializations": list(specializations) or None,
+            "locations": list(locations) or None,
+            "qualification": qualification,
+            "skills": list(skills) or None,
+            "company": company,
+            "remote": remote,
+            "search": search,
+        },
+        pages=pages or None,
+        workers=workers,
+    )
+    for change in feed.watch(interval, polls=None if interval else 1):
+        click.echo(change.to_json())
+
+
 @favorites.command("add")
 @click.option(
     "-i", "--id", "id_",
@@ -0,0 +1,122 @@
+import shutil
+import subprocess
+import sys
+from datetime import datetime
+
+import click
+from rich.console import Console
+
+from habr.career import codec
+from habr.career.cli.utils import process_response_error
+from habr.career.client import HABRCareerClient
+from habr.career.client.watch import (
+    NotificationWatcher,
+    WatchEvent,
+    WatchEventKind,
+)
+from habr.career.utils import cleanup_tags
+
+COUNTER_TITLES = {
+    "messages": "Непрочитанные сообщения",
+    "friends": "Заявки в друзья",
+    "events": "События",
+}
+
+
+def describe(event: WatchEvent) -> tuple[str, str]:
+    """Title and text of the event for terminal and desktop notifications."""
+    if event.kind == WatchEventKind.MESSAGE:
+        return (
+            f"Сообщение от {event.username}",
+            cleanup_tags(event.message.body),
+        )
+    if event.kind == WatchEventKind.FRIENDSHIP_REQUEST:
+        return "Заявка в друзья", f"{event.title} ({event.username})"
+    return COUNTER_TITLES[event.counter], str(event.value)
+
+
+def notify(title: str, text: str) -> None:
+    """Show desktop notification if supported, ring the bell otherwise."""
+    if shutil.which("notify-send"):
+        subprocess.run(["notify-send", "Habr Career: " + title, text])
+    elif sys.platform == "darwin" and shutil.which("osascript"):
+        def quote(value: str) -> str:
+            return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+        script = (
+            f"display notification {quote(text)}"
+            f" with title {quote('Habr Career: ' + title)}"
+        )
+        subprocess.run(["osascript", "-e", script])
+    else:
+        click.echo("\a", nl=False)
+
+
+@click.command("watch")
+@click.option(
+    "-i", "--min-interval",
+    type=click.FloatRange(min=1),
+    default=15,
+    show_default=True,
+    help="Seconds between polls after a change.",
+)
+@click.option(
+    "-I", "--max-interval",
+    type=click.FloatRange(min=1),
+    default=300,
+    show_default=True,
+    help="Seconds between polls when nothing changes.",
+)
+@click.option(
+    "--counters/--no-counters",
+    default=False,
+    show_default=True,
+    help="Output counter changes as well.",
+)
+@click.option(
+    "--notify", "desktop",
+    is_flag=True,
+    default=False,
+    help="Show desktop notifications (notify-send, osascript).",
+)
+@click.option(
+    "--polls",
+    type=click.IntRange(min=1),
+    help="Stop after the number of polls.",
+)
+@click.option(
+    "--json/--no-json", "as_json",
+    default=False,
+    show_default=True,
+    help="Output events as NDJSON.",
+)
+@click.pass_obj
+@process_response_error
+def cli(
+        client: HABRCareerClient,
+        min_interval: float,
+        max_interval: float,
+        counters: bool,
+        desktop: bool,
+        polls: int | None,
+        as_json: bool,
+) -> None:
+    """Watch for new messages and friendship requests."""
+    console = Console(highlight=False)
+    watcher = NotificationWatcher(
+        client, min_interval=min_interval, max_interval=max_interval)
+
+    for event in watcher.watch(polls=polls):
+        if event.kind == WatchEventKind.COUNTER and not counters:
+            continue
+        title, text = describe(event)
+        if as_json:
+            click.echo(codec.dumps(event.to_jsonable()))
+        else:
+            console.print(
+                f"[bright_black]{datetime.now():%H:%M:%S}[/bright_black]"
+                f" [blue]{title}[/blue]",
+            )
+            console.print(text, markup=False)
+        if desktop:
+            notify(title, text)
@@ -1,5 +1,5 @@
 import functools
-import unicodedata
+from typing import Iterable
 
 import click
 from rich import box
@@ -7,6 +7,8 @@ from rich.box import Box
 from rich.console import Console
 from rich.table import Table
 
+from habr.career import codec
+from habr.career.cli.utils.text import truncate_cell, truncate_to_width
 from habr.career.utils import (
     ResponseError,
     cleanup_tags,
@@ -15,12 +17,38 @@ from habr.career.utils import (
 
 
 def output_as_json(indent: int = 4, **kwargs) -> str:
-    from pydantic import create_model
+    from pydantic import BaseModel, create_model
+    from habr.career.client.validation import materialize
+    if not any(isinstance(v, BaseModel) for v in kwargs.values()):
+        # Plain JSON data (e.g. raw validation mode) is encoded by codec,
+        # lists of models are left to pydantic
+        try:
+            return codec.dumps(kwargs, indent=indent)
+        except TypeError:
+            pass
+    for v in kwargs.values():
+        materialize(v)
     field_definitions = {k: (v.__class__, v) for k, v in kwargs.items()}
     model = create_model("Model", **field_definitions)
     return model().model_dump_json(indent=indent)
 
 
+def output_raw(body: bytes | Iterable[bytes]) -> None:
+    """
+    Write response body to stdout as is.
+
+    :param body: Bytes or bytes chunks
+    :return:
+    """
+    stdout = click.get_binary_stream("stdout")
+    if isinstance(body, bytes):
+        body = [body]
+    for chunk in body:
+        stdout.write(chunk)
+    stdout.write(b"\n")
+    stdout.flush()
+
+
 def truncate_chars(text: str, length: int) -> str:
     text = text.replace("\n", " ")
     text = cleanup_tags(
@@ -29,29 +57,22 @@ def truncate_chars(text: str, length: int) -> str:
         p_replace=False,
         li_replace=False,
     ).strip()
-    if len(text) <= length:
-        return text
-    else:
-        text = text[:length]
-        d = str_display_width(text) - length
-        text = text[:length - d]
-        return f"{text}..."
-
-
-def str_display_width(char: str) -> int:
-    def get_char_display_width(unicode_char):
-        match unicodedata.east_asian_width(unicode_char):
-            case "W": return 2
-            case _: return 1
-    return sum(map(get_char_display_width, char))
+    return truncate_to_width(text, length)
 
 
 def build_table(
         rows: list,
         headers: list[str] | None = None,
         box_: Box | None = box.HORIZONTALS,
+        max_cell_width: int | None = None,
         **kwargs
 ) -> Table:
+    if max_cell_width is not None:
+        rows = [
+            [truncate_cell(x, max_cell_width) for x in row]
+            for row in rows
+        ]
+
     table = Table(
         box=box_,
         pad_edge=False,
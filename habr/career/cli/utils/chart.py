@@ -1,5 +1,6 @@
 import math
-from typing import Iterable
+from array import array
+from typing import Iterable, Sequence
 
 from rich import box
 from rich.table import Table
@@ -86,38 +87,197 @@ class Chart:
 
     def _normalize(self, data) -> list[list[float]]:
         """Normalize the data and return it."""
+        # All values in one flat array, so min and max are single C loops
+        flat = array("d", [v or 0 for datum in data for v in datum])
+        if not flat:
+            return [[] for _ in data]
 
         # We offset by the minimum if there's a negative.
-        min_datum = min([
-            min([s or 0 for s in sublist])
-            for sublist in data
-        ])
-
-        if min_datum < 0:
-            min_datum = abs(min_datum)
-            data_offset = [
-                [d + min_datum for d in datum]
-                for datum in data
-            ]
-        else:
-            data_offset = data
-
-        max_datum = max([
-            max([s or 0 for s in sublist])
-            for sublist in data_offset
-        ])
+        offset = min(min(flat), 0)
+        max_datum = max(flat) - offset
 
         # max_dat / width is the value for a single tick. norm_factor is the
         # inverse of this value
         # If you divide a number to the value of single tick, you will find how
         # many ticks it does contain basically.
-        norm_factor = self.width / float(max_datum)
-        normal_data = [
-            [(v or 0) * norm_factor for v in datum]
-            for datum in data_offset
+        norm_factor = self.width / max_datum if max_datum else 0
+        return [
+            [((v or 0) - offset) * norm_factor for v in datum]
+            for datum in data
         ]
 
-        return normal_data
+    def __rich__(self):
+        return self._table
+
+
+NAN = float("nan")
+# Markers of series points, repeated if there are more series
+MARKERS = "●◆▲■✚"
+# Interpolated segments between points
+LINE = "·"
+# Width of Y axis labels
+AXIS_WIDTH = 8
+
+
+def to_array(values: Iterable[float | None]) -> array:
+    """Float array of values, missing values are NaN."""
+    return array("d", [NAN if v is None else v for v in values])
+
+
+def bucket(values: Sequence[float], buckets: int) -> array:
+    """
+    Downsample values to `buckets` points, every point is the mean of
+    consecutive values, missing (NaN) values are skipped.
+    Runs in O(len(values)).
+
+    :param values: Float array
+    :param buckets: Points count
+    :return: Float array of `min(len(values), buckets)` points
+    """
+    size = len(values)
+    if size <= buckets:
+        return array("d", values)
+    result = array("d", bytes(8 * buckets))
+    for i in range(buckets):
+        chunk = [v for v in values[i * size // buckets:(i + 1) * size // buckets]
+                 if v == v]
+        result[i] = math.fsum(chunk) / len(chunk) if chunk else NAN
+    return result
+
+
+def resample(values: Sequence[float], width: int) -> tuple[array, set[int]]:
+    """
+    Fit values into `width` columns: long series are bucketed, points of
+    short ones are spread over columns and linearly interpolated between.
+
+    :param values: Float array
+    :param width: Columns count
+    :return: Value of every column (NaN if absent) and columns of points
+    """
+    values = bucket(values, width)
+    size = len(values)
+    if size <= 1 or size == width:
+        return values, set(range(size))
+
+    result = array("d", bytes(8 * width))
+    step = (size - 1) / (width - 1)
+    for x in range(width):
+        position = x * step
+        i = min(int(position), size - 2)
+        fraction = position - i
+        # NaN neighbours make interpolated value NaN as well
+        result[x] = values[i] + (values[i + 1] - values[i]) * fraction
+    points = {round(i / step) for i in range(size)}
+    return result, points
+
+
+class SeriesChart:
+    """
+    Line chart of several series sharing X axis, e.g. salaries by periods.
+    Series of any length are fitted to chart width (see `resample`), so
+    rendering cost does not depend on points count.
+
+    :param series: Series name -> values, None for missing values
+    :param labels: X axis labels of points
+    :param styles: Series styles
+    :param width: Plot width in columns
+    :param height: Plot height in rows
+    :param title:
+    :param captions:
+    """
+
+    def __init__(
+            self,
+            series: dict[str, Iterable[float | None]],
+            labels: Sequence[str] = (),
+            styles: Sequence[str | None] | None = None,
+            width: int = 60,
+            height: int = 12,
+            title: str | Text | None = None,
+            captions: Iterable | None = None,
+    ):
+        self.width = width
+        self.height = height
+        styles = styles or [None] * len(series)
+
+        columns = {
+            name: resample(to_array(values), width)
+            for name, values in series.items()
+        }
+        finite = [
+            v for values, _ in columns.values() for v in values if v == v]
+        low, high = (min(finite), max(finite)) if finite else (0.0, 0.0)
+
+        markers = [MARKERS[i % len(MARKERS)] for i in range(len(series))]
+        title = Text("\n").join(x for x in [
+            Text(title) if isinstance(title, str) else title,
+            Text("  ").join(
+                Text(f"{marker} {name}", style=style)
+                for name, marker, style in zip(series, markers, styles)
+            ),
+            Text(" "),
+        ] if x)
+
+        self._table = Table(
+            title=title,
+            box=box.HORIZONTALS,
+            pad_edge=False,
+            show_edge=False,
+            show_header=False,
+            caption=captions and Text("\n").join([
+                Text(" "),
+                *[Text(c, style="bright_black") for c in captions]
+            ]),
+        )
+        self._table.add_row(self._plot(
+            list(zip(columns.values(), markers, styles)), low, high))
+        self._table.add_row(self._axis(labels))
+
+    def _rows(self, values: array, low: float, high: float) -> list[int]:
+        """Plot row of every column, top row is 0, -1 if value is absent."""
+        scale = (self.height - 1) / (high - low) if high > low else 0
+        return [
+            self.height - 1 - round((v - low) * scale) if v == v else -1
+            for v in values
+        ]
+
+    def _plot(self, columns: list, low: float, high: float) -> Text:
+        grid: list[list[tuple[str, str | None]]] = [
+            [(" ", None)] * self.width for _ in range(self.height)
+        ]
+        # Later series are drawn over earlier ones
+        for (values, points), marker, style in columns:
+            for x, y in enumerate(self._rows(values, low, high)):
+                if y < 0:
+                    continue
+                grid[y][x] = (marker if x in points else LINE, style)
+
+        ticks = {0: high, self.height // 2: (low + high) / 2,
+                 self.height - 1: low}
+        lines = []
+        for y, row in enumerate(grid):
+            tick = ticks.get(y)
+            line = Text(
+                (to_readable(tick, 1) if tick is not None else "")
+                .rjust(AXIS_WIDTH - 2) + " ┤",
+                style="bright_black",
+            )
+            for char, style in row:
+                line.append(char, style=style)
+            lines.append(line)
+        return Text("\n").join(lines)
+
+    def _axis(self, labels: Sequence[str]) -> Text:
+        """X axis with the first and the last labels."""
+        line = Text(" " * (AXIS_WIDTH - 1) + "└" + "─" * self.width,
+                    style="bright_black")
+        if not labels:
+            return line
+        first, last = labels[0], labels[-1]
+        gap = self.width - len(first) - len(last)
+        axis = first + " " * gap + last if gap > 0 else first
+        return Text("\n").join([
+            line, Text(" " * AXIS_WIDTH + axis, style="bright_black")])
 
     def __rich__(self):
         return self._table
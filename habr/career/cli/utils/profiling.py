@@ -0,0 +1,108 @@
+import cProfile
+import time
+
+from rich import box
+from rich.console import Console
+from rich.table import Table
+
+from habr.career.client import RequestHook
+from habr.career.client.metrics import RequestInfo
+
+# Response processing phases reported as parsing
+PARSING_PHASES = ("decode", "ssr", "errors", "validation")
+
+
+class Timings(RequestHook):
+    """
+    Collects command phase breakdown:
+        imports     - module imports before command started
+        client init - client instantiation
+        HTTP calls  - every request made by the command, split by
+                      network and parsing time
+        rendering   - everything else, mostly output rendering
+    """
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.phases: dict[str, float] = {}
+        self.requests: list[RequestInfo] = []
+        self._phase: str | None = None
+        self._phase_started_at = 0.0
+
+    def start(self, phase: str) -> None:
+        self._phase = phase
+        self._phase_started_at = time.perf_counter()
+
+    def stop(self) -> None:
+        dt = time.perf_counter() - self._phase_started_at
+        self.phases[self._phase] = self.phases.get(self._phase, 0.0) + dt
+
+    def post_request(self, info: RequestInfo) -> None:
+        self.requests.append(info)
+
+    def build_table(self) -> Table:
+        total = time.perf_counter() - self.started_at
+        command = self.phases.get("command", 0.0)
+
+        table = Table(
+            box=box.HORIZONTALS,
+            pad_edge=False,
+            title="Timings",
+            title_justify="left",
+        )
+        table.add_column("Phase")
+        table.add_column("Status", justify="right")
+        table.add_column("Network", justify="right")
+        table.add_column("Parsing", justify="right")
+        table.add_column("Time", justify="right")
+
+        for phase in ("imports", "client init"):
+            if phase in self.phases:
+                table.add_row(phase, "", "", "", fmt(self.phases[phase]))
+
+        http_total = 0.0
+        for info in self.requests:
+            network = info.timings.get("network", 0.0)
+            parsing = sum(info.timings.get(p, 0.0) for p in PARSING_PHASES)
+            http_total += info.elapsed
+            table.add_row(
+                f"{info.method} {info.endpoint}",
+                str(info.status or type(info.error).__name__),
+                fmt(network),
+                fmt(parsing),
+                fmt(info.elapsed),
+            )
+
+        table.add_row("rendering & other", "", "", "",
+                      fmt(max(command - http_total, 0.0)))
+        table.add_section()
+        table.add_row("total", "", "", "", fmt(total), style="bold")
+        return table
+
+    def report(self) -> None:
+        Console(stderr=True).print(self.build_table())
+
+
+class Profiler:
+    """Dumps cProfile statistics for the whole command to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def stop(self) -> None:
+        self.profile.disable()
+        self.profile.dump_stats(self.path)
+        Console(stderr=True).print(
+            f"Profile saved to {self.path}. "
+            f"Inspect with `python -m pstats {self.path}` "
+            f"or a viewer like snakeviz.",
+            style="blue",
+        )
+
+
+def fmt(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}ms"
@@ -0,0 +1,234 @@
+"""
+Streaming rendering of large CLI tables.
+
+`show_table` builds a single table of all rows, so nothing is printed
+until every row is ready. `TableStream` prints the title and header once
+and then every batch of rows (e.g. a fetched page) as soon as it is added.
+Column widths do not depend on content, so separately rendered batches
+line up into one table, and memory does not grow with rows count.
+
+Example:
+    pages = iter_pages(fetch, first, page, total_pages=..., pages=0)
+    stream_table(console, pages, rows=build_rows, widths=[25, 70])
+"""
+import sys
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+import click
+from rich import box
+from rich.box import Box
+from rich.console import Console
+from rich.segment import Segment, Segments
+from rich.table import Table
+from rich.text import Text
+
+from habr.career.cli.utils.text import truncate_cell
+
+__all__ = [
+    "TableStream",
+    "iter_pages",
+    "page_prompt",
+    "stream_table",
+]
+
+T = TypeVar("T")
+
+# Keys stopping the pager
+QUIT_KEYS = ("q", "Q", "\x1b", "\x03")
+
+
+class TableStream:
+    """
+    :param console:
+    :param widths: Columns widths in cells
+    :param headers: Columns headers, printed once
+    :param title: Printed once above the first rows
+    :param box_: Tables box
+    :param max_cell_width: Cut cell lines longer than that, in cells
+    """
+
+    def __init__(
+            self,
+            console: Console,
+            widths: list[int],
+            headers: list[str] | None = None,
+            title: str | None = None,
+            box_: Box | None = box.HORIZONTALS,
+            max_cell_width: int | None = None,
+    ):
+        self.console = console
+        self.widths = widths
+        self.headers = headers
+        self.title = title
+        self.box = box_
+        self.max_cell_width = max_cell_width
+        self.rows_count = 0
+        self._bottom: list[Segment] | None = None
+
+    @property
+    def width(self) -> int:
+        """Table width, columns and padding between them."""
+        return sum(self._column_widths()) + self._padding
+
+    @property
+    def _padding(self) -> int:
+        dividers = len(self.widths) - 1
+        if self.box is None:
+            return dividers * 2
+        return dividers * 3 + 2
+
+    def _column_widths(self) -> list[int]:
+        # Widths do not depend on content, so every batch has the same
+        # layout, they are reduced proportionally on narrow terminals
+        available = self.console.width - self._padding
+        total = sum(self.widths)
+        if total <= available:
+            return self.widths
+        return [max(1, width * available // total) for width in self.widths]
+
+    def _table(self, first: bool) -> Table:
+        table = Table(
+            title=self.title if first else None,
+            box=self.box,
+            pad_edge=False,
+            show_header=first and bool(self.headers),
+        )
+        headers = self.headers or [""] * len(self.widths)
+        for header, width in zip(headers, self._column_widths()):
+            table.add_column(header=header, width=width)
+        return table
+
+    def write(self, rows: Iterable[list]) -> None:
+        """
+        Print rows under previously printed ones.
+
+        :param rows:
+        :return:
+        """
+        first = not self.rows_count
+        table = self._table(first)
+        for row in rows:
+            if self.max_cell_width is not None:
+                row = [truncate_cell(x, self.max_cell_width) for x in row]
+            table.add_row(*row, style="bright_green")
+        if not table.row_count:
+            return
+        self.rows_count += table.row_count
+
+        lines = self.console.render_lines(table, pad=False, new_lines=True)
+        if self.box is not None:
+            # Batches are joined into one table: top edge is printed
+            # with the first batch only, bottom edge is printed on close
+            self._bottom = lines.pop()
+            if not first:
+                lines = lines[1:]
+        for line in lines:
+            self.console.print(Segments(line), end="")
+
+    def close(self, caption: str | None = None) -> None:
+        """
+        Print bottom edge and caption below the rows.
+
+        :param caption:
+        :return:
+        """
+        if self._bottom is not None:
+            self.console.print(Segments(self._bottom), end="")
+            self._bottom = None
+        if not caption:
+            return
+        self.console.print(
+            Text.from_markup(caption, style="table.caption"),
+            width=self.width,
+            justify="center",
+        )
+
+
+def page_prompt(page: int, total_pages: int) -> bool:
+    """
+    Wait for a key press before fetching the next page.
+
+    :param page: Shown page
+    :param total_pages:
+    :return: False if user wants to stop
+    """
+    if not sys.stdin.isatty():
+        # Nobody to ask, e.g. output is piped
+        return True
+    prompt = (f"-- Page {page}/{total_pages}, any key for the next page,"
+              f" q to quit --")
+    click.secho(prompt, nl=False, err=True, fg="bright_black")
+    key = click.getchar()
+    # Erase the prompt line, rows of the next page are printed in its place
+    click.echo("\r\x1b[K", nl=False, err=True)
+    return key not in QUIT_KEYS
+
+
+def iter_pages(
+        fetch: Callable[[int], T],
+        first: T,
+        page: int,
+        total_pages: Callable[[T], int],
+        pages: int = 0,
+        pager: Callable[[int, int], bool] | None = None,
+) -> Iterator[T]:
+    """
+    Yield already fetched page and fetch the following ones on demand:
+    the next page is requested only when the previous one is consumed.
+
+    :param fetch: Takes page number, returns page
+    :param first: Already fetched page number `page`
+    :param page: First page number
+    :param total_pages: Takes page, returns pages count
+    :param pages: Pages to yield, all remaining pages if 0
+    :param pager: Called with shown page number and pages count before
+                  fetching the next page, stops if returns False,
+                  e.g. `page_prompt`
+    :return:
+    """
+    result = first
+    yielded = 0
+    while True:
+        yield result
+        yielded += 1
+        last_page = total_pages(result)
+        if page >= last_page or (pages and yielded >= pages):
+            return
+        if pager is not None and not pager(page, last_page):
+            return
+        page += 1
+        result = fetch(page)
+
+
+def stream_table(
+        console: Console,
+        results: Iterable[T],
+        rows: Callable[[T], Iterable[list]],
+        widths: list[int],
+        headers: list[str] | None = None,
+        title: str | None = None,
+        caption: Callable[[T], str] | None = None,
+        max_cell_width: int | None = None,
+) -> int:
+    """
+    Print rows of every result as soon as it is available.
+
+    :param console:
+    :param results: Pages, e.g. `iter_pages(...)`
+    :param rows: Takes page, returns table rows
+    :param widths: Columns widths in cells
+    :param headers: Columns headers
+    :param title: Table title
+    :param caption: Takes the last page, returns caption
+    :param max_cell_width: Cut cell lines longer than that, in cells
+    :return: Printed rows count
+    """
+    stream = TableStream(console, widths, headers=headers, title=title,
+                         max_cell_width=max_cell_width)
+    last: Any = None
+    try:
+        for last in results:
+            stream.write(rows(last))
+    finally:
+        stream.close(caption(last) if caption and last is not None else None)
+    return stream.rows_count
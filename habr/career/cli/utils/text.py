@@ -0,0 +1,103 @@
+"""
+Text layout helpers for CLI tables.
+
+Display width of a string is the number of terminal cells it takes:
+East Asian wide and fullwidth characters take two cells, others one.
+Widths of code points are cached, and characters below U+1100
+(ASCII, Cyrillic, etc.) are never wide, so they are not looked up at all.
+"""
+import functools
+import re
+import unicodedata
+from typing import Any
+
+from rich.text import Text
+
+__all__ = [
+    "char_width",
+    "str_display_width",
+    "truncate_to_width",
+    "truncate_cell",
+]
+
+# The first wide code point is U+1100, characters before it are narrow
+_MAYBE_WIDE = re.compile("[\u1100-\U0010ffff]")
+
+
+@functools.cache
+def char_width(char: str) -> int:
+    """
+    Terminal cells taken by a character.
+
+    :param char: Single character
+    :return: 1 or 2
+    """
+    return 2 if unicodedata.east_asian_width(char) in "WF" else 1
+
+
+def str_display_width(text: str) -> int:
+    """
+    Terminal cells taken by a string.
+
+    :param text:
+    :return:
+    """
+    if text.isascii():
+        return len(text)
+    return len(text) + sum(
+        char_width(c) - 1 for c in _MAYBE_WIDE.findall(text))
+
+
+def truncate_to_width(text: str, width: int, placeholder: str = "...") -> str:
+    """
+    Cut text to fit into `width` cells, placeholder is appended
+    to cut text. Runs in O(len(text)).
+
+    :param text:
+    :param width: Max width of kept text in cells
+    :param placeholder: Appended to cut text
+    :return:
+    """
+    # Every character takes at least one cell, so the kept text is
+    # not longer than `width`, wide characters are dropped from its end
+    prefix = text[:width]
+    over = str_display_width(prefix) - width
+    if over <= 0 and len(prefix) == len(text):
+        return text
+    end = len(prefix)
+    while over > 0:
+        end -= 1
+        over -= char_width(prefix[end])
+    return f"{prefix[:end]}{placeholder}"
+
+
+def truncate_cell(cell: Any, width: int, placeholder: str = "...") -> Any:
+    """
+    Cut every line of a table cell to fit into `width` cells.
+    Strings are read as markup, cells other than text are kept as is.
+
+    :param cell: Table cell, e.g. string or `Text`
+    :param width: Max width of kept line text in cells
+    :param placeholder: Appended to cut lines
+    :return: Cell as is if every line fits, cut `Text` otherwise
+    """
+    if isinstance(cell, str):
+        # Markup tags only add to the width, so the cell fits if it does
+        if all(str_display_width(x) <= width for x in cell.split("\n")):
+            return cell
+        cell = Text.from_markup(cell)
+    elif not isinstance(cell, Text):
+        return cell
+
+    lines = cell.split("\n", allow_blank=True)
+    if all(str_display_width(x.plain) <= width for x in lines):
+        return cell
+    cut = []
+    for line in lines:
+        plain = truncate_to_width(line.plain, width, placeholder)
+        if plain != line.plain:
+            # Cut line is a prefix of the line with the placeholder
+            line = line[:len(plain) - len(placeholder)]
+            line.append(placeholder)
+        cut.append(line)
+    return Text("\n").join(cut)
@@ -1,11 +1,14 @@
+import threading
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from functools import partialmethod, cached_property
-from typing import Any
+from typing import Any, Iterator
 from urllib.parse import urlparse, parse_qsl
 
 from pydantic import ValidationError
-from requests import Request, Session, Response, JSONDecodeError
+from requests import Request, Session, Response
 
+from habr.career import codec
 from habr.career.client.companies import (
     HABRCareerCompaniesMixin,
     HABRCareerCompaniesRatingsMixin,
@@ -15,21 +18,32 @@ from habr.career.client.courses import HABRCareerCoursesMixin
 from habr.career.client.experts import HABRCareerExpertsMixin
 from habr.career.client.friendships import HABRCareerFriendshipsMixin
 from habr.career.client.journal import HABRCareerJournalMixin
+from habr.career.client.metrics import (
+    RequestHook,
+    RequestInfo,
+    MetricsCollector,
+    endpoint_name,
+)
+from habr.career.client.pipeline import SSRPage, is_parsing_deferred
 from habr.career.client.resumes import HABRCareerResumesMixin
 from habr.career.client.salaries import HABRCareerSalariesMixin
 from habr.career.client.tools import HABRCareerToolsMixin
 from habr.career.client.users import HABRCareerUsersMixin
 from habr.career.client.users.models import User
 from habr.career.client.vacancies import HABRCareerVacanciesMixin
+from habr.career.client.validation import validate
 from habr.career.utils import (
     get_ssr_json,
+    get_ssr_json_text,
     LogoutError,
     NotAuthorizedError,
     ResponseError,
     Convertor,
+    QueryEncoder,
     PydanticModel,
     registered_errors,
     HABRCareerClientError,
+    ValidationMode,
 )
 
 __all__ = [
@@ -52,6 +66,10 @@ __all__ = [
     "HABRCareerBaseClient",
     "HABRCareerClient",
 
+    "RequestHook",
+    "MetricsCollector",
+    "ValidationMode",
+
     "logout",
 ]
 
@@ -142,23 +160,89 @@ class HABRCareerBaseClient:
     BASE_URL = "https://career.habr.com/api/"
     GENERAL_BASE_URL = "https://career.habr.com/"
     CSRF_PROTECTED_HTTP_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+    # Response bodies not larger than that are checked for error shapes
+    # in passthrough mode. Error responses are tiny JSON objects.
+    PASSTHROUGH_ERROR_CHECK_SIZE = 4096
+    PASSTHROUGH_CHUNK_SIZE = 64 * 1024
 
     def __init__(
             self,
             auth: Authenticator | None = None,
             session_id: str | None = None,
             debug: bool = False,
+            hooks: list[RequestHook] | None = None,
+            validation: ValidationMode = ValidationMode.STRICT,
     ):
+        """
+        :param auth: Authenticator
+        :param session_id: Session token
+        :param debug: Print HTTP traffic
+        :param hooks: Request instrumentation hooks
+        :param validation: How responses are validated against models.
+                           LAZY mode validates list items on first access,
+                           RAW mode returns JSON data without validation.
+        """
         self.auth = auth
+        self.hooks: list[RequestHook] = list(hooks or [])
+        self.validation = ValidationMode(validation)
         if auth and not auth.is_authenticated():
             auth.login()
 
         self._sess = session_id
+        self._local = threading.local()
 
         if debug:
             from http.client import HTTPConnection
             HTTPConnection.debuglevel = 1
 
+    def add_hook(self, hook: RequestHook) -> None:
+        """
+        Register request instrumentation hook.
+
+        :param hook:
+        :return:
+        """
+        self.hooks.append(hook)
+
+    @contextmanager
+    def passthrough(self, stream: bool = False) -> Iterator[None]:
+        """
+        Return response body bytes untouched instead of decoding and
+        validating it. Server side rendered pages give the state JSON.
+        Only small bodies are decoded to check whether it's an error.
+        Applies to requests made by the current thread.
+        Example:
+            with client.passthrough():
+                body: bytes = client.get_resumes()
+
+            with client.passthrough(stream=True):
+                for chunk in client.get_resumes():
+                    sys.stdout.buffer.write(chunk)
+
+        :param stream: Return iterator over body chunks instead of bytes
+        :return:
+        """
+        previous = getattr(self._local, "passthrough", None)
+        self._local.passthrough = {"stream": stream}
+        try:
+            yield
+        finally:
+            self._local.passthrough = previous
+
+    @property
+    def session(self) -> Session:
+        """
+        HTTP session of the current thread, keeping connections alive
+        between requests. Sessions are not shared between threads,
+        `Session` is not thread-safe.
+
+        :return:
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = Session()
+        return session
+
     @property
     def auth(self) -> Authenticator:
         return self._auth
@@ -179,7 +263,9 @@ class HABRCareerBaseClient:
             ssr: bool = False,
             cls: type[PydanticModel] = None,
             params_options: dict[str, Any] | None = None,
+            params_encoder: QueryEncoder | None = None,
             data_options: dict[str, Any] | None = None,
+            endpoint: str | None = None,
             **kwargs
     ) -> Response | dict[str, Any] | PydanticModel:
         """
@@ -192,79 +278,202 @@ class HABRCareerBaseClient:
         :param base_url:
         :param ssr:
         :param cls: Pydantic model
-        :param params_options:
+        :param params_options: Ignored if `params_encoder` is given
+        :param params_encoder: Endpoint query parameters encoder
         :param data_options:
+        :param endpoint: Endpoint label used by hooks, e.g. metrics.
+                         Path with numeric IDs replaced by default.
         :param kwargs:
         :return:
         """
         url = self.make_url(path, base_url, ssr)
+        info = RequestInfo(method, endpoint or endpoint_name(path), url)
 
-        params_options = params_options or {}
-        data_options = data_options or {}
-
-        convertor = Convertor()
-
-        params = kwargs.get("params")
-        if params is not None:
-            kwargs["params"] = convertor.map(params, **params_options)
-
-        data = kwargs.get("data")
-        if data is not None:
-            kwargs["data"] = convertor.map(data, **data_options)
-
-        json = kwargs.get("json")
-        if json is not None:
-            kwargs["json"] = convertor.map(json, **data_options)
-
-        kwargs["cookies"] = kwargs.get("cookies") or {}
-
-        session = Session()
-        request = Request(method, url, **kwargs)
-
-        if auth_required:
-            if method in self.CSRF_PROTECTED_HTTP_METHODS:
-                self.set_header(request,
-                                "X-Csrf-Token", lambda: self.csrf_token)
-            if self.auth:
-                self.set_cookie(request,
-                                "remember_user_token", self.auth.token)
-            self.set_cookie(request, "_career_session", self._sess)
-
-        response = session.send(request.prepare())
+        for hook in self.hooks:
+            hook.pre_request(info)
+        try:
+            return self._request(
+                info,
+                url,
+                method,
+                auth_required=auth_required,
+                key=key,
+                ssr=ssr,
+                cls=cls,
+                params_options=params_options,
+                params_encoder=params_encoder,
+                data_options=data_options,
+                **kwargs
+            )
+        except Exception as e:
+            info.error = e
+            raise
+        finally:
+            info.finish()
+            for hook in self.hooks:
+                hook.post_request(info)
+
+    def _request(
+            self,
+            info: RequestInfo,
+            url: str,
+            method: str,
+            auth_required: bool = False,
+            key: str | None = None,
+            ssr: bool = False,
+            cls: type[PydanticModel] = None,
+            params_options: dict[str, Any] | None = None,
+            params_encoder: QueryEncoder | None = None,
+            data_options: dict[str, Any] | None = None,
+            **kwargs
+    ) -> Response | dict[str, Any] | PydanticModel:
+        with info.timer("prepare"):
+            params_options = params_options or {}
+            data_options = data_options or {}
+
+            convertor = Convertor()
+
+            # Query string is built here, so requests does not encode it again
+            params = kwargs.pop("params", None)
+            if params is not None:
+                encoder = (params_encoder
+                           or QueryEncoder.from_options(**params_options))
+                query = encoder.encode(params)
+                if query:
+                    url = f"{url}{'&' if '?' in url else '?'}{query}"
+                    info.url = url
+
+            data = kwargs.get("data")
+            if data is not None:
+                kwargs["data"] = convertor.map(data, **data_options)
+
+            json = kwargs.get("json")
+            if json is not None:
+                kwargs["json"] = convertor.map(json, **data_options)
+
+            kwargs["cookies"] = kwargs.get("cookies") or {}
+
+            session = self.session
+            request = Request(method, url, **kwargs)
+
+            if auth_required:
+                if method in self.CSRF_PROTECTED_HTTP_METHODS:
+                    self.set_header(request,
+                                    "X-Csrf-Token", lambda: self.csrf_token)
+                if self.auth:
+                    self.set_cookie(request,
+                                    "remember_user_token", self.auth.token)
+                self.set_cookie(request, "_career_session", self._sess)
+
+            prepared_request = request.prepare()
+
+        passthrough = getattr(self._local, "passthrough", None)
+        stream = bool(passthrough and passthrough["stream"])
+
+        with info.timer("network"):
+            response = session.send(prepared_request, stream=stream)
+            # Cookies are set per request, the session keeps connections only
+            session.cookies.clear()
+            info.response = response
+            info.status = response.status_code
+            if stream:
+                info.bytes_received = int(
+                    response.headers.get("Content-Length") or 0)
+            else:
+                info.bytes_received = len(response.content)
 
         self._sess = response.cookies.get("_career_session")
 
+        if passthrough and response.ok:
+            return self._passthrough(info, response, key, ssr, stream)
+
         if not response.ok:
             try:
-                data = response.json()
-            except JSONDecodeError:
+                with info.timer("decode"):
+                    data = codec.loads(response.content)
+            except codec.JSONDecodeError:
                 raise ResponseError(
                     status=response.status_code,
                     error=response.reason
                 )
+        elif ssr and is_parsing_deferred():
+            return SSRPage(
+                body=response.content,
+                encoding=response.encoding,
+                key=key,
+                cls=cls,
+                validation=self.validation,
+            )
         elif ssr:
-            data = get_ssr_json(response.text)
+            with info.timer("ssr"):
+                data = get_ssr_json(response.text)
         else:
             try:
-                data = response.json()
-            except JSONDecodeError:
+                with info.timer("decode"):
+                    data = codec.loads(response.content)
+            except codec.JSONDecodeError:
                 return response
 
-        # Make sure response data is not error
-        # Validate data against registered errors
-        for error_cls in registered_errors:
-            error_cls.check_data(data)
+        self._check_errors(info, data)
 
         # JSON data processing
         if cls is not None:
             try:
-                obj = cls(**data)
+                with info.timer("validation"):
+                    obj = validate(cls, data, self.validation)
+                if self.validation is ValidationMode.RAW:
+                    return data[key] if key else data
                 return getattr(obj, key) if key else obj
             except ValidationError:
                 raise HABRCareerClientError("Unknown error")
 
         return data[key] if key else data
 
+    def _passthrough(
+            self,
+            info: RequestInfo,
+            response: Response,
+            key: str | None,
+            ssr: bool,
+            stream: bool,
+    ) -> bytes | Iterator[bytes]:
+        if ssr:
+            with info.timer("ssr"):
+                body = get_ssr_json_text(response.text).encode()
+        elif key:
+            # Data has to be decoded anyway to pick the key
+            with info.timer("decode"):
+                data = codec.loads(response.content)
+            self._check_errors(info, data)
+            body = codec.dumpb(data[key])
+        elif stream:
+            length = int(response.headers.get("Content-Length") or -1)
+            if not 0 <= length <= self.PASSTHROUGH_ERROR_CHECK_SIZE:
+                return response.iter_content(self.PASSTHROUGH_CHUNK_SIZE)
+            body = response.content
+        else:
+            body = response.content
+
+        small = len(body) <= self.PASSTHROUGH_ERROR_CHECK_SIZE
+        if small and body.lstrip().startswith(b"{"):
+            with info.timer("decode"):
+                try:
+                    data = codec.loads(body)
+                except ValueError:
+                    data = None
+            if data is not None:
+                self._check_errors(info, data)
+
+        return iter([body]) if stream else body
+
+    @staticmethod
+    def _check_errors(info: RequestInfo, data: Any) -> None:
+        # Make sure response data is not error
+        # Validate data against registered errors
+        with info.timer("errors"):
+            for error_cls in registered_errors:
+                error_cls.check_data(data)
+
     @staticmethod
     def _set_request_data(
             field: str,
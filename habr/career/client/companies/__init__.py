@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import verify, UNIQUE, StrEnum
 
-from habr.career.utils import Pagination
+from habr.career.utils import Pagination, QueryEncoder
 from .models import Ratings
 
 
@@ -51,6 +51,10 @@ class CompanyRatingCriteria(StrEnum):
     S16 = "s_16"  # Современные технологии
 
 
+# Companies ratings query parameters
+RATINGS_QUERY = QueryEncoder("sort", "y", "sz", "page", "q")
+
+
 # noinspection PyUnresolvedReferences
 class HABRCareerCompaniesMixin:
     """Раздел `Компании`"""
@@ -161,6 +165,7 @@ class HABRCareerCompaniesRatingsMixin:
                 "page": page,
                 "q": search,
             },
+            params_encoder=RATINGS_QUERY,
             cls=Ratings,
         )
 
@@ -0,0 +1,501 @@
+"""
+Companies ratings history.
+
+Crawls `get_companies_ratings` over years × company sizes × criteria ×
+pages and keeps it normalised in a sqlite file: companies once, one
+score per company, year and criterion, one position per company, year,
+size and criterion. Every rating item carries scores of all criteria,
+the criterion of a request only orders the list, so scores are complete
+after crawling a single criterion and other criteria add positions.
+
+Past years ratings don't change: their pages are fetched once, an
+interrupted crawl resumes with pages that are not saved yet. Pages of
+the latest year are fetched again once they are older than `max_age`.
+
+Example:
+    store = RatingsStore("ratings.sqlite")
+    crawler = RatingsCrawler(client, store, workers=8, rate=5)
+    crawler.run(rating_years(), sizes=list(CompanySize))
+
+    store.trend("aston")                     # [(2019, 4.2), ...]
+    store.rank_changes(2022, 2023, size=CompanySize.HUGE)
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Iterable
+
+from habr.career.client.store import SQLiteStore
+from habr.career.utils import Pagination, RateLimiter
+from . import CompanyRatingCriteria, CompanySize
+from .models import Ratings
+
+__all__ = [
+    "CRITERIA",
+    "RatingsQuery",
+    "RatingsStats",
+    "CompanyScore",
+    "RankChange",
+    "RatingsStore",
+    "RatingsCrawler",
+    "rating_years",
+]
+
+# Criteria crawled by default
+CRITERIA = tuple(CompanyRatingCriteria)
+
+# Score titles of rating items
+CRITERIA_TITLES = {
+    "Средняя оценка": CompanyRatingCriteria.AV,
+    "Общая оценка": CompanyRatingCriteria.AV,
+    "Интересные задачи": CompanyRatingCriteria.S2,
+    "Адекватная зарплата": CompanyRatingCriteria.S3,
+    "Социальный пакет": CompanyRatingCriteria.S4,
+    "Комфортные условия труда": CompanyRatingCriteria.S5,
+    "Профессиональный рост": CompanyRatingCriteria.S6,
+    "Карьерный рост": CompanyRatingCriteria.S7,
+    "Отношения с коллегами": CompanyRatingCriteria.S8,
+    "Признание результатов труда": CompanyRatingCriteria.S9,
+    "Грамотность менеджмента": CompanyRatingCriteria.S10,
+    "Связь с топ-менеджментом": CompanyRatingCriteria.S11,
+    "Компания делает мир лучше": CompanyRatingCriteria.S12,
+    "Современные технологии": CompanyRatingCriteria.S16,
+}
+
+# Ratings cover the previous years
+RATING_YEARS = 5
+
+DAY = 24 * 60 * 60
+
+
+def rating_years(latest: int | None = None) -> list[int]:
+    """
+    Years covered by ratings, the oldest first.
+
+    :param latest: Latest year, the previous one by default
+    :return:
+    """
+    latest = latest or date.today().year - 1
+    return list(range(latest - RATING_YEARS + 1, latest + 1))
+
+
+@dataclass(frozen=True)
+class RatingsQuery:
+    """Single ratings list, fetched page by page."""
+    year: int
+    size: CompanySize
+    criterion: CompanyRatingCriteria
+
+    def params(self, page: int) -> dict:
+        """`get_companies_ratings` parameters."""
+        return {
+            "year": self.year,
+            "size": self.size,
+            "sort": self.criterion,
+            "page": page,
+        }
+
+
+@dataclass
+class RatingsStats:
+    queries: int = 0
+    pages: int = 0
+    skipped: int = 0
+    fetched: int = 0
+    ratings: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def done(self) -> int:
+        return self.skipped + self.fetched + len(self.failed)
+
+
+@dataclass
+class CompanyScore:
+    alias: str
+    title: str
+    year: int
+    score: float
+    position: int | None
+
+
+@dataclass
+class RankChange:
+    alias: str
+    title: str
+    position: int | None  # None if not rated in the year
+    previous: int | None  # None if not rated in the previous year
+    score: float | None
+    previous_score: float | None
+
+    @property
+    def change(self) -> int | None:
+        """Positions gained, negative if lost."""
+        if self.position is None or self.previous is None:
+            return None
+        return self.previous - self.position
+
+
+def company_alias(href: str) -> str:
+    """Company alias of `/companies/<alias>` link."""
+    return href.rstrip("/").rsplit("/", 1)[-1]
+
+
+def parse_score(value: str | None) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RatingsStore(SQLiteStore):
+    """Companies ratings kept in a sqlite file."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rating_companies (
+            id INTEGER PRIMARY KEY,
+            alias TEXT NOT NULL UNIQUE,
+            title TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS rating_pages (
+            year INTEGER NOT NULL,
+            size TEXT NOT NULL,
+            criterion TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            total_pages INTEGER NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (year, size, criterion, page)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS rating_scores (
+            company INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            criterion TEXT NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (company, year, criterion)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS rating_positions (
+            year INTEGER NOT NULL,
+            size TEXT NOT NULL,
+            criterion TEXT NOT NULL,
+            company INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (year, size, criterion, company)
+        ) WITHOUT ROWID;
+    """
+
+    def saved_pages(
+            self,
+            years: Iterable[int],
+    ) -> dict[tuple[int, str, str], dict[int, tuple[int, float]]]:
+        """
+        Saved pages of the years.
+
+        :param years:
+        :return: (year, size, criterion) ->
+                 page -> (total pages, fetched at)
+        """
+        years = list(years)
+        saved = {}
+        with closing(self._connect()) as conn:
+            for row in conn.execute(
+                    f"SELECT * FROM rating_pages"
+                    f" WHERE year IN ({', '.join('?' * len(years))})",
+                    years,
+            ):
+                key = (row["year"], row["size"], row["criterion"])
+                saved.setdefault(key, {})[row["page"]] = (
+                    row["total_pages"], row["fetched_at"])
+        return saved
+
+    def save_page(
+            self,
+            query: RatingsQuery,
+            page: int,
+            result: Ratings,
+    ) -> int:
+        """
+        Save companies, scores and positions of the page, atomically.
+        Positions the page covers are replaced.
+
+        :param query:
+        :param page:
+        :param result: `get_companies_ratings` result
+        :return: Number of saved ratings
+        """
+        criterion = query.criterion
+        meta = result.meta
+        first = (page - 1) * meta.per_page + 1
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM rating_positions"
+                " WHERE year = ? AND size = ? AND criterion = ?"
+                " AND position BETWEEN ? AND ?",
+                (query.year, query.size, criterion,
+                 first, first + meta.per_page - 1),
+            )
+            for rating in result.list_:
+                company = rating.company
+                company_id = conn.execute(
+                    "INSERT INTO rating_companies (alias, title)"
+                    " VALUES (?, ?) ON CONFLICT (alias)"
+                    " DO UPDATE SET title = excluded.title"
+                    " RETURNING id",
+                    (company_alias(company.href), company.title),
+                ).fetchone()[0]
+
+                scores = {}
+                for item in (rating.scores.featured, *rating.scores.items):
+                    criterion_ = CRITERIA_TITLES.get(item.title)
+                    score = parse_score(item.value)
+                    if criterion_ is not None and score is not None:
+                        scores[criterion_] = score
+                conn.executemany(
+                    "INSERT INTO rating_scores VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT DO UPDATE SET score = excluded.score",
+                    [(company_id, query.year, c, s)
+                     for c, s in scores.items()],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO rating_positions"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (query.year, query.size, criterion, company_id,
+                     rating.position),
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO rating_pages VALUES (?, ?, ?, ?, ?, ?)",
+                (query.year, query.size, criterion, page,
+                 max(meta.total_pages, 1), time.time()),
+            )
+        return len(result.list_)
+
+    def find(self, company: str) -> str | None:
+        """
+        Company alias by alias or title, case-insensitive.
+
+        :param company:
+        :return: None if not found
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT alias FROM rating_companies"
+                " WHERE alias = ? OR lower(title) = lower(?)"
+                " ORDER BY alias = ? DESC LIMIT 1",
+                (company, company, company),
+            ).fetchone()
+        return row and row["alias"]
+
+    def years(self) -> list[int]:
+        """Years having scores."""
+        with closing(self._connect()) as conn:
+            return [
+                row[0] for row in conn.execute(
+                    "SELECT DISTINCT year FROM rating_scores ORDER BY year")
+            ]
+
+    def trend(
+            self,
+            company: str,
+            criterion: CompanyRatingCriteria = CompanyRatingCriteria.AV,
+    ) -> list[CompanyScore]:
+        """
+        Scores of the company by year.
+
+        :param company: Company alias
+        :param criterion:
+        :return: Scores, the oldest year first, with the best position
+                 among company sizes
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT c.alias, c.title, s.year, s.score,
+                       (SELECT min(p.position) FROM rating_positions p
+                        WHERE p.year = s.year AND p.criterion = s.criterion
+                        AND p.company = s.company) AS position
+                FROM rating_companies c
+                JOIN rating_scores s ON s.company = c.id
+                WHERE c.alias = ? AND s.criterion = ?
+                ORDER BY s.year
+                """,
+                (company, criterion),
+            ).fetchall()
+        return [CompanyScore(**row) for row in rows]
+
+    def rank_changes(
+            self,
+            year: int,
+            previous: int,
+            size: CompanySize = CompanySize.HUGE,
+            criterion: CompanyRatingCriteria = CompanyRatingCriteria.AV,
+            k: int | None = None,
+    ) -> list[RankChange]:
+        """
+        Position changes of companies between two years.
+
+        :param year:
+        :param previous: Year to compare with
+        :param size:
+        :param criterion:
+        :param k: Number of companies with the largest changes, all
+                  companies of both years in the order of the year if None
+        :return: Companies rated in one of the years only come last
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                WITH current AS (
+                    SELECT company, position FROM rating_positions
+                    WHERE year = ? AND size = ? AND criterion = ?
+                ), before AS (
+                    SELECT company, position FROM rating_positions
+                    WHERE year = ? AND size = ? AND criterion = ?
+                ), companies AS (
+                    SELECT company FROM current
+                    UNION SELECT company FROM before
+                )
+                SELECT c.alias, c.title,
+                       cur.position AS position,
+                       bef.position AS previous,
+                       s1.score AS score,
+                       s0.score AS previous_score
+                FROM companies
+                JOIN rating_companies c ON c.id = companies.company
+                LEFT JOIN current cur ON cur.company = companies.company
+                LEFT JOIN before bef ON bef.company = companies.company
+                LEFT JOIN rating_scores s1 ON s1.company = c.id
+                    AND s1.year = ? AND s1.criterion = ?
+                LEFT JOIN rating_scores s0 ON s0.company = c.id
+                    AND s0.year = ? AND s0.criterion = ?
+                """,
+                (year, size, criterion, previous, size, criterion,
+                 year, criterion, previous, criterion),
+            ).fetchall()
+
+        changes = [RankChange(**row) for row in rows]
+        if k is None:
+            changes.sort(key=lambda x: (
+                x.position is None, x.position or x.previous))
+            return changes
+        changes.sort(key=lambda x: (
+            x.change is None, -abs(x.change or 0), x.position or 0))
+        return changes[:k]
+
+
+class RatingsCrawler:
+    """
+    :param client: Client or client pool
+    :param store: Results store
+    :param workers: Concurrent requests
+    :param rate: Requests per second limit, not limited if None
+    """
+
+    def __init__(
+            self,
+            client,
+            store: RatingsStore,
+            workers: int = 8,
+            rate: float | None = 5,
+    ):
+        self.client = client
+        self.store = store
+        self.workers = workers
+        self.limiter = RateLimiter(rate) if rate else None
+
+    def fetch(self, query: RatingsQuery, page: int) -> Ratings:
+        if self.limiter is not None:
+            self.limiter.acquire()
+        return self.client.get_companies_ratings(**query.params(page))
+
+    def run(
+            self,
+            years: Iterable[int],
+            sizes: Iterable[CompanySize] = tuple(CompanySize),
+            criteria: Iterable[CompanyRatingCriteria] = CRITERIA,
+            max_age: float = DAY,
+            progress: Callable[[RatingsStats], None] | None = None,
+    ) -> RatingsStats:
+        """
+        Fetch and save pages which are not saved yet, and pages of the
+        latest year older than `max_age` seconds. First pages of lists
+        are requested together, the rest as soon as the number of pages
+        of the list is known. Failed pages are retried by the next run.
+
+        :param years:
+        :param sizes:
+        :param criteria:
+        :param max_age: Seconds, pages of the latest year are kept for
+        :param progress: Called with stats after every page
+        :return:
+        """
+        years = sorted(set(years))
+        queries = [
+            RatingsQuery(year, size, criterion)
+            for year in years for size in sizes for criterion in criteria
+        ]
+        saved = self.store.saved_pages(years)
+        stale_before = time.time() - max_age
+        latest = years[-1] if years else None
+
+        def pending(query: RatingsQuery, pages: Iterable[int]) -> list[int]:
+            key = (query.year, query.size, query.criterion)
+            saved_ = saved.get(key, {})
+            return [
+                page for page in pages
+                if page not in saved_ or (
+                    query.year == latest and saved_[page][1] < stale_before)
+            ]
+
+        stats = RatingsStats(queries=len(queries))
+        executor = ThreadPoolExecutor(self.workers)
+        futures = {}
+
+        def submit(query: RatingsQuery, pages: list[int]) -> None:
+            for page in pages:
+                future = executor.submit(self.fetch, query, page)
+                futures[future] = (query, page)
+
+        try:
+            for query in queries:
+                key = (query.year, query.size, query.criterion)
+                total_pages = saved.get(key, {}).get(Pagination.INIT_PAGE)
+                if total_pages is None or pending(query, [1]):
+                    # The number of pages is known after the first one
+                    submit(query, [Pagination.INIT_PAGE])
+                    stats.pages += 1
+                    continue
+                pages = range(Pagination.INIT_PAGE, total_pages[0] + 1)
+                pages_ = pending(query, pages)
+                submit(query, pages_)
+                stats.pages += len(pages)
+                stats.skipped += len(pages) - len(pages_)
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    query, page = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        stats.failed[f"{query.year}/{query.size}/"
+                                     f"{query.criterion}/{page}"] = (
+                            f"{e.__class__.__name__}: {e}")
+                    else:
+                        # Results are saved by this thread only
+                        stats.ratings += self.store.save_page(
+                            query, page, result)
+                        stats.fetched += 1
+                        if page == Pagination.INIT_PAGE:
+                            rest = range(
+                                page + 1, result.meta.total_pages + 1)
+                            rest_ = pending(query, rest)
+                            submit(query, rest_)
+                            stats.pages += len(rest)
+                            stats.skipped += len(rest) - len(rest_)
+                    if progress is not None:
+                        progress(stats)
+        finally:
+            # Requests are not started for the rest on interruption
+            executor.shutdown(cancel_futures=True)
+        return stats
@@ -2,7 +2,7 @@ from typing import Any, TypedDict, Unpack
 
 from requests.status_codes import codes
 
-from habr.career.utils import Pagination, ComplainReason
+from habr.career.utils import Pagination, ComplainReason, QueryEncoder
 from .models import (
     Conversations,
     Conversation,
@@ -21,6 +21,10 @@ class TemplateUpdateParams(TemplateParams, total=False):
     pass
 
 
+# Conversation query parameters
+CONVERSATION_QUERY = QueryEncoder("valid", "page", bool_as_str=True)
+
+
 # noinspection PyUnresolvedReferences
 class HABRCareerConversationsMixin:
     """Раздел `Переписки`"""
@@ -126,9 +130,7 @@ class HABRCareerConversationsMixin:
             cls=Conversation,
             auth_required=True,
             params={"valid": True, "page": page},
-            params_options={
-                "bool_as_str": True,
-            },
+            params_encoder=CONVERSATION_QUERY,
         )
 
     connect = get_conversation
@@ -0,0 +1,571 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from enum import StrEnum, verify, UNIQUE
+from typing import Any, Iterable, Iterator
+
+from pydantic import BaseModel
+
+from habr.career import codec
+from habr.career.client.store import SQLiteStore
+from habr.career.client.validation import materialize
+from habr.career.utils import Pagination
+
+__all__ = [
+    "UnitKind",
+    "UnitStatus",
+    "WorkUnit",
+    "WorkQueue",
+    "SQLiteWorkQueue",
+    "CrawlCoordinator",
+    "CrawlWorker",
+]
+
+
+@verify(UNIQUE)
+class UnitKind(StrEnum):
+    RESUMES = "resumes"      # Page of `get_resumes`
+    VACANCIES = "vacancies"  # Page of `get_vacancies`
+    PROFILE = "profile"      # Single `get_profile`
+
+
+@verify(UNIQUE)
+class UnitStatus(StrEnum):
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+
+
+UNIT_HANDLERS = {
+    UnitKind.RESUMES: "get_resumes",
+    UnitKind.VACANCIES: "get_vacancies",
+    UnitKind.PROFILE: "get_profile",
+}
+
+# Error of units failed by expired leases
+LEASE_EXPIRED_ERROR = "Lease expired"
+
+
+class WorkUnit:
+    def __init__(
+            self,
+            crawl_id: str,
+            kind: UnitKind,
+            params: dict[str, Any],
+            id_: int | None = None,
+            status: UnitStatus = UnitStatus.PENDING,
+            attempts: int = 0,
+            lease_owner: str | None = None,
+            lease_expires: float | None = None,
+    ):
+        self.id = id_
+        self.crawl_id = crawl_id
+        self.kind = UnitKind(kind)
+        self.params = params
+        self.status = UnitStatus(status)
+        self.attempts = attempts
+        self.lease_owner = lease_owner
+        self.lease_expires = lease_expires
+
+    @property
+    def key(self) -> str:
+        """Unique unit key within the crawl, used to skip duplicates."""
+        return json.dumps([self.kind, self.params], sort_keys=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.id} {self.kind}"
+            f" {self.params} {self.status}>"
+        )
+
+
+class WorkQueue(ABC):
+    """
+    Shared queue of crawl work units.
+    Units are leased by workers for a limited time. Units whose lease
+    expired without commit are given out again.
+    """
+
+    @abstractmethod
+    def put(self, units: Iterable[WorkUnit]) -> int:
+        """
+        Add units to the queue skipping already known ones.
+
+        :param units:
+        :return: Number of added units.
+        """
+
+    @abstractmethod
+    def lease(
+            self,
+            worker_id: str,
+            limit: int = 1,
+            timeout: float = 300,
+            crawl_id: str | None = None,
+            max_attempts: int = 3,
+    ) -> list[WorkUnit]:
+        """
+        Lease pending (or expired) units.
+        Expired units are marked as failed once `max_attempts` is reached:
+        a unit killing its worker never gets to `fail`.
+
+        :param worker_id: Worker identifier
+        :param limit: Max units to lease
+        :param timeout: Lease duration in seconds
+        :param crawl_id: Lease units of this crawl only
+        :param max_attempts:
+        :return:
+        """
+
+    @abstractmethod
+    def commit(self, unit: WorkUnit, worker_id: str, result: Any) -> bool:
+        """
+        Save unit result and mark unit as done.
+        Returns False if the lease has been lost meanwhile.
+
+        :param unit:
+        :param worker_id:
+        :param result: JSON serializable result
+        :return:
+        """
+
+    @abstractmethod
+    def fail(
+            self,
+            unit: WorkUnit,
+            worker_id: str,
+            error: str,
+            max_attempts: int = 3,
+    ) -> bool:
+        """
+        Release unit after unsuccessful attempt.
+        Unit is marked as failed once `max_attempts` is reached.
+
+        :param unit:
+        :param worker_id:
+        :param error: Error description
+        :param max_attempts:
+        :return:
+        """
+
+    @abstractmethod
+    def results(self, crawl_id: str) -> Iterator[tuple[WorkUnit, Any]]:
+        """
+        Iterate over committed results of the crawl.
+
+        :param crawl_id:
+        :return:
+        """
+
+    @abstractmethod
+    def stats(self, crawl_id: str | None = None) -> dict[str, int]:
+        """
+        Get units count by status.
+
+        :param crawl_id:
+        :return:
+        """
+
+
+class SQLiteWorkQueue(SQLiteStore, WorkQueue):
+    """
+    Work queue kept in a sqlite file.
+    Suitable for tests and single host runs with several worker processes.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS units (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            crawl_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,
+            result TEXT,
+            error TEXT,
+            updated_at REAL NOT NULL,
+            UNIQUE (crawl_id, key)
+        );
+        CREATE INDEX IF NOT EXISTS units_status
+            ON units (status, lease_expires);
+    """
+
+    @staticmethod
+    def _to_unit(row: sqlite3.Row) -> WorkUnit:
+        return WorkUnit(
+            id_=row["id"],
+            crawl_id=row["crawl_id"],
+            kind=row["kind"],
+            params=json.loads(row["params"]),
+            status=row["status"],
+            attempts=row["attempts"],
+            lease_owner=row["lease_owner"],
+            lease_expires=row["lease_expires"],
+        )
+
+    def put(self, units: Iterable[WorkUnit]) -> int:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.executemany(
+                """
+                INSERT OR IGNORE INTO units
+                    (crawl_id, kind, key, params, status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        u.crawl_id,
+                        u.kind,
+                        u.key,
+                        json.dumps(u.params),
+                        UnitStatus.PENDING,
+                        now,
+                    ) for u in units
+                ],
+            )
+            return cursor.rowcount
+
+    def lease(
+            self,
+            worker_id: str,
+            limit: int = 1,
+            timeout: float = 300,
+            crawl_id: str | None = None,
+            max_attempts: int = 3,
+    ) -> list[WorkUnit]:
+        now = time.time()
+        crawl_filter = "AND crawl_id = ?" if crawl_id is not None else ""
+        crawl_params = (crawl_id,) if crawl_id is not None else ()
+        with self._transaction() as conn:
+            conn.execute(
+                f"""
+                UPDATE units
+                SET status = ?, error = ?,
+                    lease_owner = NULL, lease_expires = NULL,
+                    updated_at = ?
+                WHERE status = ? AND lease_expires < ? AND attempts >= ?
+                {crawl_filter}
+                """,
+                (UnitStatus.FAILED, LEASE_EXPIRED_ERROR, now,
+                 UnitStatus.LEASED, now, max_attempts, *crawl_params),
+            )
+            rows = conn.execute(
+                f"""
+                SELECT * FROM units
+                WHERE (
+                    status = ?
+                    OR (status = ? AND lease_expires < ?)
+                ) {crawl_filter}
+                ORDER BY id
+                LIMIT ?
+                """,
+                (UnitStatus.PENDING, UnitStatus.LEASED, now,
+                 *crawl_params, limit),
+            ).fetchall()
+            conn.executemany(
+                """
+                UPDATE units
+                SET status = ?, lease_owner = ?, lease_expires = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+                """,
+                [
+                    (UnitStatus.LEASED, worker_id, now + timeout, now,
+                     row["id"])
+                    for row in rows
+                ],
+            )
+        units = []
+        for row in rows:
+            unit = self._to_unit(row)
+            unit.status = UnitStatus.LEASED
+            unit.attempts += 1
+            unit.lease_owner = worker_id
+            unit.lease_expires = now + timeout
+            units.append(unit)
+        return units
+
+    def commit(self, unit: WorkUnit, worker_id: str, result: Any) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE units
+                SET status = ?, result = ?, error = NULL,
+                    lease_owner = NULL, lease_expires = NULL,
+                    updated_at = ?
+                WHERE id = ? AND status = ? AND lease_owner = ?
+                """,
+                (UnitStatus.DONE, codec.dumps(result), time.time(),
+                 unit.id, UnitStatus.LEASED, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def fail(
+            self,
+            unit: WorkUnit,
+            worker_id: str,
+            error: str,
+            max_attempts: int = 3,
+    ) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE units
+                SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                    error = ?, lease_owner = NULL, lease_expires = NULL,
+                    updated_at = ?
+                WHERE id = ? AND status = ? AND lease_owner = ?
+                """,
+                (max_attempts, UnitStatus.FAILED, UnitStatus.PENDING,
+                 error, time.time(),
+                 unit.id, UnitStatus.LEASED, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def results(self, crawl_id: str) -> Iterator[tuple[WorkUnit, Any]]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM units WHERE crawl_id = ? AND status = ?"
+                " ORDER BY id",
+                (crawl_id, UnitStatus.DONE),
+            )
+            for row in rows:
+                yield self._to_unit(row), codec.loads(row["result"])
+
+    def stats(self, crawl_id: str | None = None) -> dict[str, int]:
+        crawl_filter = "WHERE crawl_id = ?" if crawl_id is not None else ""
+        crawl_params = (crawl_id,) if crawl_id is not None else ()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT status, COUNT(*) FROM units {crawl_filter}"
+                " GROUP BY status",
+                crawl_params,
+            ).fetchall()
+        stats = {s.value: 0 for s in UnitStatus}
+        stats.update({status: count for status, count in rows})
+        return stats
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    Convert client method result into JSON serializable data.
+
+    :param value:
+    :return:
+    """
+    if isinstance(value, BaseModel):
+        materialize(value)
+        return value.model_dump(mode="json", by_alias=True)
+    return value
+
+
+def total_pages(page: Any) -> int:
+    """
+    Pages count of a list page in any validation mode:
+    a model, raw JSON data or passthrough body.
+
+    :param page: `get_resumes` or `get_vacancies` result
+    :return:
+    """
+    if isinstance(page, BaseModel):
+        return page.meta.total_pages
+    if isinstance(page, (bytes, str)):
+        page = codec.loads(page)
+    return page["meta"]["totalPages"]
+
+
+class CrawlCoordinator:
+    """
+    Turns crawl queries into work units stored in a shared queue.
+
+    Example:
+        queue = SQLiteWorkQueue("crawl.sqlite")
+        coordinator = CrawlCoordinator(queue)
+        coordinator.plan_resumes("python", client, skills=[446])
+
+        # On every worker host / process
+        CrawlWorker(queue, client).run()
+
+        for unit, result in queue.results("python"):
+            ...
+    """
+
+    def __init__(self, queue: WorkQueue):
+        self.queue = queue
+
+    def plan_resumes(
+            self,
+            crawl_id: str,
+            client=None,
+            pages: int | None = None,
+            per_page: int = Pagination.PER_PAGE,
+            **filters
+    ) -> int:
+        """
+        Plan `get_resumes` crawl split by pages.
+        If `pages` is not passed it's taken from the first page meta,
+        which requires `client`.
+
+        :param crawl_id: Crawl identifier
+        :param client: Client used to discover pages count
+        :param pages: Number of pages to crawl
+        :param per_page: Items per page
+        :param filters: `get_resumes` filters
+        :return: Number of added units.
+        """
+        if pages is None:
+            first = client.get_resumes(per_page=per_page, **filters)
+            pages = total_pages(first)
+        return self._plan_pages(
+            crawl_id, UnitKind.RESUMES, pages, per_page, filters)
+
+    def plan_vacancies(
+            self,
+            crawl_id: str,
+            client=None,
+            pages: int | None = None,
+            per_page: int = Pagination.PER_PAGE,
+            **filters
+    ) -> int:
+        """
+        Plan `get_vacancies` crawl split by pages.
+        If `pages` is not passed it's taken from the first page meta,
+        which requires `client`.
+
+        :param crawl_id: Crawl identifier
+        :param client: Client used to discover pages count
+        :param pages: Number of pages to crawl
+        :param per_page: Items per page
+        :param filters: `get_vacancies` filters
+        :return: Number of added units.
+        """
+        if pages is None:
+            first = client.get_vacancies(per_page=per_page, **filters)
+            pages = total_pages(first)
+        return self._plan_pages(
+            crawl_id, UnitKind.VACANCIES, pages, per_page, filters)
+
+    def plan_profiles(self, crawl_id: str, usernames: Iterable[str]) -> int:
+        """
+        Plan `get_profile` crawl, one unit per user.
+
+        :param crawl_id: Crawl identifier
+        :param usernames: Users aliases
+        :return: Number of added units.
+        """
+        return self.queue.put(
+            WorkUnit(crawl_id, UnitKind.PROFILE, {"username": u})
+            for u in usernames
+        )
+
+    def _plan_pages(
+            self,
+            crawl_id: str,
+            kind: UnitKind,
+            pages: int,
+            per_page: int,
+            filters: dict[str, Any],
+    ) -> int:
+        filters = {k: v for k, v in filters.items() if v is not None}
+        return self.queue.put(
+            WorkUnit(
+                crawl_id,
+                kind,
+                {**filters, "page": page, "per_page": per_page},
+            )
+            for page in range(Pagination.INIT_PAGE, pages + 1)
+        )
+
+
+class CrawlWorker:
+    """Leases units from the queue and runs them with the client."""
+
+    def __init__(
+            self,
+            queue: WorkQueue,
+            client,
+            worker_id: str | None = None,
+            lease_timeout: float = 300,
+            max_attempts: int = 3,
+            batch_size: int = 1,
+    ):
+        self.queue = queue
+        self.client = client
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}"
+            f":{threading.get_ident()}"
+        )
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+
+    def execute(self, unit: WorkUnit) -> Any:
+        """
+        Run unit with corresponding client method.
+
+        :param unit:
+        :return:
+        """
+        method = getattr(self.client, UNIT_HANDLERS[unit.kind])
+        return to_jsonable(method(**unit.params))
+
+    def run_once(self, crawl_id: str | None = None) -> int:
+        """
+        Lease and process one batch of units.
+
+        :param crawl_id: Process units of this crawl only
+        :return: Number of processed units.
+        """
+        units = self.queue.lease(
+            self.worker_id,
+            limit=self.batch_size,
+            timeout=self.lease_timeout,
+            crawl_id=crawl_id,
+            max_attempts=self.max_attempts,
+        )
+        for unit in units:
+            try:
+                result = self.execute(unit)
+            except Exception as e:
+                self.queue.fail(unit, self.worker_id,
+                                f"{e.__class__.__name__}: {e}",
+                                max_attempts=self.max_attempts)
+            else:
+                self.queue.commit(unit, self.worker_id, result)
+        return len(units)
+
+    def run(
+            self,
+            crawl_id: str | None = None,
+            max_units: int | None = None,
+            wait: bool = False,
+            poll_interval: float = 5,
+    ) -> int:
+        """
+        Process units until the queue is drained.
+
+        :param crawl_id: Process units of this crawl only
+        :param max_units: Stop after processing this number of units
+        :param wait: Keep polling while units are leased by other workers,
+                     so units of crashed workers are picked up on expiry
+        :param poll_interval: Seconds between polls when waiting
+        :return: Number of processed units.
+        """
+        processed = 0
+        while max_units is None or processed < max_units:
+            count = self.run_once(crawl_id)
+            if not count:
+                if not wait or not self.queue.stats(crawl_id)[UnitStatus.LEASED]:
+                    break
+                time.sleep(poll_interval)
+            processed += count
+        return processed
@@ -1,6 +1,11 @@
 from enum import StrEnum, verify, UNIQUE, IntEnum
 
-from habr.career.utils import QualificationID, Currency, Pagination
+from habr.career.utils import (
+    QualificationID,
+    Currency,
+    Pagination,
+    QueryEncoder,
+)
 from .models import Experts
 
 
@@ -23,6 +28,25 @@ class RequestID(StrEnum):
     RQ8 = "8"  # Карьера за рубежом
 
 
+# Experts search query parameters
+EXPERTS_QUERY = QueryEncoder(
+    "q",
+    "order",
+    "rid",
+    "sid[]",
+    "qid",
+    "skills[]",
+    "rateFrom",
+    "rate",
+    "currency",
+    "freeOnly",
+    "freeIntro",
+    "page",
+    "perPage",
+    bool_as_str=True,
+)
+
+
 # noinspection PyUnresolvedReferences
 class HABRCareerExpertsMixin:
     """Раздел `Эксперты`"""
@@ -171,8 +195,6 @@ class HABRCareerExpertsMixin:
         return self.get(
             "frontend_v1/experts",
             params=params,
-            params_options={
-                "bool_as_str": True,
-            },
+            params_encoder=EXPERTS_QUERY,
             cls=Experts,
         )
@@ -0,0 +1,488 @@
+"""
+Vacancy to resume matching.
+
+Crawled resumes (`ResumeColumns`) are indexed as a sparse resume × skill
+matrix stored by columns: skill ID -> array of resume rows (postings).
+Scoring a vacancy is a sparse matrix-vector product: IDF weights of
+vacancy skills are accumulated over their postings only, so the cost
+depends on how many resumes share skills with the vacancy rather than
+on the number of resumes. Qualification, location and salary fit of
+the candidates are read from the same columns and mixed in with
+`MatchWeights`. The index is append-only like the columns, `update`
+indexes rows appended since the previous call.
+
+With NumPy installed (pip install "Habr Career[numpy]") candidates are
+scored at once over NumPy copies of the columns and postings, otherwise
+one by one in pure Python with early stop.
+
+Example:
+    columns = ResumeColumns()
+    matcher = ResumeMatcher(columns)
+    for page in pages:
+        matcher.add_page(page)
+
+    vacancies = client.get_vacancies(skills=[446])["list"]
+    for vacancy_id, matches in matcher.match_many(vacancies, k=20).items():
+        for match in matches:
+            print(vacancy_id, match.resume, round(match.score, 2))
+"""
+import heapq
+import math
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from habr.career.client.resumes.columnar import MISSING, ResumeColumns
+from habr.career.client.resumes.models import Resumes
+from habr.career.client.skills import UNKNOWN, vacancy_document
+
+__all__ = [
+    "MatchWeights",
+    "Match",
+    "VacancyFeatures",
+    "ResumeMatcher",
+]
+
+# Qualification IDs from junior to senior, neighbours match partially
+QUALIFICATIONS = (1, 3, 4, 5, 6)
+
+# Score of a feature which is unknown for vacancy or resume
+NEUTRAL = 0.5
+
+
+@dataclass
+class MatchWeights:
+    """Weights of features in the total score, their sum is 1."""
+    skills: float = 0.6
+    qualification: float = 0.15
+    location: float = 0.15
+    salary: float = 0.1
+
+
+@dataclass
+class Match:
+    resume: str
+    index: int  # Row of `ResumeColumns`
+    score: float
+    skills: int  # Number of shared skills
+
+
+@dataclass
+class VacancyFeatures:
+    id: str
+    skills: list[int]
+    qualification: int
+    location: int
+    remote: bool
+    salary_to: int | None
+    currency: str | None
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> "VacancyFeatures":
+        """
+        Features of `get_vacancies` list item or `get_vacancy` result.
+
+        :param data: Vacancy raw JSON data
+        :return:
+        """
+        item = data.get("vacancy") or data
+        document = vacancy_document(item)
+        salary = item.get("salary") or {}
+        return cls(
+            id=document.id,
+            skills=list(document.skills),
+            qualification=document.qualification,
+            location=document.location,
+            remote=bool(item.get("remoteWork")),
+            salary_to=salary.get("to") or None,
+            currency=salary.get("currency"),
+        )
+
+
+class ResumeMatcher:
+    """
+    :param columns: Crawled resumes, indexed rows are not changed later
+    :param weights:
+    :param vectorized: Score with NumPy, by default if it is installed
+    """
+
+    def __init__(
+            self,
+            columns: ResumeColumns | None = None,
+            weights: MatchWeights | None = None,
+            vectorized: bool | None = None,
+    ):
+        if vectorized and np is None:
+            raise ImportError(
+                "NumPy is required for vectorized matching. "
+                "Install it with `pip install numpy`."
+            )
+        self.columns = columns if columns is not None else ResumeColumns()
+        self.weights = weights or MatchWeights()
+        self.vectorized = np is not None if vectorized is None else vectorized
+        # NumPy copies of columns and postings, dropped on update
+        self._arrays: dict[str, Any] | None = None
+        self._postings_arrays: dict[int, Any] = {}
+        # Skill ID -> rows of resumes having it
+        self.postings: dict[int, array] = {}
+        # Qualification ID -> rows, candidates of vacancies without skills
+        self.qualifications: dict[int, array] = {}
+        self.indexed = 0
+        self.update()
+
+    def update(self) -> int:
+        """
+        Index resumes appended to columns since the previous call.
+
+        :return: Number of indexed resumes
+        """
+        columns = self.columns
+        start, end = self.indexed, len(columns)
+        skills, offsets = columns.skills, columns.skill_offsets
+        for row in range(start, end):
+            for skill in skills[offsets[row]:offsets[row + 1]]:
+                postings = self.postings.get(skill)
+                if postings is None:
+                    postings = self.postings[skill] = array("i")
+                postings.append(row)
+            qualification = columns.qualification[row]
+            rows = self.qualifications.get(qualification)
+            if rows is None:
+                rows = self.qualifications[qualification] = array("i")
+            rows.append(row)
+        self.indexed = end
+        if end > start:
+            self._arrays = None
+            self._postings_arrays.clear()
+        return end - start
+
+    def add_page(self, page: dict[str, Any] | Resumes) -> int:
+        """
+        Append `get_resumes` page to columns and index it.
+
+        :param page:
+        :return: Number of indexed resumes
+        """
+        self.columns.append_page(page)
+        return self.update()
+
+    def idf(self, skill: int) -> float:
+        """Smoothed inverse document frequency of the skill."""
+        postings = self.postings.get(skill)
+        frequency = len(postings) if postings is not None else 0
+        return math.log((self.indexed + 1) / (frequency + 1)) + 1
+
+    def match(
+            self,
+            vacancy: dict[str, Any] | VacancyFeatures,
+            k: int = 10,
+            min_skills: int = 1,
+    ) -> list[Match]:
+        """
+        Best fitting resumes of the vacancy.
+
+        :param vacancy: Vacancy raw JSON data or its features
+        :param k: Number of resumes
+        :param min_skills: Skip resumes sharing fewer skills. Vacancies
+                           without skills are matched against resumes
+                           of the same qualification
+        :return: Matches sorted by score, descending
+        """
+        if not isinstance(vacancy, VacancyFeatures):
+            vacancy = VacancyFeatures.from_data(vacancy)
+        if self.vectorized:
+            return self._match_vectorized(vacancy, k, min_skills)
+        weights = self.weights
+
+        # Sparse product of resume × skill matrix and vacancy IDF vector.
+        # Most candidates share a single skill, their skills score is the
+        # weight of that skill, so they are scored by posting lists as
+        # a whole and only resumes sharing several skills one by one.
+        skill_weights = self._skill_weights(vacancy)
+        total = sum(skill_weights.values()) / weights.skills
+        shared = Counter()
+        for skill in skill_weights:
+            shared.update(self.postings.get(skill, ()))
+
+        # Groups of candidates with the same skills score
+        groups: list[tuple[float, Iterable[int]]] = []
+        if skill_weights:
+            skills, offsets = self.columns.skills, self.columns.skill_offsets
+            for row, count in shared.items():
+                if count > 1 and count >= min_skills:
+                    score = sum(
+                        skill_weights.get(skill, 0.0)
+                        for skill in skills[offsets[row]:offsets[row + 1]]
+                    )
+                    groups.append((score / total, (row,)))
+            if min_skills <= 1:
+                groups.extend(
+                    (weight / total, self._single(skill, shared))
+                    for skill, weight in skill_weights.items()
+                )
+        else:
+            groups.append((
+                weights.skills * NEUTRAL,
+                self.qualifications.get(vacancy.qualification, ()),
+            ))
+        # Groups by skills score, other features add at most `rest`,
+        # so the loop stops once the best possible total can't get to top
+        groups.sort(key=lambda x: -x[0])
+        rest = weights.qualification + weights.location + weights.salary
+        scorer = self._scorer(vacancy)
+
+        top: list[tuple[float, int]] = []
+        for skill_score, rows in groups:
+            if len(top) == k and skill_score + rest <= top[0][0]:
+                break
+            for row in rows:
+                score = skill_score + scorer(row)
+                # Earlier rows win ties, as they are pushed out last
+                item = (score, -row)
+                if len(top) < k:
+                    heapq.heappush(top, item)
+                elif item > top[0]:
+                    heapq.heapreplace(top, item)
+
+        return [
+            Match(
+                resume=self.columns.id(-row),
+                index=-row,
+                score=score,
+                skills=shared.get(-row, 0),
+            )
+            for score, row in sorted(top, reverse=True)
+        ]
+
+    def _skill_weights(self, vacancy: VacancyFeatures) -> dict[int, float]:
+        """Weighted IDF of vacancy skills."""
+        return {
+            skill: self.weights.skills * self.idf(skill)
+            for skill in set(vacancy.skills)
+        }
+
+    def _match_vectorized(
+            self,
+            vacancy: VacancyFeatures,
+            k: int,
+            min_skills: int,
+    ) -> list[Match]:
+        """`match` scoring all candidates at once with NumPy."""
+        weights = self.weights
+        skill_weights = self._skill_weights(vacancy)
+        if skill_weights:
+            # Sparse product as weighted sums over postings grouped by row,
+            # arrays are as long as postings rather than columns
+            postings = [self._posting_array(skill) for skill in skill_weights]
+            candidates, inverse, shared = np.unique(
+                np.concatenate(postings),
+                return_inverse=True,
+                return_counts=True,
+            )
+            skill_scores = np.bincount(
+                inverse,
+                weights=np.repeat(
+                    list(skill_weights.values()), [len(x) for x in postings]),
+            )
+            if min_skills > 1:
+                found = shared >= min_skills
+                candidates = candidates[found]
+                shared = shared[found]
+                skill_scores = skill_scores[found]
+            total = sum(skill_weights.values()) / weights.skills
+            scores = skill_scores / total
+        else:
+            candidates = np.array(
+                self.qualifications.get(vacancy.qualification, ()),
+                dtype=np.intp,
+            )
+            shared = np.zeros(len(candidates), dtype=np.intp)
+            scores = np.full(len(candidates), weights.skills * NEUTRAL)
+        scores += self._score_vectorized(vacancy, candidates)
+
+        if len(candidates) > k:
+            # Candidates scoring at least the k-th best, ties included
+            kth = len(candidates) - k
+            best = scores >= np.partition(scores, kth)[kth]
+            candidates = candidates[best]
+            scores = scores[best]
+            shared = shared[best]
+        # Earlier rows win ties
+        order = np.lexsort((candidates, -scores))[:k]
+        return [
+            Match(
+                resume=self.columns.id(row),
+                index=row,
+                score=score,
+                skills=count,
+            )
+            for row, score, count in zip(
+                candidates[order].tolist(),
+                scores[order].tolist(),
+                shared[order].tolist(),
+            )
+        ]
+
+    def _column_arrays(self) -> dict[str, Any]:
+        """NumPy copies of columns, qualification indexes `qualifications`."""
+        if self._arrays is None:
+            arrays = self.columns.to_numpy()
+            arrays["qualifications"], arrays["qualification"] = np.unique(
+                arrays["qualification"], return_inverse=True)
+            self._arrays = arrays
+        return self._arrays
+
+    def _posting_array(self, skill: int) -> Any:
+        """Posting list of the skill as NumPy array."""
+        postings = self._postings_arrays.get(skill)
+        if postings is None:
+            postings = self._postings_arrays[skill] = np.array(
+                self.postings.get(skill, ()), dtype=np.intp)
+        return postings
+
+    def _single(self, skill: int, shared: Counter) -> Iterator[int]:
+        """Rows of resumes sharing only this skill with the vacancy."""
+        for row in self.postings.get(skill, ()):
+            if shared[row] == 1:
+                yield row
+
+    def match_many(
+            self,
+            vacancies: Iterable[dict[str, Any] | VacancyFeatures],
+            k: int = 10,
+            min_skills: int = 1,
+    ) -> dict[str, list[Match]]:
+        """
+        Best fitting resumes of every vacancy.
+
+        :param vacancies: Vacancies raw JSON data or their features
+        :param k: Number of resumes per vacancy
+        :param min_skills: See `match`
+        :return: Vacancy ID -> matches
+        """
+        self.update()
+        result = {}
+        for vacancy in vacancies:
+            if not isinstance(vacancy, VacancyFeatures):
+                vacancy = VacancyFeatures.from_data(vacancy)
+            result[vacancy.id] = self.match(vacancy, k, min_skills)
+        return result
+
+    def _scorer(self, vacancy: VacancyFeatures) -> Callable[[int], float]:
+        """
+        Weighted qualification, location and salary score of resume row.
+        Vacancy values are bound once, the score is called per candidate.
+        """
+        weights = self.weights
+        columns = self.columns
+        qualifications = columns.qualification
+        locations = columns.location
+        remote_work = columns.remote_work
+        relocation = columns.relocation
+        salaries = columns.salary
+        currencies = columns.currency
+
+        qualification_scores = {
+            q: weights.qualification * qualification_score(
+                vacancy.qualification, q)
+            for q in self.qualifications
+        }
+        remote = vacancy.remote
+        location = vacancy.location
+        location_weight = weights.location
+        salary_weight = weights.salary
+        salary_to = vacancy.salary_to
+        currency = columns.currencies.codes.get(vacancy.currency, MISSING)
+
+        def score(row: int) -> float:
+            total = qualification_scores[qualifications[row]]
+
+            if remote and remote_work[row]:
+                total += location_weight
+            elif location == UNKNOWN:
+                total += location_weight * NEUTRAL
+            elif locations[row] == location:
+                total += location_weight
+            elif relocation[row]:
+                total += location_weight * NEUTRAL
+
+            salary = salaries[row]
+            if (salary == MISSING or salary_to is None
+                    or currencies[row] != currency):
+                total += salary_weight * NEUTRAL
+            elif salary <= salary_to:
+                total += salary_weight
+            else:
+                # Expectations above the range fade out at double the maximum
+                total += salary_weight * max(
+                    0.0, 1 - (salary - salary_to) / salary_to)
+            return total
+
+        return score
+
+    def _score_vectorized(self, vacancy: VacancyFeatures, rows: Any) -> Any:
+        """`_scorer` of NumPy array of resume rows."""
+        weights = self.weights
+        arrays = self._column_arrays()
+
+        total = np.array([
+            weights.qualification * qualification_score(
+                vacancy.qualification, q)
+            for q in arrays["qualifications"].tolist()
+        ])[arrays["qualification"][rows]]
+
+        total += np.select(
+            [
+                arrays["remote_work"][rows] & vacancy.remote,
+                np.full(len(rows), vacancy.location == UNKNOWN),
+                arrays["location"][rows] == vacancy.location,
+                arrays["relocation"][rows],
+            ],
+            [
+                weights.location,
+                weights.location * NEUTRAL,
+                weights.location,
+                weights.location * NEUTRAL,
+            ],
+            0.0,
+        )
+
+        salary_to = vacancy.salary_to
+        if salary_to is None:
+            total += weights.salary * NEUTRAL
+            return total
+        salaries = arrays["salary"][rows].astype(np.float64)
+        currency = self.columns.currencies.codes.get(vacancy.currency, MISSING)
+        # Expectations above the range fade out at double the maximum
+        fit = np.maximum(0.0, 1 - (salaries - salary_to) / salary_to)
+        fit[salaries <= salary_to] = 1.0
+        fit[(salaries == MISSING)
+            | (arrays["currency"][rows] != currency)] = NEUTRAL
+        total += weights.salary * fit
+        return total
+
+
+def qualification_score(vacancy: int, resume: int) -> float:
+    """
+    Fit of resume qualification to the vacancy one: 1 if equal,
+    `NEUTRAL` if neighbours or unknown, 0 otherwise.
+
+    :param vacancy: Qualification ID
+    :param resume: Qualification ID
+    :return:
+    """
+    if vacancy == UNKNOWN or resume == MISSING:
+        return NEUTRAL
+    if resume == vacancy:
+        return 1.0
+    if resume in QUALIFICATIONS and vacancy in QUALIFICATIONS:
+        distance = abs(
+            QUALIFICATIONS.index(resume) - QUALIFICATIONS.index(vacancy))
+        return NEUTRAL if distance == 1 else 0.0
+    return 0.0
@@ -0,0 +1,276 @@
+import bisect
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+
+from requests import Response
+
+__all__ = [
+    "RequestInfo",
+    "RequestHook",
+    "MetricsCollector",
+]
+
+# Latency histogram buckets (seconds), Prometheus style upper bounds
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_ID_SEGMENT = re.compile(r"(?<=/)\d+(?=/|$)|^\d+(?=/|$)")
+_ALIAS_SEGMENTS = [
+    (re.compile(r"^(frontend/users)/[^/]+"), r"\1/{username}"),
+    (re.compile(r"^((?:frontend/)?conversations)/(?!templates|search)[^/]+"),
+     r"\1/{username}"),
+    (re.compile(r"^(frontend_v1/courses)/[^/]+"), r"\1/{alias}"),
+]
+
+
+def endpoint_name(path: str) -> str:
+    """
+    Build endpoint label from request path replacing IDs and aliases.
+    Example:
+        frontend/vacancies/1000135136/favorite -> frontend/vacancies/{id}/favorite
+        frontend/conversations/x55aah/messages -> frontend/conversations/{username}/messages
+
+    :param path:
+    :return:
+    """
+    path = _ID_SEGMENT.sub("{id}", path)
+    for pattern, repl in _ALIAS_SEGMENTS:
+        path = pattern.sub(repl, path)
+    return path
+
+
+class RequestInfo:
+    """
+    Request data passed to hooks.
+    `timings` holds time spent per phase in seconds:
+        prepare    - params conversion and request building
+        network    - sending request and receiving response
+        decode     - JSON decoding
+        ssr        - server side rendered JSON extraction
+        errors     - checking data against registered error schemas
+        validation - pydantic model validation
+    """
+
+    def __init__(self, method: str, endpoint: str, url: str):
+        self.method = method
+        self.endpoint = endpoint
+        self.url = url
+        self.status: int | None = None
+        self.response: Response | None = None
+        self.bytes_received: int = 0
+        self.timings: dict[str, float] = {}
+        self.error: Exception | None = None
+        self.started_at = time.perf_counter()
+        self.elapsed: float | None = None
+
+    def finish(self) -> None:
+        self.elapsed = time.perf_counter() - self.started_at
+
+    def timer(self, phase: str) -> "_PhaseTimer":
+        """
+        Measure phase duration.
+        Example:
+            with info.timer("network"):
+                response = session.send(request)
+
+        :param phase: Phase name
+        :return:
+        """
+        return _PhaseTimer(self, phase)
+
+
+class _PhaseTimer:
+    def __init__(self, info: RequestInfo, phase: str):
+        self.info = info
+        self.phase = phase
+
+    def __enter__(self) -> None:
+        self.started_at = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        dt = time.perf_counter() - self.started_at
+        timings = self.info.timings
+        timings[self.phase] = timings.get(self.phase, 0.0) + dt
+
+
+class RequestHook:
+    """
+    Base class for request instrumentation hooks.
+    Register with `client.add_hook(hook)`.
+    """
+
+    def pre_request(self, info: RequestInfo) -> None:
+        """Called before request is sent."""
+
+    def post_request(self, info: RequestInfo) -> None:
+        """Called after request is done, whether it failed or not."""
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.statuses: dict[int, int] = defaultdict(int)
+        self.bytes_received = 0
+        self.phases: dict[str, float] = defaultdict(float)
+
+    def add(self, info: RequestInfo) -> None:
+        self.count += 1
+        if info.error is not None:
+            self.errors += 1
+        self.latency_sum += info.elapsed
+        index = bisect.bisect_left(LATENCY_BUCKETS, info.elapsed)
+        self.latency_buckets[index] += 1
+        if info.status is not None:
+            self.statuses[info.status] += 1
+        self.bytes_received += info.bytes_received
+        for phase, dt in info.timings.items():
+            self.phases[phase] += dt
+
+    def as_dict(self) -> dict[str, Any]:
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(
+                (*map(str, LATENCY_BUCKETS), "+Inf"), self.latency_buckets):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "latency": {
+                "sum": self.latency_sum,
+                "avg": self.latency_sum / self.count if self.count else 0,
+                "buckets": buckets,
+            },
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "bytes_received": self.bytes_received,
+            "phases": dict(self.phases),
+        }
+
+
+class MetricsCollector(RequestHook):
+    """
+    Collects per endpoint metrics: latency histogram, status codes,
+    bytes received and time split by request phases.
+
+    Example:
+        metrics = MetricsCollector()
+        client = HABRCareerClient(auth=auth, hooks=[metrics])
+        ...
+        print(metrics.to_json())
+        print(metrics.to_prometheus())
+    """
+
+    PROMETHEUS_PREFIX = "habr_career_client"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: dict[tuple[str, str], _EndpointStats] = {}
+
+    def post_request(self, info: RequestInfo) -> None:
+        key = (info.method, info.endpoint)
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = _EndpointStats()
+            stats.add(info)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Get metrics summary.
+
+        :return: Examples:
+            {
+                "GET frontend/resumes": {
+                    "count": 2,
+                    "errors": 0,
+                    "latency": {
+                        "sum": 0.81,
+                        "avg": 0.405,
+                        "buckets": {"0.005": 0, ..., "0.5": 2, ..., "+Inf": 2}
+                    },
+                    "statuses": {"200": 2},
+                    "bytes_received": 153210,
+                    "phases": {
+                        "prepare": 0.0003,
+                        "network": 0.71,
+                        "decode": 0.02,
+                        "errors": 0.004,
+                        "validation": 0.07
+                    }
+                }
+            }
+        """
+        with self._lock:
+            return {
+                f"{method} {endpoint}": stats.as_dict()
+                for (method, endpoint), stats
+                in sorted(self._endpoints.items())
+            }
+
+    def to_json(self, indent: int | None = 4) -> str:
+        return json.dumps(self.summary(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Export metrics in Prometheus text exposition format."""
+        prefix = self.PROMETHEUS_PREFIX
+        lines = [
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        requests_lines = [f"# TYPE {prefix}_requests_total counter"]
+        errors_lines = [f"# TYPE {prefix}_request_errors_total counter"]
+        bytes_lines = [
+            f"# TYPE {prefix}_response_bytes_total counter"]
+        phases_lines = [
+            f"# TYPE {prefix}_phase_duration_seconds_total counter"]
+
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            for (method, endpoint), stats in items:
+                labels = f'method="{method}",endpoint="{endpoint}"'
+                data = stats.as_dict()
+                for bound, count in data["latency"]["buckets"].items():
+                    lines.append(
+                        f"{prefix}_request_duration_seconds_bucket"
+                        f'{{{labels},le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f"{prefix}_request_duration_seconds_sum{{{labels}}}"
+                    f" {stats.latency_sum}"
+                )
+                lines.append(
+                    f"{prefix}_request_duration_seconds_count{{{labels}}}"
+                    f" {stats.count}"
+                )
+                for status, count in data["statuses"].items():
+                    requests_lines.append(
+                        f'{prefix}_requests_total{{{labels},status="{status}"}}'
+                        f" {count}"
+                    )
+                errors_lines.append(
+                    f"{prefix}_request_errors_total{{{labels}}} {stats.errors}")
+                bytes_lines.append(
+                    f"{prefix}_response_bytes_total{{{labels}}}"
+                    f" {stats.bytes_received}"
+                )
+                for phase, dt in data["phases"].items():
+                    phases_lines.append(
+                        f"{prefix}_phase_duration_seconds_total"
+                        f'{{{labels},phase="{phase}"}} {dt}'
+                    )
+
+        return "\n".join(
+            [*lines, *requests_lines, *errors_lines,
+             *bytes_lines, *phases_lines]
+        ) + "\n"
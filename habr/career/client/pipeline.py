@@ -0,0 +1,261 @@
+"""
+Fetch/parse pipeline for server side rendered pages.
+
+Extracting SSR state from HTML (and cleaning HTML fields afterwards) is
+CPU bound, so fetching pages with threads alone is limited by the GIL.
+Pipeline fetches pages in threads and parses them in a process pool,
+results are streamed back as soon as they are ready.
+
+Example:
+    pipeline = SSRPipeline(fetch_workers=16)
+    for username, profile in pipeline.map(client.get_profile, usernames):
+        ...
+
+    # HTML fields cleanup is done in worker processes as well
+    pipeline = SSRPipeline(transform=cleanup_vacancy_description)
+    for id_, vacancy in pipeline.map(client.get_vacancy, ids):
+        ...
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    FIRST_COMPLETED,
+    wait,
+)
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+from pydantic import ValidationError
+
+from habr.career.client.validation import validate
+from habr.career.utils import (
+    HABRCareerClientError,
+    PydanticModel,
+    ValidationMode,
+    cleanup_tags,
+    get_ssr_json,
+    registered_errors,
+)
+
+__all__ = [
+    "SSRPage",
+    "SSRPipeline",
+    "deferred_parsing",
+    "is_parsing_deferred",
+    "parse_page",
+    "cleanup_vacancy_description",
+]
+
+# Vacancy fields holding HTML
+VACANCY_HTML_FIELDS = ("team", "candidate", "description", "bonuses",
+                       "instructions")
+
+_local = threading.local()
+
+
+@contextmanager
+def deferred_parsing() -> Iterator[None]:
+    """
+    Make client methods return fetched SSR pages as `SSRPage`
+    instead of parsing them. Affects calls made by the current thread only,
+    so it works with client pools as well.
+
+    Example:
+        with deferred_parsing():
+            page = client.get_vacancy(1000000000)
+        vacancy = parse_page(page)
+    """
+    previous = getattr(_local, "deferred", False)
+    _local.deferred = True
+    try:
+        yield
+    finally:
+        _local.deferred = previous
+
+
+def is_parsing_deferred() -> bool:
+    return getattr(_local, "deferred", False)
+
+
+@dataclass
+class SSRPage:
+    """
+    Fetched but not parsed SSR page, sent to worker processes.
+
+    :param body: HTML page bytes
+    :param encoding: Response encoding
+    :param key: Key of data to return
+    :param cls: Pydantic model
+    :param validation: Validation mode
+    """
+    body: bytes
+    encoding: str | None = None
+    key: str | None = None
+    cls: type[PydanticModel] | None = None
+    validation: ValidationMode = ValidationMode.STRICT
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+
+def parse_page(
+        page: SSRPage,
+        transform: Callable[[Any], Any] | None = None,
+) -> Any:
+    """
+    Parse SSR page the same way client does.
+
+    :param page: Fetched page
+    :param transform: Applied to parsed result, must be picklable
+                      (module level function) to run in worker process
+    :return:
+    """
+    data = get_ssr_json(page.text)
+    for error_cls in registered_errors:
+        error_cls.check_data(data)
+
+    if page.cls is not None and page.validation is not ValidationMode.RAW:
+        try:
+            obj = validate(page.cls, data, page.validation)
+        except ValidationError:
+            raise HABRCareerClientError("Unknown error")
+        result = getattr(obj, page.key) if page.key else obj
+    else:
+        result = data[page.key] if page.key else data
+
+    return transform(result) if transform is not None else result
+
+
+def cleanup_vacancy_description(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Replace HTML of vacancy description blocks with plain text.
+    Transform for `get_vacancy` results.
+
+    :param data: `get_vacancy` result
+    :return:
+    """
+    vacancy = data.get("vacancy") or {}
+    for name in VACANCY_HTML_FIELDS:
+        if isinstance(vacancy.get(name), str):
+            vacancy[name] = cleanup_tags(vacancy[name])
+    return data
+
+
+class _InlineExecutor(Executor):
+    """Runs jobs in the calling thread, used when parse_workers=0."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class SSRPipeline:
+    """
+    :param fetch_workers: Threads fetching pages
+    :param parse_workers: Processes parsing pages, CPU count by default.
+                          Pages are parsed by fetching threads if 0.
+    :param transform: Applied to every parsed result in worker process,
+                      e.g. `cleanup_vacancy_description`
+    :param return_exceptions: Yield exceptions as results instead of raising
+    :param mp_context: Multiprocessing context of parsing processes,
+                       `forkserver` where available, as forking
+                       a multi-threaded process is unsafe
+    """
+
+    def __init__(
+            self,
+            fetch_workers: int = 8,
+            parse_workers: int | None = None,
+            transform: Callable[[Any], Any] | None = None,
+            return_exceptions: bool = False,
+            mp_context: multiprocessing.context.BaseContext | None = None,
+    ):
+        self.fetch_workers = fetch_workers
+        self.parse_workers = (
+            os.cpu_count() or 1 if parse_workers is None else parse_workers)
+        self.transform = transform
+        self.return_exceptions = return_exceptions
+        if mp_context is None:
+            methods = multiprocessing.get_all_start_methods()
+            if "forkserver" in methods:
+                mp_context = multiprocessing.get_context("forkserver")
+        self.mp_context = mp_context
+
+    @staticmethod
+    def _fetch(func: Callable[[Any], Any], item: Any) -> Any:
+        with deferred_parsing():
+            return func(item)
+
+    def _parse_executor(self) -> Executor:
+        if not self.parse_workers:
+            return _InlineExecutor()
+        return ProcessPoolExecutor(self.parse_workers, self.mp_context)
+
+    def map(
+            self,
+            func: Callable[[Any], Any],
+            items: Iterable[Any],
+    ) -> Iterator[tuple[Any, Any]]:
+        """
+        Call `func` for every item and parse fetched pages.
+        Results are yielded in completion order, not in items order.
+        Results of calls returning JSON data are yielded as is.
+
+        :param func: Client or client pool method (or any callable calling
+                     it) taking item, e.g. `client.get_profile`
+        :param items: Items, e.g. usernames
+        :return: Iterator of (item, result)
+        """
+        items = iter(items)
+        # Items fetched ahead of parsing are limited to keep memory bounded
+        max_fetching = self.fetch_workers * 2
+        pending: dict[Future, tuple[bool, Any]] = {}
+
+        with (
+            self._parse_executor() as parse_executor,
+            ThreadPoolExecutor(self.fetch_workers) as fetch_executor,
+        ):
+            def submit_fetch() -> None:
+                for item in items:
+                    future = fetch_executor.submit(self._fetch, func, item)
+                    pending[future] = (True, item)
+                    return
+
+            for _ in range(max_fetching):
+                submit_fetch()
+
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        fetched, item = pending.pop(future)
+                        if fetched:
+                            submit_fetch()
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            if not self.return_exceptions:
+                                raise
+                            yield item, e
+                            continue
+
+                        if fetched and isinstance(result, SSRPage):
+                            future = parse_executor.submit(
+                                parse_page, result, self.transform)
+                            pending[future] = (False, item)
+                        else:
+                            yield item, result
+            finally:
+                for future in pending:
+                    future.cancel()
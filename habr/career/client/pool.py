@@ -0,0 +1,217 @@
+import math
+import os
+import threading
+import time
+from functools import partial, cached_property
+from typing import Any, Iterable, Self
+
+from habr.career.utils import (
+    BaseResponseError,
+    NotAuthorizedError,
+    NoActiveClientsError,
+)
+
+__all__ = [
+    "PoolMember",
+    "ClientPool",
+]
+
+RATE_LIMIT_STATUSES = (429,)
+AUTH_ERROR_STATUSES = (401, 403)
+
+
+def get_error_status(e: BaseResponseError) -> int | None:
+    """
+    Get HTTP status code carried by response error data.
+
+    :param e:
+    :return:
+    """
+    status = e.data.get("status", e.data.get("httpCode"))
+    try:
+        return int(status)
+    except (TypeError, ValueError):
+        return None
+
+
+class PoolMember:
+    """Client wrapper keeping track of its load and availability."""
+
+    def __init__(self, client):
+        self.client = client
+        self.in_flight: int = 0
+        self.requests: int = 0
+        self.disabled_until: float | None = None
+        self.disabled_reason: str | None = None
+
+    def is_active(self) -> bool:
+        return (
+            self.disabled_until is None
+            or time.monotonic() >= self.disabled_until
+        )
+
+    def disable(self, reason: str, timeout: float = math.inf) -> None:
+        self.disabled_until = time.monotonic() + timeout
+        self.disabled_reason = reason
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} in_flight={self.in_flight}"
+            f" requests={self.requests} active={self.is_active()}>"
+        )
+
+
+class ClientPool:
+    """
+    Pool of authenticated clients (one per account).
+    Exposes the same API as a single client. Every call is routed to the
+    least loaded active client. Clients hitting rate limit are taken out of
+    rotation for `rate_limit_timeout` seconds, clients with broken auth
+    are taken out of rotation permanently. In both cases the call is
+    retried with the next client.
+
+    Example:
+        pool = ClientPool.from_env()
+        jobs = ConcurrentJobs(max_workers=len(pool) * 2)
+        for username in usernames:
+            jobs.register(pool.get_profile, username)
+        profiles = list(jobs.run())
+    """
+
+    TOKENS_ENV_NAME = "HABR_CAREER_TOKENS"
+
+    def __init__(
+            self,
+            clients: Iterable,
+            rate_limit_timeout: float = 60,
+    ):
+        self.members = [PoolMember(c) for c in clients]
+        if not self.members:
+            raise ValueError("No clients provided")
+        self.rate_limit_timeout = rate_limit_timeout
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_tokens(cls, tokens: Iterable[str], **kwargs) -> Self:
+        """
+        Create pool from auth tokens.
+
+        :param tokens: Auth tokens
+        :param kwargs: Pool options
+        :return:
+        """
+        from habr.career.client import HABRCareerClient, TokenAuthenticator
+        return cls(
+            [
+                HABRCareerClient(auth=TokenAuthenticator(token=token))
+                for token in tokens
+            ],
+            **kwargs
+        )
+
+    @classmethod
+    def from_env(
+            cls,
+            name: str = TOKENS_ENV_NAME,
+            sep: str = ",",
+            **kwargs
+    ) -> Self:
+        """
+        Create pool from auth tokens kept in environment variable.
+
+        :param name: Environment variable name
+        :param sep: Tokens separator
+        :param kwargs: Pool options
+        :return:
+        """
+        tokens = os.getenv(name, "").split(sep)
+        return cls.from_tokens([t.strip() for t in tokens if t.strip()],
+                               **kwargs)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> Self:
+        """
+        Create pool from auth tokens kept in file, one token per line.
+        Empty lines and lines starting with `#` are skipped.
+
+        :param path: Path to file
+        :param kwargs: Pool options
+        :return:
+        """
+        with open(path, encoding="utf-8") as f:
+            tokens = [
+                line.strip() for line in f
+                if line.strip() and not line.lstrip().startswith("#")
+            ]
+        return cls.from_tokens(tokens, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    @property
+    def active_members(self) -> list[PoolMember]:
+        return [m for m in self.members if m.is_active()]
+
+    def acquire(self, exclude: Iterable[PoolMember] = ()) -> PoolMember:
+        """
+        Take the least loaded active client.
+
+        :param exclude: Members to skip
+        :return:
+        """
+        exclude = set(map(id, exclude))
+        with self._lock:
+            members = [
+                m for m in self.active_members
+                if id(m) not in exclude
+            ]
+            if not members:
+                raise NoActiveClientsError("No active clients left in pool")
+            member = min(members, key=lambda m: (m.in_flight, m.requests))
+            member.in_flight += 1
+            member.requests += 1
+            return member
+
+    def release(self, member: PoolMember) -> None:
+        with self._lock:
+            member.in_flight -= 1
+
+    def call(self, name: str, *args, **kwargs) -> Any:
+        """
+        Call client attribute `name` on the least loaded client.
+        Properties are just read.
+
+        :param name: Client attribute name
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        tried = []
+        while True:
+            member = self.acquire(exclude=tried)
+            tried.append(member)
+            try:
+                value = getattr(member.client, name)
+                return value(*args, **kwargs) if callable(value) else value
+            except NotAuthorizedError:
+                member.disable("auth")
+            except BaseResponseError as e:
+                status = get_error_status(e)
+                if status in RATE_LIMIT_STATUSES:
+                    member.disable("rate_limit", self.rate_limit_timeout)
+                elif status in AUTH_ERROR_STATUSES:
+                    member.disable("auth")
+                else:
+                    raise
+            finally:
+                self.release(member)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name == "members":
+            raise AttributeError(name)
+        attr = getattr(type(self.members[0].client), name)
+        if isinstance(attr, (property, cached_property)):
+            return self.call(name)
+        if callable(attr):
+            return partial(self.call, name)
+        return attr
@@ -1,7 +1,12 @@
 from enum import verify, UNIQUE, StrEnum
 from typing import Any
 
-from habr.career.utils import Currency, Pagination, QualificationID
+from habr.career.utils import (
+    Currency,
+    Pagination,
+    QualificationID,
+    QueryEncoder,
+)
 from .models import Resumes
 
 
@@ -39,6 +44,40 @@ class CareerSearchField(StrEnum):
     SOCIAL_TAGS = "social_tags"          # в навыках сообществ
 
 
+# Resumes search query parameters
+RESUMES_QUERY = QueryEncoder(
+    "q",
+    "fields[]",
+    "s[]",
+    "order",
+    "qid",
+    "skills[]",
+    "salary",
+    "currency",
+    "locations[]",
+    "exclude_locations",
+    "company_ids[]",
+    "not_companies",
+    "current_company",
+    "university_ids[]",
+    "not_universities",
+    "edc_ids[]",
+    "not_edcs",
+    "work_state",
+    "relocation",
+    "remote",
+    "period",
+    "with_educations",
+    "with_add_eds",
+    "with_experiences",
+    "with_salary",
+    "with_social_ratings",
+    "page",
+    "per_page",
+    bool_as_str=True,
+)
+
+
 # noinspection PyUnresolvedReferences
 class HABRCareerResumesMixin:
     """Раздел `Специалисты`"""
@@ -257,13 +296,23 @@ class HABRCareerResumesMixin:
         return self.get(
             "frontend/resumes",
             params=params,
-            params_options={
-                "bool_as_str": True,
-            },
+            params_encoder=RESUMES_QUERY,
             cls=Resumes,
             auth_required=True,
         )
 
+    def record_resume_skills(self, index, **filters) -> Resumes:
+        """
+        Get resumes page and count its skills in the skill index.
+
+        :param index: `SkillIndex`
+        :param filters: `get_resumes` parameters
+        :return:
+        """
+        result = self.get_resumes(**filters)
+        index.add_resumes(result)
+        return result
+
     def get_resumes_data(
             self,
             search: str | None = None,
@@ -569,9 +618,7 @@ class HABRCareerResumesMixin:
             auth_required=True,
             ssr=True,
             params=params,
-            params_options={
-                "bool_as_str": True,
-            },
+            params_encoder=RESUMES_QUERY,
         )
 
     def save_careers_filter(
@@ -749,9 +796,7 @@ class HABRCareerResumesMixin:
             "frontend/user_filters/resumes",
             auth_required=True,
             params=params,
-            params_options={
-                "bool_as_str": True,
-            },
+            params_encoder=RESUMES_QUERY,
         )
 
     @staticmethod
@@ -891,9 +936,7 @@ class HABRCareerResumesMixin:
         return self.get(
             "frontend/resumes",
             params={**params, **kwargs},
-            params_options={
-                "bool_as_str": True,
-            },
+            params_encoder=RESUMES_QUERY,
             cls=Resumes,
             auth_required=True,
         )
@@ -0,0 +1,363 @@
+"""
+Salary distribution analytics over crawled resumes.
+
+The site gives pre-aggregated percentiles for a limited set of filters
+only (see `get_salary_general_graph`), this module computes arbitrary
+percentiles, histograms and group-bys locally from `ResumeColumns`.
+Salaries are converted to a single currency once, into a flat float64
+array (NaN if salary is absent or its currency has no rate), filters
+are byte masks over that array, so every query is a pass over flat
+arrays plus one sort.
+
+Example:
+    columns = ResumeColumns.from_pages(
+        result for unit, result in queue.results("python")
+        if unit.kind == UnitKind.RESUMES
+    )
+    analytics = SalaryAnalytics(columns, rates={"usd": 92.5, "eur": 99.1})
+    analytics.percentiles()                   # {10: 120000.0, 25: ...}
+    mask = analytics.mask(skills=[446], remote_work=True)
+    for group in analytics.group_by(GroupBy.QUALIFICATION, mask=mask):
+        print(group.title, group.count, group.percentiles[50])
+"""
+import math
+from array import array
+from dataclasses import dataclass, field
+from enum import StrEnum, verify, UNIQUE
+from itertools import compress
+from typing import Iterable, Iterator, Sequence
+
+from habr.career.utils import Currency
+from .columnar import MISSING, ResumeColumns
+
+__all__ = [
+    "PERCENTILES",
+    "GroupBy",
+    "GroupStats",
+    "SalaryAnalytics",
+    "percentiles",
+    "histogram",
+]
+
+# Percentiles computed by default
+PERCENTILES = (10, 25, 50, 75, 90)
+
+NAN = float("nan")
+
+
+@verify(UNIQUE)
+class GroupBy(StrEnum):
+    QUALIFICATION = "qualification"
+    LOCATION = "location"
+    SKILL = "skill"
+    SPECIALIZATION = "specialization"
+    CURRENCY = "currency"
+    REMOTE_WORK = "remote_work"
+    RELOCATION = "relocation"
+
+
+@dataclass
+class GroupStats:
+    key: int | str | bool | None
+    title: str
+    count: int
+    mean: float
+    percentiles: dict[float, float] = field(default_factory=dict)
+
+
+def percentiles(
+        values: Sequence[float],
+        qs: Iterable[float] = PERCENTILES,
+        presorted: bool = False,
+) -> dict[float, float]:
+    """
+    Percentiles with linear interpolation between closest ranks,
+    the same as `numpy.percentile` default method. NaN values are skipped.
+
+    :param values:
+    :param qs: Percentiles in range [0, 100]
+    :param presorted: Values are sorted already and have no NaN
+    :return: Percentile -> value, NaN if there are no values
+    """
+    if not presorted:
+        values = sorted(v for v in values if v == v)
+    n = len(values)
+    result = {}
+    for q in qs:
+        if not 0 <= q <= 100:
+            raise ValueError(f"Percentile {q} is out of range [0, 100]")
+        if not n:
+            result[q] = NAN
+            continue
+        position = q / 100 * (n - 1)
+        low = int(position)
+        high = min(low + 1, n - 1)
+        low_value, high_value = values[low], values[high]
+        result[q] = low_value + (high_value - low_value) * (position - low)
+    return result
+
+
+def histogram(
+        values: Iterable[float],
+        bins: int = 20,
+        range_: tuple[float, float] | None = None,
+) -> tuple[array, array]:
+    """
+    Counts of values within equal width bins, the last bin includes
+    its right edge. NaN values and values out of range are skipped.
+
+    :param values:
+    :param bins: Number of bins
+    :param range_: Lower and upper edges, min and max of values by default
+    :return: Bins edges (bins + 1) and counts (bins) arrays
+    """
+    values = array("d", (v for v in values if v == v))
+    if range_ is None:
+        range_ = (min(values), max(values)) if values else (0.0, 1.0)
+    low, high = range_
+    if high <= low:
+        high = low + 1
+    width = (high - low) / bins
+    counts = array("q", [0]) * bins
+    for value in values:
+        if low <= value <= high:
+            counts[min(int((value - low) / width), bins - 1)] += 1
+    edges = array("d", [low + width * i for i in range(bins)] + [high])
+    return edges, counts
+
+
+class SalaryAnalytics:
+    """
+    :param columns: Crawled resumes
+    :param rates: Currency -> value of its unit in the target currency,
+                  salaries in currencies without rate are skipped
+    :param currency: Target currency
+    """
+
+    def __init__(
+            self,
+            columns: ResumeColumns,
+            rates: dict[str, float] | None = None,
+            currency: Currency = Currency.RUR,
+    ):
+        self.columns = columns
+        self.currency = currency
+        self.rates = {str(k): v for k, v in (rates or {}).items()}
+        self.rates[str(currency)] = 1.0
+
+        # Currency code -> rate, NaN if the rate is unknown
+        factors = array("d", [
+            self.rates.get(value, NAN)
+            for value in columns.currencies.values
+        ])
+        self.values = array("d", [
+            NAN if salary == MISSING or code == MISSING
+            else salary * factors[code]
+            for salary, code in zip(columns.salary, columns.currency)
+        ])
+        # Resumes with salary in a currency without rate
+        self.unconverted = sum(
+            1 for salary, value in zip(columns.salary, self.values)
+            if salary != MISSING and value != value
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def mask(
+            self,
+            qualifications: Iterable[int] | None = None,
+            locations: Iterable[int] | None = None,
+            skills: Iterable[int] | None = None,
+            specializations: Iterable[str] | None = None,
+            remote_work: bool | None = None,
+            relocation: bool | None = None,
+    ) -> bytearray:
+        """
+        Mask of resumes matching all passed filters, values of a single
+        filter are alternatives. Resumes without salary are not matched.
+
+        :param qualifications: Qualification IDs
+        :param locations: Location IDs
+        :param skills: Skill IDs, resumes with any of them match
+        :param specializations: Specialization titles
+        :param remote_work:
+        :param relocation:
+        :return: 1 for matched resumes, 0 for the rest
+        """
+        columns = self.columns
+        mask = bytearray(v == v for v in self.values)
+        if qualifications is not None:
+            wanted = set(qualifications)
+            mask = _and(mask, (x in wanted for x in columns.qualification))
+        if locations is not None:
+            wanted = set(locations)
+            mask = _and(mask, (x in wanted for x in columns.location))
+        if remote_work is not None:
+            mask = _and(mask, (x == remote_work for x in columns.remote_work))
+        if relocation is not None:
+            mask = _and(mask, (x == relocation for x in columns.relocation))
+        if skills is not None:
+            wanted = set(skills)
+            mask = _and(mask, _any_of(
+                columns.skills, columns.skill_offsets, wanted))
+        if specializations is not None:
+            wanted = {
+                columns.specialization_titles.codes[title]
+                for title in specializations
+                if title in columns.specialization_titles.codes
+            }
+            mask = _and(mask, _any_of(
+                columns.specializations, columns.specialization_offsets,
+                wanted))
+        return mask
+
+    def selected(self, mask: bytearray | None = None) -> list[float]:
+        """
+        Sorted salaries of matched resumes.
+
+        :param mask: See `mask`, all resumes with salary by default
+        :return:
+        """
+        if mask is None:
+            return sorted(v for v in self.values if v == v)
+        return sorted(compress(self.values, mask))
+
+    def percentiles(
+            self,
+            qs: Iterable[float] = PERCENTILES,
+            mask: bytearray | None = None,
+    ) -> dict[float, float]:
+        return percentiles(self.selected(mask), qs, presorted=True)
+
+    def summary(
+            self,
+            qs: Iterable[float] = PERCENTILES,
+            mask: bytearray | None = None,
+            title: str = "Все",
+    ) -> GroupStats:
+        """
+        Salary statistics of all matched resumes as a single group.
+
+        :param qs: Percentiles in range [0, 100]
+        :param mask: See `mask`, all resumes with salary by default
+        :param title: Group title
+        :return:
+        """
+        values = self.selected(mask)
+        return GroupStats(
+            key=None,
+            title=title,
+            count=len(values),
+            mean=math.fsum(values) / len(values) if values else NAN,
+            percentiles=percentiles(values, qs, presorted=True),
+        )
+
+    def histogram(
+            self,
+            bins: int = 20,
+            mask: bytearray | None = None,
+            range_: tuple[float, float] | None = None,
+    ) -> tuple[array, array]:
+        return histogram(self.selected(mask), bins, range_)
+
+    def group_by(
+            self,
+            by: GroupBy,
+            qs: Iterable[float] = PERCENTILES,
+            mask: bytearray | None = None,
+            min_count: int = 1,
+    ) -> list[GroupStats]:
+        """
+        Salary statistics of every group. A resume with several skills or
+        specializations belongs to every corresponding group.
+
+        :param by: Grouping column
+        :param qs: Percentiles in range [0, 100]
+        :param mask: See `mask`, all resumes with salary by default
+        :param min_count: Skip groups with fewer resumes
+        :return: Groups sorted by count, descending
+        """
+        qs = tuple(qs)
+        if mask is None:
+            mask = self.mask()
+
+        groups: dict[int | str | bool | None, array] = {}
+        for key, value in self._keys(by, mask):
+            values = groups.get(key)
+            if values is None:
+                values = groups[key] = array("d")
+            values.append(value)
+
+        stats = []
+        for key, values in groups.items():
+            if len(values) < min_count:
+                continue
+            values = sorted(values)
+            stats.append(GroupStats(
+                key=key,
+                title=self._title(by, key),
+                count=len(values),
+                mean=math.fsum(values) / len(values),
+                percentiles=percentiles(values, qs, presorted=True),
+            ))
+        stats.sort(key=lambda s: (-s.count, s.title))
+        return stats
+
+    def _keys(
+            self,
+            by: GroupBy,
+            mask: bytearray,
+    ) -> Iterator[tuple[int | str | bool | None, float]]:
+        columns = self.columns
+        values = self.values
+        match by:
+            case GroupBy.SKILL | GroupBy.SPECIALIZATION:
+                if by == GroupBy.SKILL:
+                    items, offsets = columns.skills, columns.skill_offsets
+                else:
+                    items = columns.specializations
+                    offsets = columns.specialization_offsets
+                for i in compress(range(len(values)), mask):
+                    for item in items[offsets[i]:offsets[i + 1]]:
+                        yield item, values[i]
+            case GroupBy.REMOTE_WORK | GroupBy.RELOCATION:
+                column = getattr(columns, str(by))
+                for key, value in compress(zip(column, values), mask):
+                    yield bool(key), value
+            case _:
+                column = getattr(columns, str(by))
+                for key, value in compress(zip(column, values), mask):
+                    yield (None if key == MISSING else key), value
+
+    def _title(self, by: GroupBy, key: int | str | bool | None) -> str:
+        columns = self.columns
+        if key is None:
+            return "—"
+        match by:
+            case GroupBy.QUALIFICATION:
+                return columns.qualification_titles.get(key, str(key))
+            case GroupBy.LOCATION:
+                return columns.location_titles.get(key, str(key))
+            case GroupBy.SKILL:
+                return columns.skill_titles.get(key, str(key))
+            case GroupBy.SPECIALIZATION:
+                return columns.specialization_titles.value(key)
+            case GroupBy.CURRENCY:
+                return columns.currencies.value(key)
+            case _:
+                return "Да" if key else "Нет"
+
+
+def _and(mask: bytearray, condition: Iterable[bool]) -> bytearray:
+    return bytearray(m and c for m, c in zip(mask, condition))
+
+
+def _any_of(
+        items: array,
+        offsets: array,
+        wanted: set[int],
+) -> Iterator[bool]:
+    """Whether any CSR row item is wanted, for every row."""
+    for start, end in zip(offsets, offsets[1:]):
+        yield not wanted.isdisjoint(items[start:end])
@@ -0,0 +1,324 @@
+"""
+Compact columnar representation of resumes search results.
+
+Resumes are stored as parallel arrays of scalar fields instead of
+a graph of pydantic models, skills and specializations are stored
+CSR style: flat values array plus offsets array. Row views are built
+on demand. It takes tens of bytes per resume, so hundreds of thousands of
+crawled resumes fit in memory easily.
+
+Example:
+    client = HABRCareerClient(auth=auth, validation=ValidationMode.RAW)
+    columns = ResumeColumns()
+    for page in range(1, 11):
+        columns.append_page(client.get_resumes(page=page, per_page=100))
+
+    columns.salary          # array('i', [300000, -1, ...])
+    columns[0].skills       # [446, 1012, ...]
+    columns.to_numpy()      # dict of NumPy arrays
+"""
+from array import array
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+
+from .models import Resumes
+
+__all__ = [
+    "MISSING",
+    "ResumeRow",
+    "ResumeColumns",
+]
+
+# Value of integer columns for missing data, e.g. resume without salary
+MISSING = -1
+
+
+class ResumeRow:
+    """Single resume view, built on demand from columns."""
+
+    __slots__ = (
+        "id",
+        "salary",
+        "currency",
+        "qualification",
+        "age",
+        "experience",
+        "location",
+        "availability",
+        "remote_work",
+        "relocation",
+        "last_visited",
+        "skills",
+        "specializations",
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs[name])
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"ResumeRow(id={self.id!r}, salary={self.salary!r})"
+
+
+class _Categories:
+    """Maps repeated strings to small integer codes."""
+
+    def __init__(self):
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+
+    def code(self, value: str | None) -> int:
+        if value is None:
+            return MISSING
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def value(self, code: int) -> str | None:
+        return None if code == MISSING else self.values[code]
+
+
+class ResumeColumns:
+    """
+    Resumes stored column by column.
+
+    Scalar columns (`array`, MISSING if value is absent):
+        salary, qualification, age, experience, location - int32
+        currency, availability - int16 codes, see `currencies`, `availabilities`
+        remote_work, relocation - int8
+        last_visited - float64 UNIX timestamp, NaN if absent
+    Usernames are stored as a single UTF-8 buffer with offsets.
+    Skills IDs and specializations codes are stored CSR style:
+    values of the i-th resume are `skills[skill_offsets[i]:skill_offsets[i + 1]]`.
+    """
+
+    def __init__(self):
+        self._ids = bytearray()
+        self._id_offsets = array("q", [0])
+
+        self.salary = array("i")
+        self.currency = array("h")
+        self.qualification = array("i")
+        self.age = array("i")
+        self.experience = array("i")
+        self.location = array("i")
+        self.availability = array("h")
+        self.remote_work = array("b")
+        self.relocation = array("b")
+        self.last_visited = array("d")
+
+        self.skills = array("i")
+        self.skill_offsets = array("q", [0])
+        self.specializations = array("h")
+        self.specialization_offsets = array("q", [0])
+
+        self.currencies = _Categories()
+        self.availabilities = _Categories()
+        self.specialization_titles = _Categories()
+        # Skill ID -> title
+        self.skill_titles: dict[int, str] = {}
+        # Qualification and location ID -> title
+        self.qualification_titles: dict[int, str] = {}
+        self.location_titles: dict[int, str] = {}
+
+    @classmethod
+    def from_pages(
+            cls,
+            pages: Iterable[dict[str, Any] | Resumes],
+    ) -> "ResumeColumns":
+        columns = cls()
+        for page in pages:
+            columns.append_page(page)
+        return columns
+
+    def append_page(self, page: dict[str, Any] | Resumes) -> None:
+        """
+        Append resumes search page.
+        Raw JSON data is preferable (see ValidationMode.RAW) as pydantic
+        models are dumped back to JSON data first.
+
+        :param page: `get_resumes` result
+        :return:
+        """
+        if isinstance(page, Resumes):
+            page = page.model_dump(mode="json", by_alias=True)
+        for item in page["list"]:
+            self.append(item)
+
+    def append(self, item: dict[str, Any]) -> None:
+        """
+        Append single resume.
+
+        :param item: Resume raw JSON data
+        :return:
+        """
+        self._ids += item["id"].encode()
+        self._id_offsets.append(len(self._ids))
+
+        salary = item.get("salary")
+        self.salary.append(_value(salary))
+        self.currency.append(
+            self.currencies.code(salary and salary.get("currency")))
+        qualification = item.get("qualification")
+        self.qualification.append(_value(qualification))
+        self.age.append(_value(item.get("age")))
+        self.experience.append(_value(item.get("experience")))
+        location = item.get("location")
+        self.location.append(_value(location))
+        for titles, data in (
+                (self.qualification_titles, qualification),
+                (self.location_titles, location),
+        ):
+            if data and data.get("value") is not None:
+                titles.setdefault(data["value"], data["title"])
+        availability = item.get("availability")
+        self.availability.append(self.availabilities.code(
+            availability and availability.get("value")))
+        self.remote_work.append(bool(item.get("remoteWork")))
+        self.relocation.append(bool(item.get("relocation")))
+        self.last_visited.append(_timestamp(item.get("lastVisited")))
+
+        for skill in item.get("skills") or ():
+            self.skills.append(skill["value"])
+            self.skill_titles.setdefault(skill["value"], skill["title"])
+        self.skill_offsets.append(len(self.skills))
+
+        for specialization in item.get("specializations") or ():
+            self.specializations.append(
+                self.specialization_titles.code(specialization["title"]))
+        self.specialization_offsets.append(len(self.specializations))
+
+    def __len__(self) -> int:
+        return len(self.salary)
+
+    def __getitem__(self, index: int) -> ResumeRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Resume index out of range")
+        last_visited = self.last_visited[index]
+        return ResumeRow(
+            id=self.id(index),
+            salary=_optional(self.salary[index]),
+            currency=self.currencies.value(self.currency[index]),
+            qualification=_optional(self.qualification[index]),
+            age=_optional(self.age[index]),
+            experience=_optional(self.experience[index]),
+            location=_optional(self.location[index]),
+            availability=self.availabilities.value(self.availability[index]),
+            remote_work=bool(self.remote_work[index]),
+            relocation=bool(self.relocation[index]),
+            last_visited=(
+                None if last_visited != last_visited
+                else datetime.fromtimestamp(last_visited).astimezone()
+            ),
+            skills=self.resume_skills(index),
+            specializations=[
+                self.specialization_titles.value(code)
+                for code in self.specializations[
+                    self.specialization_offsets[index]:
+                    self.specialization_offsets[index + 1]
+                ]
+            ],
+        )
+
+    def __iter__(self) -> Iterator[ResumeRow]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def id(self, index: int) -> str:
+        start, end = self._id_offsets[index], self._id_offsets[index + 1]
+        return self._ids[start:end].decode()
+
+    @property
+    def ids(self) -> list[str]:
+        return [self.id(i) for i in range(len(self))]
+
+    def resume_skills(self, index: int) -> list[int]:
+        start = self.skill_offsets[index]
+        end = self.skill_offsets[index + 1]
+        return self.skills[start:end].tolist()
+
+    @property
+    def nbytes(self) -> int:
+        """Memory taken by columns data, categories are not included."""
+        columns = [
+            self._id_offsets,
+            self.salary,
+            self.currency,
+            self.qualification,
+            self.age,
+            self.experience,
+            self.location,
+            self.availability,
+            self.remote_work,
+            self.relocation,
+            self.last_visited,
+            self.skills,
+            self.skill_offsets,
+            self.specializations,
+            self.specialization_offsets,
+        ]
+        return len(self._ids) + sum(
+            len(column) * column.itemsize for column in columns)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """
+        Convert columns to NumPy arrays. Data is copied: arrays viewing
+        column buffers would block appending rows while they exist.
+        Requires `numpy` (pip install "Habr Career[numpy]").
+
+        :return: Column name -> NumPy array
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError(
+                "NumPy is required for this operation. "
+                "Install it with `pip install numpy`."
+            ) from e
+
+        columns = {
+            name: np.array(getattr(self, name), dtype=dtype)
+            for name, dtype in (
+                ("salary", np.int32),
+                ("currency", np.int16),
+                ("qualification", np.int32),
+                ("age", np.int32),
+                ("experience", np.int32),
+                ("location", np.int32),
+                ("availability", np.int16),
+                ("remote_work", np.int8),
+                ("relocation", np.int8),
+                ("last_visited", np.float64),
+                ("skills", np.int32),
+                ("skill_offsets", np.int64),
+                ("specializations", np.int16),
+                ("specialization_offsets", np.int64),
+            )
+        }
+        columns["remote_work"] = columns["remote_work"].astype(bool)
+        columns["relocation"] = columns["relocation"].astype(bool)
+        columns["id"] = np.array(self.ids, dtype=object)
+        return columns
+
+
+def _value(data: dict[str, Any] | None) -> int:
+    if not data or data.get("value") is None:
+        return MISSING
+    return int(data["value"])
+
+
+def _optional(value: int) -> int | None:
+    return None if value == MISSING else value
+
+
+def _timestamp(data: dict[str, Any] | None) -> float:
+    if not data or not data.get("date"):
+        return float("nan")
+    return datetime.fromisoformat(data["date"]).timestamp()
@@ -1,7 +1,8 @@
 from enum import verify, UNIQUE, StrEnum
 from typing import Any
 
-from habr.career.utils import bool_to_str, Qualification
+from habr.career.utils import bool_to_str, Qualification, QueryEncoder
+from .history import MY_SALARY, SalaryHistory, series_key
 from .models import (
     SalaryGeneralGraph,
     SalaryDynamicGraph,
@@ -16,6 +17,19 @@ class EmploymentType(StrEnum):
     PART_TIME = "1"
 
 
+# Salary calculator query parameters
+SALARY_QUERY = QueryEncoder(
+    "qualification",
+    "spec_aliases[]",
+    "remote",
+    "employment_type",
+    "company_alias",
+    "skills[]",
+    "locations[]",
+    "exclude_locations",
+)
+
+
 # noinspection PyUnresolvedReferences
 class HABRCareerSalariesMixin:
     """Раздел `Зарплаты`"""
@@ -50,6 +64,17 @@ class HABRCareerSalariesMixin:
         path = "frontend_v1/salary_calculator/my_salary"
         return self.get(path, cls=MySalary, auth_required=True)
 
+    def record_my_salary(self, history: SalaryHistory) -> MySalary:
+        """
+        Get my salary and append its periods to the history store.
+
+        :param history:
+        :return:
+        """
+        result = self.my_salary()
+        history.append(MY_SALARY, result.periods, title="Моя зарплата")
+        return result
+
     def get_suitable_vacancies(
             self,
             specializations: list[str] | None = None,
@@ -147,6 +172,7 @@ class HABRCareerSalariesMixin:
             auth_required=True,
             key="vacancies",
             params=params,
+            params_encoder=SALARY_QUERY,
         )
 
     def get_suitable_courses(
@@ -440,6 +466,7 @@ class HABRCareerSalariesMixin:
             auth_required=True,
             cls=SalaryGeneralGraph,
             params=params,
+            params_encoder=SALARY_QUERY,
         )
 
     def get_salary_dynamic_graph(
@@ -508,7 +535,28 @@ class HABRCareerSalariesMixin:
             auth_required=True,
             cls=SalaryDynamicGraph,
             params=params,
+            params_encoder=SALARY_QUERY,
+        )
+
+    def record_salary_dynamic_graph(
+            self,
+            history: SalaryHistory,
+            **filters
+    ) -> SalaryDynamicGraph:
+        """
+        Get salary dynamic graph and append its periods to the history store.
+
+        :param history:
+        :param filters: `get_salary_dynamic_graph` parameters
+        :return:
+        """
+        result = self.get_salary_dynamic_graph(**filters)
+        history.append(
+            series_key(filters),
+            result.graphs_data.periods,
+            title=result.graphs_data.title,
         )
+        return result
 
     def get_salary_chart(
             self,
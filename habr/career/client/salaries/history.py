@@ -0,0 +1,340 @@
+"""
+Local salary time-series store.
+
+Periods of `get_salary_dynamic_graph` and `my_salary` are appended to
+a sqlite file, keyed by filter combination (series) and period key,
+e.g. 232 for the second half of 2023. Points are never updated: a new
+observation is appended only when the value of a period changes, the
+latest one wins on reads. Refresh fetches only series whose latest
+period is older than the current one.
+
+Example:
+    history = SalaryHistory("history.sqlite")
+    history.refresh(client, [
+        {"qualification": Qualification.JUNIOR},
+        {"qualification": Qualification.SENIOR},
+    ], my_salary=True)
+
+    key = series_key({"qualification": Qualification.SENIOR})
+    periods, values = history.series(key, start=221)
+    percent_change(values)          # array('d', [-20.1, 16.5, ...])
+"""
+import math
+import sqlite3
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import date
+from typing import Any, Iterable
+
+from habr.career.client.store import SQLiteStore
+from habr.career.utils import filters_key
+
+__all__ = [
+    "MY_SALARY",
+    "SalaryHistory",
+    "series_key",
+    "period_key",
+    "percent_change",
+]
+
+# Key of `my_salary` series
+MY_SALARY = "my_salary"
+
+NAN = float("nan")
+DAY = 24 * 60 * 60
+
+
+def series_key(filters: dict[str, Any] | None = None) -> str:
+    """
+    Key of `get_salary_dynamic_graph` series, unset filters are skipped.
+
+    :param filters: `get_salary_dynamic_graph` parameters
+    :return:
+    """
+    return filters_key(filters)
+
+
+def period_key(day: date) -> int:
+    """
+    Key of the half-year period of the day, the way site numbers them.
+
+    :param day:
+    :return: E.g. 232 for 2023-10-01
+    """
+    return day.year % 100 * 10 + (1 if day.month <= 6 else 2)
+
+
+def percent_change(values: Iterable[float]) -> array:
+    """
+    Percent change between consecutive values, NaN where
+    the previous value is absent or zero.
+
+    :param values:
+    :return: Array shorter by one
+    """
+    values = array("d", values)
+    return array("d", [
+        (b - a) / a * 100 if a and not math.isnan(a) else NAN
+        for a, b in zip(values, values[1:])
+    ])
+
+
+class SalaryHistory(SQLiteStore):
+    """Salary series kept in a sqlite file."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS salary_series (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL UNIQUE,
+            title TEXT,
+            fetched_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS salary_points (
+            series_id INTEGER NOT NULL,
+            period INTEGER NOT NULL,
+            fetched_at REAL NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (series_id, period, fetched_at)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS salary_periods (
+            period INTEGER PRIMARY KEY,
+            title TEXT NOT NULL
+        );
+    """
+
+    @staticmethod
+    def _latest(conn: sqlite3.Connection, series_id: int) -> dict[int, float]:
+        # Bare column of MAX() aggregate is taken from the row with max value
+        return {
+            row["period"]: row["value"] for row in conn.execute(
+                "SELECT period, value, MAX(fetched_at) FROM salary_points"
+                " WHERE series_id = ? GROUP BY period",
+                (series_id,),
+            )
+        }
+
+    def append(
+            self,
+            key: str,
+            periods: Iterable[Any],
+            title: str | None = None,
+            fetched_at: float | None = None,
+    ) -> int:
+        """
+        Append fetched periods of the series.
+
+        :param key: Series key, see `series_key`
+        :param periods: Objects with `key`, `value` and `title` fields,
+                        e.g. `SalaryDynamicGraph.GraphsData.Period`,
+                        periods without value are skipped
+        :param title: Series title
+        :param fetched_at: UNIX timestamp of the fetch, now by default
+        :return: Appended points count
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        periods = [p for p in periods if p.value is not None]
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO salary_series (key, title, fetched_at)"
+                " VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE SET"
+                " title = COALESCE(excluded.title, title),"
+                " fetched_at = excluded.fetched_at",
+                (key, title, fetched_at),
+            )
+            series_id = conn.execute(
+                "SELECT id FROM salary_series WHERE key = ?", (key,),
+            ).fetchone()["id"]
+            latest = self._latest(conn, series_id)
+            points = [
+                (series_id, p.key, fetched_at, float(p.value))
+                for p in periods if latest.get(p.key) != p.value
+            ]
+            conn.executemany(
+                "INSERT OR IGNORE INTO salary_points VALUES (?, ?, ?, ?)",
+                points,
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO salary_periods VALUES (?, ?)",
+                [(p.key, p.title) for p in periods],
+            )
+        return len(points)
+
+    def keys(self) -> list[str]:
+        with closing(self._connect()) as conn:
+            return [
+                row["key"] for row in
+                conn.execute("SELECT key FROM salary_series ORDER BY id")
+            ]
+
+    def title(self, key: str) -> str | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT title FROM salary_series WHERE key = ?", (key,),
+            ).fetchone()
+        return row and row["title"]
+
+    def period_titles(self, periods: Iterable[int]) -> list[str]:
+        """
+        Titles of periods, e.g. "2-е пол. 2023".
+
+        :param periods: Period keys
+        :return:
+        """
+        with closing(self._connect()) as conn:
+            titles = {
+                row["period"]: row["title"] for row in
+                conn.execute("SELECT period, title FROM salary_periods")
+            }
+        return [titles.get(p, str(p)) for p in periods]
+
+    def stale_keys(
+            self,
+            keys: Iterable[str],
+            today: date | None = None,
+            min_interval: float = DAY,
+    ) -> list[str]:
+        """
+        Keys of series which have to be fetched: never fetched ones and
+        ones whose latest period is older than the current period.
+        Series fetched less than `min_interval` seconds ago are not stale,
+        as the site publishes a new period with a delay.
+
+        :param keys:
+        :param today: Current day, today by default
+        :param min_interval: Seconds between fetches of the same series
+        :return:
+        """
+        current = period_key(today or date.today())
+        now = time.time()
+        with closing(self._connect()) as conn:
+            state = {
+                row["key"]: (row["fetched_at"], row["latest"])
+                for row in conn.execute(
+                    "SELECT s.key, s.fetched_at, MAX(p.period) AS latest"
+                    " FROM salary_series s"
+                    " LEFT JOIN salary_points p ON p.series_id = s.id"
+                    " GROUP BY s.id"
+                )
+            }
+        stale = []
+        for key in dict.fromkeys(keys):
+            fetched_at, latest = state.get(key, (None, None))
+            if fetched_at is None or (
+                    (latest is None or latest < current)
+                    and now - fetched_at >= min_interval):
+                stale.append(key)
+        return stale
+
+    def refresh(
+            self,
+            client,
+            filters: Iterable[dict[str, Any]] = (),
+            my_salary: bool = False,
+            today: date | None = None,
+            min_interval: float = DAY,
+            workers: int = 4,
+    ) -> list[str]:
+        """
+        Fetch stale series.
+
+        :param client: Client or client pool
+        :param filters: `get_salary_dynamic_graph` parameters of every series
+        :param my_salary: Refresh `my_salary` series as well
+        :param today: Current day, today by default
+        :param min_interval: See `stale_keys`
+        :param workers: Concurrent requests
+        :return: Keys of fetched series
+        """
+        filters_by_key = {series_key(f): f for f in filters}
+        keys = list(filters_by_key)
+        if my_salary:
+            keys.append(MY_SALARY)
+        stale = self.stale_keys(keys, today, min_interval)
+
+        def fetch(key: str) -> None:
+            if key == MY_SALARY:
+                client.record_my_salary(self)
+            else:
+                client.record_salary_dynamic_graph(
+                    self, **filters_by_key[key])
+
+        with ThreadPoolExecutor(workers) as executor:
+            # Errors are raised after all fetches are finished
+            for _ in list(executor.map(fetch, stale)):
+                pass
+        return stale
+
+    def series(
+            self,
+            key: str,
+            start: int | None = None,
+            end: int | None = None,
+    ) -> tuple[array, array]:
+        """
+        Latest values of the series periods within the range.
+
+        :param key: Series key
+        :param start: First period key, inclusive
+        :param end: Last period key, inclusive
+        :return: Period keys and values arrays
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT p.period, p.value, MAX(p.fetched_at)"
+                " FROM salary_points p"
+                " JOIN salary_series s ON p.series_id = s.id"
+                " WHERE s.key = ? AND p.period BETWEEN ? AND ?"
+                " GROUP BY p.period ORDER BY p.period",
+                (key, start or 0, end if end is not None else 2 ** 31),
+            ).fetchall()
+        return (
+            array("i", [row["period"] for row in rows]),
+            array("d", [row["value"] for row in rows]),
+        )
+
+    def aligned(
+            self,
+            keys: Iterable[str],
+            start: int | None = None,
+            end: int | None = None,
+    ) -> tuple[array, dict[str, array]]:
+        """
+        Several series aligned by period, NaN where series has no value.
+
+        :param keys: Series keys
+        :param start: First period key, inclusive
+        :param end: Last period key, inclusive
+        :return: Period keys and series key -> values
+        """
+        series = {key: self.series(key, start, end) for key in keys}
+        periods = sorted({p for ps, _ in series.values() for p in ps})
+        index = {p: i for i, p in enumerate(periods)}
+        aligned = {}
+        for key, (ps, values) in series.items():
+            column = array("d", [NAN]) * len(periods)
+            for p, value in zip(ps, values):
+                column[index[p]] = value
+            aligned[key] = column
+        return array("i", periods), aligned
+
+    def change(
+            self,
+            key: str,
+            start: int | None = None,
+            end: int | None = None,
+    ) -> float | None:
+        """
+        Percent change of the series between the first and the last
+        periods within the range.
+
+        :param key: Series key
+        :param start: First period key, inclusive
+        :param end: Last period key, inclusive
+        :return: None if there are less than two values
+        """
+        _, values = self.series(key, start, end)
+        if len(values) < 2 or not values[0]:
+            return None
+        return (values[-1] - values[0]) / values[0] * 100
@@ -0,0 +1,335 @@
+"""
+Salary matrix sweeper.
+
+Runs `get_salary_general_graph` for every combination of filter
+dimensions (specializations × locations × skills × remote × employment
+type) and stores percentiles as a tidy table: one row per combination,
+qualification and percentile. Qualification is not a request parameter
+of the general graph, all qualification groups come in one response,
+so qualifications only filter stored rows and do not multiply requests.
+
+Every combination is saved in its own transaction, so an interrupted
+sweep resumes with the combinations that are not saved yet.
+
+Example:
+    store = SQLiteSweepStore("salaries.sqlite")
+    sweeper = SalarySweeper(client, store, workers=8, rate=5)
+    stats = sweeper.run(
+        "2024-W10",
+        SweepDimensions(
+            specializations=["backend", "frontend"],
+            locations=["c_678", "c_679"],
+            remote=[None, True],
+        ),
+    )
+    for row in store.rows("2024-W10"):
+        ...
+"""
+import csv
+import itertools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Iterable, Iterator, TextIO
+
+from habr.career.client.store import SQLiteStore
+from habr.career.utils import Qualification, RateLimiter
+from . import EmploymentType
+from .models import SalaryGeneralGraph
+
+__all__ = [
+    "PERCENTILES",
+    "SweepQuery",
+    "SweepDimensions",
+    "SweepStats",
+    "SQLiteSweepStore",
+    "SalarySweeper",
+]
+
+# Percentiles of general graph groups
+PERCENTILES = ("min", "p25", "median", "p75", "max")
+
+# Columns of stored rows
+COLUMNS = (
+    "specialization",
+    "location",
+    "skill",
+    "remote",
+    "employment_type",
+    "qualification",
+    "percentile",
+    "value",
+    "total",
+)
+
+
+@dataclass(frozen=True)
+class SweepQuery:
+    """Single filter combination, one request."""
+    specialization: str | None = None
+    location: str | None = None
+    skill: str | None = None
+    remote: bool | None = None
+    employment_type: EmploymentType | None = None
+
+    @property
+    def key(self) -> str:
+        """Unique combination key within the sweep."""
+        return json.dumps(asdict(self), sort_keys=True)
+
+    @property
+    def params(self) -> dict[str, Any]:
+        """`get_salary_general_graph` parameters."""
+        return {
+            "specializations": self.specialization and [self.specialization],
+            "locations": self.location and [self.location],
+            "skills": self.skill and [self.skill],
+            "remote": self.remote,
+            "employment_type": self.employment_type,
+        }
+
+
+@dataclass
+class SweepDimensions:
+    """
+    Values of every dimension, None means the dimension is not filtered.
+
+    :param qualifications: Qualification groups to store
+    :param specializations: Specializations aliases
+    :param locations: Locations aliases
+    :param skills: Skills aliases
+    :param remote:
+    :param employment_types:
+    """
+    qualifications: list[Qualification] = field(
+        default_factory=lambda: list(Qualification))
+    specializations: list[str | None] = field(default_factory=lambda: [None])
+    locations: list[str | None] = field(default_factory=lambda: [None])
+    skills: list[str | None] = field(default_factory=lambda: [None])
+    remote: list[bool | None] = field(default_factory=lambda: [None])
+    employment_types: list[EmploymentType | None] = field(
+        default_factory=lambda: [None])
+
+    def queries(self) -> list[SweepQuery]:
+        """Combinations of dimensions values without duplicates."""
+        combinations = itertools.product(
+            self.specializations or [None],
+            self.locations or [None],
+            self.skills or [None],
+            self.remote or [None],
+            self.employment_types or [None],
+        )
+        return list(dict.fromkeys(SweepQuery(*c) for c in combinations))
+
+
+@dataclass
+class SweepStats:
+    total: int = 0
+    skipped: int = 0
+    fetched: int = 0
+    rows: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def done(self) -> int:
+        return self.skipped + self.fetched + len(self.failed)
+
+
+class SQLiteSweepStore(SQLiteStore):
+    """Sweep results kept in a sqlite file."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sweep_queries (
+            sweep_id TEXT NOT NULL,
+            key TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (sweep_id, key)
+        );
+        CREATE TABLE IF NOT EXISTS salaries (
+            sweep_id TEXT NOT NULL,
+            specialization TEXT,
+            location TEXT,
+            skill TEXT,
+            remote INTEGER,
+            employment_type TEXT,
+            qualification TEXT NOT NULL,
+            percentile TEXT NOT NULL,
+            value INTEGER NOT NULL,
+            total INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS salaries_sweep ON salaries (sweep_id);
+    """
+
+    def saved_keys(self, sweep_id: str) -> set[str]:
+        """
+        Keys of saved combinations.
+
+        :param sweep_id:
+        :return:
+        """
+        with closing(self._connect()) as conn:
+            return {
+                row["key"] for row in conn.execute(
+                    "SELECT key FROM sweep_queries WHERE sweep_id = ?",
+                    (sweep_id,),
+                )
+            }
+
+    def save(
+            self,
+            sweep_id: str,
+            query: SweepQuery,
+            rows: list[dict[str, Any]],
+    ) -> None:
+        """
+        Save rows of the combination, atomically.
+
+        :param sweep_id:
+        :param query:
+        :param rows: Rows with `COLUMNS` keys
+        :return:
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO sweep_queries VALUES (?, ?, ?)",
+                (sweep_id, query.key, time.time()),
+            )
+            conn.executemany(
+                f"INSERT INTO salaries VALUES"
+                f" (?, {', '.join('?' * len(COLUMNS))})",
+                [(sweep_id, *(row[c] for c in COLUMNS)) for row in rows],
+            )
+
+    def rows(self, sweep_id: str) -> Iterator[dict[str, Any]]:
+        """
+        Stored rows of the sweep.
+
+        :param sweep_id:
+        :return:
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM salaries"
+                f" WHERE sweep_id = ? ORDER BY rowid",
+                (sweep_id,),
+            )
+            for row in cursor:
+                row = dict(row)
+                if row["remote"] is not None:
+                    row["remote"] = bool(row["remote"])
+                yield row
+
+    def export_csv(self, sweep_id: str, file: TextIO) -> int:
+        """
+        Write rows of the sweep as CSV.
+
+        :param sweep_id:
+        :param file: Text file opened with newline=""
+        :return: Rows count
+        """
+        writer = csv.DictWriter(file, COLUMNS)
+        writer.writeheader()
+        count = 0
+        for row in self.rows(sweep_id):
+            writer.writerow(row)
+            count += 1
+        return count
+
+
+def to_rows(
+        query: SweepQuery,
+        graph: SalaryGeneralGraph,
+        qualifications: Iterable[Qualification],
+) -> list[dict[str, Any]]:
+    """
+    Tidy rows of general graph: one per qualification and percentile.
+
+    :param query:
+    :param graph: `get_salary_general_graph` result
+    :param qualifications: Qualification groups to keep
+    :return:
+    """
+    qualifications = set(qualifications)
+    dimensions = asdict(query)
+    return [
+        {
+            **dimensions,
+            "qualification": str(group.name),
+            "percentile": percentile,
+            "value": getattr(group, percentile),
+            "total": group.total,
+        }
+        for group in graph.groups if group.name in qualifications
+        for percentile in PERCENTILES
+    ]
+
+
+class SalarySweeper:
+    """
+    :param client: Client or client pool
+    :param store: Results store
+    :param workers: Concurrent requests
+    :param rate: Requests per second limit, not limited if None
+    """
+
+    def __init__(
+            self,
+            client,
+            store: SQLiteSweepStore,
+            workers: int = 8,
+            rate: float | None = 5,
+    ):
+        self.client = client
+        self.store = store
+        self.workers = workers
+        self.limiter = RateLimiter(rate) if rate else None
+
+    def fetch(self, query: SweepQuery) -> SalaryGeneralGraph:
+        if self.limiter is not None:
+            self.limiter.acquire()
+        return self.client.get_salary_general_graph(**query.params)
+
+    def run(
+            self,
+            sweep_id: str,
+            dimensions: SweepDimensions,
+            progress: Callable[[SweepStats], None] | None = None,
+    ) -> SweepStats:
+        """
+        Fetch and save combinations which are not saved yet.
+        Failed combinations are not saved and are retried by the next run.
+
+        :param sweep_id: Sweep identifier, e.g. week, run again to resume
+        :param dimensions:
+        :param progress: Called with stats after every combination
+        :return:
+        """
+        queries = dimensions.queries()
+        saved = self.store.saved_keys(sweep_id)
+        pending = [q for q in queries if q.key not in saved]
+        stats = SweepStats(
+            total=len(queries), skipped=len(queries) - len(pending))
+
+        executor = ThreadPoolExecutor(self.workers)
+        try:
+            futures = {executor.submit(self.fetch, q): q for q in pending}
+            for future in as_completed(futures):
+                query = futures[future]
+                try:
+                    graph = future.result()
+                except Exception as e:
+                    stats.failed[query.key] = f"{e.__class__.__name__}: {e}"
+                else:
+                    rows = to_rows(query, graph, dimensions.qualifications)
+                    # Results are saved by this thread only
+                    self.store.save(sweep_id, query, rows)
+                    stats.fetched += 1
+                    stats.rows += len(rows)
+                if progress is not None:
+                    progress(stats)
+        finally:
+            # Requests are not started for the rest on interruption
+            executor.shutdown(cancel_futures=True)
+        return stats
@@ -0,0 +1,466 @@
+"""
+Skill co-occurrence and market demand index.
+
+Skills of crawled resumes (supply) and vacancies (demand) are counted
+in a sqlite file per segment: source, qualification and location.
+For every segment it keeps documents count, per-skill counts and
+a sparse skill × skill co-occurrence matrix, both directions of a pair
+are stored, so skills associated with a given one are a single index
+range scan. Documents are indexed once by ID, so the same pages can be
+added again and only new documents are counted.
+
+Example:
+    index = SkillIndex("skills.sqlite")
+    index.add_crawl(SQLiteWorkQueue("crawl.sqlite"), "python")
+    client.record_resume_skills(index, page=2)
+
+    # Skills most associated with Go among Senior resumes in Moscow
+    go = index.find("Go")
+    index.related(go, qualification=5, location=678)
+    # Skills most wanted by vacancies relative to resumes
+    index.demand(k=20)
+"""
+import sqlite3
+from collections import Counter
+from contextlib import closing
+from dataclasses import dataclass
+from enum import StrEnum, verify, UNIQUE
+from typing import Any, Iterable
+from urllib.parse import parse_qs, urlparse
+
+from habr.career.client.crawl import UnitKind, WorkQueue, to_jsonable
+from habr.career.client.store import SQLiteStore
+
+__all__ = [
+    "SkillSource",
+    "SkillRank",
+    "SkillScore",
+    "SkillDocument",
+    "SkillIndex",
+    "resume_document",
+    "vacancy_document",
+]
+
+# Qualification or location of a document is unknown
+UNKNOWN = 0
+
+
+@verify(UNIQUE)
+class SkillSource(StrEnum):
+    RESUMES = "resumes"      # Supply
+    VACANCIES = "vacancies"  # Demand
+
+
+@verify(UNIQUE)
+class SkillRank(StrEnum):
+    COUNT = "count"  # Documents with both skills
+    LIFT = "lift"    # How much more often skills meet than by chance
+
+
+@dataclass
+class SkillDocument:
+    """Skills of a single resume or vacancy."""
+    id: str
+    qualification: int
+    location: int
+    skills: dict[int, str]
+
+
+@dataclass
+class SkillScore:
+    skill: int
+    title: str
+    count: int
+    score: float
+
+
+def resume_document(item: dict[str, Any]) -> SkillDocument:
+    """
+    Skills of `get_resumes` list item.
+
+    :param item: Resume raw JSON data
+    :return:
+    """
+    qualification = item.get("qualification") or {}
+    location = item.get("location") or {}
+    return SkillDocument(
+        id=item["id"],
+        qualification=qualification.get("value") or UNKNOWN,
+        location=location.get("value") or UNKNOWN,
+        skills={s["value"]: s["title"] for s in item.get("skills") or ()},
+    )
+
+
+def vacancy_document(item: dict[str, Any]) -> SkillDocument:
+    """
+    Skills of `get_vacancies` list item. Vacancy items refer to skills,
+    qualification and locations by links to filtered search only,
+    IDs are taken from them. A vacancy with several locations is counted
+    in the first one.
+
+    :param item: Vacancy raw JSON data
+    :return:
+    """
+    qualification = item.get("salaryQualification") or {}
+    locations = item.get("locations") or [{}]
+    skills = {}
+    for skill in item.get("skills") or ():
+        skill_id = _query_id(skill.get("href"), "skills[]")
+        if skill_id is not None:
+            skills[skill_id] = skill["title"]
+    return SkillDocument(
+        id=str(item["id"]),
+        qualification=_query_id(qualification.get("href"), "qid") or UNKNOWN,
+        location=_query_id(locations[0].get("href"), "city_id") or UNKNOWN,
+        skills=skills,
+    )
+
+
+def _query_id(href: str | None, name: str) -> int | None:
+    if not href:
+        return None
+    values = parse_qs(urlparse(href).query).get(name)
+    if not values or not values[0].isdigit():
+        return None
+    return int(values[0])
+
+
+class SkillIndex(SQLiteStore):
+    """Skill counters kept in a sqlite file."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS skill_titles (
+            skill INTEGER PRIMARY KEY,
+            title TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS skill_documents (
+            source TEXT NOT NULL,
+            id TEXT NOT NULL,
+            PRIMARY KEY (source, id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS skill_segments (
+            source TEXT NOT NULL,
+            qualification INTEGER NOT NULL,
+            location INTEGER NOT NULL,
+            documents INTEGER NOT NULL,
+            PRIMARY KEY (source, qualification, location)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS skill_counts (
+            source TEXT NOT NULL,
+            skill INTEGER NOT NULL,
+            qualification INTEGER NOT NULL,
+            location INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (source, skill, qualification, location)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS skill_pairs (
+            source TEXT NOT NULL,
+            skill INTEGER NOT NULL,
+            qualification INTEGER NOT NULL,
+            location INTEGER NOT NULL,
+            other INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (source, skill, qualification, location, other)
+        ) WITHOUT ROWID;
+    """
+
+    def add(
+            self,
+            source: SkillSource,
+            documents: Iterable[SkillDocument],
+    ) -> int:
+        """
+        Count skills of documents which are not indexed yet.
+        Counters are aggregated in memory and written in one transaction.
+
+        :param source:
+        :param documents:
+        :return: Number of indexed documents
+        """
+        documents = list({d.id: d for d in documents}.values())
+        with self._transaction() as conn:
+            indexed = set()
+            ids = [d.id for d in documents]
+            # Chunks fit into the sqlite variables limit
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                indexed.update(row["id"] for row in conn.execute(
+                    f"SELECT id FROM skill_documents WHERE source = ?"
+                    f" AND id IN ({', '.join('?' * len(chunk))})",
+                    (source, *chunk),
+                ))
+            documents = [d for d in documents if d.id not in indexed]
+
+            segments = Counter()
+            counts = Counter()
+            pairs = Counter()
+            titles = {}
+            for document in documents:
+                segment = (document.qualification, document.location)
+                segments[segment] += 1
+                skills = sorted(document.skills)
+                titles.update(document.skills)
+                for i, skill in enumerate(skills):
+                    counts[(skill, *segment)] += 1
+                    for other in skills[i + 1:]:
+                        pairs[(skill, *segment, other)] += 1
+                        pairs[(other, *segment, skill)] += 1
+
+            conn.executemany(
+                "INSERT INTO skill_documents VALUES (?, ?)",
+                [(source, d.id) for d in documents],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO skill_titles VALUES (?, ?)",
+                titles.items(),
+            )
+            for table, counter in (
+                    ("skill_segments", segments),
+                    ("skill_counts", counts),
+                    ("skill_pairs", pairs),
+            ):
+                if not counter:
+                    continue
+                width = len(next(iter(counter))) + 2
+                column = "documents" if table == "skill_segments" else "count"
+                conn.executemany(
+                    f"INSERT INTO {table} VALUES"
+                    f" ({', '.join('?' * width)})"
+                    f" ON CONFLICT DO UPDATE SET"
+                    f" {column} = {column} + excluded.{column}",
+                    [(source, *key, n) for key, n in counter.items()],
+                )
+        return len(documents)
+
+    def add_resumes(self, page: Any) -> int:
+        """
+        Index `get_resumes` page.
+
+        :param page: Page model or raw JSON data
+        :return: Number of indexed resumes
+        """
+        page = to_jsonable(page)
+        return self.add(
+            SkillSource.RESUMES, map(resume_document, page["list"]))
+
+    def add_vacancies(self, page: dict[str, Any]) -> int:
+        """
+        Index `get_vacancies` page.
+
+        :param page: Page raw JSON data
+        :return: Number of indexed vacancies
+        """
+        return self.add(
+            SkillSource.VACANCIES, map(vacancy_document, page["list"]))
+
+    def add_crawl(self, queue: WorkQueue, crawl_id: str) -> int:
+        """
+        Index resumes and vacancies pages of the crawl.
+
+        :param queue:
+        :param crawl_id:
+        :return: Number of indexed documents
+        """
+        indexed = 0
+        for unit, result in queue.results(crawl_id):
+            if unit.kind == UnitKind.RESUMES:
+                indexed += self.add_resumes(result)
+            elif unit.kind == UnitKind.VACANCIES:
+                indexed += self.add_vacancies(result)
+        return indexed
+
+    def find(self, title: str) -> int | None:
+        """
+        Skill ID by title, case-insensitive.
+
+        :param title:
+        :return: None if skill is not indexed
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT skill FROM skill_titles WHERE title = ?"
+                " COLLATE NOCASE",
+                (title,),
+            ).fetchone()
+            if row is None and title.isdigit():
+                row = conn.execute(
+                    "SELECT skill FROM skill_titles WHERE skill = ?",
+                    (int(title),),
+                ).fetchone()
+        return row and row["skill"]
+
+    def titles(self, skills: Iterable[int]) -> dict[int, str]:
+        skills = list(skills)
+        with closing(self._connect()) as conn:
+            return {
+                row["skill"]: row["title"] for row in conn.execute(
+                    f"SELECT skill, title FROM skill_titles"
+                    f" WHERE skill IN ({', '.join('?' * len(skills))})",
+                    skills,
+                )
+            }
+
+    @staticmethod
+    def _segment(
+            qualification: int | None,
+            location: int | None,
+            alias: str = "",
+    ) -> tuple[str, tuple[int, ...]]:
+        """SQL condition of the segment and its parameters."""
+        conditions, params = [], []
+        for name, value in (
+                ("qualification", qualification),
+                ("location", location),
+        ):
+            if value is not None:
+                conditions.append(f"{alias}{name} = ?")
+                params.append(value)
+        return "".join(f" AND {c}" for c in conditions), tuple(params)
+
+    def documents(
+            self,
+            source: SkillSource = SkillSource.RESUMES,
+            qualification: int | None = None,
+            location: int | None = None,
+    ) -> int:
+        """
+        Number of indexed documents of the segment.
+
+        :param source:
+        :param qualification: Qualification ID, any by default
+        :param location: Location ID, any by default
+        :return:
+        """
+        condition, params = self._segment(qualification, location)
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                f"SELECT COALESCE(SUM(documents), 0) FROM skill_segments"
+                f" WHERE source = ?{condition}",
+                (source, *params),
+            ).fetchone()[0]
+
+    def counts(
+            self,
+            source: SkillSource = SkillSource.RESUMES,
+            qualification: int | None = None,
+            location: int | None = None,
+    ) -> dict[int, int]:
+        """
+        Documents count of every skill within the segment.
+
+        :param source:
+        :param qualification: Qualification ID, any by default
+        :param location: Location ID, any by default
+        :return: Skill ID -> count
+        """
+        condition, params = self._segment(qualification, location)
+        with closing(self._connect()) as conn:
+            return {
+                row[0]: row[1] for row in conn.execute(
+                    f"SELECT skill, SUM(count) FROM skill_counts"
+                    f" WHERE source = ?{condition} GROUP BY skill",
+                    (source, *params),
+                )
+            }
+
+    def related(
+            self,
+            skill: int,
+            k: int = 10,
+            source: SkillSource = SkillSource.RESUMES,
+            qualification: int | None = None,
+            location: int | None = None,
+            rank: SkillRank = SkillRank.LIFT,
+            min_count: int = 2,
+    ) -> list[SkillScore]:
+        """
+        Skills most associated with the skill within the segment.
+
+        :param skill: Skill ID
+        :param k: Number of skills
+        :param source:
+        :param qualification: Qualification ID, any by default
+        :param location: Location ID, any by default
+        :param rank: Ranking of skills
+        :param min_count: Skip skills met together fewer times,
+                          lift of rare pairs is noise
+        :return: Skills sorted by score, descending
+        """
+        condition, params = self._segment(qualification, location, "p.")
+        with closing(self._connect()) as conn:
+            pairs = conn.execute(
+                f"SELECT p.other, t.title, SUM(p.count) AS count"
+                f" FROM skill_pairs p"
+                f" LEFT JOIN skill_titles t ON t.skill = p.other"
+                f" WHERE p.source = ? AND p.skill = ?{condition}"
+                f" GROUP BY p.other HAVING SUM(p.count) >= ?",
+                (source, skill, *params, min_count),
+            ).fetchall()
+
+        if rank == SkillRank.LIFT:
+            total = self.documents(source, qualification, location)
+            counts = self.counts(source, qualification, location)
+            skill_count = counts.get(skill, 0)
+
+            def score(row: sqlite3.Row) -> float:
+                return row["count"] * total / (
+                    skill_count * counts[row["other"]])
+        else:
+            def score(row: sqlite3.Row) -> float:
+                return float(row["count"])
+
+        scores = [
+            SkillScore(
+                skill=row["other"],
+                title=row["title"] or str(row["other"]),
+                count=row["count"],
+                score=score(row),
+            )
+            for row in pairs
+        ]
+        scores.sort(key=lambda s: (-s.score, -s.count, s.skill))
+        return scores[:k]
+
+    def demand(
+            self,
+            k: int = 10,
+            qualification: int | None = None,
+            location: int | None = None,
+            min_count: int = 2,
+    ) -> list[SkillScore]:
+        """
+        Skills in short supply: share of vacancies requiring the skill
+        relative to share of resumes having it. Skills absent
+        in resumes are scored as if one resume had them.
+
+        :param k: Number of skills
+        :param qualification: Qualification ID, any by default
+        :param location: Location ID, any by default
+        :param min_count: Skip skills required by fewer vacancies
+        :return: Skills sorted by demand/supply ratio, descending;
+                 count is the number of vacancies
+        """
+        vacancies = self.documents(
+            SkillSource.VACANCIES, qualification, location)
+        resumes = self.documents(SkillSource.RESUMES, qualification, location)
+        demand = self.counts(SkillSource.VACANCIES, qualification, location)
+        supply = self.counts(SkillSource.RESUMES, qualification, location)
+        if not vacancies:
+            return []
+
+        scores = [
+            SkillScore(
+                skill=skill,
+                title="",
+                count=count,
+                score=(count / vacancies) / (
+                    max(supply.get(skill, 0), 1) / max(resumes, 1)),
+            )
+            for skill, count in demand.items() if count >= min_count
+        ]
+        scores.sort(key=lambda s: (-s.score, -s.count, s.skill))
+        scores = scores[:k]
+        titles = self.titles(s.skill for s in scores)
+        for score in scores:
+            score.title = titles.get(score.skill, str(score.skill))
+        return scores
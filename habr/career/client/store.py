@@ -0,0 +1,47 @@
+"""
+Base of the stores kept in a sqlite file.
+
+Every call opens its own connection, so a store can be shared by threads
+and worker processes. Writes go through `_transaction`, which takes the
+write lock at once (`BEGIN IMMEDIATE`) and waits for it up to
+`busy_timeout` seconds.
+"""
+import sqlite3
+from contextlib import closing, contextmanager
+from typing import Iterator
+
+__all__ = [
+    "SQLiteStore",
+]
+
+
+class SQLiteStore:
+    """Sqlite file with the schema created on opening."""
+
+    SCHEMA: str = ""
+
+    def __init__(self, path: str, busy_timeout: float = 30):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        with closing(self._connect()) as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            isolation_level=None,
+        )
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
@@ -40,7 +40,12 @@ class HABRCareerUsersMixin:
         :return:
         """
         # TODO: API endpoint not discovered yet
-        return self.get(username, auth_required=True, ssr=True)
+        return self.get(
+            username,
+            auth_required=True,
+            ssr=True,
+            endpoint="{username}",
+        )
 
     @property
     def profile(self) -> dict[str, Any]:
@@ -50,7 +55,12 @@ class HABRCareerUsersMixin:
         :return:
         """
         # TODO: API endpoint not discovered yet
-        return self.get(self.username, auth_required=True, ssr=True)
+        return self.get(
+            self.username,
+            auth_required=True,
+            ssr=True,
+            endpoint="{username}",
+        )
 
     def get_my_skills(self, limit: int = 10) -> list[dict[str, str]]:
         """
@@ -126,6 +136,7 @@ class HABRCareerUsersMixin:
             f"{username}/print.{fmt}",
             base_url="https://career.habr.com/",
             auth_required=True,
+            endpoint=f"{{username}}/print.{fmt}",
         )
         return response.content
 
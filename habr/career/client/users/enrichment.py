@@ -0,0 +1,391 @@
+"""
+Bulk profile enrichment.
+
+`get_resumes` gives resume summaries, while full profiles (experience,
+education, contacts visibility, achievements) are server side rendered
+pages, one heavy request per user. `ProfileEnricher` fetches profiles of
+a resume query or a username list with `SSRPipeline`: pages are fetched
+by threads reusing connections of their client sessions, SSR state is
+extracted and normalised into `Profile` models. The state script is cut
+out of a page without parsing the whole page, so pages are parsed by
+fetching threads by default, sending them to worker processes costs
+more than parsing.
+
+Profiles are cached in a sqlite file by username. Profiles fetched less
+than `max_age` seconds ago are taken from the cache, so enriching the
+same users again requests stale and new profiles only.
+
+Example:
+    enricher = ProfileEnricher(client, ProfileCache("profiles.sqlite"))
+    usernames = resume_usernames(client, {"search": "python"}, pages=3)
+    for profile in enricher.enrich(usernames):
+        print(profile.username, profile.experience, len(profile.companies))
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+from pydantic import BaseModel
+
+from habr.career.client.pipeline import SSRPipeline
+from habr.career.client.store import SQLiteStore
+from habr.career.utils import Pagination, RateLimiter, cleanup_tags
+
+__all__ = [
+    "ProfilePosition",
+    "ProfileCompany",
+    "ProfileEducation",
+    "Profile",
+    "EnrichmentStats",
+    "ProfileCache",
+    "ProfileEnricher",
+    "normalize_profile",
+    "resume_usernames",
+]
+
+WEEK = 7 * 24 * 60 * 60
+
+# Usernames per cache query, below sqlite variables limit
+CACHE_CHUNK_SIZE = 500
+
+
+class ProfilePosition(BaseModel):
+    title: str
+    duration: str | None = None
+    skills: list[str] = []
+
+
+class ProfileCompany(BaseModel):
+    title: str
+    subtitle: str | None = None
+    location: str | None = None
+    positions: list[ProfilePosition] = []
+
+
+class ProfileEducation(BaseModel):
+    title: str
+    subtitle: str | None = None
+    courses: list[str] = []
+
+
+class Profile(BaseModel):
+    """User profile normalised from `get_profile` SSR state."""
+    username: str
+    full_name: str | None = None
+    is_expert: bool = False
+    specialization: str | None = None
+    qualification: str | None = None
+    divisions: list[str] = []
+    skills: list[str] = []
+    salary: str | None = None
+    availability: str | None = None
+    location: str | None = None
+    relocation: str | None = None
+    age: str | None = None
+    experience: str | None = None
+    registered_at: str | None = None
+    last_visited: str | None = None
+    contacts_visibility: str | None = None
+    contacts: list[str] = []  # Titles of visible contacts
+    achievements: list[str] = []
+    achievements_total: int = 0
+    friends: int = 0
+    recommendations: int = 0
+    about: str | None = None  # Plain text
+    companies: list[ProfileCompany] = []
+    education: list[ProfileEducation] = []
+    fetched_at: float = 0  # Unix time
+
+
+def _title(value: Any) -> str | None:
+    """Title of `{"title": ...}` objects, strings are taken as is."""
+    if isinstance(value, dict):
+        return value.get("title")
+    return value if isinstance(value, str) else None
+
+
+def _titles(items: Iterable[Any] | None) -> list[str]:
+    return [t for t in map(_title, items or ()) if t]
+
+
+def _total(value: Any) -> int:
+    if isinstance(value, dict):
+        value = value.get("total")
+    return value if isinstance(value, int) else 0
+
+
+def _items(section: Any) -> list[dict[str, Any]]:
+    if isinstance(section, dict):
+        return section.get("items") or []
+    return []
+
+
+def normalize_profile(data: dict[str, Any]) -> Profile:
+    """
+    Normalise `get_profile` result. Missing sections are left empty.
+    Transform of `SSRPipeline`, runs in worker processes if any.
+
+    :param data: `get_profile` result
+    :return: Profile, username is the alias found in data if any
+    """
+    user = data.get("user") or {}
+    resume = data.get("resume") or {}
+    contacts = user.get("contacts") or {}
+    about = resume.get("about") or {}
+
+    return Profile(
+        username=user.get("id") or user.get("alias") or "",
+        full_name=user.get("title") or user.get("fullName"),
+        is_expert=bool(user.get("isExpert")),
+        specialization=_title(user.get("specialization")),
+        qualification=_title(user.get("qualification")),
+        divisions=_titles(user.get("divisions")),
+        skills=_titles(user.get("skills")),
+        salary=_title(user.get("salary")),
+        availability=_title(user.get("availability")),
+        location=_title(user.get("location")),
+        relocation=_title(user.get("relocation")),
+        age=_title(user.get("age")),
+        experience=_title(user.get("experience")),
+        registered_at=_title(user.get("registeredAt")),
+        last_visited=_title(user.get("lastVisited")),
+        contacts_visibility=_title(contacts.get("hint")),
+        contacts=_titles(contacts.get("items")),
+        achievements=_titles(user.get("achievements")),
+        achievements_total=_total(user.get("achievementsTotal")),
+        friends=_total(user.get("friends")),
+        recommendations=_total(user.get("recommendationLetters")),
+        about=about.get("value") and cleanup_tags(about["value"]),
+        companies=[
+            ProfileCompany(
+                title=c.get("title") or "",
+                subtitle=c.get("subtitle"),
+                location=c.get("location"),
+                positions=[
+                    ProfilePosition(
+                        title=p.get("title") or "",
+                        duration=p.get("duration"),
+                        skills=_titles(p.get("tags")),
+                    ) for p in c.get("positions") or ()
+                ],
+            ) for c in _items(resume.get("companies"))
+        ],
+        education=[
+            ProfileEducation(
+                title=e.get("title") or "",
+                subtitle=e.get("subtitle"),
+                courses=_titles(e.get("courses")),
+            ) for e in _items(resume.get("education"))
+        ],
+    )
+
+
+def resume_usernames(
+        client,
+        filters: dict[str, Any] | None = None,
+        pages: int | None = None,
+        workers: int = 4,
+) -> list[str]:
+    """
+    Usernames of a resume query, pages after the first fetched
+    concurrently.
+
+    :param client: Client or client pool
+    :param filters: `get_resumes` parameters except page
+    :param pages: Number of pages, all if None
+    :param workers: Concurrent requests
+    :return: Usernames in the order of the query, without repeats
+    """
+    filters = {k: v for k, v in (filters or {}).items() if k != "page"}
+    first = client.get_resumes(page=Pagination.INIT_PAGE, **filters)
+    last = first.meta.total_pages
+    if pages is not None:
+        last = min(last, pages)
+
+    results = [first]
+    with ThreadPoolExecutor(workers) as executor:
+        results.extend(executor.map(
+            lambda p: client.get_resumes(page=p, **filters),
+            range(Pagination.INIT_PAGE + 1, last + 1),
+        ))
+
+    # Resumes can move between pages while they are fetched
+    usernames = {}
+    for result in results:
+        for resume in result.objects:
+            usernames.setdefault(resume.id)
+    return list(usernames)
+
+
+@dataclass
+class EnrichmentStats:
+    users: int = 0
+    cached: int = 0
+    fetched: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def done(self) -> int:
+        return self.cached + self.fetched + len(self.failed)
+
+
+class ProfileCache(SQLiteStore):
+    """Normalised profiles kept in a sqlite file by username."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS profiles (
+            username TEXT PRIMARY KEY,
+            fetched_at REAL NOT NULL,
+            data TEXT NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    def fresh(
+            self,
+            usernames: Iterable[str],
+            max_age: float = WEEK,
+    ) -> dict[str, Profile]:
+        """
+        Cached profiles fetched less than `max_age` seconds ago.
+
+        :param usernames:
+        :param max_age: Seconds
+        :return: Username -> profile
+        """
+        usernames = list(usernames)
+        fetched_after = time.time() - max_age
+        profiles = {}
+        with closing(self._connect()) as conn:
+            for i in range(0, len(usernames), CACHE_CHUNK_SIZE):
+                chunk = usernames[i:i + CACHE_CHUNK_SIZE]
+                for row in conn.execute(
+                        f"SELECT username, data FROM profiles"
+                        f" WHERE username IN ({', '.join('?' * len(chunk))})"
+                        f" AND fetched_at >= ?",
+                        (*chunk, fetched_after),
+                ):
+                    profiles[row["username"]] = Profile.model_validate_json(
+                        row["data"])
+        return profiles
+
+    def get(self, username: str) -> Profile | None:
+        """Cached profile of any age."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT data FROM profiles WHERE username = ?", (username,),
+            ).fetchone()
+        return row and Profile.model_validate_json(row["data"])
+
+    def save(self, profiles: Iterable[Profile]) -> None:
+        """Save profiles, replacing cached ones, atomically."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO profiles VALUES (?, ?, ?)",
+                [
+                    (p.username, p.fetched_at, p.model_dump_json())
+                    for p in profiles
+                ],
+            )
+
+
+class ProfileEnricher:
+    """
+    :param client: Client or client pool
+    :param cache: Profiles cache
+    :param max_age: Seconds cached profiles are fresh for
+    :param fetch_workers: Concurrent requests
+    :param parse_workers: Processes parsing pages, pages are parsed by
+                          fetching threads if 0, see `SSRPipeline`
+    :param rate: Requests per second limit, not limited if None
+    :param batch: Fetched profiles saved to the cache at once
+    """
+
+    def __init__(
+            self,
+            client,
+            cache: ProfileCache,
+            max_age: float = WEEK,
+            fetch_workers: int = 8,
+            parse_workers: int | None = 0,
+            rate: float | None = None,
+            batch: int = 50,
+    ):
+        self.client = client
+        self.cache = cache
+        self.max_age = max_age
+        self.pipeline = SSRPipeline(
+            fetch_workers=fetch_workers,
+            parse_workers=parse_workers,
+            transform=normalize_profile,
+            return_exceptions=True,
+        )
+        self.limiter = RateLimiter(rate) if rate else None
+        self.batch = batch
+
+    def fetch(self, username: str) -> Any:
+        if self.limiter is not None:
+            self.limiter.acquire()
+        return self.client.get_profile(username)
+
+    def enrich(
+            self,
+            usernames: Iterable[str],
+            stats: EnrichmentStats | None = None,
+            progress: Callable[[EnrichmentStats], None] | None = None,
+    ) -> Iterator[Profile]:
+        """
+        Profiles of the users: fresh cached ones first, then fetched ones
+        in completion order. Fetched profiles are saved to the cache in
+        batches, and when iteration stops. Failed users are skipped and
+        counted in stats, the next run retries them.
+
+        :param usernames:
+        :param stats: Filled while iterating
+        :param progress: Called with stats after every profile
+        :return:
+        """
+        stats = stats if stats is not None else EnrichmentStats()
+        usernames = list(dict.fromkeys(usernames))
+        stats.users = len(usernames)
+
+        cached = self.cache.fresh(usernames, self.max_age)
+        for username in usernames:
+            if username in cached:
+                stats.cached += 1
+                if progress is not None:
+                    progress(stats)
+                yield cached[username]
+
+        fetched = []
+        try:
+            for username, result in self.pipeline.map(
+                    self.fetch,
+                    [u for u in usernames if u not in cached],
+            ):
+                if isinstance(result, Exception):
+                    stats.failed[username] = (
+                        f"{result.__class__.__name__}: {result}")
+                    if progress is not None:
+                        progress(stats)
+                    continue
+                if not isinstance(result, Profile):
+                    # Returned parsed, by a client not deferring parsing
+                    result = normalize_profile(result)
+                # The requested username is the cache key
+                profile = result.model_copy(update={
+                    "username": username,
+                    "fetched_at": time.time(),
+                })
+                fetched.append(profile)
+                if len(fetched) >= self.batch:
+                    self.cache.save(fetched)
+                    fetched = []
+                stats.fetched += 1
+                if progress is not None:
+                    progress(stats)
+                yield profile
+        finally:
+            if fetched:
+                self.cache.save(fetched)
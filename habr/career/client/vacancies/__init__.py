@@ -1,7 +1,12 @@
 from enum import StrEnum, verify, UNIQUE
 from typing import Any
 
-from habr.career.utils import Currency, Pagination, QualificationID
+from habr.career.utils import (
+    Currency,
+    Pagination,
+    QualificationID,
+    QueryEncoder,
+)
 
 
 @verify(UNIQUE)
@@ -24,6 +29,29 @@ class EmploymentType(StrEnum):
     PART_TIME = "part_time"
 
 
+# Vacancies search query parameters
+VACANCIES_QUERY = QueryEncoder(
+    "sort",
+    "type",
+    "currency",
+    "per_page",
+    "page",
+    "q",
+    "s[]",
+    "skills[]",
+    "qid",
+    "salary",
+    "company_id",
+    "with_salary",
+    "remote",
+    "has_accreditation",
+    "exclude_company",
+    "locations[]",
+    "employment_type",
+    bool_as_str=True,
+)
+
+
 # noinspection PyUnresolvedReferences
 class HABRCareerVacanciesMixin:
     """Раздел `Вакансии`"""
@@ -230,11 +258,21 @@ class HABRCareerVacanciesMixin:
         return self.get(
             "frontend/vacancies",
             params=params,
-            params_options={
-                "bool_as_str": True,
-            },
+            params_encoder=VACANCIES_QUERY,
         )
 
+    def record_vacancy_skills(self, index, **filters) -> dict[str, Any]:
+        """
+        Get vacancies page and count its skills in the skill index.
+
+        :param index: `SkillIndex`
+        :param filters: `get_vacancies` parameters
+        :return:
+        """
+        result = self.get_vacancies(**filters)
+        index.add_vacancies(result)
+        return result
+
     def get_vacancy(self, id_: int) -> dict[str, Any]:
         """
         Get vacancy details.
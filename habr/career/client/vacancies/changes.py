@@ -0,0 +1,428 @@
+"""
+Change data capture of vacancies.
+
+A feed is a `get_vacancies` query polled again and again. For every
+vacancy of the feed a fingerprint is kept in a sqlite file: short hashes
+of title, salary, skills, archived and hidden flags taken from the list,
+and of the description taken from `get_vacancy`. A poll fetches the
+list pages and compares list-level hashes only, so details are fetched
+for new vacancies and vacancies whose list fields changed, not for every
+vacancy of the feed. A poll yields events of vacancies that appeared
+(insert), changed (update) or left the feed (delete), the new state is
+saved once the poll is complete, so an interrupted poll is repeated.
+
+An edit of the description alone is not noticed: details are fetched
+only when list fields change, that is the price of not fetching them
+on every poll.
+
+Pages are fetched concurrently, so a vacancy moving to an already
+fetched page is missed by the list. A vacancy missing from the list is
+reported deleted when `get_vacancy` doesn't find it or finds it archived
+or hidden, or when it's missing from the list of the next poll as well
+(it doesn't match the filters anymore).
+
+Example:
+    feed = VacancyFeed(client, ChangeStore("changes.sqlite"),
+                       {"search": "python", "remote": True})
+    while True:
+        for change in feed.poll():
+            print(change.to_json())
+        time.sleep(600)
+"""
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from enum import StrEnum, verify, UNIQUE
+from hashlib import blake2b
+from typing import Any, Callable, Iterable, Iterator
+
+from habr.career import codec
+from habr.career.client.pool import get_error_status
+from habr.career.client.store import SQLiteStore
+from habr.career.utils import (
+    BaseResponseError,
+    Pagination,
+    cleanup_tags,
+    filters_key,
+)
+
+__all__ = [
+    "FIELDS",
+    "ChangeKind",
+    "VacancyChange",
+    "ChangeStore",
+    "VacancyFeed",
+    "fingerprint",
+]
+
+# Fingerprint components, the last one comes from `get_vacancy`
+FIELDS = ("title", "salary", "skills", "archived", "hidden", "description")
+LIST_FIELDS = FIELDS[:-1]
+
+# Bytes per component hash
+HASH_SIZE = 8
+
+NOT_FOUND_STATUSES = (404,)
+
+
+@verify(UNIQUE)
+class ChangeKind(StrEnum):
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+@dataclass
+class VacancyChange:
+    kind: ChangeKind
+    id: int
+    # Vacancy details, list item if details are not fetched,
+    # None for deleted vacancies
+    vacancy: dict[str, Any] | None = None
+    # Changed fingerprint components of updated vacancies
+    fields: list[str] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        """Event as a single line JSON, e.g. for NDJSON stream."""
+        return codec.dumps({
+            "kind": str(self.kind),
+            "id": self.id,
+            "fields": self.fields,
+            "vacancy": self.vacancy,
+        })
+
+
+def _hash(value: Any) -> bytes:
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return blake2b(data.encode(), digest_size=HASH_SIZE).digest()
+
+
+def fingerprint(
+        item: dict[str, Any],
+        details: dict[str, Any] | None = None,
+) -> bytes:
+    """
+    Hashes of every `FIELDS` component, concatenated.
+
+    :param item: `get_vacancies` list item
+    :param details: `get_vacancy` vacancy, the description hash is empty
+                    (zero) if not passed
+    :return:
+    """
+    salary = item.get("salary") or {}
+    values = {
+        "title": item.get("title"),
+        "salary": [salary.get(k) for k in ("from", "to", "currency")],
+        "skills": sorted(s["title"] for s in item.get("skills") or ()),
+        "archived": bool(item.get("archived")),
+        "hidden": bool(item.get("hidden")),
+    }
+    hashes = [_hash(values[name]) for name in LIST_FIELDS]
+    if details is not None:
+        hashes.append(_hash(cleanup_tags(details.get("description") or "")))
+    else:
+        hashes.append(bytes(HASH_SIZE))
+    return b"".join(hashes)
+
+
+def changed_fields(old: bytes, new: bytes) -> list[str]:
+    """Names of fingerprint components which differ."""
+    return [
+        name for i, name in enumerate(FIELDS)
+        if old[i * HASH_SIZE:(i + 1) * HASH_SIZE]
+        != new[i * HASH_SIZE:(i + 1) * HASH_SIZE]
+    ]
+
+
+class ChangeStore(SQLiteStore):
+    """Vacancy fingerprints of feeds kept in a sqlite file."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS change_feeds (
+            id INTEGER PRIMARY KEY,
+            key TEXT NOT NULL UNIQUE,
+            polled_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS vacancy_fingerprints (
+            feed INTEGER NOT NULL,
+            vacancy INTEGER NOT NULL,
+            fingerprint BLOB NOT NULL,
+            PRIMARY KEY (feed, vacancy)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS missing_vacancies (
+            feed INTEGER NOT NULL,
+            vacancy INTEGER NOT NULL,
+            PRIMARY KEY (feed, vacancy)
+        ) WITHOUT ROWID;
+    """
+
+    def _feed_id(self, conn: sqlite3.Connection, key: str) -> int:
+        return conn.execute(
+            "INSERT INTO change_feeds (key) VALUES (?)"
+            " ON CONFLICT (key) DO UPDATE SET key = key RETURNING id",
+            (key,),
+        ).fetchone()[0]
+
+    def fingerprints(self, key: str) -> dict[int, bytes]:
+        """
+        Saved fingerprints of the feed.
+
+        :param key: Feed key
+        :return: Vacancy ID -> fingerprint
+        """
+        with closing(self._connect()) as conn:
+            return {
+                row[0]: row[1] for row in conn.execute(
+                    "SELECT vacancy, fingerprint FROM vacancy_fingerprints"
+                    " JOIN change_feeds ON change_feeds.id = feed"
+                    " WHERE change_feeds.key = ?",
+                    (key,),
+                )
+            }
+
+    def missing(self, key: str) -> set[int]:
+        """
+        Vacancies of the feed missing from the list of the last poll,
+        but not confirmed deleted.
+
+        :param key: Feed key
+        :return: Vacancy IDs
+        """
+        with closing(self._connect()) as conn:
+            return {
+                row[0] for row in conn.execute(
+                    "SELECT vacancy FROM missing_vacancies"
+                    " JOIN change_feeds ON change_feeds.id = feed"
+                    " WHERE change_feeds.key = ?",
+                    (key,),
+                )
+            }
+
+    def polled_at(self, key: str) -> float | None:
+        """Time of the last complete poll of the feed."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT polled_at FROM change_feeds WHERE key = ?", (key,),
+            ).fetchone()
+        return row and row[0]
+
+    def save(
+            self,
+            key: str,
+            upserted: dict[int, bytes],
+            deleted: Iterable[int] = (),
+            missing: Iterable[int] = (),
+    ) -> None:
+        """
+        Save changed fingerprints of the feed, atomically.
+
+        :param key: Feed key
+        :param upserted: Vacancy ID -> fingerprint
+        :param deleted: Vacancy IDs
+        :param missing: Vacancy IDs missing from the list, but not
+                        confirmed deleted, replace saved ones
+        :return:
+        """
+        with self._transaction() as conn:
+            feed = self._feed_id(conn, key)
+            conn.executemany(
+                "INSERT OR REPLACE INTO vacancy_fingerprints VALUES (?, ?, ?)",
+                [(feed, id_, fp) for id_, fp in upserted.items()],
+            )
+            conn.executemany(
+                "DELETE FROM vacancy_fingerprints"
+                " WHERE feed = ? AND vacancy = ?",
+                [(feed, id_) for id_ in deleted],
+            )
+            conn.execute(
+                "DELETE FROM missing_vacancies WHERE feed = ?", (feed,))
+            conn.executemany(
+                "INSERT INTO missing_vacancies VALUES (?, ?)",
+                [(feed, id_) for id_ in missing],
+            )
+            conn.execute(
+                "UPDATE change_feeds SET polled_at = ? WHERE id = ?",
+                (time.time(), feed),
+            )
+
+
+class VacancyFeed:
+    """
+    :param client: Client or client pool
+    :param store: Fingerprints store
+    :param filters: `get_vacancies` parameters except page
+    :param pages: Polled pages, all if None. Vacancies are reported
+                  deleted only when all pages of the feed are polled
+    :param workers: Concurrent requests
+    """
+
+    def __init__(
+            self,
+            client,
+            store: ChangeStore,
+            filters: dict[str, Any] | None = None,
+            pages: int | None = None,
+            workers: int = 4,
+    ):
+        self.client = client
+        self.store = store
+        self.filters = {
+            k: v for k, v in (filters or {}).items() if k != "page"}
+        self.key = filters_key(self.filters)
+        self.pages = pages
+        self.workers = workers
+
+    def fetch_list(self) -> tuple[list[dict[str, Any]], bool]:
+        """
+        Fetch vacancies of the feed, pages after the first concurrently.
+
+        :return: Vacancies, whether all pages are fetched
+        """
+        first = self.client.get_vacancies(
+            page=Pagination.INIT_PAGE, **self.filters)
+        total_pages = first["meta"]["totalPages"]
+        last = total_pages
+        if self.pages is not None:
+            last = min(total_pages, self.pages)
+        items = list(first["list"])
+        with ThreadPoolExecutor(self.workers) as executor:
+            for page in executor.map(
+                    lambda p: self.client.get_vacancies(
+                        page=p, **self.filters),
+                    range(Pagination.INIT_PAGE + 1, last + 1),
+            ):
+                items.extend(page["list"])
+        return items, last >= total_pages
+
+    def fetch_details(self, ids: list[int]) -> dict[int, dict[str, Any]]:
+        """`get_vacancy` vacancies by ID, fetched concurrently."""
+        with ThreadPoolExecutor(self.workers) as executor:
+            results = executor.map(
+                lambda id_: self.client.get_vacancy(id_=id_), ids)
+            return {
+                id_: result.get("vacancy") or {}
+                for id_, result in zip(ids, results)
+            }
+
+    def fetch_vacancy(self, id_: int) -> dict[str, Any] | None:
+        """`get_vacancy` vacancy, None if it's not found."""
+        try:
+            result = self.client.get_vacancy(id_=id_)
+        except BaseResponseError as e:
+            if get_error_status(e) in NOT_FOUND_STATUSES:
+                return None
+            raise
+        return result.get("vacancy") or {}
+
+    def confirm_deletes(
+            self,
+            ids: list[int],
+            missing: set[int],
+    ) -> tuple[list[int], list[int]]:
+        """
+        Check vacancies missing from the list of the feed.
+
+        :param ids: Vacancy IDs missing from the list
+        :param missing: Vacancy IDs missing from the previous list
+        :return: Deleted vacancies: not found, archived, hidden, or
+                 missing from the previous list as well; vacancies
+                 which are still there
+        """
+        deleted, still = [], []
+        check = [id_ for id_ in ids if id_ not in missing]
+        with ThreadPoolExecutor(self.workers) as executor:
+            vacancies = dict(
+                zip(check, executor.map(self.fetch_vacancy, check)))
+        for id_ in ids:
+            if id_ in missing:
+                deleted.append(id_)
+                continue
+            vacancy = vacancies[id_]
+            if (vacancy is None or vacancy.get("archived")
+                    or vacancy.get("hidden")):
+                deleted.append(id_)
+            else:
+                still.append(id_)
+        return deleted, still
+
+    def poll(
+            self,
+            callback: Callable[[VacancyChange], None] | None = None,
+    ) -> list[VacancyChange]:
+        """
+        Fetch the feed and save the new state.
+
+        :param callback: Called with every event before the state is saved
+        :return: Events: inserts and updates in the order of the list,
+                 then deletes
+        """
+        saved = self.store.fingerprints(self.key)
+        items, complete = self.fetch_list()
+
+        # Vacancies can move between pages while they are fetched
+        current = {}
+        for item in items:
+            current.setdefault(int(item["id"]), item)
+
+        list_size = len(LIST_FIELDS) * HASH_SIZE
+        list_prints = {
+            id_: fingerprint(item)[:list_size]
+            for id_, item in current.items()
+        }
+        changed = [
+            id_ for id_, fp in list_prints.items()
+            if id_ not in saved or saved[id_][:list_size] != fp
+        ]
+        details = self.fetch_details(changed)
+
+        changes = []
+        upserted = {}
+        for id_ in changed:
+            new = fingerprint(current[id_], details[id_])
+            upserted[id_] = new
+            vacancy = details[id_] or current[id_]
+            if id_ not in saved:
+                changes.append(VacancyChange(ChangeKind.INSERT, id_, vacancy))
+            else:
+                changes.append(VacancyChange(
+                    ChangeKind.UPDATE, id_, vacancy,
+                    changed_fields(saved[id_], new),
+                ))
+
+        deleted, missing = [], []
+        if complete:
+            deleted, missing = self.confirm_deletes(
+                [id_ for id_ in saved if id_ not in current],
+                self.store.missing(self.key),
+            )
+            changes.extend(
+                VacancyChange(ChangeKind.DELETE, id_) for id_ in deleted)
+
+        if callback is not None:
+            for change in changes:
+                callback(change)
+        self.store.save(self.key, upserted, deleted, missing)
+        return changes
+
+    def watch(
+            self,
+            interval: float = 600,
+            polls: int | None = None,
+    ) -> Iterator[VacancyChange]:
+        """
+        Poll the feed every `interval` seconds and yield events.
+
+        :param interval: Seconds between starts of polls
+        :param polls: Number of polls, endless if None
+        :return:
+        """
+        count = 0
+        while polls is None or count < polls:
+            started = time.monotonic()
+            yield from self.poll()
+            count += 1
+            if polls is None or count < polls:
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
@@ -0,0 +1,303 @@
+"""
+Near-duplicate vacancy detection.
+
+Vacancy text (title, company, divisions, skills and, for `get_vacancy`
+results, description cleaned by `cleanup_tags`) is split into word
+shingles and summarized by a MinHash signature: `num_perm` minimums of
+shingle hashes. Signatures are computed with one permutation hashing,
+a single hash per shingle is put into one of `num_perm` bins and empty
+bins are filled from the nearest non-empty one, so the cost is linear
+in text length rather than in text length × `num_perm`. The share of
+equal signature values estimates Jaccard similarity of shingle sets.
+
+Signatures are indexed by locality-sensitive hashing: split into `bands`
+bands, vacancies with an equal band (of the same company by default)
+land in the same bucket. Only vacancies sharing a bucket are compared,
+so adding a vacancy costs `bands` dict lookups plus a few comparisons
+regardless of how many vacancies are indexed. A vacancy joins the
+cluster of its most similar candidate if the similarity reaches
+`threshold`, otherwise it starts a new cluster. Cluster ID is the ID of
+the first vacancy of the cluster, it never changes, so it can be
+exported while vacancies still stream in.
+
+Example:
+    dedup = VacancyDeduplicator(threshold=0.7)
+    for page in pages:
+        for entry in dedup.add_page(page):
+            if not entry.duplicate:
+                process(entry.id)
+
+    dedup.clusters()  # Cluster ID -> vacancy IDs, duplicates only
+"""
+import re
+from array import array
+from dataclasses import dataclass
+from hashlib import blake2b
+from operator import eq
+from typing import Any, Iterable
+
+from habr.career.client.crawl import UnitKind, WorkQueue
+from habr.career.utils import cleanup_tags
+
+__all__ = [
+    "DedupEntry",
+    "VacancyDeduplicator",
+    "vacancy_text",
+    "shingles",
+]
+
+WORD_RE = re.compile(r"\w+")
+
+# Signature value of a vacancy without text
+EMPTY = 2 ** 64 - 1
+# Odd constant mixing the distance to the borrowed bin in densification
+GOLDEN = 0x9E3779B97F4A7C15
+
+
+@dataclass
+class DedupEntry:
+    id: str
+    cluster: str  # ID of the first vacancy of the cluster
+    # Estimated Jaccard similarity to the closest earlier vacancy
+    # of the cluster, 1 for the first one
+    similarity: float
+
+    @property
+    def duplicate(self) -> bool:
+        return self.id != self.cluster
+
+
+def vacancy_text(item: dict[str, Any]) -> str:
+    """
+    Text of `get_vacancies` list item or `get_vacancy` result.
+
+    :param item: Vacancy raw JSON data
+    :return:
+    """
+    item = item.get("vacancy") or item
+    company = item.get("company") or {}
+    parts = [
+        item.get("title") or "",
+        company.get("title") or "",
+        *(d["title"] for d in item.get("divisions") or ()),
+        *(s["title"] for s in item.get("skills") or ()),
+    ]
+    for name in ("description", "bonuses", "instructions"):
+        if item.get(name):
+            parts.append(cleanup_tags(item[name]))
+    return "\n".join(parts)
+
+
+def shingles(text: str, size: int = 3) -> set[str]:
+    """
+    Word shingles of the text, lowercase. A text shorter than the size
+    is a single shingle.
+
+    :param text:
+    :param size: Words per shingle
+    :return:
+    """
+    words = WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {
+        " ".join(words[i:i + size])
+        for i in range(len(words) - size + 1)
+    }
+
+
+class VacancyDeduplicator:
+    """
+    :param threshold: Minimal estimated Jaccard similarity of duplicates
+    :param num_perm: Signature length
+    :param bands: LSH bands, `num_perm` must be divisible by them.
+                  More bands find less similar candidates, a pair of
+                  similarity s is a candidate with probability
+                  1 - (1 - s ** (num_perm / bands)) ** bands
+    :param shingle: Words per shingle
+    :param same_company: Vacancies of different companies are never
+                         duplicates
+    :param max_bucket: Vacancies kept per LSH bucket. Buckets of mass
+                       reposts are capped, as their newer members have
+                       the same cluster as the kept ones
+    """
+
+    def __init__(
+            self,
+            threshold: float = 0.7,
+            num_perm: int = 64,
+            bands: int = 16,
+            shingle: int = 3,
+            same_company: bool = True,
+            max_bucket: int = 16,
+    ):
+        if num_perm % bands:
+            raise ValueError(
+                f"num_perm {num_perm} is not divisible by bands {bands}")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle = shingle
+        self.same_company = same_company
+        self.max_bucket = max_bucket
+
+        self.ids: list[str] = []
+        self.entries: dict[str, DedupEntry] = {}
+        self.signatures = array("Q")
+        self.buckets: list[dict[bytes, list[int]]] = [
+            {} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def signature(self, item: dict[str, Any]) -> array:
+        """
+        MinHash signature of the vacancy text.
+
+        :param item: Vacancy raw JSON data
+        :return:
+        """
+        num_perm = self.num_perm
+        bins = [EMPTY] * num_perm
+        for value in shingles(vacancy_text(item), self.shingle):
+            h = int.from_bytes(
+                blake2b(value.encode(), digest_size=8).digest(), "little")
+            index, value_ = h % num_perm, h // num_perm
+            if value_ < bins[index]:
+                bins[index] = value_
+        # Densification: empty bin takes the next non-empty one, offset
+        # by the distance, so equal texts still get equal signatures
+        if EMPTY in bins and any(v != EMPTY for v in bins):
+            filled = bins[:]
+            for index, value in enumerate(bins):
+                if value != EMPTY:
+                    continue
+                distance = 1
+                while bins[(index + distance) % num_perm] == EMPTY:
+                    distance += 1
+                filled[index] = (
+                    bins[(index + distance) % num_perm] + distance * GOLDEN
+                ) & EMPTY
+            bins = filled
+        return array("Q", bins)
+
+    def similarity(self, a: array, b: array) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return sum(map(eq, a, b)) / self.num_perm
+
+    def add(self, item: dict[str, Any]) -> DedupEntry:
+        """
+        Index the vacancy and assign it to a cluster.
+        An already indexed vacancy keeps its entry.
+
+        :param item: `get_vacancies` list item or `get_vacancy` result
+        :return:
+        """
+        item = item.get("vacancy") or item
+        id_ = str(item["id"])
+        entry = self.entries.get(id_)
+        if entry is not None:
+            return entry
+
+        signature = self.signature(item)
+        company = ""
+        if self.same_company:
+            company_ = item.get("company") or {}
+            company = company_.get("alias_name") or company_.get("title") or ""
+        rows, num_perm = self.rows, self.num_perm
+        keys = [
+            company.encode() + b"\0"
+            + signature[i * rows:(i + 1) * rows].tobytes()
+            for i in range(self.bands)
+        ]
+
+        candidates = set()
+        for buckets, key in zip(self.buckets, keys):
+            bucket = buckets.get(key)
+            if bucket is not None:
+                candidates.update(bucket)
+
+        best, best_similarity = None, 0.0
+        signatures = self.signatures
+        for row in sorted(candidates):
+            similarity = self.similarity(
+                signature, signatures[row * num_perm:(row + 1) * num_perm])
+            if similarity > best_similarity:
+                best, best_similarity = row, similarity
+
+        if best is not None and best_similarity >= self.threshold:
+            cluster = self.entries[self.ids[best]].cluster
+            entry = DedupEntry(id_, cluster, best_similarity)
+        else:
+            entry = DedupEntry(id_, id_, 1.0)
+
+        row = len(self.ids)
+        self.ids.append(id_)
+        self.entries[id_] = entry
+        signatures.extend(signature)
+        for buckets, key in zip(self.buckets, keys):
+            bucket = buckets.setdefault(key, [])
+            if len(bucket) < self.max_bucket:
+                bucket.append(row)
+        return entry
+
+    def add_page(self, page: dict[str, Any]) -> list[DedupEntry]:
+        """
+        Index `get_vacancies` page.
+
+        :param page:
+        :return: Entries of page vacancies
+        """
+        return [self.add(item) for item in page["list"]]
+
+    def add_crawl(self, queue: WorkQueue, crawl_id: str) -> int:
+        """
+        Index vacancies pages of the crawl.
+
+        :param queue:
+        :param crawl_id:
+        :return: Number of indexed vacancies
+        """
+        before = len(self)
+        for unit, result in queue.results(crawl_id):
+            if unit.kind == UnitKind.VACANCIES:
+                self.add_page(result)
+        return len(self) - before
+
+    def annotate(self, items: Iterable[dict[str, Any]]) -> list[dict]:
+        """
+        Index vacancies and set their "cluster" key to the cluster ID.
+
+        :param items: Vacancies raw JSON data, changed in place
+        :return: Items
+        """
+        items = list(items)
+        for item in items:
+            item["cluster"] = self.add(item).cluster
+        return items
+
+    def cluster(self, id_: int | str) -> str | None:
+        """
+        Cluster ID of the vacancy.
+
+        :param id_: Vacancy ID
+        :return: None for vacancies not indexed
+        """
+        entry = self.entries.get(str(id_))
+        return entry and entry.cluster
+
+    def clusters(self, min_size: int = 2) -> dict[str, list[str]]:
+        """
+        Vacancy IDs by cluster ID, in the order of indexing.
+
+        :param min_size: Skip smaller clusters, 1 to get all of them
+        :return:
+        """
+        clusters: dict[str, list[str]] = {}
+        for id_ in self.ids:
+            clusters.setdefault(self.entries[id_].cluster, []).append(id_)
+        return {
+            cluster: ids
+            for cluster, ids in clusters.items() if len(ids) >= min_size
+        }
@@ -0,0 +1,165 @@
+from functools import cache
+from typing import Any, Iterator, get_args, get_origin
+
+from pydantic import BaseModel, ValidationError
+
+from habr.career.utils import HABRCareerClientError, ValidationMode
+
+__all__ = [
+    "LazyList",
+    "LazyDict",
+    "validate",
+    "materialize",
+]
+
+
+def _validate_item(model: type[BaseModel], item: Any) -> BaseModel:
+    if isinstance(item, model):
+        return item
+    try:
+        return model.model_validate(item)
+    except ValidationError as e:
+        raise HABRCareerClientError(
+            f"Invalid {model.__name__} data") from e
+
+
+class LazyList(list):
+    """
+    List of raw items validated against the model on first access.
+    Validated items replace raw ones, so every item is validated once.
+    """
+
+    def __init__(self, items: list, model: type[BaseModel]):
+        super().__init__(items)
+        self.model = model
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = super().__getitem__(index)
+        if not isinstance(item, self.model):
+            item = _validate_item(self.model, item)
+            super().__setitem__(index, item)
+        return item
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __reversed__(self) -> Iterator[BaseModel]:
+        for i in reversed(range(len(self))):
+            yield self[i]
+
+    def __contains__(self, value) -> bool:
+        return any(item == value for item in self)
+
+    def validated_count(self) -> int:
+        return sum(
+            isinstance(item, self.model) for item in super().__iter__())
+
+    def validate_all(self) -> list[BaseModel]:
+        return list(self)
+
+
+class LazyDict(dict):
+    """Dict of raw values validated against the model on first access."""
+
+    def __init__(self, items: dict, model: type[BaseModel]):
+        super().__init__(items)
+        self.model = model
+
+    def __getitem__(self, key) -> BaseModel:
+        value = super().__getitem__(key)
+        if not isinstance(value, self.model):
+            value = _validate_item(self.model, value)
+            super().__setitem__(key, value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def values(self) -> list[BaseModel]:
+        return [self[key] for key in self]
+
+    def items(self) -> list[tuple[Any, BaseModel]]:
+        return [(key, self[key]) for key in self]
+
+    def validate_all(self) -> dict[Any, BaseModel]:
+        return dict(self.items())
+
+
+@cache
+def lazy_fields(
+        cls: type[BaseModel],
+) -> dict[str, tuple[type[LazyList | LazyDict], type[BaseModel]]]:
+    """
+    Find top level collections of models, e.g. list of resumes.
+    These are validated lazily.
+
+    :param cls: Pydantic model
+    :return: Field name -> (lazy collection class, item model)
+    """
+    fields = {}
+    for name, info in cls.model_fields.items():
+        origin = get_origin(info.annotation)
+        args = get_args(info.annotation)
+        if origin is list:
+            container, item = LazyList, args[0]
+        elif origin is dict:
+            container, item = LazyDict, args[1]
+        else:
+            continue
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            fields[name] = (container, item)
+    return fields
+
+
+def validate(
+        cls: type[BaseModel],
+        data: dict[str, Any],
+        mode: ValidationMode = ValidationMode.STRICT,
+) -> BaseModel | dict[str, Any]:
+    """
+    Validate response data against the model.
+
+    :param cls: Pydantic model
+    :param data: JSON data
+    :param mode: Validation mode
+    :return: Model instance, or data itself in RAW mode
+    """
+    if mode is ValidationMode.RAW:
+        return data
+
+    fields = lazy_fields(cls) if mode is ValidationMode.LAZY else {}
+    if not fields:
+        return cls(**data)
+
+    envelope = dict(data)
+    collections = {}
+    for name, (container, item) in fields.items():
+        alias = cls.model_fields[name].alias or name
+        value = envelope.get(alias)
+        if not isinstance(value, list if container is LazyList else dict):
+            # Let model report the error
+            return cls(**data)
+        collections[name] = container(value, item)
+        envelope[alias] = type(value)()
+
+    obj = cls(**envelope)
+    obj.__dict__.update(collections)
+    return obj
+
+
+def materialize(obj: Any) -> Any:
+    """
+    Validate all lazily validated items of the model in place.
+    Use it before model serialization.
+
+    :param obj: Model returned by client
+    :return: The same model
+    """
+    if isinstance(obj, BaseModel):
+        for name, value in obj.__dict__.items():
+            if isinstance(value, (LazyList, LazyDict)):
+                obj.__dict__[name] = value.validate_all()
+    return obj
@@ -0,0 +1,227 @@
+"""
+Notifications watcher.
+
+Polls notification counters of the current user (`/me`), the cheapest
+request telling that something changed, and fetches the delta only when
+a counter moves: new messages of unread conversations when the messages
+counter grows, new incoming friendship requests when the friends counter
+grows. The events counter has no delta endpoint, its changes are
+reported as they are.
+
+The interval between polls adapts: it is reset to `min_interval` once
+something changes and grows by `backoff` after every quiet poll up to
+`max_interval`, so an idle watcher makes a few requests per hour.
+
+Example:
+    watcher = NotificationWatcher(client, min_interval=10)
+    for event in watcher.watch():
+        if event.kind == WatchEventKind.MESSAGE:
+            print(event.username, cleanup_tags(event.message.body))
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from enum import StrEnum, verify, UNIQUE
+from typing import Any, Callable, Iterator
+
+from habr.career.client.conversations.models import Message
+from habr.career.utils import Pagination
+
+__all__ = [
+    "COUNTERS",
+    "WatchEventKind",
+    "WatchEvent",
+    "NotificationWatcher",
+]
+
+# Notification counters of `User`
+COUNTERS = ("messages", "friends", "events")
+
+
+@verify(UNIQUE)
+class WatchEventKind(StrEnum):
+    COUNTER = "counter"
+    MESSAGE = "message"
+    FRIENDSHIP_REQUEST = "friendship_request"
+
+
+@dataclass
+class WatchEvent:
+    kind: WatchEventKind
+    counter: str  # Notification counter the event comes from
+    value: int  # Counter value
+    username: str | None = None  # Message author or friendship requester
+    title: str | None = None  # Requester name
+    message: Message | None = None
+
+    def to_jsonable(self) -> dict[str, Any]:
+        return {
+            "kind": str(self.kind),
+            "counter": self.counter,
+            "value": self.value,
+            "username": self.username,
+            "title": self.title,
+            "message": self.message and self.message.model_dump(
+                mode="json", by_alias=True),
+        }
+
+
+class NotificationWatcher:
+    """
+    :param client: Authorized client
+    :param min_interval: Seconds between polls after a change
+    :param max_interval: Seconds between polls when nothing changes
+    :param backoff: Interval growth factor after a quiet poll
+    :param max_pages: Conversations and friendship requests pages
+                      fetched per change at most
+    :param sleep: Sleep function, e.g. to stop waiting on a signal
+    """
+
+    def __init__(
+            self,
+            client,
+            min_interval: float = 15,
+            max_interval: float = 300,
+            backoff: float = 1.5,
+            max_pages: int = 3,
+            sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff = backoff
+        self.max_pages = max_pages
+        self.sleep = sleep
+
+        self.interval = min_interval
+        # Counters of the previous poll, none before the first one
+        self.counters: dict[str, int] | None = None
+        # Creation time of the latest seen message of other users
+        self.watermark: datetime | None = None
+        # Username -> ID of the latest seen message
+        self.seen_messages: dict[str, int] = {}
+        self.seen_requests: set[str] = set()
+
+    def poll(self) -> list[WatchEvent]:
+        """
+        Fetch counters and the delta of the counters which grew.
+        Unread messages and requests are reported by the first poll.
+
+        :return: Events of the poll
+        """
+        user = self.client.user.user
+        counters = user.notification_counters.model_dump()
+        previous = self.counters or dict.fromkeys(COUNTERS, 0)
+
+        events = []
+        for name in COUNTERS:
+            value = counters[name]
+            if value == previous[name]:
+                continue
+            events.append(WatchEvent(WatchEventKind.COUNTER, name, value))
+            if value < previous[name]:
+                # Read somewhere else, nothing to fetch
+                continue
+            if name == "messages":
+                events.extend(self.fetch_messages(value))
+            elif name == "friends":
+                events.extend(self.fetch_requests(value))
+
+        self.counters = counters
+        if events:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(
+                self.interval * self.backoff, self.max_interval)
+        return events
+
+    def fetch_messages(self, value: int) -> list[WatchEvent]:
+        """
+        New messages of conversations with an unread last message.
+        Conversations come the latest first, pages are fetched until
+        a conversation older than the watermark.
+
+        :param value: Messages counter
+        :return:
+        """
+        unread = []
+        watermark = self.watermark
+        for page in range(Pagination.INIT_PAGE, self.max_pages + 1):
+            conversations = self.client.get_conversations(page=page)
+            older = False
+            for username in conversations.ids:
+                conversation = conversations.objects[username].conversation
+                last = conversation.last_message
+                if last is None or last.is_mine:
+                    continue
+                if watermark is not None and last.created_at <= watermark:
+                    older = True
+                    break
+                if not last.is_read:
+                    unread.append((username, last.created_at))
+            # Conversations meta total is the pages count
+            if older or page >= conversations.meta.total:
+                break
+
+        events = []
+        for username, created_at in unread:
+            messages = [
+                m for m in self.client.get_messages(username).data
+                if not m.is_mine
+            ]
+            seen = self.seen_messages.get(username)
+            if seen is not None:
+                new = [m for m in messages if m.id > seen]
+            elif watermark is not None:
+                new = [m for m in messages if m.created_at > watermark]
+            else:
+                # Unread messages before the first poll, the last one only
+                new = sorted(messages, key=lambda m: m.id)[-1:]
+            for message in sorted(new, key=lambda m: m.id):
+                events.append(WatchEvent(
+                    WatchEventKind.MESSAGE, "messages", value,
+                    username=username, message=message,
+                ))
+            if messages:
+                self.seen_messages[username] = max(m.id for m in messages)
+            if self.watermark is None or created_at > self.watermark:
+                self.watermark = created_at
+        return events
+
+    def fetch_requests(self, value: int) -> list[WatchEvent]:
+        """
+        Incoming friendship requests not reported yet.
+
+        :param value: Friends counter
+        :return:
+        """
+        events = []
+        for page in range(Pagination.INIT_PAGE, self.max_pages + 1):
+            requests = self.client.get_friendship_requests(page=page)
+            for item in requests.list_:
+                if item.friendship != "incoming":
+                    continue
+                if item.id in self.seen_requests:
+                    continue
+                self.seen_requests.add(item.id)
+                events.append(WatchEvent(
+                    WatchEventKind.FRIENDSHIP_REQUEST, "friends", value,
+                    username=item.id, title=item.title,
+                ))
+            if page >= requests.meta.total_pages:
+                break
+        return events
+
+    def watch(self, polls: int | None = None) -> Iterator[WatchEvent]:
+        """
+        Poll with adaptive intervals and yield events.
+
+        :param polls: Number of polls, endless if None
+        :return:
+        """
+        count = 0
+        while polls is None or count < polls:
+            yield from self.poll()
+            count += 1
+            if polls is None or count < polls:
+                self.sleep(self.interval)
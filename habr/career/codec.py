@@ -0,0 +1,226 @@
+"""
+JSON codec used by client, SSR state parsing and CLI output.
+
+The fastest installed backend is picked: `orjson`, `ujson`, then
+the standard library `json`. Install accelerated one with
+`pip install "Habr Career[orjson]"`. Backend can be forced with
+`HABR_CAREER_JSON` environment variable or `set_codec`, e.g. to compare them.
+
+Example:
+    from habr.career import codec
+
+    codec.loads(b'{"a": 1}')            # {"a": 1}
+    codec.dumps({"a": "б"}, indent=2)   # '{\\n  "a": "б"\\n}'
+    codec.get_codec().name              # "orjson"
+"""
+import json
+import math
+import os
+from abc import ABC, abstractmethod
+from typing import Any
+
+__all__ = [
+    "JSONDecodeError",
+    "JSONCodec",
+    "StdlibCodec",
+    "OrjsonCodec",
+    "UjsonCodec",
+    "CODECS",
+    "available_codecs",
+    "get_codec",
+    "set_codec",
+    "loads",
+    "dumps",
+    "dumpb",
+]
+
+# Raised by every codec on invalid input
+JSONDecodeError = json.JSONDecodeError
+
+ENV_VARIABLE = "HABR_CAREER_JSON"
+
+
+class JSONCodec(ABC):
+    """
+    JSON backend interface.
+    Encoded data is always UTF-8 with non-ASCII characters kept as is.
+    NaN and infinite floats are encoded as null, as orjson does,
+    so every backend gives valid JSON.
+    """
+
+    name: str
+
+    @abstractmethod
+    def loads(self, data: str | bytes) -> Any:
+        """
+        Decode JSON document.
+
+        :param data: JSON document
+        :return:
+        :raises JSONDecodeError: Invalid document or not UTF-8 bytes
+        """
+
+    @abstractmethod
+    def dumpb(self, obj: Any, indent: int | None = None) -> bytes:
+        """
+        Encode object into UTF-8 JSON document.
+
+        :param obj:
+        :param indent: Pretty print with indentation, compact if None
+        :return:
+        """
+
+    def dumps(self, obj: Any, indent: int | None = None) -> str:
+        return self.dumpb(obj, indent).decode()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name}>"
+
+
+class StdlibCodec(JSONCodec):
+    name = "json"
+
+    def loads(self, data: str | bytes) -> Any:
+        try:
+            return json.loads(data)
+        except UnicodeDecodeError as e:
+            # Binary body, e.g. a PDF document
+            raise JSONDecodeError(str(e), _as_text(data), 0) from e
+
+    def dumps(self, obj: Any, indent: int | None = None) -> str:
+        try:
+            return json.dumps(
+                obj, ensure_ascii=False, indent=indent, allow_nan=False)
+        except ValueError:
+            return json.dumps(
+                _finite(obj), ensure_ascii=False, indent=indent)
+
+    def dumpb(self, obj: Any, indent: int | None = None) -> bytes:
+        return self.dumps(obj, indent).encode()
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def loads(self, data: str | bytes) -> Any:
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+        return self._orjson.loads(data)
+
+    def dumpb(self, obj: Any, indent: int | None = None) -> bytes:
+        if indent is None:
+            return self._orjson.dumps(obj, option=self._options)
+        if indent == 2:
+            return self._orjson.dumps(
+                obj, option=self._options | self._orjson.OPT_INDENT_2)
+        # orjson supports two spaces indentation only
+        return STDLIB.dumpb(obj, indent)
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, data: str | bytes) -> Any:
+        try:
+            return self._ujson.loads(data)
+        except (self._ujson.JSONDecodeError, UnicodeDecodeError) as e:
+            raise JSONDecodeError(str(e), _as_text(data), 0) from e
+
+    def dumps(self, obj: Any, indent: int | None = None) -> str:
+        try:
+            return self._ujson.dumps(
+                obj, ensure_ascii=False, indent=indent or 0)
+        except OverflowError:
+            # Raised on NaN and infinite floats
+            return self._ujson.dumps(
+                _finite(obj), ensure_ascii=False, indent=indent or 0)
+
+    def dumpb(self, obj: Any, indent: int | None = None) -> bytes:
+        return self.dumps(obj, indent).encode()
+
+
+def _finite(obj: Any) -> Any:
+    """Copy of JSON data with NaN and infinite floats replaced by None."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _as_text(data: str | bytes) -> str:
+    if isinstance(data, bytes):
+        return data.decode(errors="replace")
+    return data
+
+
+STDLIB = StdlibCodec()
+
+# Ordered from the fastest one
+CODECS: dict[str, type[JSONCodec]] = {
+    "orjson": OrjsonCodec,
+    "ujson": UjsonCodec,
+    "json": StdlibCodec,
+}
+
+_codec: JSONCodec | None = None
+
+
+def available_codecs() -> list[JSONCodec]:
+    """Instances of installed codecs, the fastest first."""
+    codecs = []
+    for cls in CODECS.values():
+        try:
+            codecs.append(STDLIB if cls is StdlibCodec else cls())
+        except ImportError:
+            continue
+    return codecs
+
+
+def set_codec(name: str | None = None) -> JSONCodec:
+    """
+    Select codec used by the package.
+
+    :param name: Codec name, the fastest installed one if None
+    :return: Selected codec
+    :raises ValueError: Unknown codec name
+    :raises ImportError: Codec backend is not installed
+    """
+    global _codec
+    if name is None:
+        _codec = available_codecs()[0]
+    elif name not in CODECS:
+        raise ValueError(
+            f"Unknown JSON codec {name!r}, choose one of: {', '.join(CODECS)}")
+    else:
+        cls = CODECS[name]
+        _codec = STDLIB if cls is StdlibCodec else cls()
+    return _codec
+
+
+def get_codec() -> JSONCodec:
+    if _codec is None:
+        return set_codec(os.environ.get(ENV_VARIABLE) or None)
+    return _codec
+
+
+def loads(data: str | bytes) -> Any:
+    return get_codec().loads(data)
+
+
+def dumps(obj: Any, indent: int | None = None) -> str:
+    return get_codec().dumps(obj, indent)
+
+
+def dumpb(obj: Any, indent: int | None = None) -> bytes:
+    return get_codec().dumpb(obj, indent)
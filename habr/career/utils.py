@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import json
+import re
+import threading
+import time
 from enum import Enum, verify, UNIQUE, StrEnum, IntEnum
-from typing import Any, Self, Iterator, Literal
+from functools import lru_cache
+from typing import Any, Self, Iterable, Iterator, Literal
+from urllib.parse import quote_plus
 
 from bs4 import BeautifulSoup
 from pydantic import BaseModel, ValidationError, Field
 
+from habr.career import codec
+
 type PydanticModel = BaseModel
 type Username = str
 
@@ -30,6 +37,10 @@ class LogoutError(HABRCareerClientError):
     pass
 
 
+class NoActiveClientsError(HABRCareerClientError):
+    pass
+
+
 class BaseResponseError(HABRCareerClientError):
     schema: type[PydanticModel] | None = None
     reason_field: str | None = None
@@ -149,6 +160,32 @@ class ConcurrentJobs:
             yield f.result()
 
 
+class RateLimiter:
+    """
+    Spaces calls made from any number of threads,
+    so that no more than `rate` calls per second are started.
+
+    Example:
+        limiter = RateLimiter(5)
+        limiter.acquire()  # Blocks until the next free slot
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.interval = 1 / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 def get_ssr_json(html_code: str) -> dict:
     """
     Retrieve server side rendered json put into text/html page.
@@ -158,6 +195,37 @@ def get_ssr_json(html_code: str) -> dict:
     :param html_code:
     :return:
     """
+    return codec.loads(get_ssr_json_text(html_code))
+
+
+# Opening tag of the SSR state script, attributes in any order
+_SSR_SCRIPT = re.compile(
+    r"<script"
+    r"(?=[^>]*\stype\s*=\s*[\"']?application/json[\"'\s>])"
+    r"(?=[^>]*\sdata-ssr-state\s*=\s*[\"']?true[\"'\s>])"
+    r"[^>]*>",
+    re.IGNORECASE,
+)
+_SCRIPT_END = re.compile(r"</script", re.IGNORECASE)
+
+
+def get_ssr_json_text(html_code: str) -> str:
+    """
+    Retrieve server side rendered json put into text/html page
+    without decoding it.
+    Script contents is raw text, so it's cut out of the page as is,
+    without parsing the whole page. Pages the script is not found in
+    are parsed as before.
+
+    :param html_code:
+    :return:
+    """
+    match = _SSR_SCRIPT.search(html_code)
+    if match is not None:
+        end = _SCRIPT_END.search(html_code, match.end())
+        if end is not None:
+            return html_code[match.end():end.start()]
+
     soup = BeautifulSoup(html_code, features="html.parser")
     search_params = {
         "name": "script",
@@ -165,25 +233,152 @@ def get_ssr_json(html_code: str) -> dict:
         "attrs": {"data-ssr-state": "true"},
     }
     el = soup.find(**search_params)
-    return json.loads(el.get_text())
-
+    return el.get_text()
+
+
+# Tags making markup unsuitable for the fast path of `cleanup_tags`:
+# raw text and whitespace preserving elements, strings ignored by get_text
+_SOUP_ONLY_TAGS = frozenset({
+    "script", "style", "template", "rt", "rp", "pre", "textarea",
+    "title", "xmp", "iframe", "noembed", "noframes", "noscript", "plaintext",
+})
+# Void elements, closed by parser right after opening
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "menuitem", "meta", "param", "source", "track", "wbr",
+    "basefont", "bgsound", "command", "frame", "image", "isindex", "nextid",
+    "spacer",
+})
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+_LETTERS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")
+# Characters after `&` or `<` making it a reference or markup, not text
+_ENTITY_START = _LETTERS | {"#"}
+_TAG_START = _LETTERS | {"/", "!", "?"}
+_SPECIAL_CHAR = re.compile(r"[<&]")
+_TAG = re.compile(
+    r"<(/?)([a-zA-Z][a-zA-Z0-9]*)"
+    r"((?:\s+[a-zA-Z_:][-a-zA-Z0-9_:.]*"
+    r"(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s\"'=<>`/]+))?)*)"
+    r"\s*(/?)>"
+)
+_ENTITY = re.compile(
+    r"&(?:(amp|lt|gt|quot|nbsp|laquo|raquo|mdash|ndash|hellip)"
+    r"|#([0-9]{1,7})|#[xX]([0-9a-fA-F]{1,6}));"
+)
+_ENTITIES = {
+    "amp": "&", "lt": "<", "gt": ">", "quot": '"', "nbsp": "\xa0",
+    "laquo": "«", "raquo": "»", "mdash": "—", "ndash": "–", "hellip": "…",
+}
+
+
+class _SoupRequired(Exception):
+    """Markup is out of the fast path scope."""
+
+
+def _char_ref(code: int) -> str:
+    # Parser decodes references to 128-159 as windows-1252,
+    # out of range references are replaced
+    if 128 <= code <= 159 or code > 0x10FFFF:
+        raise _SoupRequired
+    return chr(code)
+
+
+def _strings(html_code: str, p_replace: bool, li_replace: bool) -> list[str]:
+    """
+    Split markup into text strings the way BeautifulSoup with html.parser
+    does, adding strings inserted by `cleanup_tags` around `p` and `li`.
 
-def cleanup_tags(
+    :raises _SoupRequired: Markup is out of the fast path scope
+    """
+    strings = []
+    data = []
+    stack = []
+    size = len(html_code)
+
+    def end_data():
+        if data:
+            text = "".join(data)
+            data.clear()
+            if not text.strip(_ASCII_SPACES):
+                text = "\n" if "\n" in text else " "
+            strings.append(text)
+
+    def end_element(name):
+        if name == "p" and p_replace or name == "li" and li_replace:
+            strings.append("\n")
+
+    pos = 0
+    while pos < size:
+        match = _SPECIAL_CHAR.search(html_code, pos)
+        if match is None:
+            data.append(html_code[pos:])
+            break
+        start = match.start()
+        if start > pos:
+            data.append(html_code[pos:start])
+        pos = start
+
+        if html_code[pos] == "&":
+            entity = _ENTITY.match(html_code, pos)
+            if entity is not None:
+                name, dec, hex_ = entity.groups()
+                if name:
+                    data.append(_ENTITIES[name])
+                else:
+                    data.append(_char_ref(int(dec or hex_, 10 if dec else 16)))
+                pos = entity.end()
+            elif pos + 1 == size or html_code[pos + 1] not in _ENTITY_START:
+                data.append("&")
+                pos += 1
+            else:
+                raise _SoupRequired
+            continue
+
+        tag = _TAG.match(html_code, pos)
+        if tag is None:
+            if pos + 1 == size or html_code[pos + 1] not in _TAG_START:
+                data.append("<")
+                pos += 1
+                continue
+            raise _SoupRequired
+
+        closing, name, attrs, self_closing = tag.groups()
+        name = name.lower()
+        if name in _SOUP_ONLY_TAGS or closing and (
+                attrs or self_closing or name in _VOID_TAGS):
+            raise _SoupRequired
+        pos = tag.end()
+        end_data()
+
+        if closing:
+            if name in stack:
+                while True:
+                    popped = stack.pop()
+                    end_element(popped)
+                    if popped == name:
+                        break
+        elif name not in _VOID_TAGS:
+            if name == "li" and li_replace:
+                strings.append("— ")
+            if self_closing:
+                end_element(name)
+            else:
+                stack.append(name)
+
+    end_data()
+    while stack:
+        end_element(stack.pop())
+    return strings
+
+
+def _cleanup_tags_soup(
         html_code: str,
         br_replace=True,
         p_replace=True,
         li_replace=True,
         **kwargs
 ) -> str:
-    """
-    Remove HTML tags from input string.
-
-    :param html_code:
-    :param br_replace:
-    :param p_replace:
-    :param li_replace:
-    :return:
-    """
+    """Reference `cleanup_tags` implementation built on BeautifulSoup."""
     if br_replace:
         html_code = html_code.replace("<br>", "\n")
 
@@ -201,6 +396,106 @@ def cleanup_tags(
     return soup.get_text(**kwargs).strip()
 
 
+@lru_cache(maxsize=4096)
+def _cleanup_tags(
+        html_code: str,
+        br_replace: bool,
+        p_replace: bool,
+        li_replace: bool,
+        separator: str,
+        strip: bool,
+) -> str:
+    if br_replace:
+        html_code = html_code.replace("<br>", "\n")
+    try:
+        strings = _strings(html_code, p_replace, li_replace)
+    except _SoupRequired:
+        return _cleanup_tags_soup(
+            html_code,
+            br_replace=False,
+            p_replace=p_replace,
+            li_replace=li_replace,
+            separator=separator,
+            strip=strip,
+        )
+    if strip:
+        strings = [s.strip() for s in strings]
+        strings = [s for s in strings if s]
+    return separator.join(strings).strip()
+
+
+def cleanup_tags(
+        html_code: str,
+        br_replace=True,
+        p_replace=True,
+        li_replace=True,
+        **kwargs
+) -> str:
+    """
+    Remove HTML tags from input string.
+    Markup is converted in a single pass, results are cached.
+    Rare constructs (comments, scripts, unusual entities, etc.)
+    are handled by BeautifulSoup giving the same result.
+
+    :param html_code:
+    :param br_replace:
+    :param p_replace:
+    :param li_replace:
+    :param kwargs: `BeautifulSoup.get_text` options: separator, strip
+    :return:
+    """
+    if kwargs.keys() - {"separator", "strip"}:
+        return _cleanup_tags_soup(
+            html_code, br_replace, p_replace, li_replace, **kwargs)
+    return _cleanup_tags(
+        html_code,
+        bool(br_replace),
+        bool(p_replace),
+        bool(li_replace),
+        kwargs.get("separator", ""),
+        bool(kwargs.get("strip", False)),
+    )
+
+
+def cleanup_tags_many(html_codes: Iterable[str], **kwargs) -> list[str]:
+    """
+    Remove HTML tags from many input strings, e.g. messages bodies.
+    Repeated strings are converted once.
+
+    :param html_codes:
+    :param kwargs: `cleanup_tags` options
+    :return:
+    """
+    converted = {}
+    results = []
+    for html_code in html_codes:
+        if html_code not in converted:
+            converted[html_code] = cleanup_tags(html_code, **kwargs)
+        results.append(converted[html_code])
+    return results
+
+
+def filters_key(filters: dict[str, Any] | None = None) -> str:
+    """
+    Stable key of request filters, e.g. to store results of a query.
+    Unset filters are skipped, the order of filters and list values
+    doesn't matter.
+
+    :param filters: Request parameters
+    :return: JSON object text
+    """
+    normalized = {}
+    for name, value in (filters or {}).items():
+        if value is None or value == [] or value == ():
+            continue
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, (list, tuple)):
+            value = sorted(str(x) for x in value)
+        normalized[name] = value
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+
 def bool_to_str(value: bool | None) -> str | None:
     """
     Convert boolean value into string.
@@ -230,6 +525,98 @@ class Convertor:
         }
 
 
+class QueryEncoder:
+    """
+    Query string encoder compiled from endpoint parameters schema.
+    Parameters are encoded in schema order, parameters missing in schema
+    go after them. None values are dropped, booleans and enums are
+    converted like `Convertor` does, lists are encoded as repeated keys
+    (e.g. `skills[]=1&skills[]=2`). Encoded `key=value` pairs are cached,
+    so repeated queries (e.g. crawling pages) are mostly joined from cache.
+
+    Example:
+        RESUMES_QUERY = QueryEncoder("q", "skills[]", "page",
+                                     bool_as_str=True)
+        RESUMES_QUERY.encode({"q": "python", "skills[]": [1, 2], "page": 2})
+        # q=python&skills%5B%5D=1&skills%5B%5D=2&page=2
+
+    :param keys: Query parameters names
+    :param bool_as_str: Encode booleans as `true`/`false` instead of `1`/`0`
+    """
+
+    CACHE_SIZE = 4096
+
+    _defaults: dict[bool, QueryEncoder] = {}
+
+    def __init__(self, *keys: str, bool_as_str: bool = False):
+        self.keys = keys
+        self.bool_as_str = bool_as_str
+        self._keys_set = frozenset(keys)
+        self._quoted_keys = {key: quote_plus(key) for key in keys}
+        self._pairs: dict[tuple[str, type, Any], str] = {}
+
+    @classmethod
+    def from_options(cls, bool_as_str: bool = False) -> QueryEncoder:
+        """
+        Schemaless encoder for `params_options` of request.
+
+        :param bool_as_str:
+        :return:
+        """
+        encoder = cls._defaults.get(bool_as_str)
+        if encoder is None:
+            encoder = cls._defaults[bool_as_str] = cls(bool_as_str=bool_as_str)
+        return encoder
+
+    def _value(self, value: Any) -> str:
+        if isinstance(value, bool):
+            return str(value).lower() if self.bool_as_str else str(int(value))
+        if isinstance(value, Enum):
+            value = value.value
+        return quote_plus(str(value))
+
+    def _pair(self, key: str, value: Any) -> str:
+        # Type is a part of cache key as True == 1 and hash(True) == hash(1)
+        cache_key = (key, type(value), value)
+        try:
+            return self._pairs[cache_key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable value
+            return f"{quote_plus(key)}={self._value(value)}"
+        quoted_key = self._quoted_keys.get(key) or quote_plus(key)
+        if len(self._pairs) >= self.CACHE_SIZE:
+            self._pairs.clear()
+        pair = self._pairs[cache_key] = f"{quoted_key}={self._value(value)}"
+        return pair
+
+    def encode(self, params: dict[str, Any]) -> str:
+        """
+        Encode parameters into query string.
+
+        :param params:
+        :return: Query string without leading `?`
+        """
+        keys = self.keys
+        if not self._keys_set.issuperset(params):
+            keys = (*keys, *(k for k in params if k not in self._keys_set))
+
+        parts = []
+        for key in keys:
+            value = params.get(key)
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                parts.extend(
+                    self._pair(key, item) for item in value
+                    if item is not None
+                )
+            else:
+                parts.append(self._pair(key, value))
+        return "&".join(parts)
+
+
 @verify(UNIQUE)
 class Qualification(StrEnum):
     ALL = "All"
@@ -277,6 +664,19 @@ class CurrencySymbol(StrEnum):
         return cls.__members__[name.upper()]
 
 
+class ValidationMode(StrEnum):
+    """
+    How client validates responses against models:
+        STRICT - the whole response is validated
+        LAZY   - envelope (meta, etc.) is validated up front,
+                 list items are validated on first access
+        RAW    - no validation, JSON data is returned as is
+    """
+    STRICT = "strict"
+    LAZY = "lazy"
+    RAW = "raw"
+
+
 class Pagination:
     PER_PAGE = 15
     INIT_PAGE = 1
@@ -36,6 +36,9 @@ setup(
     tests_require=tests_requirements,
     extras_require={
         "testing": tests_requirements,
+        "numpy": ["numpy==1.26.4"],
+        "orjson": ["orjson==3.9.15"],
+        "ujson": ["ujson==5.9.0"],
     },
     long_description=readme,
     keywords="habr_career,habr,career",
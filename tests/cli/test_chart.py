@@ -0,0 +1,98 @@
+import io
+import math
+import unittest
+
+from parameterized import parameterized
+from rich.console import Console
+
+from habr.career.cli.utils.chart import (
+    Chart,
+    SeriesChart,
+    bucket,
+    resample,
+    to_array,
+)
+
+
+def render(renderable) -> str:
+    console = Console(file=io.StringIO(), width=120, color_system=None)
+    console.print(renderable)
+    return console.file.getvalue()
+
+
+def same(a: list[float], b: list[float]) -> bool:
+    return len(a) == len(b) and all(
+        x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b))
+
+
+class ChartTestCase(unittest.TestCase):
+    @parameterized.expand([
+        ([1, 2, 3, 4], 4, [1, 2, 3, 4]),
+        ([1, 2, 3, 4], 2, [1.5, 3.5]),
+        ([1, 2, 3, 4, 5, 6], 3, [1.5, 3.5, 5.5]),
+        ([1, None, 3, None], 2, [1, 3]),
+        ([None, None, 3, 5], 2, [math.nan, 4]),
+        ([], 5, []),
+    ])
+    def test_bucket(self, values: list, buckets: int, expected: list) -> None:
+        self.assertTrue(same(
+            list(bucket(to_array(values), buckets)), expected))
+
+    def test_resample_interpolates(self) -> None:
+        values, points = resample(to_array([0, 10, 20]), 5)
+        self.assertEqual(list(values), [0, 5, 10, 15, 20])
+        self.assertEqual(points, {0, 2, 4})
+
+    def test_resample_missing(self) -> None:
+        values, _ = resample(to_array([None, 10, 20]), 5)
+        self.assertTrue(same(list(values), [math.nan, math.nan, 10, 15, 20]))
+
+    def test_resample_long_series(self) -> None:
+        values, points = resample(to_array(range(10000)), 50)
+        self.assertEqual(len(values), 50)
+        self.assertEqual(len(points), 50)
+        self.assertEqual(values[0], 99.5)
+
+    @parameterized.expand([
+        ([(1,), (2,), (4,)], [[12.5], [25.0], [50.0]]),
+        ([(-2,), (0,), (2,)], [[0.0], [25.0], [50.0]]),
+        ([(None, 2), (4, None)], [[0.0, 25.0], [50.0, 0.0]]),
+        ([(0,), (0,)], [[0.0], [0.0]]),
+    ])
+    def test_normalize(self, data: list, expected: list) -> None:
+        chart = Chart.__new__(Chart)
+        chart.width = 50
+        self.assertEqual(chart._normalize(data), expected)
+
+    def test_series_chart(self) -> None:
+        output = render(SeriesChart(
+            series={
+                "Backend": [100000, 150000, 200000],
+                "Frontend": [None, 120000, 90000],
+            },
+            labels=["2022", "2023", "2024"],
+            width=30,
+            height=5,
+            title="Salaries",
+        ))
+        lines = output.splitlines()
+        self.assertIn("● Backend", output)
+        self.assertIn("◆ Frontend", output)
+        self.assertIn("200.0K ┤", output)
+        self.assertIn(" 90.0K ┤", output)
+        # The highest point is in the top right corner
+        top = next(line for line in lines if "200.0K" in line)
+        self.assertTrue(top.rstrip().endswith("●"))
+        self.assertIn("2022", lines[-1])
+        self.assertIn("2024", lines[-1])
+
+    def test_series_chart_many_points(self) -> None:
+        output = render(SeriesChart(
+            series={"Series": [math.sin(i / 100) + 2 for i in range(20000)]},
+            width=40,
+            height=8,
+        ))
+        plot = [line for line in output.splitlines() if "┤" in line]
+        self.assertEqual(len(plot), 8)
+        self.assertTrue(all(
+            len(line.split("┤", 1)[1].rstrip()) <= 40 for line in plot))
@@ -0,0 +1,118 @@
+import io
+import unittest
+
+from parameterized import parameterized
+from rich.console import Console
+
+from habr.career.cli.utils.stream import TableStream, iter_pages, stream_table
+
+
+def make_console(width: int = 100) -> Console:
+    return Console(file=io.StringIO(), width=width, color_system=None)
+
+
+def make_rows(page: int) -> list[list[str]]:
+    return [
+        [f"user{page}-{i}", "сообщение " * i, str(i)]
+        for i in range(3)
+    ]
+
+
+class StreamTestCase(unittest.TestCase):
+    @parameterized.expand([
+        (1, 5, 0, [1, 2, 3, 4, 5]),
+        (1, 5, 2, [1, 2]),
+        (4, 5, 0, [4, 5]),
+        (5, 5, 0, [5]),
+        (1, 1, 0, [1]),
+    ])
+    def test_iter_pages(
+            self,
+            page: int,
+            total_pages: int,
+            pages: int,
+            expected: list[int],
+    ) -> None:
+        fetched = []
+
+        def fetch(p: int) -> int:
+            fetched.append(p)
+            return p
+
+        results = iter_pages(
+            fetch, page, page, lambda _: total_pages, pages=pages)
+        self.assertEqual(list(results), expected)
+        # The first page is already fetched
+        self.assertEqual(fetched, expected[1:])
+
+    def test_iter_pages_fetches_on_demand(self) -> None:
+        fetched = []
+        results = iter_pages(fetched.append, 1, 1, lambda _: 10)
+        next(results)
+        next(results)
+        self.assertEqual(fetched, [2])
+
+    def test_iter_pages_pager(self) -> None:
+        asked = []
+
+        def pager(page: int, total_pages: int) -> bool:
+            asked.append((page, total_pages))
+            return page < 2
+
+        results = iter_pages(lambda p: p, 1, 1, lambda _: 5, pager=pager)
+        self.assertEqual(list(results), [1, 2])
+        self.assertEqual(asked, [(1, 5), (2, 5)])
+
+    @parameterized.expand([
+        (120,),
+        # Columns are reduced to fit the terminal
+        (40,),
+    ])
+    def test_batches_join_into_one_table(self, width: int) -> None:
+        widths = [12, 40, 4]
+        headers = ["User", "Message", "ID"]
+
+        console = make_console(width)
+        stream = TableStream(console, widths, headers=headers, title="Title")
+        for page in range(1, 4):
+            stream.write(make_rows(page))
+        stream.close()
+
+        expected = make_console(width)
+        table = TableStream(expected, widths, headers=headers, title="Title")
+        table.write(
+            row for page in range(1, 4) for row in make_rows(page))
+        table.close()
+
+        self.assertEqual(
+            console.file.getvalue(), expected.file.getvalue())
+        self.assertEqual(stream.rows_count, 9)
+
+    def test_stream_table(self) -> None:
+        console = make_console()
+        count = stream_table(
+            console,
+            iter_pages(lambda p: p, 1, 1, lambda _: 3),
+            rows=make_rows,
+            widths=[12, 40, 4],
+            title="Messages",
+            caption=lambda page: f"Page: {page}",
+        )
+        output = console.file.getvalue()
+        self.assertEqual(count, 9)
+        self.assertEqual(output.count("Messages"), 1)
+        self.assertIn("user3-2", output)
+        self.assertTrue(output.rstrip().endswith("Page: 3"))
+
+    def test_max_cell_width(self) -> None:
+        console = make_console()
+        stream_table(
+            console,
+            [2],
+            rows=make_rows,
+            widths=[12, 40, 4],
+            max_cell_width=15,
+        )
+        output = console.file.getvalue()
+        self.assertIn("сообщение сообщ...", output)
+        self.assertNotIn("сообщение сообщение", output)
@@ -0,0 +1,59 @@
+import unittest
+
+from parameterized import parameterized
+from rich.text import Text
+
+from habr.career.cli.utils import truncate_chars
+from habr.career.cli.utils.text import (
+    str_display_width,
+    truncate_cell,
+    truncate_to_width,
+)
+
+
+class TextTestCase(unittest.TestCase):
+    @parameterized.expand([
+        ("", 0),
+        ("Python", 6),
+        ("Разработчик — Python", 20),
+        ("日本語", 6),
+        ("Ａ１", 4),
+        ("a日b", 4),
+    ])
+    def test_str_display_width(self, text: str, width: int) -> None:
+        self.assertEqual(str_display_width(text), width)
+
+    @parameterized.expand([
+        ("Python", 10, "Python"),
+        ("Python developer", 6, "Python..."),
+        ("Разработчик", 4, "Разр..."),
+        ("日本語です", 5, "日本..."),
+        ("日本語", 6, "日本語"),
+        ("a日本", 2, "a..."),
+    ])
+    def test_truncate_to_width(self, text: str, width: int, result: str):
+        self.assertEqual(truncate_to_width(text, width), result)
+
+    def test_truncate_chars(self) -> None:
+        self.assertEqual(
+            truncate_chars("<p>Добрый\nдень</p>", 8), "Добрый д...")
+
+    @parameterized.expand([
+        ("Python", "Python"),
+        ("Python developer\nDjango", "Python...\nDjango"),
+        ("[blue]Python[/blue] developer", "Python..."),
+        (Text("日本語です\n日本"), "日本語...\n日本"),
+    ])
+    def test_truncate_cell(self, cell: str | Text, plain: str) -> None:
+        result = truncate_cell(cell, 6)
+        self.assertEqual(getattr(result, "plain", result), plain)
+
+    def test_truncate_cell_keeps_styles(self) -> None:
+        cell = Text("\n").join([Text("ID"), Text("Python developer", "blue")])
+        result = truncate_cell(cell, 6)
+        self.assertEqual(result.plain, "ID\nPython...")
+        self.assertEqual(
+            [(x.start, x.end, x.style) for x in result.spans],
+            [(3, 9, "blue")],
+        )
+        self.assertIs(truncate_cell(42, 1), 42)
@@ -0,0 +1,101 @@
+import math
+import unittest
+
+from parameterized import parameterized
+
+from habr.career.client.resumes.analytics import (
+    GroupBy,
+    SalaryAnalytics,
+    histogram,
+    percentiles,
+)
+from habr.career.client.resumes.columnar import ResumeColumns
+from habr.career.utils import Currency
+
+
+def resume(
+        index: int,
+        salary: int | None,
+        currency: str = "rur",
+        qualification: int = 4,
+        skills: tuple[int, ...] = (),
+        remote: bool = False,
+) -> dict:
+    return {
+        "id": f"user{index}",
+        "salary": salary and {
+            "title": str(salary), "value": salary, "currency": currency},
+        "qualification": {"title": f"Q{qualification}", "value": qualification},
+        "location": {"title": "Москва", "value": 678},
+        "remoteWork": remote,
+        "skills": [{"title": f"S{s}", "value": s} for s in skills],
+        "specializations": [{"title": "Backend"}],
+    }
+
+
+class AnalyticsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.columns = ResumeColumns.from_pages([{"list": [
+            resume(0, 100000, qualification=3, skills=(1,)),
+            resume(1, 200000, qualification=4, skills=(1, 2), remote=True),
+            resume(2, 300000, qualification=5, skills=(2,)),
+            resume(3, 4000, currency="usd", qualification=5, skills=(1,)),
+            resume(4, 1000, currency="kzt"),
+            resume(5, None),
+        ]}])
+        self.analytics = SalaryAnalytics(self.columns, {Currency.USD: 100})
+
+    @parameterized.expand([
+        ([1, 2, 3, 4], (0, 50, 100), [1, 2.5, 4]),
+        ([4, 1, math.nan, 3, 2], (25, 75), [1.75, 3.25]),
+        ([7], (10, 90), [7, 7]),
+    ])
+    def test_percentiles(self, values: list, qs: tuple, expected: list):
+        self.assertEqual(list(percentiles(values, qs).values()), expected)
+
+    def test_percentiles_empty(self):
+        self.assertTrue(math.isnan(percentiles([], (50,))[50]))
+        with self.assertRaises(ValueError):
+            percentiles([1], (101,))
+
+    def test_histogram(self):
+        edges, counts = histogram([0, 1, 2, 3, 4, math.nan], bins=4)
+        self.assertEqual(edges.tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(counts.tolist(), [1, 1, 1, 2])
+        _, counts = histogram([0, 5, 10], bins=2, range_=(0, 6))
+        self.assertEqual(counts.tolist(), [1, 1])
+
+    def test_currency_normalization(self):
+        self.assertEqual(self.analytics.values[3], 400000)
+        self.assertTrue(math.isnan(self.analytics.values[4]))
+        self.assertTrue(math.isnan(self.analytics.values[5]))
+        self.assertEqual(self.analytics.unconverted, 1)
+        self.assertEqual(self.analytics.percentiles((0, 100)),
+                         {0: 100000, 100: 400000})
+
+        in_usd = SalaryAnalytics(self.columns, {"rur": 0.01}, Currency.USD)
+        self.assertEqual(in_usd.summary((50,)).percentiles[50], 2500)
+
+    def test_mask(self):
+        mask = self.analytics.mask(skills=[1])
+        self.assertEqual(list(mask), [1, 1, 0, 1, 0, 0])
+        mask = self.analytics.mask(skills=[1], qualifications=[5])
+        self.assertEqual(self.analytics.selected(mask), [400000])
+        mask = self.analytics.mask(remote_work=True)
+        self.assertEqual(self.analytics.selected(mask), [200000])
+        mask = self.analytics.mask(specializations=["Frontend"])
+        self.assertEqual(self.analytics.summary(mask=mask).count, 0)
+
+    def test_group_by(self):
+        groups = self.analytics.group_by(GroupBy.SKILL, (50,))
+        self.assertEqual(
+            [(g.title, g.count, g.percentiles[50]) for g in groups],
+            [("S1", 3, 200000), ("S2", 2, 250000)],
+        )
+        groups = self.analytics.group_by(
+            GroupBy.QUALIFICATION, (50,), min_count=2)
+        self.assertEqual([(g.key, g.title, g.mean) for g in groups],
+                         [(5, "Q5", 350000)])
+        groups = self.analytics.group_by(GroupBy.REMOTE_WORK)
+        self.assertEqual([(g.title, g.count) for g in groups],
+                         [("Нет", 3), ("Да", 1)])
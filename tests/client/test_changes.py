@@ -0,0 +1,155 @@
+import json
+import threading
+
+from habr.career.client.vacancies.changes import (
+    ChangeKind,
+    ChangeStore,
+    VacancyFeed,
+    fingerprint,
+)
+from habr.career.utils import ResponseError
+from tests.fixtures import vacancy
+from tests.utils import SQLiteTestCase
+
+PER_PAGE = 2
+
+
+class FakeClient:
+    def __init__(self, count: int):
+        self.vacancies = {}
+        for i in range(count):
+            item = vacancy(i)
+            self.vacancies[item["id"]] = item
+        self.descriptions = {}
+        self.details = []
+        self.unlisted = set()
+        self.lock = threading.Lock()
+
+    def get_vacancies(self, page: int = 1, **filters) -> dict:
+        items = [item for id_, item in self.vacancies.items()
+                 if id_ not in self.unlisted]
+        return {
+            "list": items[(page - 1) * PER_PAGE:page * PER_PAGE],
+            "meta": {"totalPages": -(-len(items) // PER_PAGE)},
+        }
+
+    def get_vacancy(self, id_: int) -> dict:
+        with self.lock:
+            self.details.append(id_)
+        if id_ not in self.vacancies:
+            raise ResponseError(status=404, error="Not Found")
+        return {"vacancy": {
+            **self.vacancies[id_],
+            "description": self.descriptions.get(id_, "<p>Описание</p>"),
+        }}
+
+
+class ChangesTestCase(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = FakeClient(5)
+        self.feed = VacancyFeed(
+            self.client, ChangeStore(self.path), {"search": "python"})
+
+    def test_fingerprint(self):
+        item = vacancy(0)
+        self.assertEqual(len(fingerprint(item)), 48)
+        self.assertEqual(fingerprint(item)[:40], fingerprint(
+            item, {"description": "<p>Текст</p>"})[:40])
+        self.assertEqual(fingerprint(item, {"description": "<p>Текст</p>"}),
+                         fingerprint(item, {"description": "Текст"}))
+        # Skills order doesn't matter
+        reordered = {**item, "skills": item["skills"][::-1]}
+        self.assertEqual(fingerprint(item), fingerprint(reordered))
+
+    def test_poll(self):
+        changes = self.feed.poll()
+        self.assertEqual([c.kind for c in changes], [ChangeKind.INSERT] * 5)
+        self.assertEqual(changes[0].vacancy["description"], "<p>Описание</p>")
+        self.assertEqual(len(self.client.details), 5)
+
+        # Nothing changed, details are not fetched
+        self.client.details.clear()
+        self.assertEqual(self.feed.poll(), [])
+        self.assertEqual(self.client.details, [])
+
+        vacancies = self.client.vacancies
+        vacancies[1000000001]["salary"] = {**vacancies[1000000001]["salary"],
+                                           "to": 1}
+        vacancies[1000000002]["archived"] = True
+        self.client.descriptions[1000000002] = "<p>Новое описание</p>"
+        del vacancies[1000000003]
+        item = vacancy(9)
+        vacancies[item["id"]] = item
+
+        events = []
+        changes = self.feed.poll(callback=events.append)
+        self.assertEqual(events, changes)
+        self.assertEqual(
+            [(c.kind, c.id, c.fields) for c in changes],
+            [
+                (ChangeKind.UPDATE, 1000000001, ["salary"]),
+                (ChangeKind.UPDATE, 1000000002, ["archived", "description"]),
+                (ChangeKind.INSERT, 1000000009, []),
+                (ChangeKind.DELETE, 1000000003, []),
+            ],
+        )
+        # The deleted vacancy is confirmed
+        self.assertEqual(sorted(self.client.details),
+                         [1000000001, 1000000002, 1000000003, 1000000009])
+        self.assertEqual(json.loads(changes[-1].to_json()), {
+            "kind": "delete", "id": 1000000003, "fields": [], "vacancy": None,
+        })
+        self.assertEqual(self.feed.poll(), [])
+
+    def test_missing_vacancy(self):
+        self.feed.poll()
+        # Moved between concurrently fetched pages, it's still there
+        self.client.unlisted.add(1000000001)
+        self.assertEqual(self.feed.poll(), [])
+        self.assertEqual(self.feed.store.missing(self.feed.key), {1000000001})
+        self.client.unlisted.clear()
+        self.assertEqual(self.feed.poll(), [])
+        self.assertEqual(self.feed.store.missing(self.feed.key), set())
+
+        # Missing from two lists in a row, it doesn't match the filters
+        self.client.unlisted.add(1000000001)
+        self.assertEqual(self.feed.poll(), [])
+        self.client.details.clear()
+        [change] = self.feed.poll()
+        self.assertEqual((change.kind, change.id),
+                         (ChangeKind.DELETE, 1000000001))
+        self.assertEqual(self.client.details, [])
+        self.assertEqual(self.feed.store.missing(self.feed.key), set())
+
+        # Hidden vacancies are deleted at once
+        self.client.vacancies[1000000002]["hidden"] = True
+        self.client.unlisted.add(1000000002)
+        [change] = self.feed.poll()
+        self.assertEqual((change.kind, change.id),
+                         (ChangeKind.DELETE, 1000000002))
+
+    def test_feeds(self):
+        self.feed.poll()
+        other = VacancyFeed(
+            self.client, self.feed.store, {"search": "go"}, pages=1)
+        self.assertEqual(len(other.poll()), PER_PAGE)
+        # Vacancies out of polled pages are not deleted
+        self.assertEqual(other.poll(), [])
+        self.assertIsNotNone(self.feed.store.polled_at(other.key))
+        self.assertIsNone(self.feed.store.polled_at("unknown"))
+
+    def test_failed_poll(self):
+        def get_vacancy(id_: int) -> dict:
+            raise RuntimeError("Failed")
+
+        self.client.get_vacancy = get_vacancy
+        with self.assertRaises(RuntimeError):
+            self.feed.poll()
+        # Nothing is saved, the next poll reports the same events
+        del self.client.get_vacancy
+        self.assertEqual(len(self.feed.poll()), 5)
+
+    def test_watch(self):
+        changes = list(self.feed.watch(interval=0, polls=2))
+        self.assertEqual(len(changes), 5)
@@ -0,0 +1,56 @@
+import importlib.util
+import unittest
+
+from habr.career.client.resumes.columnar import ResumeColumns
+from habr.career.client.resumes.models import Resumes
+from tests.fixtures import example
+
+
+class ResumeColumnsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.page = example(Resumes)
+        self.page["list"][1]["salary"] = None
+        self.page["list"][1]["skills"] = []
+        self.columns = ResumeColumns.from_pages([self.page, self.page])
+
+    def test_columns(self):
+        items = self.page["list"]
+        self.assertEqual(len(self.columns), len(items) * 2)
+        self.assertEqual(self.columns.salary[0], items[0]["salary"]["value"])
+        self.assertEqual(self.columns.salary[1], -1)
+        self.assertEqual(self.columns.ids[:2], [items[0]["id"], items[1]["id"]])
+
+    def test_row(self):
+        item = self.page["list"][0]
+        row = self.columns[0]
+        self.assertEqual(row.id, item["id"])
+        self.assertEqual(row.currency, item["salary"]["currency"])
+        self.assertEqual(row.skills, [x["value"] for x in item["skills"]])
+        self.assertEqual(row.specializations,
+                         [x["title"] for x in item["specializations"]])
+        self.assertEqual(row.last_visited.isoformat(timespec="seconds")[:10],
+                         item["lastVisited"]["date"][:10])
+
+        row = self.columns[-len(self.page["list"]) + 1]
+        self.assertIsNone(row.salary)
+        self.assertIsNone(row.currency)
+        self.assertEqual(row.skills, [])
+
+    def test_from_model(self):
+        columns = ResumeColumns.from_pages([Resumes(**self.page)])
+        self.assertEqual(columns[0].as_dict(), self.columns[0].as_dict())
+
+    def test_memory(self):
+        self.assertLess(self.columns.nbytes / len(self.columns), 200)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "requires numpy")
+    def test_to_numpy(self):
+        arrays = self.columns.to_numpy()
+        self.assertEqual(arrays["salary"].tolist(),
+                         self.columns.salary.tolist())
+        self.assertEqual(arrays["remote_work"].dtype.name, "bool")
+        self.assertEqual(arrays["id"].tolist(), self.columns.ids)
+        # Arrays don't hold column buffers, rows can still be appended
+        self.columns.append_page(self.page)
+        self.assertEqual(len(arrays["salary"]) + len(self.page["list"]),
+                         len(self.columns))
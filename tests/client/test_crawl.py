@@ -0,0 +1,107 @@
+from parameterized import parameterized
+
+from habr.career import codec
+from habr.career.client.crawl import (
+    CrawlCoordinator,
+    CrawlWorker,
+    SQLiteWorkQueue,
+    UnitKind,
+    UnitStatus,
+    total_pages,
+)
+from habr.career.client.resumes.models import Resumes
+from habr.career.client.validation import validate
+from habr.career.utils import ValidationMode
+from tests.fixtures import example
+from tests.utils import SQLiteTestCase
+
+
+class FakeClient:
+    def __init__(self, fail_usernames=()):
+        self.fail_usernames = set(fail_usernames)
+
+    def get_vacancies(self, page: int = 1, per_page: int = 15, **kwargs):
+        return {
+            "list": [{"id": page * 100 + i} for i in range(per_page)],
+            "meta": {"totalPages": 3, "currentPage": page},
+        }
+
+    def get_profile(self, username: str):
+        if username in self.fail_usernames:
+            raise RuntimeError("Broken profile")
+        return {"user": {"alias": username}}
+
+
+class CrawlTestCase(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.queue = SQLiteWorkQueue(self.path)
+        self.coordinator = CrawlCoordinator(self.queue)
+
+    def test_plan_pages(self):
+        added = self.coordinator.plan_vacancies(
+            "test", FakeClient(), per_page=2, remote=True)
+        self.assertEqual(added, 3)
+        # Planning again does not duplicate units
+        self.coordinator.plan_vacancies("test", pages=3, per_page=2,
+                                        remote=True)
+        self.assertEqual(self.queue.stats("test")[UnitStatus.PENDING], 3)
+
+    def test_worker_commits_results(self):
+        self.coordinator.plan_vacancies("test", FakeClient(), per_page=2)
+        processed = CrawlWorker(self.queue, FakeClient()).run("test")
+        self.assertEqual(processed, 3)
+        results = list(self.queue.results("test"))
+        self.assertEqual(
+            [unit.params["page"] for unit, _ in results], [1, 2, 3])
+        self.assertEqual(results[1][1]["list"], [{"id": 200}, {"id": 201}])
+        self.assertEqual(self.queue.stats("test")[UnitStatus.DONE], 3)
+
+    def test_expired_lease_is_released(self):
+        self.coordinator.plan_profiles("test", ["a", "b"])
+        # Worker crashed right after taking the lease
+        units = self.queue.lease("crashed", limit=2, timeout=-1)
+        self.assertEqual([u.kind for u in units], [UnitKind.PROFILE] * 2)
+
+        CrawlWorker(self.queue, FakeClient(), worker_id="alive").run()
+        self.assertEqual(self.queue.stats("test")[UnitStatus.DONE], 2)
+        # Lost lease can not be committed anymore
+        self.assertFalse(self.queue.commit(units[0], "crashed", {}))
+
+    def test_active_lease_is_kept(self):
+        self.coordinator.plan_profiles("test", ["a"])
+        self.queue.lease("other", timeout=300)
+        self.assertEqual(self.queue.lease("worker"), [])
+
+    def test_failed_units(self):
+        self.coordinator.plan_profiles("test", ["a", "broken"])
+        worker = CrawlWorker(self.queue, FakeClient({"broken"}),
+                             max_attempts=2)
+        worker.run()
+        stats = self.queue.stats("test")
+        self.assertEqual(stats[UnitStatus.DONE], 1)
+        self.assertEqual(stats[UnitStatus.FAILED], 1)
+
+    def test_expired_lease_attempts(self):
+        self.coordinator.plan_profiles("test", ["a"])
+        # Unit kills its worker every time, so `fail` is never called
+        for _ in range(2):
+            self.assertEqual(
+                len(self.queue.lease("crashed", timeout=-1, max_attempts=2)),
+                1)
+        self.assertEqual(self.queue.lease("worker", max_attempts=2), [])
+        stats = self.queue.stats("test")
+        self.assertEqual(stats[UnitStatus.FAILED], 1)
+        self.assertEqual(stats.get(UnitStatus.LEASED, 0), 0)
+
+    @parameterized.expand([
+        (ValidationMode.STRICT,),
+        (ValidationMode.LAZY,),
+        (ValidationMode.RAW,),
+    ])
+    def test_total_pages(self, mode: ValidationMode):
+        data = example(Resumes)
+        expected = data["meta"]["totalPages"]
+        page = validate(Resumes, data, mode)
+        self.assertEqual(total_pages(page), expected)
+        self.assertEqual(total_pages(codec.dumpb(data)), expected)
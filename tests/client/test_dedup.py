@@ -0,0 +1,114 @@
+import unittest
+
+from parameterized import parameterized
+
+from habr.career.client.crawl import (
+    CrawlCoordinator,
+    CrawlWorker,
+    SQLiteWorkQueue,
+)
+from habr.career.client.vacancies.dedup import (
+    VacancyDeduplicator,
+    shingles,
+    vacancy_text,
+)
+from tests.fixtures import vacancy
+from tests.utils import temp_path
+
+WORDS = [f"word{i}" for i in range(200)]
+
+
+def posting(index: int, company: str, words: list[str]) -> dict:
+    item = vacancy(index)
+    item["title"] = "Python разработчик"
+    item["company"]["alias_name"] = company
+    item["company"]["title"] = company
+    item["description"] = "<p>" + "<br>".join(words) + "</p>"
+    return {"vacancy": item}
+
+
+class FakeClient:
+    def get_vacancies(self, page: int = 1, **filters) -> dict:
+        return {"list": [
+            posting(page, "acme", WORDS)["vacancy"],
+            posting(page + 10, "acme", WORDS[:-2])["vacancy"],
+        ]}
+
+
+class DedupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dedup = VacancyDeduplicator()
+
+    @parameterized.expand([
+        ("", set()),
+        ("Go", {"go"}),
+        ("Senior Go, Rust", {"senior go rust"}),
+        ("a b c d", {"a b c", "b c d"}),
+    ])
+    def test_shingles(self, text: str, expected: set[str]):
+        self.assertEqual(shingles(text), expected)
+
+    def test_vacancy_text(self):
+        text = vacancy_text(posting(1, "acme", ["one", "two"]))
+        self.assertTrue(text.startswith("Python разработчик\nacme\n"))
+        self.assertTrue(text.endswith("Навык 4\none\ntwo"))
+
+    def test_signature(self):
+        a = self.dedup.signature(posting(0, "acme", WORDS))
+        b = self.dedup.signature(posting(1, "other", WORDS))
+        c = self.dedup.signature(posting(2, "acme", WORDS[:100]))
+        self.assertEqual(len(a), 64)
+        # Company title is a part of the text
+        self.assertGreater(self.dedup.similarity(a, b), 0.8)
+        # About a half of shingles is shared
+        self.assertAlmostEqual(self.dedup.similarity(a, c), 0.5, delta=0.2)
+        self.assertEqual(
+            self.dedup.signature({"id": 1}).tolist(), [2 ** 64 - 1] * 64)
+
+    def test_add(self):
+        first = self.dedup.add(posting(0, "acme", WORDS))
+        self.assertFalse(first.duplicate)
+        self.assertEqual(first.cluster, "1000000000")
+
+        reworded = self.dedup.add(posting(1, "acme", WORDS[:-3] + ["new"]))
+        self.assertTrue(reworded.duplicate)
+        self.assertEqual(reworded.cluster, first.cluster)
+        self.assertGreater(reworded.similarity, 0.7)
+
+        # Another company and a different text start new clusters
+        self.assertFalse(self.dedup.add(posting(2, "other", WORDS)).duplicate)
+        self.assertFalse(
+            self.dedup.add(posting(3, "acme", WORDS[:60])).duplicate)
+        # Indexed vacancy keeps its entry
+        self.assertIs(self.dedup.add(posting(1, "acme", [])), reworded)
+
+        self.assertEqual(len(self.dedup), 4)
+        self.assertEqual(self.dedup.clusters(),
+                         {"1000000000": ["1000000000", "1000000001"]})
+        self.assertEqual(len(self.dedup.clusters(min_size=1)), 3)
+        self.assertEqual(self.dedup.cluster(1000000001), "1000000000")
+        self.assertIsNone(self.dedup.cluster(1))
+
+    def test_any_company(self):
+        dedup = VacancyDeduplicator(same_company=False)
+        dedup.add(posting(0, "acme", WORDS))
+        self.assertEqual(
+            dedup.add(posting(1, "other", WORDS)).cluster, "1000000000")
+
+    def test_annotate(self):
+        items = self.dedup.annotate([
+            posting(0, "acme", WORDS)["vacancy"],
+            posting(1, "acme", WORDS)["vacancy"],
+        ])
+        self.assertEqual([x["cluster"] for x in items], ["1000000000"] * 2)
+
+    def test_bands(self):
+        with self.assertRaises(ValueError):
+            VacancyDeduplicator(num_perm=64, bands=10)
+
+    def test_add_crawl(self):
+        queue = SQLiteWorkQueue(temp_path(self))
+        CrawlCoordinator(queue).plan_vacancies("dedup", pages=2)
+        CrawlWorker(queue, FakeClient()).run()
+        self.assertEqual(self.dedup.add_crawl(queue, "dedup"), 4)
+        self.assertEqual(len(self.dedup.clusters()), 1)
@@ -0,0 +1,169 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from habr.career.client.users.enrichment import (
+    EnrichmentStats,
+    ProfileCache,
+    ProfileEnricher,
+    normalize_profile,
+    resume_usernames,
+)
+from habr.career.utils import ResponseError
+from tests.server import StandInClient, StandInServer
+from tests.utils import SQLiteTestCase
+
+
+def profile(username: str) -> dict:
+    return {
+        "user": {
+            "id": username,
+            "title": username.title(),
+            "isExpert": False,
+            "specialization": {"title": "Backend Developer"},
+            "qualification": "Senior",
+            "divisions": [{"title": "Бэкенд"}],
+            "skills": [{"title": "Python"}, {"title": "Django"}],
+            "salary": "От 300 000 ₽",
+            "availability": "Ищу работу",
+            "location": "Москва",
+            "experience": "10 лет",
+            "contacts": {
+                "hint": {"title": "Контакты видны друзьям"},
+                "items": [{"title": "Telegram", "value": {"title": "@u"}}],
+            },
+            "achievements": [{"title": "Эксперт"}],
+            "achievementsTotal": 12,
+            "friends": {"total": 3},
+            "recommendationLetters": {"total": 1},
+        },
+        "resume": {
+            "about": {"value": "<p>Обо мне</p>"},
+            "companies": {"items": [{
+                "title": "Company",
+                "subtitle": "IT",
+                "positions": [{
+                    "title": "Developer",
+                    "duration": "2 года",
+                    "tags": [{"title": "Python"}],
+                    "message": "<p>Работа</p>",
+                }],
+            }]},
+            "education": {"items": [{
+                "title": "МГУ",
+                "courses": [{"title": "ВМК"}],
+            }]},
+        },
+    }
+
+
+class FakeClient:
+    def __init__(self, pages: int = 3):
+        self.pages = pages
+        self.fetched = []
+        self.failing = set()
+        self.lock = threading.Lock()
+
+    def get_resumes(self, page: int = 1, **filters):
+        # Usernames repeat between pages
+        return SimpleNamespace(
+            objects=[SimpleNamespace(id=f"user{page + i}") for i in range(2)],
+            meta=SimpleNamespace(total_pages=self.pages),
+        )
+
+    def get_profile(self, username: str) -> dict:
+        with self.lock:
+            self.fetched.append(username)
+        if username in self.failing:
+            raise ResponseError(status=500, error="Failed")
+        return profile(username)
+
+
+class EnrichmentTestCase(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = FakeClient()
+        self.cache = ProfileCache(self.path)
+        self.enricher = ProfileEnricher(
+            self.client, self.cache, max_age=60, fetch_workers=2, batch=2)
+
+    def test_normalize_profile(self):
+        result = normalize_profile(profile("alice"))
+        self.assertEqual(result.username, "alice")
+        self.assertEqual(result.specialization, "Backend Developer")
+        self.assertEqual(result.qualification, "Senior")
+        self.assertEqual(result.skills, ["Python", "Django"])
+        self.assertEqual(result.contacts_visibility, "Контакты видны друзьям")
+        self.assertEqual(result.contacts, ["Telegram"])
+        self.assertEqual((result.friends, result.recommendations,
+                          result.achievements_total), (3, 1, 12))
+        self.assertEqual(result.about, "Обо мне")
+        self.assertEqual(result.companies[0].positions[0].skills, ["Python"])
+        self.assertEqual(result.education[0].courses, ["ВМК"])
+
+        # Missing sections are left empty
+        empty = normalize_profile({})
+        self.assertEqual((empty.username, empty.companies), ("", []))
+
+    def test_resume_usernames(self):
+        self.assertEqual(resume_usernames(self.client),
+                         ["user1", "user2", "user3", "user4"])
+        self.assertEqual(resume_usernames(self.client, pages=1),
+                         ["user1", "user2"])
+
+    def test_enrich(self):
+        stats = EnrichmentStats()
+        profiles = list(self.enricher.enrich(
+            ["alice", "bob", "alice", "carol"], stats=stats))
+        self.assertEqual(sorted(p.username for p in profiles),
+                         ["alice", "bob", "carol"])
+        self.assertEqual((stats.users, stats.fetched, stats.cached),
+                         (3, 3, 0))
+        self.assertGreater(profiles[0].fetched_at, 0)
+
+        # Fresh profiles are taken from the cache
+        self.client.fetched.clear()
+        stats = EnrichmentStats()
+        profiles = list(self.enricher.enrich(["carol", "dave"], stats=stats))
+        self.assertEqual([p.username for p in profiles], ["carol", "dave"])
+        self.assertEqual(self.client.fetched, ["dave"])
+        self.assertEqual((stats.fetched, stats.cached), (1, 1))
+
+        # Stale ones are fetched again
+        self.enricher.max_age = 0
+        time.sleep(0.01)
+        self.client.fetched.clear()
+        list(self.enricher.enrich(["carol"]))
+        self.assertEqual(self.client.fetched, ["carol"])
+
+    def test_failed(self):
+        self.client.failing.add("bob")
+        stats = EnrichmentStats()
+        profiles = list(self.enricher.enrich(["alice", "bob"], stats=stats))
+        self.assertEqual([p.username for p in profiles], ["alice"])
+        self.assertEqual(list(stats.failed), ["bob"])
+        self.assertIsNone(self.cache.get("bob"))
+
+        # Failed users are retried by the next run
+        self.client.failing.clear()
+        stats = EnrichmentStats()
+        list(self.enricher.enrich(["alice", "bob"], stats=stats))
+        self.assertEqual((stats.cached, stats.fetched), (1, 1))
+
+    def test_interrupted(self):
+        profiles = self.enricher.enrich(["alice", "bob", "carol"])
+        next(profiles)
+        profiles.close()
+        # Profiles yielded before iteration stopped are saved
+        self.assertEqual(len(self.cache.fresh(["alice", "bob", "carol"])), 1)
+
+    def test_ssr_pages(self):
+        with StandInServer() as server:
+            client = StandInClient(server.url)
+            for parse_workers in (0, 1):
+                enricher = ProfileEnricher(
+                    client, self.cache, max_age=0,
+                    parse_workers=parse_workers)
+                profiles = list(enricher.enrich(["user0", "user1"]))
+                self.assertEqual(sorted(p.username for p in profiles),
+                                 ["user0", "user1"])
@@ -0,0 +1,149 @@
+import math
+import threading
+from datetime import date
+
+from parameterized import parameterized
+
+from habr.career.client.salaries import HABRCareerSalariesMixin
+from habr.career.client.salaries.history import (
+    MY_SALARY,
+    SalaryHistory,
+    percent_change,
+    period_key,
+    series_key,
+)
+from habr.career.client.salaries.models import MySalary, SalaryDynamicGraph
+from habr.career.utils import Qualification
+from tests.utils import SQLiteTestCase
+
+TITLES = {221: "1-е пол. 2022", 222: "2-е пол. 2022", 231: "1-е пол. 2023"}
+
+
+class FakeClient(HABRCareerSalariesMixin):
+    def __init__(self, values: dict[int, float]):
+        self.values = values
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_salary_dynamic_graph(self, **filters) -> SalaryDynamicGraph:
+        with self.lock:
+            self.calls.append(filters)
+        return SalaryDynamicGraph.model_validate({
+            "graphs_data": {
+                "title": "Средняя зарплата по рынку",
+                "periods": [
+                    {"key": k, "value": v, "title": TITLES[k]}
+                    for k, v in self.values.items()
+                ],
+            },
+        })
+
+    def my_salary(self) -> MySalary:
+        with self.lock:
+            self.calls.append(MY_SALARY)
+        return MySalary.model_validate({
+            "periods": [
+                {"key": 221, "value": None, "title": TITLES[221]},
+                {"key": 222, "value": 200000, "title": TITLES[222]},
+            ],
+            "lastSalary": {
+                "value": 200000,
+                "qualification": "Senior",
+                "specialization": "backend",
+            },
+            "currentPeriod": {},
+            "feedbackIsActive": True,
+            "leftFeedback": False,
+            "hasServices": False,
+        })
+
+
+class HistoryTestCase(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.history = SalaryHistory(self.path)
+
+    def test_series_key(self):
+        self.assertEqual(
+            series_key({
+                "qualification": Qualification.SENIOR,
+                "specializations": ["frontend", "backend"],
+                "remote": None,
+            }),
+            series_key({
+                "specializations": ["backend", "frontend"],
+                "qualification": "Senior",
+            }),
+        )
+
+    @parameterized.expand([
+        (date(2023, 1, 1), 231),
+        (date(2023, 6, 30), 231),
+        (date(2023, 7, 1), 232),
+        (date(2030, 12, 31), 302),
+    ])
+    def test_period_key(self, day: date, key: int):
+        self.assertEqual(period_key(day), key)
+
+    def test_percent_change(self):
+        changes = percent_change([100, 150, 0, 10])
+        self.assertEqual(changes[:2].tolist(), [50.0, -100.0])
+        self.assertTrue(math.isnan(changes[2]))
+
+    def test_append_only_changes(self):
+        client = FakeClient({221: 100, 222: 200})
+        filters = {"qualification": Qualification.JUNIOR}
+        key = series_key(filters)
+
+        client.record_salary_dynamic_graph(self.history, **filters)
+        client.values = {221: 100, 222: 210, 231: 300}
+        # The same values are not appended again
+        self.assertEqual(
+            self.history.append(key, client.get_salary_dynamic_graph()
+                                .graphs_data.periods), 2)
+
+        periods, values = self.history.series(key)
+        self.assertEqual(periods.tolist(), [221, 222, 231])
+        self.assertEqual(values.tolist(), [100, 210, 300])
+        periods, values = self.history.series(key, start=222, end=222)
+        self.assertEqual(values.tolist(), [210])
+        self.assertEqual(self.history.change(key), 200.0)
+        self.assertEqual(
+            self.history.period_titles([221, 999]), [TITLES[221], "999"])
+        self.assertEqual(self.history.title(key), "Средняя зарплата по рынку")
+
+    def test_refresh_stale_only(self):
+        client = FakeClient({221: 100, 222: 200})
+        filters = [
+            {"qualification": Qualification.JUNIOR},
+            {"qualification": Qualification.SENIOR},
+        ]
+        fetched = self.history.refresh(
+            client, filters, my_salary=True, today=date(2022, 12, 1))
+        self.assertEqual(len(fetched), 3)
+        self.assertEqual(len(client.calls), 3)
+
+        # Latest period is the current one
+        fetched = self.history.refresh(
+            client, filters, my_salary=True, today=date(2022, 12, 1))
+        self.assertEqual(fetched, [])
+
+        # New period is due, but series were fetched recently
+        fetched = self.history.refresh(
+            client, filters, today=date(2023, 2, 1))
+        self.assertEqual(fetched, [])
+        fetched = self.history.refresh(
+            client, filters, today=date(2023, 2, 1), min_interval=0)
+        self.assertEqual(len(fetched), 2)
+
+    def test_aligned(self):
+        client = FakeClient({221: 100, 222: 200, 231: 300})
+        client.record_salary_dynamic_graph(self.history)
+        client.record_my_salary(self.history)
+
+        periods, series = self.history.aligned([series_key(), MY_SALARY])
+        self.assertEqual(periods.tolist(), [221, 222, 231])
+        self.assertEqual(series[series_key()].tolist(), [100, 200, 300])
+        my = series[MY_SALARY]
+        self.assertTrue(math.isnan(my[0]) and math.isnan(my[2]))
+        self.assertEqual(my[1], 200000)
@@ -0,0 +1,168 @@
+import importlib.util
+import random
+import unittest
+
+from parameterized import parameterized
+
+from habr.career.client.matching import (
+    MatchWeights,
+    ResumeMatcher,
+    VacancyFeatures,
+    qualification_score,
+)
+from tests.fixtures import vacancy
+
+
+def resume(
+        index: int,
+        skills: tuple[int, ...],
+        qualification: int = 5,
+        location: int = 678,
+        salary: int | None = None,
+        remote: bool = False,
+) -> dict:
+    return {
+        "id": f"user{index}",
+        "salary": salary and {
+            "title": str(salary), "value": salary, "currency": "rur"},
+        "qualification": {"title": f"Q{qualification}", "value": qualification},
+        "location": {"title": f"L{location}", "value": location},
+        "remoteWork": remote,
+        "skills": [{"title": f"S{s}", "value": s} for s in skills],
+    }
+
+
+def features(skills: list[int], **kwargs) -> VacancyFeatures:
+    return VacancyFeatures(**{
+        "id": "1",
+        "skills": skills,
+        "qualification": 5,
+        "location": 678,
+        "remote": False,
+        "salary_to": None,
+        "currency": None,
+        **kwargs,
+    })
+
+
+class MatchingTestCase(unittest.TestCase):
+    vectorized = False
+
+    def setUp(self):
+        self.matcher = ResumeMatcher(vectorized=self.vectorized)
+        self.matcher.add_page({"list": [
+            resume(0, (1, 2, 3)),
+            resume(1, (1, 2)),
+            resume(2, (1,), qualification=3),
+            resume(3, (4,)),
+            resume(4, (2, 9), location=1, remote=True),
+        ]})
+
+    def test_vacancy_features(self):
+        item = vacancy(3)
+        for data in (item, {"vacancy": item}):
+            result = VacancyFeatures.from_data(data)
+            self.assertEqual(result.id, "1000000003")
+            self.assertEqual(result.skills, [0, 1, 2, 3, 4])
+            self.assertEqual(result.salary_to, 400003)
+
+    @parameterized.expand([
+        (5, 5, 1.0),
+        (5, 4, 0.5),
+        (5, 3, 0.0),
+        (0, 3, 0.5),
+        (5, -1, 0.5),
+    ])
+    def test_qualification_score(self, vacancy_: int, resume_: int,
+                                 expected: float):
+        self.assertEqual(qualification_score(vacancy_, resume_), expected)
+
+    def test_match(self):
+        matches = self.matcher.match(features([1, 2, 3]), k=3)
+        # user2 and user4 tie, the earlier one wins
+        self.assertEqual([m.resume for m in matches],
+                         ["user0", "user1", "user2"])
+        self.assertEqual([m.skills for m in matches], [3, 2, 1])
+        self.assertAlmostEqual(matches[0].score, 1.0 - 0.1 * 0.5)
+
+        matches = self.matcher.match(features([1, 2]), min_skills=2)
+        self.assertEqual([m.resume for m in matches], ["user0", "user1"])
+
+    def test_match_features(self):
+        # Remote resume wins location, expected salary is within the range
+        matches = self.matcher.match(
+            features([2], remote=True, location=1), k=5)
+        self.assertEqual(matches[0].resume, "user4")
+        self.matcher.add_page({"list": [
+            resume(5, (7,), salary=100000),
+            resume(6, (7,), salary=300000),
+        ]})
+        matches = self.matcher.match(
+            features([7], salary_to=200000, currency="rur"))
+        self.assertEqual([m.resume for m in matches], ["user5", "user6"])
+        self.assertAlmostEqual(
+            matches[0].score - matches[1].score, 0.1 * 0.5)
+
+    def test_pruning_is_exact(self):
+        self.matcher.add_page({"list": [
+            resume(i, tuple(range(i % 7, i % 7 + 3)), qualification=i % 6,
+                   location=i % 3, salary=50000 * (i % 9 + 1))
+            for i in range(10, 400)
+        ]})
+        vacancy_ = features([1, 3, 5, 8], salary_to=250000, currency="rur")
+        weights = MatchWeights()
+        scorer = self.matcher._scorer(vacancy_)
+        skills = set(vacancy_.skills)
+        total = sum(self.matcher.idf(s) for s in skills)
+        expected = sorted(
+            (
+                weights.skills * sum(
+                    self.matcher.idf(s)
+                    for s in skills & set(self.matcher.columns.resume_skills(i))
+                ) / total + scorer(i),
+                -i,
+            )
+            for i in range(len(self.matcher.columns))
+            if skills & set(self.matcher.columns.resume_skills(i))
+        )[::-1][:10]
+        matches = self.matcher.match(vacancy_, k=10)
+        self.assertEqual([m.index for m in matches], [-i for _, i in expected])
+        for match, (score, _) in zip(matches, expected):
+            self.assertAlmostEqual(match.score, score)
+
+    def test_match_many_updates(self):
+        self.matcher.columns.append(resume(5, (8,)))
+        result = self.matcher.match_many([features([8])])
+        self.assertEqual([m.resume for m in result["1"]], ["user5"])
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "requires numpy")
+class VectorizedMatchingTestCase(MatchingTestCase):
+    vectorized = True
+
+    def test_same_as_stdlib(self):
+        rng = random.Random(1)
+        self.matcher.add_page({"list": [
+            resume(
+                i,
+                tuple(rng.sample(range(30), rng.randint(0, 5))),
+                qualification=rng.choice((1, 3, 4, 5, 6)),
+                location=rng.choice((1, 678, 679)),
+                salary=rng.choice((None, 100000, 200000, 300000)),
+                remote=rng.random() < 0.3,
+            )
+            for i in range(5, 500)
+        ]})
+        stdlib = ResumeMatcher(self.matcher.columns, vectorized=False)
+        for skills, min_skills in (([1, 2, 3], 1), ([4, 5], 2), ([], 1)):
+            vacancy_ = features(
+                skills, salary_to=250000, currency="rur", location=679)
+            expected = stdlib.match(vacancy_, k=20, min_skills=min_skills)
+            matches = self.matcher.match(
+                vacancy_, k=20, min_skills=min_skills)
+            self.assertEqual([m.index for m in matches],
+                             [m.index for m in expected])
+            self.assertEqual([m.skills for m in matches],
+                             [m.skills for m in expected])
+            for match, other in zip(matches, expected):
+                self.assertAlmostEqual(match.score, other.score)
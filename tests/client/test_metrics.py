@@ -0,0 +1,74 @@
+import unittest
+
+from parameterized import parameterized
+
+from habr.career.client.metrics import (
+    MetricsCollector,
+    RequestInfo,
+    endpoint_name,
+)
+
+
+def make_info(endpoint: str, status: int = 200, elapsed: float = 0.2,
+              error: Exception | None = None) -> RequestInfo:
+    info = RequestInfo("GET", endpoint, f"https://career.habr.com/{endpoint}")
+    info.status = status
+    info.bytes_received = 100
+    info.timings = {"network": elapsed / 2, "validation": elapsed / 4}
+    info.error = error
+    info.elapsed = elapsed
+    return info
+
+
+class MetricsTestCase(unittest.TestCase):
+    @parameterized.expand([
+        ("frontend/resumes", "frontend/resumes"),
+        ("frontend/vacancies/1000135136/favorite",
+         "frontend/vacancies/{id}/favorite"),
+        ("frontend/conversations/x55aah/messages",
+         "frontend/conversations/{username}/messages"),
+        ("frontend/conversations/templates/12",
+         "frontend/conversations/templates/{id}"),
+        ("frontend/users/x55aah/friendships",
+         "frontend/users/{username}/friendships"),
+        ("frontend_v1/courses/python-pro/scores",
+         "frontend_v1/courses/{alias}/scores"),
+    ])
+    def test_endpoint_name(self, path: str, expected: str):
+        self.assertEqual(endpoint_name(path), expected)
+
+    def test_summary(self):
+        metrics = MetricsCollector()
+        metrics.post_request(make_info("frontend/resumes", elapsed=0.2))
+        metrics.post_request(make_info("frontend/resumes", elapsed=3))
+        metrics.post_request(make_info(
+            "frontend/resumes", status=429, elapsed=0.01,
+            error=RuntimeError()))
+
+        summary = metrics.summary()["GET frontend/resumes"]
+        self.assertEqual(summary["count"], 3)
+        self.assertEqual(summary["errors"], 1)
+        self.assertEqual(summary["statuses"], {"200": 2, "429": 1})
+        self.assertEqual(summary["bytes_received"], 300)
+        buckets = summary["latency"]["buckets"]
+        self.assertEqual(buckets["0.01"], 1)
+        self.assertEqual(buckets["0.25"], 2)
+        self.assertEqual(buckets["5.0"], 3)
+        self.assertEqual(buckets["+Inf"], 3)
+
+    def test_prometheus(self):
+        metrics = MetricsCollector()
+        metrics.post_request(make_info("frontend/resumes"))
+        text = metrics.to_prometheus()
+        self.assertIn(
+            'habr_career_client_requests_total'
+            '{method="GET",endpoint="frontend/resumes",status="200"} 1',
+            text,
+        )
+        self.assertIn(
+            'habr_career_client_request_duration_seconds_bucket'
+            '{method="GET",endpoint="frontend/resumes",le="+Inf"} 1',
+            text,
+        )
+        metrics.reset()
+        self.assertEqual(metrics.summary(), {})
@@ -0,0 +1,41 @@
+import json
+import unittest
+
+from habr.career.client.resumes.models import Resumes
+from habr.career.utils import ResponseError
+from tests.server import StandInClient, StandInServer
+
+
+class PassthroughTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.client = StandInClient(self.server.url)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_bytes(self):
+        with self.client.passthrough():
+            body = self.client.get_resumes()
+        self.assertIsInstance(body, bytes)
+        Resumes(**json.loads(body))
+        # Mode is reset on exit
+        self.assertIsInstance(self.client.get_resumes(), Resumes)
+
+    def test_stream(self):
+        with self.client.passthrough(stream=True):
+            body = b"".join(self.client.get_resumes())
+        Resumes(**json.loads(body))
+
+    def test_ssr(self):
+        with self.client.passthrough():
+            body = self.client.get_profile("testuser")
+        self.assertIn("user", json.loads(body))
+
+    def test_error_shape(self):
+        self.server.failure_rate = 1
+        self.server.failure_status = 200
+        for stream in (False, True):
+            with self.client.passthrough(stream=stream):
+                with self.assertRaises(ResponseError):
+                    self.client.get_resumes()
@@ -0,0 +1,58 @@
+import unittest
+
+from habr.career.client.pipeline import (
+    SSRPage,
+    SSRPipeline,
+    cleanup_vacancy_description,
+    deferred_parsing,
+    parse_page,
+)
+from habr.career.client.resumes.models import Resumes
+from habr.career.utils import ResponseError
+from tests.server import StandInClient, StandInServer
+
+
+class PipelineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.client = StandInClient(self.server.url)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_deferred_parsing(self):
+        with deferred_parsing():
+            page = self.client.get_profile("testuser")
+        self.assertIsInstance(page, SSRPage)
+        self.assertEqual(parse_page(page), self.client.get_profile("testuser"))
+
+    def test_map(self):
+        usernames = [f"user{i}" for i in range(10)]
+        for parse_workers in (0, 2):
+            pipeline = SSRPipeline(fetch_workers=4,
+                                   parse_workers=parse_workers)
+            results = dict(pipeline.map(self.client.get_profile, usernames))
+            self.assertEqual(sorted(results), usernames)
+            for profile in results.values():
+                self.assertIn("user", profile)
+
+    def test_transform(self):
+        pipeline = SSRPipeline(parse_workers=1,
+                               transform=cleanup_vacancy_description)
+        [(_, vacancy)] = pipeline.map(self.client.get_vacancy, [1000000000])
+        self.assertIsInstance(vacancy, dict)
+
+    def test_json_results(self):
+        pipeline = SSRPipeline(parse_workers=0)
+        [(_, resumes)] = pipeline.map(lambda _: self.client.get_resumes(), [1])
+        self.assertIsInstance(resumes, Resumes)
+
+    def test_errors(self):
+        self.server.failure_rate = 1
+        pipeline = SSRPipeline(parse_workers=0)
+        with self.assertRaises(ResponseError):
+            list(pipeline.map(self.client.get_profile, ["testuser"]))
+
+        pipeline = SSRPipeline(parse_workers=0, return_exceptions=True)
+        [(_, error)] = pipeline.map(self.client.get_profile, ["testuser"])
+        self.assertIsInstance(error, ResponseError)
@@ -0,0 +1,77 @@
+import unittest
+
+from habr.career.client.pool import ClientPool
+from habr.career.utils import (
+    ResponseError,
+    NotAuthorizedError,
+    NoActiveClientsError,
+)
+
+
+class FakeClient:
+    def __init__(self, name: str, error: Exception | None = None):
+        self.name = name
+        self.error = error
+        self.calls = 0
+
+    @property
+    def username(self) -> str:
+        return self.name
+
+    def get_profile(self, username: str) -> dict:
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return {"client": self.name, "username": username}
+
+
+class ClientPoolTestCase(unittest.TestCase):
+    def test_least_loaded_routing(self):
+        clients = [FakeClient("a"), FakeClient("b"), FakeClient("c")]
+        pool = ClientPool(clients)
+        for i in range(9):
+            pool.get_profile(f"user{i}")
+        self.assertEqual([c.calls for c in clients], [3, 3, 3])
+
+    def test_property_proxy(self):
+        pool = ClientPool([FakeClient("a")])
+        self.assertEqual(pool.username, "a")
+
+    def test_rate_limited_client_taken_out(self):
+        limited = FakeClient(
+            "a", ResponseError(status="429", error="Too Many Requests"))
+        pool = ClientPool([limited, FakeClient("b")])
+        result = pool.get_profile("test")
+        self.assertEqual(result["client"], "b")
+        self.assertEqual(len(pool.active_members), 1)
+        self.assertEqual(pool.members[0].disabled_reason, "rate_limit")
+
+    def test_rate_limited_client_returns(self):
+        limited = FakeClient(
+            "a", ResponseError(status=429, error="Too Many Requests"))
+        pool = ClientPool([limited, FakeClient("b")], rate_limit_timeout=0)
+        pool.get_profile("test")
+        self.assertEqual(len(pool.active_members), 2)
+
+    def test_not_authorized_client_taken_out(self):
+        pool = ClientPool([
+            FakeClient("a", NotAuthorizedError()),
+            FakeClient("b", ResponseError(status=401, error="Unauthorized")),
+            FakeClient("c"),
+        ])
+        self.assertEqual(pool.get_profile("test")["client"], "c")
+        self.assertEqual(len(pool.active_members), 1)
+
+    def test_no_active_clients(self):
+        pool = ClientPool([FakeClient("a", NotAuthorizedError())])
+        with self.assertRaises(NoActiveClientsError):
+            pool.get_profile("test")
+
+    def test_other_errors_propagate(self):
+        pool = ClientPool([
+            FakeClient("a", ResponseError(error="Not found")),
+            FakeClient("b"),
+        ])
+        with self.assertRaises(ResponseError):
+            pool.get_profile("test")
+        self.assertEqual(len(pool.active_members), 2)
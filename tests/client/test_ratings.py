@@ -0,0 +1,161 @@
+import threading
+
+from habr.career.client.companies import CompanyRatingCriteria, CompanySize
+from habr.career.client.companies.models import Ratings
+from habr.career.client.companies.ratings import (
+    RatingsCrawler,
+    RatingsStore,
+    rating_years,
+)
+from tests.utils import SQLiteTestCase
+
+PER_PAGE = 2
+
+# Year -> companies of the huge size in the order of average score
+COMPANIES = {
+    2022: ["alpha", "beta", "gamma"],
+    2023: ["beta", "gamma", "alpha", "delta"],
+}
+
+
+def rating(alias: str, position: int, score: float) -> dict:
+    return {
+        "summary": {
+            "visible_summary": True,
+            "href": f"/companies/{alias}/scores",
+            "title": "Средняя оценка компании",
+            "value": str(score),
+        },
+        "scores": {
+            "featured": {"title": "Средняя оценка", "value": str(score)},
+            "items": [
+                {"title": "Интересные задачи", "value": str(score - 1),
+                 "level": "average"},
+                {"title": "Неизвестный критерий", "value": "1",
+                 "level": "average"},
+            ],
+        },
+        "review": {
+            "shouldCollapse": False,
+            "summary": "",
+            "positives": "",
+            "negatives": "",
+        },
+        "position": position,
+        "company": {
+            "title": alias.title(),
+            "description": "",
+            "href": f"/companies/{alias}",
+            "avatar": {
+                "src": "https://habrastorage.org/logo.png",
+                "src2x": "https://habrastorage.org/logo.png",
+                "alt": alias,
+            },
+            "rateHref": None,
+            "location": None,
+            "vacancies": None,
+            "awards": [],
+            "accredited": True,
+        },
+    }
+
+
+class FakeClient:
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get_companies_ratings(self, year, size, sort, page) -> Ratings:
+        with self.lock:
+            self.requests.append((year, size, sort, page))
+        companies = COMPANIES.get(year, []) if size == CompanySize.HUGE else []
+        if sort == CompanyRatingCriteria.S2:
+            companies = companies[::-1]
+        start = (page - 1) * PER_PAGE
+        return Ratings.model_validate({
+            "list": [
+                rating(alias, start + i + 1,
+                       5 - COMPANIES[year].index(alias) * 0.5)
+                for i, alias in enumerate(companies[start:start + PER_PAGE])
+            ],
+            "meta": {
+                "perPage": PER_PAGE,
+                "currentPage": page,
+                "totalPages": -(-len(companies) // PER_PAGE),
+                "totalResults": len(companies),
+                "counterDescription": "",
+            },
+        })
+
+
+class RatingsTestCase(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = RatingsStore(self.path)
+        self.client = FakeClient()
+        self.crawler = RatingsCrawler(self.client, self.store, rate=None)
+
+    def run_crawler(self, **kwargs):
+        return self.crawler.run(
+            [2022, 2023],
+            sizes=[CompanySize.HUGE, CompanySize.BIG],
+            criteria=[CompanyRatingCriteria.AV, CompanyRatingCriteria.S2],
+            **kwargs,
+        )
+
+    def test_rating_years(self):
+        self.assertEqual(rating_years(2023), [2019, 2020, 2021, 2022, 2023])
+
+    def test_crawl(self):
+        stats = self.run_crawler()
+        self.assertEqual(stats.queries, 8)
+        # 2 + 2 pages of huge companies per criterion, 1 empty page of big
+        self.assertEqual(stats.fetched, 12)
+        self.assertEqual(stats.ratings, 14)
+        self.assertEqual(stats.failed, {})
+        self.assertEqual(self.store.years(), [2022, 2023])
+        # Criteria are stored by value, not by position in the enum
+        saved = self.store.saved_pages([2022])
+        self.assertEqual({key[2] for key in saved}, {"av", "s_2"})
+
+        # Saved past years are skipped, fresh latest year too
+        self.client.requests.clear()
+        stats = self.run_crawler()
+        self.assertEqual((stats.fetched, stats.skipped), (0, 12))
+
+        # Stale pages of the latest year only are fetched again
+        stats = self.run_crawler(max_age=0)
+        self.assertEqual((stats.fetched, stats.skipped), (6, 6))
+        self.assertEqual({r[0] for r in self.client.requests}, {2023})
+
+    def test_trend(self):
+        self.run_crawler()
+        self.assertEqual(self.store.find("Gamma"), "gamma")
+        self.assertIsNone(self.store.find("omega"))
+
+        trend = self.store.trend("alpha")
+        self.assertEqual([(s.year, s.score, s.position) for s in trend],
+                         [(2022, 5.0, 1), (2023, 4.0, 3)])
+        trend = self.store.trend("alpha", CompanyRatingCriteria.S2)
+        self.assertEqual([(s.year, s.score, s.position) for s in trend],
+                         [(2022, 4.0, 3), (2023, 3.0, 2)])
+        self.assertEqual(self.store.trend("alpha", CompanyRatingCriteria.S3),
+                         [])
+
+    def test_rank_changes(self):
+        self.run_crawler()
+        changes = self.store.rank_changes(2023, 2022)
+        self.assertEqual(
+            [(c.alias, c.position, c.previous, c.change) for c in changes],
+            [
+                ("beta", 1, 2, 1),
+                ("gamma", 2, 3, 1),
+                ("alpha", 3, 1, -2),
+                ("delta", 4, None, None),
+            ],
+        )
+        changes = self.store.rank_changes(2023, 2022, k=2)
+        self.assertEqual([c.alias for c in changes], ["alpha", "beta"])
+        self.assertEqual(changes[0].previous_score, 5.0)
+        self.assertEqual(
+            self.store.rank_changes(2023, 2022, size=CompanySize.BIG), [])
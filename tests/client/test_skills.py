@@ -0,0 +1,100 @@
+from habr.career.client.crawl import (
+    CrawlCoordinator,
+    CrawlWorker,
+    SQLiteWorkQueue,
+)
+from habr.career.client.skills import (
+    SkillIndex,
+    SkillRank,
+    SkillSource,
+    vacancy_document,
+)
+from tests.fixtures import vacancy
+from tests.utils import SQLiteTestCase, temp_path
+
+
+def resume(index: int, skills: tuple[int, ...], qualification: int = 5,
+           location: int = 678) -> dict:
+    return {
+        "id": f"user{index}",
+        "qualification": {"title": f"Q{qualification}", "value": qualification},
+        "location": {"title": f"L{location}", "value": location},
+        "skills": [{"title": f"S{s}", "value": s} for s in skills],
+    }
+
+
+def page(*items: dict) -> dict:
+    return {"list": list(items)}
+
+
+class FakeClient:
+    def get_resumes(self, page: int = 1, **filters) -> dict:
+        return {"list": [resume(page + 10, (1, 2))]}
+
+    def get_vacancies(self, page: int = 1, **filters) -> dict:
+        return {"list": [vacancy(page)]}
+
+
+class SkillIndexTestCase(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index = SkillIndex(self.path)
+        self.index.add_resumes(page(
+            resume(0, (1, 2, 3)),
+            resume(1, (1, 2)),
+            resume(2, (1, 3), qualification=3),
+            resume(3, (2, 4), location=1),
+            resume(4, (4,)),
+        ))
+
+    def test_vacancy_document(self):
+        document = vacancy_document(vacancy(7))
+        self.assertEqual(document.id, "1000000007")
+        self.assertEqual(document.qualification, 5)
+        self.assertEqual(document.location, 678)
+        self.assertEqual(document.skills[3], "Навык 3")
+
+    def test_incremental(self):
+        # Indexed resumes are not counted again
+        self.assertEqual(self.index.add_resumes(page(
+            resume(0, (1, 2, 3)), resume(5, (1, 2)))), 1)
+        self.assertEqual(self.index.documents(), 6)
+        self.assertEqual(self.index.counts()[1], 4)
+        self.assertEqual(self.index.documents(qualification=5), 5)
+        self.assertEqual(self.index.documents(location=1), 1)
+
+    def test_related(self):
+        skill = self.index.find("s1")
+        self.assertEqual(skill, 1)
+        related = self.index.related(
+            skill, rank=SkillRank.COUNT, min_count=1)
+        self.assertEqual([(s.title, s.count) for s in related],
+                         [("S2", 2), ("S3", 2)])
+
+        # Senior resumes in the location only
+        related = self.index.related(
+            1, qualification=5, location=678, min_count=1)
+        self.assertEqual([(s.skill, s.count) for s in related],
+                         [(2, 2), (3, 1)])
+        self.assertAlmostEqual(related[0].score, 2 * 3 / (2 * 2))
+        self.assertAlmostEqual(related[1].score, 1 * 3 / (2 * 1))
+        self.assertEqual(self.index.related(1, min_count=3), [])
+
+    def test_demand(self):
+        self.index.add_vacancies(page(*[vacancy(i) for i in range(4)]))
+        demand = self.index.demand(k=2)
+        self.assertEqual(len(demand), 2)
+        self.assertEqual(demand[0].count, 4)
+        # Skill 1 is in 3 of 5 resumes, skill 0 is in none of them
+        self.assertEqual(demand[0].skill, 0)
+        self.assertAlmostEqual(demand[0].score, 1 / (1 / 5))
+        self.assertEqual(self.index.demand(location=1), [])
+
+    def test_add_crawl(self):
+        queue = SQLiteWorkQueue(temp_path(self))
+        coordinator = CrawlCoordinator(queue)
+        coordinator.plan_resumes("skills", pages=2)
+        coordinator.plan_vacancies("skills", pages=1)
+        CrawlWorker(queue, FakeClient()).run()
+        self.assertEqual(self.index.add_crawl(queue, "skills"), 3)
+        self.assertEqual(self.index.documents(SkillSource.VACANCIES), 1)
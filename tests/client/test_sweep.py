@@ -0,0 +1,133 @@
+import io
+import threading
+import time
+
+from habr.career.client.salaries import EmploymentType
+from habr.career.client.salaries.models import SalaryGeneralGraph
+from habr.career.client.salaries.sweep import (
+    PERCENTILES,
+    SalarySweeper,
+    SQLiteSweepStore,
+    SweepDimensions,
+)
+from habr.career.utils import Qualification, RateLimiter
+from tests.utils import SQLiteTestCase
+
+
+def make_graph(base: int) -> SalaryGeneralGraph:
+    return SalaryGeneralGraph.model_validate({
+        "groups": [
+            {
+                "name": name,
+                "min": base,
+                "p25": base + 1,
+                "median": base + 2,
+                "p75": base + 3,
+                "max": base + 4,
+                "total": 100,
+                "title": name,
+                "specTitle": None,
+                "seoTitle": None,
+                "salary": {
+                    "total": base, "value": base, "bonus": 0,
+                    "bonusPercent": 0,
+                },
+            }
+            for name in ("All", "Junior", "Senior")
+        ],
+    })
+
+
+class FakeClient:
+    def __init__(self, fail_specializations=()):
+        self.fail_specializations = set(fail_specializations)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_salary_general_graph(self, specializations=None, **kwargs):
+        with self.lock:
+            self.calls.append((specializations, kwargs))
+        if specializations and specializations[0] in self.fail_specializations:
+            raise RuntimeError("Broken graph")
+        return make_graph(1000 * len(self.calls))
+
+
+class SweepTestCase(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = SQLiteSweepStore(self.path)
+
+    def test_queries_are_deduplicated(self):
+        dimensions = SweepDimensions(
+            specializations=["backend", "frontend", "backend"],
+            locations=["c_1", "c_2"],
+            remote=[None, True],
+            employment_types=[EmploymentType.FULL_TIME],
+        )
+        queries = dimensions.queries()
+        self.assertEqual(len(queries), 8)
+        self.assertEqual(len({q.key for q in queries}), 8)
+        self.assertEqual(queries[0].params, {
+            "specializations": ["backend"],
+            "locations": ["c_1"],
+            "skills": None,
+            "remote": None,
+            "employment_type": EmploymentType.FULL_TIME,
+        })
+
+    def test_run_saves_tidy_rows(self):
+        client = FakeClient()
+        stats = SalarySweeper(client, self.store, rate=None).run(
+            "week",
+            SweepDimensions(
+                qualifications=[Qualification.JUNIOR, Qualification.SENIOR],
+                specializations=["backend", "frontend"],
+            ),
+        )
+        self.assertEqual((stats.total, stats.fetched, stats.rows), (2, 2, 20))
+        rows = list(self.store.rows("week"))
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(
+            {(r["specialization"], r["qualification"]) for r in rows},
+            {(s, q) for s in ("backend", "frontend")
+             for q in ("Junior", "Senior")},
+        )
+        self.assertEqual(
+            [r["percentile"] for r in rows[:5]], list(PERCENTILES))
+
+        output = io.StringIO()
+        self.assertEqual(self.store.export_csv("week", output), 20)
+        self.assertTrue(output.getvalue().startswith("specialization,"))
+
+    def test_run_resumes(self):
+        dimensions = SweepDimensions(
+            specializations=["backend", "frontend", "qa"])
+        stats = SalarySweeper(
+            FakeClient(fail_specializations=["qa"]), self.store, rate=None,
+        ).run("week", dimensions)
+        self.assertEqual((stats.fetched, len(stats.failed)), (2, 1))
+
+        client = FakeClient()
+        stats = SalarySweeper(client, self.store, rate=None).run(
+            "week", dimensions)
+        # Only the failed combination is fetched again
+        self.assertEqual((stats.skipped, stats.fetched), (2, 1))
+        self.assertEqual([c[0] for c in client.calls], [["qa"]])
+        self.assertEqual(len(list(self.store.rows("week"))), 45)
+
+        # Other sweeps are independent
+        stats = SalarySweeper(FakeClient(), self.store, rate=None).run(
+            "next week", dimensions)
+        self.assertEqual(stats.fetched, 3)
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(50)
+        started = time.monotonic()
+        threads = [
+            threading.Thread(target=limiter.acquire) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # The first call is not delayed, the rest are spaced by 20 ms
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
@@ -0,0 +1,54 @@
+import unittest
+
+from habr.career.client.conversations.models import Conversations
+from habr.career.client.resumes.models import Resumes
+from habr.career.client.validation import (
+    LazyDict,
+    LazyList,
+    materialize,
+    validate,
+)
+from habr.career.utils import HABRCareerClientError, ValidationMode
+from tests.fixtures import example
+
+
+class ValidationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data = example(Resumes)
+
+    def test_strict(self):
+        obj = validate(Resumes, self.data)
+        self.assertIsInstance(obj.objects[0], Resumes.Resume)
+        self.assertNotIsInstance(obj.objects, LazyList)
+
+    def test_raw(self):
+        self.assertIs(validate(Resumes, self.data, ValidationMode.RAW),
+                      self.data)
+
+    def test_lazy(self):
+        obj = validate(Resumes, self.data, ValidationMode.LAZY)
+        self.assertIsInstance(obj.objects, LazyList)
+        self.assertEqual(obj.objects.validated_count(), 0)
+        self.assertEqual(obj.meta.per_page, self.data["meta"]["perPage"])
+
+        self.assertEqual(obj.objects[1].id, self.data["list"][1]["id"])
+        self.assertEqual(obj.objects.validated_count(), 1)
+        self.assertEqual(len(obj.objects[:3]), 3)
+        self.assertEqual(obj.objects.validated_count(), 3)
+
+        strict = validate(Resumes, self.data)
+        self.assertEqual(materialize(obj).model_dump(), strict.model_dump())
+
+    def test_lazy_dict(self):
+        data = example(Conversations)
+        obj = validate(Conversations, data, ValidationMode.LAZY)
+        self.assertIsInstance(obj.objects, LazyDict)
+        login, item = obj.objects.items()[0]
+        self.assertEqual(item.login, data["conversationObjects"][login]["login"])
+
+    def test_lazy_invalid_item(self):
+        self.data["list"][2]["avatar"] = None
+        obj = validate(Resumes, self.data, ValidationMode.LAZY)
+        self.assertEqual(obj.objects[1].id, self.data["list"][1]["id"])
+        with self.assertRaises(HABRCareerClientError):
+            obj.objects[2]
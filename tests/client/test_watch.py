@@ -0,0 +1,192 @@
+import unittest
+from types import SimpleNamespace
+
+from habr.career.client.conversations.models import Conversations, Messages
+from habr.career.client.friendships.models import FriendshipRequests
+from habr.career.client.users.models import User
+from habr.career.client.watch import NotificationWatcher, WatchEventKind
+
+
+def message(id_: int, author: str, minute: int, mine: bool = False) -> dict:
+    return {
+        "id": id_,
+        "createdAt": f"2024-01-01T10:{minute:02}:00+03:00",
+        "body": f"<p>Message {id_}</p>",
+        "authorId": "me" if mine else author,
+        "isMine": mine,
+    }
+
+
+class FakeClient:
+    def __init__(self):
+        self.counters = {"messages": 0, "friends": 0, "events": 0}
+        # Username -> messages, the latest conversation first
+        self.conversations = {}
+        self.requests = []
+        self.calls = []
+        self.per_page = 20
+
+    @property
+    def user(self):
+        self.calls.append("user")
+        counters = User._User.NotificationCounters(**self.counters)
+        return SimpleNamespace(
+            user=SimpleNamespace(notification_counters=counters))
+
+    def get_conversations(self, page: int = 1) -> Conversations:
+        self.calls.append("conversations")
+        usernames = list(self.conversations)
+        objects = {}
+        for username in usernames[(page - 1) * self.per_page:
+                                  page * self.per_page]:
+            messages = self.conversations[username]
+            last = messages[-1]
+            objects[username] = {
+                "fullName": username.title(),
+                "avatarUrl": "https://habrastorage.org/avatar.png",
+                "login": username,
+                "subtitle": None,
+                "conversation": {"lastMessage": {
+                    "body": last["body"],
+                    "createdAt": last["createdAt"],
+                    "isMine": last["isMine"],
+                    "isRead": False,
+                }},
+                "banned": {"status": False, "message": None},
+                "isExpert": False,
+            }
+        return Conversations.model_validate({
+            "conversationObjects": objects,
+            "conversationIds": list(objects),
+            # Pages count, as the API returns it
+            "meta": {
+                "total": -(-len(usernames) // self.per_page),
+                "page": page,
+                "perPage": self.per_page,
+            },
+        })
+
+    def get_messages(self, username: str) -> Messages:
+        self.calls.append(f"messages {username}")
+        messages = self.conversations[username]
+        return Messages.model_validate({
+            "data": messages,
+            "meta": {"total": len(messages), "page": 1, "perPage": 20},
+        })
+
+    def get_friendship_requests(self, page: int = 1) -> FriendshipRequests:
+        self.calls.append("requests")
+        return FriendshipRequests.model_validate({
+            "list": [
+                {
+                    "id": username,
+                    "title": username.title(),
+                    "subtitle": None,
+                    "href": f"/{username}",
+                    "friendship": "incoming",
+                    "avatar": {
+                        "alt": username,
+                        "src": "https://habrastorage.org/avatar.png",
+                        "src2x": "https://habrastorage.org/avatar.png",
+                    },
+                    "isExpert": False,
+                }
+                for username in self.requests
+            ],
+            "meta": {"currentPage": page, "totalPages": 1, "perPage": 20},
+        })
+
+
+class WatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.sleeps = []
+        self.watcher = NotificationWatcher(
+            self.client,
+            min_interval=10,
+            max_interval=30,
+            backoff=2,
+            sleep=self.sleeps.append,
+        )
+
+    def test_quiet(self):
+        self.assertEqual(list(self.watcher.watch(polls=4)), [])
+        self.assertEqual(self.sleeps, [20, 30, 30])
+        # Counters only
+        self.assertEqual(self.client.calls, ["user"] * 4)
+
+    def test_messages(self):
+        self.client.conversations = {
+            "alice": [message(1, "alice", 0), message(2, "alice", 1)],
+        }
+        self.client.counters["messages"] = 1
+        events = self.watcher.poll()
+        # Unread before the first poll: the last message only
+        self.assertEqual(
+            [(e.kind, e.username, e.message and e.message.id)
+             for e in events],
+            [
+                (WatchEventKind.COUNTER, None, None),
+                (WatchEventKind.MESSAGE, "alice", 2),
+            ],
+        )
+
+        self.client.conversations = {
+            "bob": [message(3, "bob", 5)],
+            "alice": [
+                message(1, "alice", 0),
+                message(2, "alice", 1),
+                message(4, "me", 6, mine=True),
+                message(5, "alice", 7),
+                message(6, "alice", 8),
+            ],
+        }
+        self.client.counters["messages"] = 4
+        self.client.calls.clear()
+        events = self.watcher.poll()
+        self.assertEqual(
+            [(e.username, e.message.id) for e in events[1:]],
+            [("bob", 3), ("alice", 5), ("alice", 6)],
+        )
+        self.assertEqual(events[1].value, 4)
+        self.assertEqual(events[1].to_jsonable()["message"]["authorId"], "bob")
+        self.assertEqual(self.watcher.interval, 10)
+
+        # Counter goes down: read elsewhere, nothing is fetched
+        self.client.counters["messages"] = 0
+        self.client.calls.clear()
+        events = self.watcher.poll()
+        self.assertEqual([e.kind for e in events], [WatchEventKind.COUNTER])
+        self.assertEqual(self.client.calls, ["user"])
+
+    def test_messages_pages(self):
+        self.client.per_page = 2
+        self.client.conversations = {
+            "bob": [message(3, "bob", 2)],
+            "carol": [message(2, "me", 1, mine=True)],
+            # Unread conversation on the second page
+            "alice": [message(1, "alice", 0)],
+        }
+        self.client.counters["messages"] = 2
+        events = self.watcher.poll()
+        self.assertEqual([(e.username, e.message.id) for e in events[1:]],
+                         [("bob", 3), ("alice", 1)])
+        self.assertEqual(self.client.calls.count("conversations"), 2)
+
+    def test_friendship_requests(self):
+        self.client.requests = ["carol"]
+        self.client.counters["friends"] = 1
+        self.client.counters["events"] = 2
+        events = self.watcher.poll()
+        self.assertEqual(
+            [(e.kind, e.counter, e.username) for e in events],
+            [
+                (WatchEventKind.COUNTER, "friends", None),
+                (WatchEventKind.FRIENDSHIP_REQUEST, "friends", "carol"),
+                (WatchEventKind.COUNTER, "events", None),
+            ],
+        )
+        self.client.requests = ["dave", "carol"]
+        self.client.counters["friends"] = 2
+        events = self.watcher.poll()
+        self.assertEqual([e.username for e in events[1:]], ["dave"])
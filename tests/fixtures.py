@@ -0,0 +1,295 @@
+"""
+Fixtures served by the stand-in server, shared by tests and benchmarks.
+
+Every fixture is either recorded from the live site (see `record` command)
+or generated from the client pydantic models, so generated responses are
+always valid for the current models. Generation is deterministic:
+the same fixtures are produced on every run which makes results comparable.
+"""
+import json
+import re
+import types
+import typing
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable
+
+from pydantic import BaseModel, HttpUrl
+
+from habr.career.client.companies.models import Ratings
+from habr.career.client.conversations.models import (
+    Conversation,
+    Conversations,
+    Messages,
+    Templates,
+)
+from habr.career.client.experts.models import Experts
+from habr.career.client.friendships.models import Friends, FriendshipRequests
+from habr.career.client.resumes.models import Resumes
+from habr.career.client.salaries.models import (
+    MySalary,
+    SalaryChart,
+    SalaryDynamicGraph,
+    SalaryGeneralGraph,
+)
+from habr.career.client.users.models import User
+
+FIXTURES_DIR = Path(__file__).parent / "data" / "fixtures"
+
+# Items count of top level lists, e.g. resumes on a page
+PAGE_SIZE = 25
+# Items count of nested lists, e.g. resume skills
+NESTED_SIZE = 5
+
+SSR_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ru">
+<head><meta charset="UTF-8"><title>Хабр Карьера</title></head>
+<body>
+{filler}
+<script type="application/json" data-ssr-state="true">{data}</script>
+</body>
+</html>
+"""
+# Markup around SSR state to get pages of a size comparable with live ones
+SSR_FILLER = (
+    '<div class="section"><a class="link" href="/vacancies?page={i}">'
+    "Раздел {i}</a><p>Описание <b>раздела</b> номер {i}</p></div>\n"
+)
+SSR_FILLER_SIZE = 1000
+
+# Values of string fields which are parsed further by client or CLI
+STRING_VALUES = {
+    "currency": "rur",
+    "unit": "rur",
+}
+
+
+def example(
+        annotation: Any,
+        name: str = "",
+        index: int = 0,
+        size: int = PAGE_SIZE,
+) -> Any:
+    """
+    Generate JSON data valid for the annotation.
+    Pydantic models are converted to dicts using field aliases.
+
+    :param annotation: Type annotation, e.g. pydantic model
+    :param name: Field name, used as part of generated strings
+    :param index: Item index
+    :param size: Size of generated lists
+    :return:
+    """
+    if isinstance(annotation, typing.TypeAliasType):
+        return example(annotation.__value__, name, index, size)
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is typing.Annotated:
+        return example(args[0], name, index, size)
+    if origin in (typing.Union, types.UnionType):
+        # The first non-null variant
+        variant = next(a for a in args if a is not type(None))
+        return example(variant, name, index, size)
+    if origin is typing.Literal:
+        return args[0]
+    if origin is list or annotation is list:
+        if not args:
+            return []
+        return [
+            example(args[0], name, i, NESTED_SIZE)
+            for i in range(size)
+        ]
+    if origin is dict:
+        return {
+            example(args[0], name, i): example(args[1], name, i, NESTED_SIZE)
+            for i in range(size)
+        }
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return {
+                info.alias or field_name: example(
+                    info.annotation, field_name, index, size)
+                for field_name, info in annotation.model_fields.items()
+            }
+        if issubclass(annotation, Enum):
+            return list(annotation)[0].value
+        if issubclass(annotation, bool):
+            return index % 2 == 0
+        if issubclass(annotation, int):
+            return 1000 + index
+        if issubclass(annotation, float):
+            return 1000.5 + index
+        if issubclass(annotation, str):
+            return STRING_VALUES.get(name, f"{name}-{index}")
+        if issubclass(annotation, datetime):
+            return f"2023-10-{index % 28 + 1:02d}T12:00:00+03:00"
+        if issubclass(annotation, date):
+            return f"2023-10-{index % 28 + 1:02d}"
+    if annotation is HttpUrl:
+        return f"https://habrastorage.org/{name}/{index}.png"
+    raise TypeError(f"Unsupported annotation: {annotation!r}")
+
+
+def vacancy(index: int) -> dict[str, Any]:
+    """Vacancy list item, vacancies have no model to generate them from."""
+    return {
+        "id": 1000000000 + index,
+        "href": f"/vacancies/{1000000000 + index}",
+        "title": f"Python разработчик {index}",
+        "isMarked": False,
+        "remoteWork": index % 2 == 0,
+        "salaryQualification": {
+            "title": "Старший (Senior)",
+            "href": "/vacancies?qid=5",
+        },
+        "publishedDate": {
+            "date": "2023-12-07T06:21:11+03:00",
+            "title": "7 декабря",
+        },
+        "location": None,
+        "company": {
+            "alias_name": f"company{index}",
+            "href": f"/companies/company{index}",
+            "title": f"Компания {index}",
+            "accredited": True,
+            "logo": {"src": f"https://habrastorage.org/logo/{index}.png"},
+            "rating": None,
+        },
+        "employment": "full_time",
+        "salary": {
+            "from": 200000,
+            "to": 400000 + index,
+            "currency": "rur",
+            "formatted": f"от 200 000 до {400000 + index} ₽",
+        },
+        "divisions": [
+            {"title": "Бэкенд разработчик", "href": "/vacancies?s%5B%5D=2"},
+        ],
+        "skills": [
+            {"title": f"Навык {i}", "href": f"/vacancies?skills%5B%5D={i}"}
+            for i in range(NESTED_SIZE)
+        ],
+        "media": None,
+        "locations": [{"title": "Москва", "href": "/vacancies?city_id=678"}],
+        "favorite": False,
+        "archived": False,
+        "hidden": False,
+        "can_edit": False,
+        "reactions": {"items": [], "fallbackHref": None},
+    }
+
+
+def vacancies() -> dict[str, Any]:
+    return {
+        "list": [vacancy(i) for i in range(PAGE_SIZE)],
+        "meta": {
+            "totalResults": PAGE_SIZE * 10,
+            "perPage": PAGE_SIZE,
+            "currentPage": 1,
+            "totalPages": 10,
+        },
+    }
+
+
+@dataclass
+class Fixture:
+    """
+    Recorded or generated response.
+
+    :param name: Fixture name, also the file name
+    :param route: Regular expression matching request path
+    :param build: Builds response data when fixture is not recorded
+    :param method: HTTP method
+    :param ssr: Whether response is server side rendered HTML page
+    """
+    name: str
+    route: str
+    build: Callable[[], Any]
+    method: str = "GET"
+    ssr: bool = False
+    pattern: re.Pattern = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.pattern = re.compile(self.route)
+
+    @property
+    def path(self) -> Path:
+        suffix = "html" if self.ssr else "json"
+        return FIXTURES_DIR / f"{self.name}.{suffix}"
+
+    def render(self, data: Any) -> bytes:
+        if not self.ssr:
+            return json.dumps(data, ensure_ascii=False).encode()
+        filler = "".join(
+            SSR_FILLER.format(i=i) for i in range(SSR_FILLER_SIZE))
+        state = json.dumps(data, ensure_ascii=False)
+        return SSR_PAGE_TEMPLATE.format(filler=filler, data=state).encode()
+
+    def load(self) -> bytes:
+        """Load recorded fixture falling back to generated one."""
+        if self.path.exists():
+            return self.path.read_bytes()
+        return self.render(self.build())
+
+    def save(self, content: bytes) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_bytes(content)
+
+
+def model(cls: type[BaseModel], **overrides) -> Callable[[], dict[str, Any]]:
+    def build():
+        return {**example(cls), **overrides}
+    return build
+
+
+# Order matters: the first fixture matching request path is used
+FIXTURES = [
+    Fixture("me", r"^/api/frontend_v1/users/me$", model(User)),
+    Fixture("resumes", r"^/api/frontend/resumes$", model(Resumes)),
+    Fixture("vacancies", r"^/api/frontend/vacancies$", vacancies),
+    Fixture("experts", r"^/api/frontend_v1/experts$", model(Experts)),
+    Fixture("ratings", r"^/api/frontend/companies/ratings$", model(Ratings)),
+    Fixture("templates", r"^/api/frontend/conversations/templates$",
+            model(Templates)),
+    Fixture("conversations", r"^/api/frontend/conversations(/search)?$",
+            model(Conversations)),
+    Fixture("messages", r"^/api/frontend/conversations/[^/]+/messages$",
+            model(Messages)),
+    Fixture("conversation", r"^/api/frontend/conversations/[^/]+$",
+            model(Conversation)),
+    Fixture("friends", r"^/api/frontend/users/[^/]+/friendships$",
+            model(Friends)),
+    Fixture("friendship_requests",
+            r"^/api/frontend/users/[^/]+/friendship_requests$",
+            model(FriendshipRequests)),
+    Fixture("my_salary", r"^/api/frontend_v1/salary_calculator/my_salary$",
+            model(MySalary)),
+    Fixture("salary_general_graph",
+            r"^/api/frontend_v1/salary_calculator/general_graph$",
+            model(SalaryGeneralGraph)),
+    Fixture("salary_dynamic_graph",
+            r"^/api/frontend_v1/salary_calculator/dynamic_graph$",
+            model(SalaryDynamicGraph)),
+    Fixture("salary_chart", r"^/api/frontend_v1/salary_chart$",
+            model(SalaryChart)),
+    # Server side rendered pages
+    Fixture("resumes_page", r"^/resumes$",
+            lambda: {"resumes": example(Resumes)}, ssr=True),
+    Fixture("vacancy_page", r"^/vacancies/\d+$",
+            lambda: {"vacancy": vacancy(0)}, ssr=True),
+    Fixture("conversation_page", r"^/conversations/[^/]+$",
+            lambda: {"conversation": example(Conversation)}, ssr=True),
+    Fixture("profile_page", r"^/[^/]+$",
+            lambda: {"user": example(User)["user"]}, ssr=True),
+]
+
+
+def find_fixture(method: str, path: str) -> Fixture | None:
+    for fixture in FIXTURES:
+        if fixture.method == method and fixture.pattern.match(path):
+            return fixture
+    return None
@@ -0,0 +1,145 @@
+"""
+Local stand-in for career.habr.com serving fixtures.
+Supports latency and failure injection to check client behaviour
+under slow or flaky network.
+"""
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from habr.career.client import HABRCareerClient, TokenAuthenticator
+from tests.fixtures import find_fixture
+
+LIVE_URL = "https://career.habr.com"
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Example:
+        with StandInServer(latency=0.05, failure_rate=0.1) as server:
+            client = StandInClient(server.url)
+            client.get_resumes()
+
+    :param latency: Delay before every response in seconds
+    :param jitter: Random latency deviation in seconds
+    :param failure_rate: Share of requests answered with `failure_status`
+    :param failure_status: HTTP status of injected failures
+    :param seed: Random seed, keeps injected failures reproducible
+    """
+
+    daemon_threads = True
+
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            failure_rate: float = 0.0,
+            failure_status: int = 500,
+            seed: int = 0,
+    ):
+        super().__init__((host, port), StandInHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.random = random.Random(seed)
+        self.requests_count = 0
+        self._cache: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def content(self, fixture) -> bytes:
+        with self._lock:
+            if fixture.name not in self._cache:
+                self._cache[fixture.name] = fixture.load()
+            return self._cache[fixture.name]
+
+    def next_delay_and_failure(self) -> tuple[float, bool]:
+        with self._lock:
+            self.requests_count += 1
+            delay = self.latency
+            if self.jitter:
+                delay += self.random.uniform(-self.jitter, self.jitter)
+            failed = self.random.random() < self.failure_rate
+        return max(delay, 0.0), failed
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server: StandInServer
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, Nagle's algorithm would
+    # hold the body until the client acknowledges the headers
+    disable_nagle_algorithm = True
+
+    def do_request(self) -> None:
+        delay, failed = self.server.next_delay_and_failure()
+        if delay:
+            time.sleep(delay)
+
+        path = urlsplit(self.path).path
+        fixture = find_fixture(self.command, path)
+
+        if failed:
+            self.send_content(
+                self.server.failure_status,
+                b'{"error": "Injected failure"}',
+                "application/json",
+            )
+        elif fixture is None:
+            self.send_content(404, b'{"error": "Not found"}',
+                              "application/json")
+        else:
+            content_type = "text/html" if fixture.ssr else "application/json"
+            self.send_content(200, self.server.content(fixture),
+                              f"{content_type}; charset=utf-8")
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_request
+
+    def send_content(self, status: int, body: bytes, content_type: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        """Keep benchmark output clean."""
+
+
+class StandInClient(HABRCareerClient):
+    """Client sending all requests to the stand-in server."""
+
+    def __init__(self, url: str, **kwargs):
+        self.stand_in_url = url.rstrip("/")
+        super().__init__(auth=TokenAuthenticator(token="benchmark"), **kwargs)
+
+    def make_url(self, *args, **kwargs) -> str:
+        url = super().make_url(*args, **kwargs)
+        return url.replace(LIVE_URL, self.stand_in_url, 1)
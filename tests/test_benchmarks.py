@@ -0,0 +1,76 @@
+import threading
+import unittest
+
+import requests
+from parameterized import parameterized
+
+from benchmarks import suite
+from tests import fixtures
+from tests.server import StandInClient, StandInServer
+
+
+class FixturesTestCase(unittest.TestCase):
+    @parameterized.expand([
+        (name, model) for name, model in suite.VALIDATED_MODELS.items()
+    ])
+    def test_generated_fixture_is_valid(self, name, model):
+        fixture = next(f for f in fixtures.FIXTURES if f.name == name)
+        model(**fixture.build())
+
+    @parameterized.expand([
+        ("GET", "/api/frontend/conversations/templates", "templates"),
+        ("GET", "/api/frontend/conversations/testuser", "conversation"),
+        ("GET", "/api/frontend/conversations/testuser/messages", "messages"),
+        ("GET", "/testuser", "profile_page"),
+        ("POST", "/testuser", None),
+    ])
+    def test_find_fixture(self, method, path, expected):
+        fixture = fixtures.find_fixture(method, path)
+        self.assertEqual(fixture and fixture.name, expected)
+
+
+class StandInServerTestCase(unittest.TestCase):
+    def test_client_calls(self):
+        with StandInServer() as server:
+            client = StandInClient(server.url)
+            resumes = client.get_resumes()
+            self.assertEqual(len(resumes.objects), fixtures.PAGE_SIZE)
+            profile = client.get_profile("testuser")
+            self.assertIn("user", profile)
+
+    def test_session_reuse(self):
+        with StandInServer() as server:
+            client = StandInClient(server.url)
+            session = client.session
+            client.get_resumes()
+            client.get_profile("testuser")
+            self.assertIs(client.session, session)
+            self.assertEqual(len(session.cookies), 0)
+
+            # Sessions are not shared between threads
+            sessions = []
+            thread = threading.Thread(
+                target=lambda: sessions.append(client.session))
+            thread.start()
+            thread.join()
+            self.assertIsNot(sessions[0], session)
+
+    def test_failure_injection(self):
+        with StandInServer(failure_rate=1, failure_status=429) as server:
+            response = requests.get(f"{server.url}/api/frontend/resumes")
+            self.assertEqual(response.status_code, 429)
+            response = requests.get(f"{server.url}/api/unknown")
+            self.assertEqual(response.status_code, 429)
+
+        with StandInServer() as server:
+            response = requests.get(f"{server.url}/api/unknown")
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(server.requests_count, 1)
+
+    def test_compare(self):
+        def entry(median):
+            return {"results": {"case": {"median": median}}}
+
+        self.assertEqual(suite.compare(entry(1.05), entry(1)), [])
+        [(name, *_)] = suite.compare(entry(1.5), entry(1))
+        self.assertEqual(name, "case")
@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+
+import requests
+from parameterized import parameterized
+
+from habr.career import codec
+from habr.career.cli.utils import output_as_json
+from habr.career.client import HABRCareerClient, TokenAuthenticator
+from habr.career.utils import ResponseError
+
+PDF = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+
+
+class CodecTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.addCleanup(setattr, codec, "_codec", codec._codec)
+
+    @parameterized.expand([
+        (c.name, c) for c in codec.available_codecs()
+    ])
+    def test_round_trip(self, _, json_codec: codec.JSONCodec) -> None:
+        data = {"title": "Разработчик", "skills": [1, 2], "remote": None}
+        self.assertEqual(json_codec.loads(json_codec.dumps(data)), data)
+        self.assertEqual(json_codec.loads(json_codec.dumpb(data)), data)
+        self.assertIn("Разработчик", json_codec.dumps(data, indent=4))
+
+    @parameterized.expand([
+        (c.name, c) for c in codec.available_codecs()
+    ])
+    def test_decode_error(self, _, json_codec: codec.JSONCodec) -> None:
+        for data in (b"<html></html>", PDF):
+            with self.assertRaises(codec.JSONDecodeError):
+                json_codec.loads(data)
+
+    @parameterized.expand([
+        (c.name, c) for c in codec.available_codecs()
+    ])
+    def test_not_finite(self, _, json_codec: codec.JSONCodec) -> None:
+        data = {"mean": float("nan"), "range": [float("-inf"), 1.5]}
+        for indent in (None, 2):
+            text = json_codec.dumps(data, indent=indent)
+            self.assertNotIn("NaN", text)
+            self.assertNotIn("Infinity", text)
+            self.assertEqual(json_codec.loads(text),
+                             {"mean": None, "range": [None, 1.5]})
+
+    def test_cli_output(self) -> None:
+        for json_codec in codec.available_codecs():
+            codec._codec = json_codec
+            text = output_as_json(skills=[{"mean": float("nan")}])
+            self.assertEqual(codec.STDLIB.loads(text),
+                             {"skills": [{"mean": None}]})
+            self.assertIn('\n    "skills"', text)
+
+    def test_stdlib_fallback(self) -> None:
+        self.assertIsInstance(codec.available_codecs()[-1], codec.StdlibCodec)
+        self.assertEqual(codec.set_codec("json").name, "json")
+        self.assertEqual(codec.loads('{"a": 1}'), {"a": 1})
+
+    def test_unknown_codec(self) -> None:
+        with self.assertRaises(ValueError):
+            codec.set_codec("simdjson")
+
+
+class ClientDecodeTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = HABRCareerClient(auth=TokenAuthenticator(token="test"))
+        self.addCleanup(setattr, codec, "_codec", codec._codec)
+
+    @staticmethod
+    def response(status: int, body: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "Error"
+        response._content = body
+        return response
+
+    @parameterized.expand([
+        (c.name, c) for c in codec.available_codecs()
+    ])
+    def test_binary_body(self, _, json_codec: codec.JSONCodec) -> None:
+        codec._codec = json_codec
+        with mock.patch.object(requests.Session, "send",
+                               return_value=self.response(200, PDF)):
+            self.assertEqual(self.client.get_cv("testuser"), PDF)
+        with mock.patch.object(requests.Session, "send",
+                               return_value=self.response(500, PDF)):
+            with self.assertRaises(ResponseError):
+                self.client.get_cv("testuser")
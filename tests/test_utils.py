@@ -1,13 +1,23 @@
+import itertools
+import json
+import random
 import unittest
 from time import sleep, time
 
 from parameterized import parameterized
+from requests import PreparedRequest
 
 from habr.career.utils import (
     get_ssr_json,
+    get_ssr_json_text,
     cleanup_tags,
+    cleanup_tags_many,
+    _cleanup_tags_soup,
     bool_to_str,
     ConcurrentJobs,
+    Convertor,
+    Currency,
+    QueryEncoder,
 )
 
 
@@ -17,6 +27,20 @@ class UtilsTestCase(unittest.TestCase):
             data = get_ssr_json(f.read())
         self.assertEqual(data, {"value": "Testing"})
 
+    @parameterized.expand([
+        ('<script type="application/json" data-ssr-state="true">',),
+        ("<SCRIPT data-ssr-state='true' id=state type=application/json>",),
+        # Not found by the fast path, parsed with BeautifulSoup
+        ('<script data-x="a>b" type="application/json"'
+         ' data-ssr-state="true">',),
+    ])
+    def test_get_ssr_json_text(self, tag: str) -> None:
+        html_code = (
+            '<html><script type="application/json">{"other": 1}</script>'
+            f'{tag}{{"value": "</b>"}}</script></html>'
+        )
+        self.assertEqual(get_ssr_json_text(html_code), '{"value": "</b>"}')
+
     def test_clean_tags(self):
         cleaned_text = "Test message"
         html_code = f"<p>{cleaned_text}</p>"
@@ -45,3 +69,81 @@ class UtilsTestCase(unittest.TestCase):
         dt = time() - t1
 
         self.assertAlmostEqual(dt, 1, delta=0.01)
+
+
+class QueryEncoderTestCase(unittest.TestCase):
+    @staticmethod
+    def requests_query(params: dict, **options) -> str:
+        prepared = PreparedRequest()
+        prepared.prepare_url(
+            "https://career.habr.com/api",
+            Convertor().map(params, **options),
+        )
+        return prepared.path_url.partition("?")[2]
+
+    @parameterized.expand([
+        ({"q": "python django", "page": 2}, {}),
+        ({"q": None, "skills[]": [446, 1012], "s[]": []}, {}),
+        ({"remote": True, "relocation": False}, {}),
+        ({"remote": True, "relocation": False}, {"bool_as_str": True}),
+        ({"currency": Currency.RUR, "q": "C++ & Go"}, {}),
+        ({"q": "Разработчик", "locations[]": ["c_678", "c_679"]}, {}),
+    ])
+    def test_encode_as_requests(self, params: dict, options: dict) -> None:
+        encoder = QueryEncoder(*params, **options)
+        self.assertEqual(encoder.encode(params),
+                         self.requests_query(params, **options))
+        # Cached pairs give the same result
+        self.assertEqual(encoder.encode(params),
+                         self.requests_query(params, **options))
+
+    def test_encode_schema_order(self) -> None:
+        encoder = QueryEncoder("q", "page")
+        query = encoder.encode({"extra": 1, "page": 2, "q": "a"})
+        self.assertEqual(query, "q=a&page=2&extra=1")
+
+    def test_encode_bool_and_int_cached_separately(self) -> None:
+        encoder = QueryEncoder("v", bool_as_str=True)
+        self.assertEqual(encoder.encode({"v": 1}), "v=1")
+        self.assertEqual(encoder.encode({"v": True}), "v=true")
+
+
+class CleanupTagsTestCase(unittest.TestCase):
+    OPTIONS = [
+        dict(zip(("br_replace", "p_replace", "li_replace"), flags), **kwargs)
+        for flags in itertools.product((True, False), repeat=3)
+        for kwargs in ({}, {"strip": True, "separator": "\n"})
+    ]
+    # Markup pieces for randomly generated snippets
+    TOKENS = [
+        "<p>", "</p>", "<li>", "</li>", "<ul>", "</ul>", "<b>", "</b>",
+        "<br>", "<br/>", "<BR>", "<p/>", "</div>", '<a href="?a=1&b=2">',
+        "</a>", "<img src='a.png'>", "<!-- c -->", "<pre> a </pre>",
+        "Текст", " ", "\n\n", "\t", "&amp;", "&nbsp;", "&#39;", "&#150;",
+        "&copy;", "&", "<", "<3", ">",
+    ]
+
+    def assertSameAsSoup(self, html_code: str) -> None:
+        for options in self.OPTIONS:
+            self.assertEqual(
+                cleanup_tags(html_code, **options),
+                _cleanup_tags_soup(html_code, **options),
+                msg=f"{html_code!r} {options}",
+            )
+
+    def test_corpus(self):
+        with open("tests/data/html_snippets.json", encoding="utf-8") as f:
+            corpus = json.load(f)
+        for html_code in corpus:
+            self.assertSameAsSoup(html_code)
+
+    def test_random_markup(self):
+        rnd = random.Random(0)
+        for _ in range(300):
+            size = rnd.randint(1, 12)
+            self.assertSameAsSoup(
+                "".join(rnd.choice(self.TOKENS) for _ in range(size)))
+
+    def test_cleanup_tags_many(self):
+        html_codes = ["<p>a</p>", "<li>b</li>", "<p>a</p>"]
+        self.assertEqual(cleanup_tags_many(html_codes), ["a", "— b", "a"])
@@ -1,12 +1,28 @@
 import os
+import tempfile
 import unittest
 
 from habr.career.client import HABRCareerClient, TokenAuthenticator
 
 
+def temp_path(test: unittest.TestCase, suffix: str = ".sqlite") -> str:
+    """Temporary file removed after the test."""
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    test.addCleanup(os.remove, path)
+    return path
+
+
 class BasicTestCase(unittest.TestCase):
     def setUp(self):
         token = os.getenv("HABR_CAREER_TOKEN")
         session_id = os.getenv("HABR_CAREER_SESSION_ID")
         auth = TokenAuthenticator(token=token)
         self.client = HABRCareerClient(auth=auth, session_id=session_id)
+
+
+class SQLiteTestCase(unittest.TestCase):
+    """Test case with a temporary sqlite file at `path`."""
+
+    def setUp(self):
+        self.path = temp_path(self)